@@ -0,0 +1,394 @@
+"""
+Module: Student Chat Session APIs
+----------------------------------
+This module provides APIs for students to hold a conversation with the chat assistant of their project
+milestones. A chat session keeps the latest messages of the conversation, within a token budget, and a
+summary of the older messages, so every message is answered with the context of the conversation while the
+size of the AI prompt stays bounded however long the conversation runs. The older messages are summarized in a
+background thread once the answer is sent, so neither the student nor the worker serving the request waits for
+the summary.
+
+Every change of a session increases its version, and is only saved if the session was not changed since it was
+read, so two messages sent at once in the same session do not overwrite each other's exchange.
+
+Dependencies:
+- Flask, Flask-Security: For routing, HTTP request handling, and user authentication/authorization.
+- SQLAlchemy ORM: For database operations.
+- datetime: For the expiry of the chat sessions.
+- ai_gateway: For detecting AI requests rejected by the AI gateway.
+- milestone_context: For reusing the milestone context of the chat assistant.
+- streaming: For streaming the answers.
+- ai_tokens: For estimating the number of tokens of the messages.
+- background_jobs: For summarizing the chat sessions in background threads.
+
+Roles Required:
+- Student: All endpoints require the current user to have the "Student" role.
+
+Endpoints:
+----------
+1. POST /student/chat/sessions
+2. POST /student/chat/sessions/<int:session_id>
+3. DELETE /student/chat/sessions/<int:session_id>
+
+Functions:
+----------
+1. `get_chat_session(session_id)`
+2. `split_chat_history(history, budget)`
+3. `summarize_chat_history(summary, messages)`
+4. `record_chat_exchange(session_id, version, history, user_message, answer)`
+5. `summarize_chat_session(app, session_id)`
+"""
+
+from apis.student.setup import student
+from apis.student.milestone_management import render_chat_prompt
+from flask_security import current_user, roles_required
+from application.models import ChatSessions, db
+from apis.teacher.setup import ai_client
+from apis.teacher.streaming import stream_response, completion_events, STREAM_FORMATS
+from apis.teacher.ai_gateway import AIGatewayBusy
+from apis.teacher.milestone_context import milestone_context
+from apis.teacher.ai_tokens import estimate_tokens
+from apis.teacher.background_jobs import BackgroundJobs
+from flask import abort, make_response, request, current_app
+from werkzeug.exceptions import HTTPException
+from datetime import datetime, timedelta, timezone
+
+# Model answering the chat messages and summarizing the older messages of the sessions
+CHAT_MODEL = "llama-3.1-8b-instant"
+
+# Background threads summarizing the chat sessions
+summary_jobs = BackgroundJobs("chat_summary", "AI_SUMMARY_WORKERS")
+
+
+def get_chat_session(session_id):
+    """
+    Function: Get Chat Session
+    ---------------------------
+    Fetches a chat session of the current user.
+
+    Parameters:
+    - session_id (int): The ID of the chat session.
+
+    Returns:
+    - ChatSessions: The chat session.
+    - None: If the session does not exist, belongs to another user or expired.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return ChatSessions.query.filter(
+        ChatSessions.id == session_id,
+        ChatSessions.user_id == current_user.id,
+        ChatSessions.last_used_at
+        > now - timedelta(seconds=current_app.config["AI_CHAT_SESSION_TTL"]),
+    ).first()
+
+
+def split_chat_history(history, budget):
+    """
+    Function: Split Chat History
+    -----------------------------
+    Splits the messages of a chat session into the older messages to summarize and the latest messages to keep.
+
+    Parameters:
+    - history (list): The messages of the session, as `{"role", "content"}` dictionaries, oldest first.
+    - budget (int): The estimated number of tokens of the messages to keep.
+
+    Returns:
+    - tuple: The older messages and the latest messages.
+
+    Behavior:
+    - Messages are kept by exchange (question and answer), so the kept messages start with a question.
+    - The latest exchange is always kept, even beyond the budget.
+    """
+    kept, tokens = len(history), 0
+    for start in range(len(history) - 2, -1, -2):
+        tokens += sum(
+            estimate_tokens(message["content"]) for message in history[start:kept]
+        )
+        if tokens > budget and kept < len(history):
+            break
+        kept = start
+    return history[:kept], history[kept:]
+
+
+def summarize_chat_history(summary, messages):
+    """
+    Function: Summarize Chat History
+    ---------------------------------
+    Folds older messages of a chat session into the summary of the conversation.
+
+    Parameters:
+    - summary (str): The summary of the messages summarized before, or None.
+    - messages (list): The messages to summarize, as `{"role", "content"}` dictionaries.
+
+    Returns:
+    - str: The new summary.
+
+    Behavior:
+    - The summary is limited to a quarter of the `AI_CHAT_HISTORY_BUDGET` tokens.
+    - If the AI request fails, the previous summary is returned and the messages are dropped.
+    """
+    max_tokens = max(1, current_app.config["AI_CHAT_HISTORY_BUDGET"] // 4)
+    conversation = "\n".join(
+        f"{'Student' if message['role'] == 'user' else 'Assistant'}: {message['content']}"
+        for message in messages
+    )
+    if summary:
+        conversation = (
+            f"Summary of the earlier conversation: {summary}\n\n{conversation}"
+        )
+
+    try:
+        completion = ai_client.chat.completions.create(
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Summarize the following conversation between a student and the assistant of "
+                    "their project milestones. Keep the questions of the student and the milestones, tasks and "
+                    f"deadlines discussed. Answer with the summary only, in at most {max_tokens * 3 // 4} words.",
+                },
+                {"role": "user", "content": conversation},
+            ],
+            model=CHAT_MODEL,
+            max_tokens=max_tokens,
+        )
+        return completion.choices[0].message.content
+    except Exception as e:
+        current_app.logger.error(f"Chat history not summarized:\n{e}")
+        return summary
+
+
+def record_chat_exchange(session_id, version, history, user_message, answer):
+    """
+    Function: Record Chat Exchange
+    -------------------------------
+    Appends a question and its answer to a chat session and commits the session, if it was not changed since
+    the question was asked.
+
+    Parameters:
+    - session_id (int): The ID of the chat session.
+    - version (int): The version of the session when the question was asked.
+    - history (list): The messages of the session when the question was asked.
+    - user_message (str): The message of the student.
+    - answer (str): The answer of the assistant.
+
+    Raises:
+    - HTTPException: 409 if the session was changed or removed since the question was asked.
+    """
+    updated = ChatSessions.query.filter_by(id=session_id, version=version).update(
+        {
+            ChatSessions.history: [
+                *history,
+                {"role": "user", "content": user_message},
+                {"role": "assistant", "content": answer},
+            ],
+            ChatSessions.version: version + 1,
+            ChatSessions.last_used_at: datetime.now(timezone.utc).replace(tzinfo=None),
+        }
+    )
+    db.session.commit()
+    if not updated:
+        abort(409, "Chat session changed by another message. Send the message again.")
+
+
+def summarize_chat_session(app, session_id):
+    """
+    Function: Summarize Chat Session
+    ---------------------------------
+    Folds the messages of a chat session beyond the token budget into its summary. Run by `summary_jobs` once
+    the answer is sent.
+
+    Parameters:
+    - app (Flask): The application, whose context the summary runs in.
+    - session_id (int): The ID of the chat session.
+
+    Behavior:
+    - The summary is only saved if the session was not changed while it was computed. Otherwise, the messages
+      are summarized after the next answer.
+    """
+    with app.app_context():
+        try:
+            chat_session = db.session.get(ChatSessions, session_id)
+            if not chat_session:
+                return
+
+            older, latest = split_chat_history(
+                chat_session.history, app.config["AI_CHAT_HISTORY_BUDGET"]
+            )
+            if not older:
+                return
+
+            version = chat_session.version
+            summary = summarize_chat_history(chat_session.summary, older)
+            ChatSessions.query.filter_by(id=session_id, version=version).update(
+                {
+                    ChatSessions.summary: summary,
+                    ChatSessions.history: latest,
+                    ChatSessions.version: version + 1,
+                }
+            )
+            db.session.commit()
+        except Exception as e:
+            app.logger.error(f"Chat session {session_id} not summarized:\n{e}")
+        finally:
+            db.session.remove()
+
+
+"""
+    API: Create Chat Session
+    -------------------------
+    Starts a conversation with the chat assistant. Expired chat sessions of all users are removed.
+
+    Role Required:
+    - Student
+
+    Response:
+    - 201: JSON object containing:
+        - `session_id`: The ID of the chat session.
+        - `expires_at`: The time the session expires if no message is sent, renewed by every message.
+    - 403: If the user does not have the required role.
+    - 500: Internal server error.
+"""
+
+
+@student.route("/chat/sessions", methods=["POST"])
+@roles_required("Student")
+def create_chat_session():
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    ttl = timedelta(seconds=current_app.config["AI_CHAT_SESSION_TTL"])
+    ChatSessions.query.filter(ChatSessions.last_used_at <= now - ttl).delete()
+
+    chat_session = ChatSessions(
+        user_id=current_user.id, history=[], created_at=now, last_used_at=now
+    )
+    db.session.add(chat_session)
+    db.session.commit()
+
+    return {
+        "session_id": chat_session.id,
+        "expires_at": (now + ttl).strftime("%Y-%m-%d %H:%M:%S"),
+    }, 201
+
+
+"""
+    API: Continue Chat Session
+    ---------------------------
+    Sends a message to the chat assistant in a chat session. The assistant receives the milestone context, the
+    summary of the older messages of the session and its latest messages, see `split_chat_history`. The
+    messages beyond the token budget are summarized once the answer is sent.
+
+    Role Required:
+    - Student
+
+    Request Body:
+    - message (string): The query or message from the student to the AI assistant.
+
+    Response:
+    - 200: JSON object containing:
+        - `analysis`: The answer of the AI assistant.
+        - `session_id`: The ID of the chat session.
+    - 200 (streamed): If the client accepts `application/x-ndjson` or `text/event-stream` first, the answer
+      as JSON lines (`{"event": ..., "data": ...}`) or server-sent events, as it is generated: a "token" event
+      with every piece of text, then a "done" event once the exchange is recorded in the session, or an
+      "error" event if it could not be recorded.
+    - 400: If the `message` field is missing or empty.
+    - 403: If the user does not have the required role.
+    - 404: If the session does not exist or expired.
+    - 409: If another message of the session was answered meanwhile. The answer is not recorded.
+    - 500: Internal server error.
+    - 503: If too many AI requests are in progress.
+"""
+
+
+@student.route("/chat/sessions/<int:session_id>", methods=["POST"])
+@roles_required("Student")
+def continue_chat_session(session_id):
+    user_message = (request.get_json(silent=True) or {}).get("message")
+    if not user_message:
+        return abort(400, "User message can not be empty")
+    user_message = str(user_message)
+
+    chat_session = get_chat_session(session_id)
+    if not chat_session:
+        return abort(404, "Chat session not found")
+    version, history = chat_session.version, list(chat_session.history)
+
+    messages = [
+        {"role": "system", "content": milestone_context.get(render_chat_prompt)}
+    ]
+    if chat_session.summary:
+        messages.append(
+            {
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {chat_session.summary}",
+            }
+        )
+    messages += [
+        *history,
+        {"role": "user", "content": user_message},
+    ]
+
+    stream_format = request.accept_mimetypes.best
+    try:
+        chat_completion = ai_client.chat.completions.create(
+            messages=messages,
+            model=CHAT_MODEL,
+            stream=stream_format in STREAM_FORMATS,
+        )
+        if stream_format in STREAM_FORMATS:
+            response = stream_response(
+                completion_events(
+                    chat_completion,
+                    lambda answer: record_chat_exchange(
+                        session_id, version, history, user_message, answer
+                    ),
+                ),
+                stream_format,
+                completion=chat_completion,
+            )
+        else:
+            answer = chat_completion.choices[0].message.content
+            record_chat_exchange(session_id, version, history, user_message, answer)
+            response = make_response(
+                {"analysis": answer, "session_id": session_id}, 200
+            )
+
+        app = current_app._get_current_object()
+        response.call_on_close(
+            lambda: summary_jobs.submit_task(app, summarize_chat_session, session_id)
+        )
+        return response
+
+    except HTTPException:
+        raise
+
+    except AIGatewayBusy as e:
+        return abort(503, f"{e}. Try again later.")
+    except Exception as e:
+        return abort(500, str(e))
+
+
+"""
+    API: Expire Chat Session
+    -------------------------
+    Ends a chat session and removes its messages.
+
+    Role Required:
+    - Student
+
+    Response:
+    - 200: JSON object with a success message.
+    - 403: If the user does not have the required role.
+    - 404: If the session does not exist or expired.
+"""
+
+
+@student.route("/chat/sessions/<int:session_id>", methods=["DELETE"])
+@roles_required("Student")
+def expire_chat_session(session_id):
+    chat_session = get_chat_session(session_id)
+    if not chat_session:
+        return abort(404, "Chat session not found")
+
+    db.session.delete(chat_session)
+    db.session.commit()
+    return {"message": "Chat session expired"}, 200
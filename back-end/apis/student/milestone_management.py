@@ -10,7 +10,11 @@ Dependencies:
 - os: For file and directory management, including path checks and file operations.
 - datetime: For handling and converting date-time data, particularly with time zones.
 - Werkzeug: For managing HTTP exceptions
-- PyPDF2: For reading and extracting text from PDF files using the PdfReader.
+- ai_gateway: For detecting AI requests rejected by the AI gateway.
+- analysis_cache: For reusing the AI analyses of unchanged submissions.
+- submission_review: For the analysis model, the text of the submitted documents and their cache keys.
+- milestone_context: For reusing the milestone context of the chat assistant.
+- streaming: For streaming the AI answers.
 
 Roles Required:
 - Student: All endpoints require the current user to have the "Student" role.
@@ -24,6 +28,10 @@ Endpoints:
 5. GET /student/milestone_management/individual/ai_analysis/<int:task_id>
 6. GET /student/download_submission/<int:task_id>
 7. POST /student/chat
+
+Functions:
+----------
+1. `render_chat_prompt()`
 """
 
 from apis.student.setup import student, get_team_id, ai_client
@@ -32,16 +40,32 @@ from application.models import (
     Documents,
     Milestones,
     Submissions,
-    Tasks,
     Teams,
     db,
 )
 from apis.teacher.setup import ai_client
+from apis.teacher.streaming import stream_response, completion_events, STREAM_FORMATS
+from apis.teacher.ai_gateway import AIGatewayBusy
+from apis.teacher.milestone_context import milestone_context
+from apis.teacher.analysis_cache import (
+    hash_document,
+    get_cached_analysis,
+    save_analysis,
+    invalidate_document_analyses,
+)
+from apis.teacher.submission_review import (
+    ANALYSIS_MODEL,
+    extract_document_text,
+    submission_cache_key,
+)
+from apis.teacher.team_progress import update_team_progress, get_team_progress_rows
 from flask import abort, make_response, request, send_file, current_app
 from werkzeug.exceptions import HTTPException
 from datetime import datetime, timezone
 import os
-from PyPDF2 import PdfReader
+
+# Version of the student submission analysis prompt, part of the cache key of the analyses
+ANALYSIS_PROMPT_VERSION = "student-analysis/1"
 
 
 """
@@ -57,6 +81,9 @@ from PyPDF2 import PdfReader
     - 400: If the student does not belong to a team.
     - 403: If the user does not have the required role.
     - 500: Internal server error.
+
+    Behavior:
+    - Reads the completion percentages from the materialized progress of the team.
 """
 
 
@@ -77,31 +104,15 @@ def get_team_milestones():
     team_milestone_for_user = []
 
     milestones = db.session.query(Milestones).all()
+    progress = get_team_progress_rows([team_id])
 
     for milestone in milestones:
-        # Get the number of tasks in the milestone
-        task_count = (
-            db.session.query(db.func.count(Tasks.id))
-            .filter(Tasks.milestone_id == milestone.id)
-            .scalar()
-        )
-
-        # Get the number of submissions associated with the milestone tasks
-        submission_count = (
-            db.session.query(db.func.count(Submissions.id))
-            .join(Tasks, Submissions.task_id == Tasks.id)
-            .filter(Submissions.team_id == team_id)
-            .filter(Tasks.milestone_id == milestone.id)
-            .scalar()
-        )
-
+        row = progress.get((team_id, milestone.id))
         team_milestone_for_user.append(
             {
                 "milestone_id": milestone.id,
                 "title": milestone.title,
-                "completion_percentage": (
-                    (submission_count / task_count) * 100 if task_count != 0 else 0
-                ),
+                "completion_percentage": row.completion_rate() * 100 if row else 0,
             }
         )
 
@@ -223,6 +234,10 @@ def get_milestone_details(milestone_id):
     - 404: If the milestone or team does not exist.
     - 403: If the user does not have the required role.
     - 500: Internal server error.
+
+    Behavior:
+    - Updates the progress of the team in the milestone in the same transaction as the submissions.
+    - Removes the cached AI analyses of the replaced documents.
 """
 
 
@@ -286,6 +301,9 @@ def submit_milestone(milestone_id):
                         submission_id=existing_submission.id
                     ).first()
                     if old_document and os.path.exists(old_document.file_url):
+                        invalidate_document_analyses(
+                            hash_document(old_document.file_url)
+                        )
                         os.remove(old_document.file_url)
 
                     # Update the document
@@ -332,6 +350,7 @@ def submit_milestone(milestone_id):
                     f"Task {task_id} is not valid for this milestone or the file is not a PDF",
                 )
 
+        update_team_progress([milestone_id], [team_id])
         db.session.commit()
 
         current_app.logger.info(
@@ -370,10 +389,16 @@ def submit_milestone(milestone_id):
     - 200: JSON object containing the AI-generated analysis, including:
         - Content review
         - Task requirement checks.
+      The `X-Analysis-Cache` header is "hit" if the analysis of the same document, milestone and task was
+      reused from the analysis cache, "miss" otherwise.
+    - 200 (streamed): If the client accepts `application/x-ndjson` or `text/event-stream` first, the analysis
+      as JSON lines (`{"event": ..., "data": ...}`) or server-sent events, as it is generated: a "token" event
+      with every piece of text, then a "done" event. A cached analysis is sent in a single "token" event.
     - 404: If the team, submission, or document is not found.
     - 500: If the document cannot be read or the AI analysis fails or Internal server error.
     - 403: If the user does not have the required role.
     - 400: If the milestone deadline has passed.
+    - 503: If too many AI requests are in progress.
 """
 
 
@@ -402,12 +427,25 @@ def get_ai_analysis(task_id):
         return abort(404, "File not found")
 
     try:
-        with open(document.file_url, "rb") as pdf_file:
-            pdf_reader = PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + " "
-            text = text.replace("\n", " ")
+        document_hash, cache_key = submission_cache_key(
+            submission, ANALYSIS_PROMPT_VERSION
+        )
+    except Exception as e:
+        return abort(500, f"Error reading document: {str(e)}")
+
+    stream_format = request.accept_mimetypes.best
+    analysis = get_cached_analysis(cache_key)
+    if analysis is not None:
+        if stream_format in STREAM_FORMATS:
+            events = [
+                ("token", {"content": analysis}),
+                ("done", {"finish_reason": "stop"}),
+            ]
+            return stream_response(events, stream_format, {"X-Analysis-Cache": "hit"})
+        return {"analysis": analysis}, 200, {"X-Analysis-Cache": "hit"}
+
+    try:
+        text = extract_document_text(document.file_url)
     except Exception as e:
         return abort(500, f"Error reading document: {str(e)}")
 
@@ -453,12 +491,24 @@ def get_ai_analysis(task_id):
                     """,
                 },
             ],
-            model="llama-3.1-8b-instant",
+            model=ANALYSIS_MODEL,
+            stream=stream_format in STREAM_FORMATS,
         )
+        if stream_format in STREAM_FORMATS:
+            events = completion_events(
+                chat_completion,
+                lambda analysis: save_analysis(cache_key, document_hash, analysis),
+            )
+            return stream_response(
+                events, stream_format, {"X-Analysis-Cache": "miss"}, chat_completion
+            )
 
         response = chat_completion.choices[0].message.content
-        return {"analysis": response}, 200
+        save_analysis(cache_key, document_hash, response)
+        return {"analysis": response}, 200, {"X-Analysis-Cache": "miss"}
 
+    except AIGatewayBusy as e:
+        return abort(503, f"{e}. Try again later.")
     except Exception as e:
         return abort(500, f"AI analysis error: {str(e)}")
 
@@ -507,6 +557,44 @@ def download_submission(task_id):
     return file_response, 200
 
 
+def render_chat_prompt():
+    """
+    Function: Render Chat Prompt
+    -----------------------------
+    Renders the system prompt of the chat assistant, describing every milestone with its deadline and tasks.
+
+    Returns:
+    - str: The system prompt.
+    """
+    milestones = db.session.query(Milestones).all()
+    ai_prompt = []
+
+    for milestone in milestones:
+        milestone_ai_prompt = ""
+        milestone_ai_prompt += f"\nMilestone: {milestone.title}\n"
+        milestone_ai_prompt += f"\nMilestone Description: {milestone.description}\n"
+        milestone_ai_prompt += (
+            f"Deadline: {milestone.deadline.strftime('%Y-%m-%d %H:%M:%S')} GMT\n"
+        )
+        for task in milestone.task_milestones:
+            milestone_ai_prompt += f"Task: {task.description}\n"
+
+        ai_prompt.append(milestone_ai_prompt)
+
+    return f"""
+                    You are an AI assistant focused solely on helping students with operational aspects of their project milestones. Your knowledge is limited to the following milestone information: 
+                    {ai_prompt}
+
+                    Strictly adhere to these guidelines:
+                    1. Only answer questions directly related to the milestones, their tasks, deadlines, or general project management.
+                    2. If asked about anything outside the provided milestone details, state that you don't have that information.
+                    3. Do not provide any information or assistance on technical implementation, coding, or subject matter expertise.
+                    4. Be concise and direct in your responses, focusing on operational aspects only.
+
+                    Remember, your purpose is to help students understand and manage their project milestones, not to assist with the actual project work or any other topics.
+                    """
+
+
 """
     API: AI Chat Assistant for Milestones
     -------------------------------------
@@ -519,14 +607,20 @@ def download_submission(task_id):
     - message (string): The query or message from the student to the AI assistant.
 
     Functionality:
-    - Retrieves milestone data, including tasks and deadlines, to provide operational guidance.
+    - Retrieves milestone data, including tasks and deadlines, to provide operational guidance. The milestone
+      context is rendered once per change of the milestones and reused by every message, see
+      `render_chat_prompt`.
     - Generates responses based on predefined milestones using an AI chat model.
 
     Response:
     - 200: JSON response containing the AI assistant's analysis or answer.
+    - 200 (streamed): If the client accepts `application/x-ndjson` or `text/event-stream` first, the answer
+      as JSON lines (`{"event": ..., "data": ...}`) or server-sent events, as it is generated: a "token" event
+      with every piece of text, then a "done" event.
     - 400: If the `message` field is missing or empty.
     - 403: If the user does not have the required role.
     - 500: Internal server error.
+    - 503: If too many AI requests are in progress.
 """
 
 
@@ -537,38 +631,15 @@ def chat():
     user_message = data.get("message")
     if not user_message:
         return abort(400, "User message can not be empty")
-    milestones = db.session.query(Milestones).all()
-    ai_prompt = []
-
-    for milestone in milestones:
-        milestone_ai_prompt = ""
-        milestone_ai_prompt += f"\nMilestone: {milestone.title}\n"
-        milestone_ai_prompt += f"\nMilestone Description: {milestone.description}\n"
-        milestone_ai_prompt += (
-            f"Deadline: {milestone.deadline.strftime('%Y-%m-%d %H:%M:%S')} GMT\n"
-        )
-        for task in milestone.task_milestones:
-            milestone_ai_prompt += f"Task: {task.description}\n"
-
-        ai_prompt.append(milestone_ai_prompt)
+    system_prompt = milestone_context.get(render_chat_prompt)
 
+    stream_format = request.accept_mimetypes.best
     try:
         chat_completion = ai_client.chat.completions.create(
             messages=[
                 {
                     "role": "system",
-                    "content": f"""
-                    You are an AI assistant focused solely on helping students with operational aspects of their project milestones. Your knowledge is limited to the following milestone information: 
-                    {ai_prompt}
-
-                    Strictly adhere to these guidelines:
-                    1. Only answer questions directly related to the milestones, their tasks, deadlines, or general project management.
-                    2. If asked about anything outside the provided milestone details, state that you don't have that information.
-                    3. Do not provide any information or assistance on technical implementation, coding, or subject matter expertise.
-                    4. Be concise and direct in your responses, focusing on operational aspects only.
-
-                    Remember, your purpose is to help students understand and manage their project milestones, not to assist with the actual project work or any other topics.
-                    """,
+                    "content": system_prompt,
                 },
                 {
                     "role": "user",
@@ -576,10 +647,19 @@ def chat():
                 },
             ],
             model="llama-3.1-8b-instant",
+            stream=stream_format in STREAM_FORMATS,
         )
+        if stream_format in STREAM_FORMATS:
+            return stream_response(
+                completion_events(chat_completion),
+                stream_format,
+                completion=chat_completion,
+            )
 
         response = chat_completion.choices[0].message.content
         return {"analysis": response}, 200
 
+    except AIGatewayBusy as e:
+        return abort(503, f"{e}. Try again later.")
     except Exception as e:
         return abort(500, str(e))
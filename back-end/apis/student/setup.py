@@ -8,8 +8,7 @@ like milestone management and notifications.
 Dependencies:
 - Flask: For creating a Blueprint.
 - SQLAlchemy ORM: For database operations.
-- os: For getting environment variables.
-- Groq: For AI tool integration.
+- ai_gateway: For sending the AI requests.
 
 Blueprint:
 ----------
@@ -18,12 +17,13 @@ Blueprint:
 
 Global Variables:
 -----------------
-1. `ai_client`: Configured AI client using an API key.
+1. `ai_client`: The AI gateway shared by all AI requests.
 
 Submodules:
 -----------
 1. milestone_management: Handles milestone-related functionalities.
 2. notifications: Manages notifications for students.
+3. chat_sessions: Handles conversations with the chat assistant.
 
 Functions:
 ----------
@@ -35,14 +35,13 @@ from application.models import (
     db,
 )
 from flask import Blueprint
-from groq import Groq
-import os
+from apis.teacher.ai_gateway import ai_gateway
 
 
 student = Blueprint("student", __name__, url_prefix="/student")
 
 # AI configuration
-ai_client = Groq(api_key=os.environ.get("AI_ACCESS_TOKEN"))
+ai_client = ai_gateway
 
 
 def get_team_id(user):
@@ -68,4 +67,4 @@ def get_team_id(user):
     )
 
 
-from . import milestone_management, notifications
+from . import milestone_management, notifications, chat_sessions
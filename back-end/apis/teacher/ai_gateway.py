@@ -0,0 +1,267 @@
+"""
+Module: AI Gateway
+-------------------
+This module provides the gateway through which all the AI requests of the application are sent. The gateway
+owns a single AI client with a pooled HTTP connection, gives every request a deadline, retries the requests
+that failed transiently with an exponential backoff and jitter while the deadline allows it, and caps the
+number of requests in flight in the worker process. It also records telemetry about the AI usage of the
+process: number of calls, retries, rejections, errors by type and a latency histogram.
+
+The gateway exposes the `chat.completions.create(...)` method of the Groq client, so the endpoints call it
+like the client itself. Streamed completions (`stream=True`) keep their slot until they are consumed or
+closed, so responses relaying them must close them even when they are never read (see `stream_response`).
+
+Dependencies:
+-------------
+- Groq: For the AI client and its errors.
+- httpx: For the pooled HTTP connection of the AI client.
+- os, random, threading, time, types: For the configuration, backoff, concurrency limit and telemetry.
+
+Classes:
+--------
+1. AIGatewayBusy: Raised when no AI request slot frees up in time.
+2. AITelemetry: Counters of the AI usage.
+3. CompletionStream: Streamed chat completion holding a slot of the gateway.
+4. AIGateway: Gateway sending the AI requests.
+"""
+
+from groq import Groq, APIConnectionError, InternalServerError, RateLimitError
+from types import SimpleNamespace
+import httpx
+import os
+import random
+import threading
+import time
+
+# Upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2.5, 5, 10, 20, 40)
+
+# Errors after which an AI request is retried
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+# Base and maximum delay (in seconds) between two attempts of an AI request
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8
+
+# Number of connections kept open to the AI service
+POOL_CONNECTIONS = 16
+
+
+class AIGatewayBusy(Exception):
+    """
+    Class: AIGatewayBusy
+    ---------------------
+    Raised when an AI request waited longer than the queue timeout, or than its deadline, for a free slot.
+    """
+
+
+class AITelemetry:
+    """
+    Class: AITelemetry
+    -------------------
+    Thread-safe counters of the AI requests made by the process.
+
+    Methods:
+    - record(seconds, error=None): Records a completed AI request, failed with `error` if given.
+    - record_retry(): Records a retried attempt.
+    - record_rejected(): Records a request rejected because no slot freed up in time.
+    - snapshot(): Returns the counters as a dictionary.
+    - reset(): Resets all counters.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.calls = 0
+            self.retries = 0
+            self.rejected = 0
+            self.in_flight = 0
+            self.errors = {}
+            self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+            self.latency_sum = 0.0
+
+    def record(self, seconds, error=None):
+        with self.lock:
+            self.calls += 1
+            if error:
+                name = type(error).__name__
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+            bucket = next(
+                (i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound),
+                len(LATENCY_BUCKETS),
+            )
+            self.latency_counts[bucket] += 1
+            self.latency_sum += seconds
+
+    def record_retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def record_rejected(self):
+        with self.lock:
+            self.rejected += 1
+
+    def snapshot(self):
+        with self.lock:
+            buckets, cumulative = {}, 0
+            for bound, count in zip(
+                [*map(str, LATENCY_BUCKETS), "+Inf"], self.latency_counts
+            ):
+                cumulative += count
+                buckets[bound] = cumulative
+
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "errors": dict(self.errors),
+                "latency_seconds": {
+                    "buckets": buckets,
+                    "count": self.calls,
+                    "sum": round(self.latency_sum, 6),
+                },
+            }
+
+
+class CompletionStream:
+    """
+    Class: CompletionStream
+    ------------------------
+    The chunks of a streamed chat completion, holding the slot of the gateway they were requested in until
+    they are consumed or the stream is closed.
+
+    Methods:
+    - close(): Closes the connection of the stream and frees its slot.
+    """
+
+    def __init__(self, chunks, release):
+        self.chunks = chunks
+        self.release = release
+        self.closed = False
+
+    def __iter__(self):
+        try:
+            yield from self.chunks
+        finally:
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.chunks.close()
+            self.release()
+
+
+class AIGateway:
+    """
+    Class: AIGateway
+    -----------------
+    Gateway sending the AI requests of the process through a single pooled AI client.
+
+    Attributes:
+    - client (Groq): The AI client. Its own retries are disabled, the gateway retries instead.
+    - chat (SimpleNamespace): The `chat.completions.create(...)` method of the Groq client.
+    - telemetry (AITelemetry): The counters of the AI requests.
+
+    Methods:
+    - configure(timeout, max_retries, max_concurrency, queue_timeout): Changes the settings of the gateway.
+    - create_completion(timeout=None, **kwargs): Sends a chat completion request and returns its response.
+    - send(deadline, kwargs): Sends a single attempt of a request in a free slot.
+    """
+
+    def __init__(
+        self, timeout=30, max_retries=2, max_concurrency=4, queue_timeout=5, client=None
+    ):
+        self.client = client or Groq(
+            api_key=os.environ.get("AI_ACCESS_TOKEN"),
+            max_retries=0,
+            http_client=httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=POOL_CONNECTIONS,
+                    max_keepalive_connections=POOL_CONNECTIONS,
+                )
+            ),
+        )
+        self.chat = SimpleNamespace(
+            completions=SimpleNamespace(create=self.create_completion)
+        )
+        self.telemetry = AITelemetry()
+        self.configure(timeout, max_retries, max_concurrency, queue_timeout)
+
+    def configure(self, timeout, max_retries, max_concurrency, queue_timeout):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.queue_timeout = queue_timeout
+        self.max_concurrency = max_concurrency
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+
+    def create_completion(self, timeout=None, **kwargs):
+        """
+        Sends a chat completion request, with the arguments of `chat.completions.create` of the Groq client.
+
+        Behavior:
+        - The request, with its retries and its wait for a slot, must complete within `timeout` seconds, or
+          the default timeout of the gateway if None.
+        - Connection errors, timeouts, rate limits and server errors are retried up to `max_retries` times,
+          after a random delay of up to 0.5, 1, 2... seconds, unless the delay would exceed the deadline.
+          The last error is raised otherwise.
+        - At most `max_concurrency` attempts are in flight at once. `AIGatewayBusy` is raised if no slot frees
+          up within the queue timeout.
+        - With `stream=True`, a `CompletionStream` is returned as soon as the AI starts answering, and the
+          recorded latency is the time to the start of the answer.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        attempt = 0
+        while True:
+            try:
+                return self.send(deadline, kwargs)
+            except RETRYABLE_ERRORS:
+                delay = random.uniform(
+                    0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt)
+                )
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    raise
+            attempt += 1
+            self.telemetry.record_retry()
+            time.sleep(delay)
+
+    def send(self, deadline, kwargs):
+        slots = self.slots
+        if not slots.acquire(
+            timeout=max(0, min(self.queue_timeout, deadline - time.monotonic()))
+        ):
+            self.telemetry.record_rejected()
+            raise AIGatewayBusy("Too many AI requests in progress")
+
+        with self.telemetry.lock:
+            self.telemetry.in_flight += 1
+
+        def release():
+            with self.telemetry.lock:
+                self.telemetry.in_flight -= 1
+            slots.release()
+
+        started = time.monotonic()
+        try:
+            response = self.client.chat.completions.create(
+                timeout=max(0, deadline - started), **kwargs
+            )
+        except Exception as e:
+            self.telemetry.record(time.monotonic() - started, e)
+            release()
+            raise
+
+        self.telemetry.record(time.monotonic() - started)
+        if kwargs.get("stream"):
+            return CompletionStream(response, release)
+        release()
+        return response
+
+
+# The AI gateway shared by the endpoints, configured in `init_extensions`
+ai_gateway = AIGateway()
@@ -0,0 +1,51 @@
+"""
+Module: Teacher AI Integration APIs
+------------------------------------
+This module provides APIs for instructors to monitor the AI integration of the application.
+
+Dependencies:
+-------------
+- Flask-Security: For role-based access control.
+- ai_gateway: For the telemetry of the AI gateway.
+
+Roles Accepted:
+---------------
+- Instructor: Full access to the telemetry endpoint.
+
+Endpoints:
+----------
+1. GET /teacher/ai/telemetry
+"""
+
+from apis.teacher.setup import teacher, ai_client
+from flask_security import roles_accepted
+
+"""
+    API: Get AI Telemetry
+    ----------------------
+    Retrieves the usage of the AI service by the application process since it started.
+
+    Roles Accepted:
+    - Instructor
+
+    Response:
+    - 200: JSON object containing:
+        - `calls`: Number of attempted AI requests, retries included.
+        - `retries`: Number of AI requests retried after a transient error.
+        - `rejected`: Number of AI requests rejected because too many requests were in progress.
+        - `in_flight`: Number of AI requests in progress.
+        - `errors`: Number of failed attempts per error type.
+        - `latency_seconds`: Cumulative latency histogram (`buckets` keyed by upper bound), with the
+          `count` and `sum` of all latencies.
+        - `max_concurrency`: Maximum number of AI requests in progress at once.
+    - 403: If the user does not have the required role.
+"""
+
+
+@teacher.route("/ai/telemetry", methods=["GET"])
+@roles_accepted("Instructor")
+def get_ai_telemetry():
+    return {
+        **ai_client.telemetry.snapshot(),
+        "max_concurrency": ai_client.max_concurrency,
+    }, 200
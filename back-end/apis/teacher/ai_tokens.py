@@ -0,0 +1,25 @@
+"""
+Module: AI Token Estimates
+---------------------------
+This module estimates the size of the texts sent to the AI, in tokens. The estimate is used wherever a prompt
+must fit a token budget: the batches of the team rankings and the history of the chat sessions.
+
+Functions:
+----------
+1. `estimate_tokens(text)`
+"""
+
+
+def estimate_tokens(text):
+    """
+    Function: Estimate Tokens
+    --------------------------
+    Estimates the number of AI tokens of a text, counting 4 characters per token.
+
+    Parameters:
+    - text (str): The text.
+
+    Returns:
+    - int: The estimated number of tokens.
+    """
+    return len(text) // 4 + 1
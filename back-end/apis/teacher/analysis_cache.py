@@ -0,0 +1,160 @@
+"""
+Module: AI Analysis Cache
+--------------------------
+This module caches the AI analyses of the submitted documents in the database, keyed by a hash of the
+document content, the milestone and task descriptions, the version of the analysis prompt and the model.
+Repeated views of the analysis of an unchanged document are then answered from the database, without
+parsing the document or spending AI tokens. Analyses expire after a time to live, the least recently used
+analyses are evicted beyond the size of the cache, and the analyses of a document are removed when the
+document is replaced.
+
+Dependencies:
+-------------
+- Flask: For the cache settings of the application.
+- SQLAlchemy ORM: For database operations.
+- hashlib, json, datetime: For the cache keys and the expiry of the analyses.
+
+Functions:
+----------
+1. `hash_document(file_url)`
+2. `analysis_cache_key(document_hash, milestone_description, task_description, prompt_version, model)`
+3. `get_cached_analysis(cache_key)`
+4. `save_analysis(cache_key, document_hash, analysis)`
+5. `invalidate_document_analyses(document_hash)`
+"""
+
+from application.models import DocumentAnalyses, db
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta, timezone
+import hashlib
+import json
+
+
+def hash_document(file_url):
+    """
+    Function: Hash Document
+    ------------------------
+    Computes the hash of the content of a document.
+
+    Parameters:
+    - file_url (str): The path of the document.
+
+    Returns:
+    - str: The SHA-256 hex digest of the document.
+    """
+    digest = hashlib.sha256()
+    with open(file_url, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def analysis_cache_key(
+    document_hash, milestone_description, task_description, prompt_version, model
+):
+    """
+    Function: Analysis Cache Key
+    -----------------------------
+    Computes the cache key of an AI analysis.
+
+    Parameters:
+    - document_hash (str): The hash of the analyzed document, see `hash_document`.
+    - milestone_description (str): The description of the milestone of the task.
+    - task_description (str): The description of the task.
+    - prompt_version (str): The name and version of the analysis instructions given to the AI.
+    - model (str): The AI model analyzing the document.
+
+    Returns:
+    - str: The SHA-256 hex digest of the inputs.
+    """
+    payload = json.dumps(
+        [document_hash, milestone_description, task_description, prompt_version, model],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_cached_analysis(cache_key):
+    """
+    Function: Get Cached Analysis
+    ------------------------------
+    Fetches a cached AI analysis and marks it as used.
+
+    Parameters:
+    - cache_key (str): The cache key of the analysis, see `analysis_cache_key`.
+
+    Returns:
+    - str: The analysis.
+    - None: If the analysis is not cached or expired.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    entry = DocumentAnalyses.query.filter_by(cache_key=cache_key).first()
+    if not entry:
+        return None
+
+    if entry.created_at <= now - timedelta(
+        seconds=current_app.config["AI_ANALYSIS_CACHE_TTL"]
+    ):
+        db.session.delete(entry)
+        db.session.commit()
+        return None
+
+    entry.last_used_at = now
+    db.session.commit()
+    return entry.analysis
+
+
+def save_analysis(cache_key, document_hash, analysis):
+    """
+    Function: Save Analysis
+    ------------------------
+    Caches an AI analysis and evicts the expired and least recently used analyses.
+
+    Parameters:
+    - cache_key (str): The cache key of the analysis, see `analysis_cache_key`.
+    - document_hash (str): The hash of the analyzed document.
+    - analysis (str): The analysis.
+
+    Behavior:
+    - At most `AI_ANALYSIS_CACHE_SIZE` analyses are kept.
+    - An analysis saved concurrently by another request under the same key is kept instead.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    entry = DocumentAnalyses.query.filter_by(cache_key=cache_key).first()
+    if not entry:
+        entry = DocumentAnalyses(cache_key=cache_key, document_hash=document_hash)
+        db.session.add(entry)
+    entry.analysis = analysis
+    entry.created_at = now
+    entry.last_used_at = now
+
+    DocumentAnalyses.query.filter(
+        DocumentAnalyses.created_at
+        <= now - timedelta(seconds=current_app.config["AI_ANALYSIS_CACHE_TTL"])
+    ).delete()
+    evicted = [
+        analysis_id
+        for (analysis_id,) in db.session.query(DocumentAnalyses.id)
+        .order_by(DocumentAnalyses.last_used_at.desc(), DocumentAnalyses.id.desc())
+        .offset(current_app.config["AI_ANALYSIS_CACHE_SIZE"])
+    ]
+    if evicted:
+        DocumentAnalyses.query.filter(DocumentAnalyses.id.in_(evicted)).delete()
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+
+
+def invalidate_document_analyses(document_hash):
+    """
+    Function: Invalidate Document Analyses
+    ---------------------------------------
+    Removes the cached analyses of a document, without committing. Called when the document is replaced.
+
+    Parameters:
+    - document_hash (str): The hash of the document, see `hash_document`.
+    """
+    DocumentAnalyses.query.filter_by(document_hash=document_hash).delete()
@@ -0,0 +1,141 @@
+"""
+Module: Background Jobs
+------------------------
+This module runs the jobs of the APIs that take too long for a request, such as the AI rankings and the AI
+reviews of the submissions. A job is stored in the database before it is scheduled, so its status,
+progress and result can be read by any worker process; the job runs in a background thread of the process
+that scheduled it, which wakes the requests waiting for the job as soon as it finishes. Work that nothing waits
+for, such as the summaries of the chat sessions, runs as plain tasks, without being stored.
+
+Dependencies:
+-------------
+- Flask: For the settings and the context of the application.
+- SQLAlchemy ORM: For reading and updating the jobs.
+- concurrent.futures, threading: For running the jobs in background threads.
+- datetime: For timestamps.
+
+Classes:
+--------
+1. BackgroundJobs: The background threads running the jobs of one kind.
+"""
+
+from application.models import db
+from flask import current_app
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import threading
+
+
+class BackgroundJobs:
+    """
+    Class: BackgroundJobs
+    ----------------------
+    Background threads running the jobs of one kind, stored as rows of a model with `status`, `error` and
+    `finished_at` columns. The threads are created on first use.
+
+    Attributes:
+    - name (str): The kind of the jobs, used in the names of the threads and in the logs.
+    - workers_setting (str): The setting of the number of jobs run at once.
+    - finished_events (dict): Events set when the job of the same ID finishes, for the requests waiting on it.
+
+    Methods:
+    - get_executor(app): Returns the background threads.
+    - submit(job, work): Schedules a stored job.
+    - submit_task(app, task, *args): Schedules a task that is not stored.
+    - run(app, model, job_id, work): Runs a job and records its outcome.
+    - wait(job, timeout): Waits until a job finishes or the timeout expires.
+    """
+
+    def __init__(self, name, workers_setting):
+        self.name = name
+        self.workers_setting = workers_setting
+        self.executor = None
+        self.lock = threading.Lock()
+        self.finished_events = {}
+
+    def get_executor(self, app):
+        """
+        Returns the background threads, created on first use with the number of threads of the settings of `app`.
+        """
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=app.config[self.workers_setting],
+                    thread_name_prefix=self.name,
+                )
+            return self.executor
+
+    def submit(self, job, work):
+        """
+        Schedules a job, already committed, on the background threads.
+
+        Behavior:
+        - The job is run by `run`, which calls `work(app, job)` in the context of the application.
+        - Jobs submitted while all threads are busy wait for a free thread.
+        """
+        app = current_app._get_current_object()
+        executor = self.get_executor(app)
+        with self.lock:
+            self.finished_events[job.id] = threading.Event()
+        executor.submit(self.run, app, type(job), job.id, work)
+
+    def submit_task(self, app, task, *args):
+        """
+        Schedules a task on the background threads, which calls `task(app, *args)`. The task enters the context
+        of the application itself and handles its own errors, so it can be scheduled after the context of the
+        request is gone, e.g. once the response is sent.
+
+        Returns:
+        - Future: The future of the task.
+        """
+        return self.get_executor(app).submit(task, app, *args)
+
+    def run(self, app, model, job_id, work):
+        """
+        Marks a job as running, calls `work(app, job)`, and marks the job as done, or failed with the error
+        raised by `work`. The changes made to the job by `work` are committed with its status.
+        """
+        with app.app_context():
+            try:
+                job = db.session.get(model, job_id)
+                job.status = "running"
+                db.session.commit()
+
+                try:
+                    work(app, job)
+                    job.status = "done"
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error(
+                        f"{self.name.capitalize()} job {job_id} failed:\n{e}"
+                    )
+                    job.status = "failed"
+                    job.error = str(e)
+                job.finished_at = datetime.now(timezone.utc)
+                db.session.commit()
+            finally:
+                db.session.remove()
+                event = self.finished_events.pop(job_id, None)
+                if event:
+                    event.set()
+
+    def wait(self, job, timeout):
+        """
+        Waits until a job finishes or the timeout expires, and returns the job reloaded from the database.
+
+        Behavior:
+        - Jobs run by this process wake the waiting requests as soon as they finish. Jobs of other processes are
+          polled from the database every second.
+        """
+        deadline = datetime.now(timezone.utc).timestamp() + timeout
+        while job.status in ("pending", "running"):
+            remaining = deadline - datetime.now(timezone.utc).timestamp()
+            if remaining <= 0:
+                break
+            event = self.finished_events.get(job.id)
+            if event:
+                event.wait(remaining)
+            else:
+                threading.Event().wait(min(remaining, 1))
+            db.session.refresh(job)
+        return job
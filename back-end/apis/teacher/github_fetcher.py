@@ -0,0 +1,260 @@
+"""
+Module: Concurrent GitHub Commit Fetcher
+-----------------------------------------
+This module fetches the statistics of many commits from the GitHub API with a bounded pool of worker
+threads. Every worker uses its own GitHub client, since the connection of a PyGithub client must not be
+shared between threads. The pool paces itself to fit the remaining GitHub rate limit and backs off when
+GitHub answers with a secondary rate limit, so a cold cache is filled in time proportional to the number
+of commits divided by the pool size.
+
+Dependencies:
+-------------
+- PyGithub: For interacting with the GitHub API.
+- concurrent.futures, threading: For the worker pool.
+- time: For pacing the requests.
+
+Functions:
+----------
+1. `clone_github_client(github_client)`
+2. `is_rate_limited(exception)`
+3. `retry_delay(exception, attempt, reset_at)`
+4. `fetch_commit_stats(github_client, repo, repo_name, shas, workers=1)`
+
+Classes:
+--------
+1. RateLimitBudget: Paces the requests of the worker pool within the GitHub rate limit.
+"""
+
+from github import Github, GithubException, RateLimitExceededException
+from github.Requester import Requester
+from apis.teacher.github_transport import install_transport
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+# Requests left untouched in every rate limit window, for the interactive use of the token
+RATE_LIMIT_RESERVE = 50
+# Attempts per commit before a rate limited request is given up
+MAX_RETRIES = 5
+# Initial and maximum wait after a secondary rate limit without a Retry-After header
+BACKOFF_SECONDS = 1
+MAX_BACKOFF_SECONDS = 60
+
+
+class RateLimitBudget:
+    """
+    Class: RateLimitBudget
+    -----------------------
+    Shared request budget of a worker pool. Requests are sent right away while the requests left in the
+    current rate limit window (minus a reserve) cover the pending ones. Otherwise, the requests left are
+    spread evenly until the window resets. A rate limit response pauses every worker.
+
+    Attributes:
+    - remaining (int): Requests left in the current window, or -1 while unknown.
+    - reset_at (float): UNIX timestamp at which the window resets.
+    - reserve (int): Requests left untouched in every window.
+    - demand (int): Number of requests the pool still has to send.
+    - backoffs (int): Number of rate limit responses the pool backed off on.
+
+    Methods:
+    - update(remaining, reset_at): Records the rate limit reported by the latest response.
+    - reserve_slot(now): Books the next request and returns how long to wait before sending it.
+    - acquire(): Waits until the next request may be sent.
+    - back_off(seconds): Pauses every worker for the given number of seconds.
+    """
+
+    def __init__(self, remaining=-1, reset_at=0, reserve=RATE_LIMIT_RESERVE, demand=0):
+        self.remaining = remaining
+        self.reset_at = reset_at
+        self.reserve = reserve
+        self.demand = demand
+        self.backoffs = 0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+        self.sleep = time.sleep
+
+    @classmethod
+    def from_client(cls, github_client, demand=0, reserve=RATE_LIMIT_RESERVE):
+        remaining, _ = github_client.requester.rate_limiting
+        return cls(
+            remaining, github_client.requester.rate_limiting_resettime, reserve, demand
+        )
+
+    def update(self, remaining, reset_at):
+        if remaining < 0:
+            return
+        with self.lock:
+            if reset_at > self.reset_at:
+                self.remaining, self.reset_at = remaining, reset_at
+            else:
+                self.remaining = min(self.remaining, remaining)
+
+    def reserve_slot(self, now):
+        with self.lock:
+            interval = 0.0
+            if self.remaining >= 0:
+                window = max(self.reset_at - now, 0)
+                budget = self.remaining - self.reserve
+                if budget <= 0 and window > 0:
+                    # Budget exhausted, wait for the next window
+                    self.next_slot = max(self.next_slot, self.reset_at)
+                    self.remaining = -1
+                else:
+                    if self.demand > budget:
+                        interval = window / max(budget, 1)
+                    self.remaining -= 1
+            self.demand = max(self.demand - 1, 0)
+
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + interval
+            return slot - now
+
+    def acquire(self):
+        delay = self.reserve_slot(time.time())
+        if delay > 0:
+            self.sleep(delay)
+
+    def back_off(self, seconds):
+        with self.lock:
+            self.backoffs += 1
+            self.next_slot = max(self.next_slot, time.time() + seconds)
+
+
+def clone_github_client(github_client):
+    """
+    Function: Clone GitHub Client
+    ------------------------------
+    Creates a GitHub client with the configuration of the given one and its own connection.
+
+    Parameters:
+    - github_client (github.Github): The client to clone.
+
+    Returns:
+    - github.Github: The new client. Its built-in request spacing and retries are disabled, since the
+      worker pool paces and retries its requests through a shared `RateLimitBudget`. It shares the caching
+      transport of the given client, if any.
+    """
+    kwargs = github_client.requester.kwargs
+    kwargs.update(seconds_between_requests=None, retry=None)
+    clone = Github(**kwargs)
+
+    transport = getattr(github_client.requester, "transport", None)
+    if transport:
+        install_transport(clone, *transport)
+    return clone
+
+
+def is_rate_limited(exception):
+    """
+    Function: Is Rate Limited
+    --------------------------
+    Checks whether a GitHub API error is a primary or secondary rate limit response.
+
+    Parameters:
+    - exception (GithubException): The error raised by PyGithub.
+
+    Returns:
+    - bool: True if the request may be retried after a wait.
+    """
+    if isinstance(exception, RateLimitExceededException):
+        return True
+    if exception.status not in (403, 429):
+        return False
+    message = (
+        exception.data.get("message", "") if isinstance(exception.data, dict) else ""
+    )
+    return exception.status == 429 or Requester.isRateLimitError(message)
+
+
+def retry_delay(exception, attempt, reset_at):
+    """
+    Function: Retry Delay
+    ----------------------
+    Computes how long to wait before retrying a rate limited request.
+
+    Parameters:
+    - exception (GithubException): The rate limit error.
+    - attempt (int): Number of failed attempts so far.
+    - reset_at (float): UNIX timestamp at which the current rate limit window resets.
+
+    Returns:
+    - float: The Retry-After time if given, else the time until a primary rate limit resets, else an
+      exponential backoff.
+    """
+    headers = {key.lower(): value for key, value in (exception.headers or {}).items()}
+    if "retry-after" in headers:
+        return float(headers["retry-after"])
+    if headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset" in headers:
+        return max(float(headers["x-ratelimit-reset"]) - time.time(), 0)
+    message = (
+        exception.data.get("message", "") if isinstance(exception.data, dict) else ""
+    )
+    if reset_at and Requester.isPrimaryRateLimitError(message):
+        return max(reset_at - time.time(), 0)
+    return min(BACKOFF_SECONDS * 2**attempt, MAX_BACKOFF_SECONDS)
+
+
+def fetch_commit_stats(github_client, repo, repo_name, shas, workers=1):
+    """
+    Function: Fetch Commit Statistics
+    ----------------------------------
+    Fetches the number of added and deleted lines of every given commit.
+
+    Parameters:
+    - github_client (github.Github): The GitHub client of the application.
+    - repo (github.Repository.Repository): The repository, used by the sequential mode.
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - shas (list): The SHAs of the commits to fetch.
+    - workers (int, optional): Size of the worker pool. With 1 worker, the commits are fetched one after
+      the other with the given repository. Defaults to 1.
+
+    Returns:
+    - dict: The `(additions, deletions)` tuple of every commit, keyed by SHA.
+
+    Raises:
+    - GithubException: If a commit cannot be fetched, or is still rate limited after `MAX_RETRIES` attempts.
+
+    Behavior:
+    - Every request waits for its slot in a `RateLimitBudget` seeded from the rate limit of the
+      application client and updated from every response.
+    - A rate limited request pauses the whole pool for the Retry-After time (or until the rate limit
+      window resets, or with an exponential backoff) and is then retried.
+    """
+    if workers <= 1 or len(shas) <= 1:
+        stats = {}
+        for sha in shas:
+            commit = repo.get_commit(sha)
+            stats[sha] = (commit.stats.additions, commit.stats.deletions)
+        return stats
+
+    budget = RateLimitBudget.from_client(github_client, demand=len(shas))
+    local = threading.local()
+    clients = []
+    clients_lock = threading.Lock()
+
+    def fetch(sha):
+        if not hasattr(local, "client"):
+            local.client = clone_github_client(github_client)
+            local.repo = local.client.get_repo(repo_name, lazy=True)
+            with clients_lock:
+                clients.append(local.client)
+
+        for attempt in range(MAX_RETRIES + 1):
+            budget.acquire()
+            try:
+                commit = local.repo.get_commit(sha)
+                return sha, (commit.stats.additions, commit.stats.deletions)
+            except GithubException as e:
+                if attempt == MAX_RETRIES or not is_rate_limited(e):
+                    raise
+                budget.back_off(retry_delay(e, attempt, budget.reset_at))
+            finally:
+                remaining, _ = local.client.requester.rate_limiting
+                budget.update(remaining, local.client.requester.rate_limiting_resettime)
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(shas))) as pool:
+            return dict(pool.map(fetch, shas))
+    finally:
+        for client in clients:
+            client.close()
@@ -0,0 +1,222 @@
+"""
+Module: GitHub GraphQL Commit Sync
+-----------------------------------
+This module fills the commit statistics store from the GitHub GraphQL API. The `history` connection of the
+default branch returns the additions and deletions of up to 100 commits per request, where the REST API
+needs one request per commit, so a cold sync costs about 100 times fewer API calls. The synced commits
+are aggregated exactly like the ones of the REST sync.
+
+Dependencies:
+-------------
+- SQLAlchemy ORM: For database operations.
+- PyGithub: For sending the GraphQL queries.
+- datetime: For parsing the commit dates.
+
+Functions:
+----------
+1. `parse_date(value)`
+2. `query_history(github_client, repo_name, cursor=None)`
+3. `sync_commits_graphql(github_client, repo_name)`
+"""
+
+from application.models import CommitStats, GithubSyncState, db
+from apis.teacher.github_stats import (
+    commit_day,
+    mark_activity_days,
+    parse_milestone_id,
+    prune_commits,
+)
+from github import GithubException
+from datetime import datetime, timezone
+
+# Commits requested per GraphQL page, the maximum allowed by GitHub
+HISTORY_PAGE_SIZE = 100
+
+HISTORY_QUERY = """
+query ($owner: String!, $name: String!, $first: Int!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          oid
+          committedDate
+          history(first: $first, after: $cursor) {
+            pageInfo {
+              hasNextPage
+              endCursor
+            }
+            nodes {
+              oid
+              message
+              additions
+              deletions
+              authoredDate
+              author {
+                user {
+                  login
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def parse_date(value):
+    """
+    Function: Parse Date
+    ---------------------
+    Parses an ISO 8601 timestamp of the GitHub API into a timezone-aware datetime.
+    """
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def query_history(github_client, repo_name, cursor=None):
+    """
+    Function: Query History
+    ------------------------
+    Fetches one page of the commit history of the default branch of a repository.
+
+    Parameters:
+    - github_client (github.Github): The GitHub client used for the API calls.
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - cursor (str, optional): The end cursor of the previous page. Defaults to None (first page).
+
+    Returns:
+    - dict: The head commit of the default branch, with its `history` page.
+
+    Raises:
+    - GithubException: If the query fails or the repository is empty. The error data contains the `status`
+      and `message` keys, like the errors of the REST API.
+    """
+    owner, name = repo_name.split("/")
+    try:
+        _, data = github_client.requester.graphql_query(
+            HISTORY_QUERY,
+            {
+                "owner": owner,
+                "name": name,
+                "first": HISTORY_PAGE_SIZE,
+                "cursor": cursor,
+            },
+        )
+    except GithubException as e:
+        errors = (e.data or {}).get("errors") if isinstance(e.data, dict) else None
+        message = errors[0].get("message") if errors else e.message
+        raise GithubException(
+            e.status, {"status": str(e.status), "message": message}, e.headers
+        )
+
+    branch = data["data"]["repository"]["defaultBranchRef"]
+    if not branch:
+        raise GithubException(
+            409, {"status": "409", "message": "Git Repository is empty."}
+        )
+    return branch["target"]
+
+
+def sync_commits_graphql(github_client, repo_name):
+    """
+    Function: Sync Commits with GraphQL
+    ------------------------------------
+    Brings the commit cache of a GitHub repository up to date from the GraphQL API, pulling only the
+    history pages that are newer than the stored sync watermark of the repository.
+
+    Parameters:
+    - github_client (github.Github): The GitHub client used for the API calls.
+    - repo_name (str): The repository identifier in the `owner/name` format.
+
+    Returns:
+    - int: The number of newly cached commits.
+
+    Raises:
+    - GithubException: If any error occurs while interacting with the GitHub API.
+
+    Behavior:
+    - Pages through the history of the default branch, newest commits first, and caches the unseen
+      commits of every page with their additions and deletions.
+    - Stops at the first page that reaches the watermark commit without an unseen commit after it, so an
+      unchanged repository costs one request.
+    - Walks the whole history (pruning commits that disappeared) when the repository has never been
+      synced or the watermark commit is no longer part of it.
+    - Advances the watermark to the head commit of the default branch.
+    """
+    state = GithubSyncState.query.filter_by(repo=repo_name).first()
+    if not state:
+        state = GithubSyncState(repo=repo_name)
+        db.session.add(state)
+
+    known_shas = {
+        sha
+        for (sha,) in db.session.query(CommitStats.sha).filter(
+            CommitStats.repo == repo_name
+        )
+    }
+    seen_shas = set()
+    reached_watermark = False
+    new_commits = 0
+
+    cursor = None
+    head = None
+    while True:
+        try:
+            target = query_history(github_client, repo_name, cursor)
+        except GithubException:
+            db.session.rollback()
+            raise
+
+        if head is None:
+            head = target
+            if head["oid"] == state.last_sha:
+                break
+
+        history = target["history"]
+        new_after_watermark = False
+        new_days = set()
+        for node in history["nodes"]:
+            seen_shas.add(node["oid"])
+            if node["oid"] == state.last_sha:
+                reached_watermark = True
+            if node["oid"] in known_shas:
+                continue
+
+            author = node["author"]["user"] if node["author"] else None
+            db.session.add(
+                CommitStats(
+                    repo=repo_name,
+                    sha=node["oid"],
+                    author=author["login"] if author else None,
+                    committed_at=parse_date(node["authoredDate"]),
+                    message=node["message"],
+                    additions=node["additions"],
+                    deletions=node["deletions"],
+                    milestone_id=parse_milestone_id(node["message"]),
+                )
+            )
+            new_days.add(commit_day(parse_date(node["authoredDate"])))
+            known_shas.add(node["oid"])
+            new_commits += 1
+            new_after_watermark = new_after_watermark or reached_watermark
+        mark_activity_days(repo_name, new_days)
+        db.session.commit()
+
+        if reached_watermark and not new_after_watermark:
+            break
+        if not history["pageInfo"]["hasNextPage"]:
+            # The whole history was walked, drop the commits that are no longer part of it
+            if not reached_watermark and known_shas - seen_shas:
+                prune_commits(repo_name, known_shas - seen_shas)
+            break
+        cursor = history["pageInfo"]["endCursor"]
+
+    state.last_sha = head["oid"]
+    state.last_commit_at = parse_date(head["committedDate"])
+    # The ETag of the REST sync no longer describes the watermark
+    state.etag = None
+    state.synced_at = datetime.now(timezone.utc)
+    db.session.commit()
+    return new_commits
@@ -0,0 +1,170 @@
+"""
+Module: Teacher GitHub Integration APIs
+----------------------------------------
+This module provides APIs for instructors to monitor the GitHub integration of the application, and the
+webhook through which GitHub pushes new commits to the application.
+
+Dependencies:
+-------------
+- Flask: For creating API routes.
+- Flask-Security: For role-based access control.
+- SQLAlchemy ORM: For database operations.
+- PyGithub: For interacting with the GitHub API.
+- github_transport: For the telemetry of the GitHub clients.
+- github_webhook: For verifying and ingesting push webhooks.
+- github_snapshots: For storing the GitHub statistics of the teams.
+
+Roles Accepted:
+---------------
+- Instructor: Full access to the telemetry endpoint.
+- The webhook endpoint is authenticated by the signature of the webhook secret instead of a user token.
+
+Endpoints:
+----------
+1. GET /teacher/github/telemetry
+2. POST /teacher/github/webhook
+"""
+
+from apis.teacher.setup import teacher, github_client, sync_repository
+from apis.teacher.github_snapshots import save_github_snapshot
+from apis.teacher.github_stats import parse_repo_url, aggregate_commit_stats
+from apis.teacher.github_transport import response_store, github_telemetry
+from apis.teacher.github_webhook import (
+    verify_signature,
+    is_default_branch_push,
+    ingest_push,
+)
+from application.models import Teams, db
+from flask_security import roles_accepted
+from flask import abort, current_app, request
+from github import GithubException
+
+"""
+    API: Get GitHub Telemetry
+    --------------------------
+    Retrieves the usage of the GitHub API by the application process since it started.
+
+    Roles Accepted:
+    - Instructor
+
+    Response:
+    - 200: JSON object containing:
+        - `calls`: Number of GitHub API calls.
+        - `not_modified`: Number of calls answered with 304 Not Modified, which do not count against the
+          rate limit.
+        - `statuses`: Number of calls per response status.
+        - `rate_limit`: The `limit`, `remaining` requests and `reset_at` UNIX timestamp reported by the
+          latest response.
+        - `latency_seconds`: Cumulative latency histogram (`buckets` keyed by upper bound), with the
+          `count` and `sum` of all latencies.
+        - `stored_responses`: Number of responses kept for conditional requests.
+    - 403: If the user does not have the required role.
+    """
+
+
+@teacher.route("/github/telemetry", methods=["GET"])
+@roles_accepted("Instructor")
+def get_github_telemetry():
+    return {**github_telemetry.snapshot(), "stored_responses": len(response_store)}, 200
+
+
+"""
+    API: Receive GitHub Push Webhook
+    ---------------------------------
+    Updates the commit statistics and GitHub snapshots of the teams working on a repository as soon as
+    commits are pushed to it, instead of waiting for the next refresh of the GitHub statistics worker.
+
+    Headers:
+    - X-GitHub-Event: The webhook event. `push` events are ingested, `ping` events are acknowledged and
+      other events are ignored.
+    - X-Hub-Signature-256: HMAC-SHA256 signature of the request body with the `GITHUB_WEBHOOK_SECRET`.
+
+    Request Body:
+    - The GitHub `push` webhook payload (JSON).
+
+    Response:
+    - 200: JSON object containing the synced `repository`, the number of `new_commits` read from the payload
+      (null when the repository had to be synced through the configured statistics source) and the IDs of
+      the updated `teams`.
+    - 202: If the event or the pushed branch is ignored.
+    - 400: If the payload is not a valid push payload.
+    - 401: If the signature is missing or invalid.
+    - 404: If no webhook secret is configured, or no team works on the repository.
+    - 502: If the commit statistics cannot be fetched from GitHub.
+
+    Behavior:
+    - Only pushes to the default branch of the repository are ingested.
+    - A push that fast-forwards the branch from the sync watermark of the repository is applied from the
+      payload, fetching only the line statistics of the pushed commits. Other pushes (force pushes, pushes
+      following a missed delivery) trigger a regular sync of the repository, as does every push when the
+      statistics are read from local git mirrors.
+    - The GitHub snapshots of all teams working on the repository are recomputed.
+    """
+
+
+@teacher.route("/github/webhook", methods=["POST"])
+def receive_github_webhook():
+    secret = current_app.config["GITHUB_WEBHOOK_SECRET"]
+    if not secret:
+        return abort(404, "Webhook not configured")
+    if not verify_signature(
+        secret, request.get_data(), request.headers.get("X-Hub-Signature-256")
+    ):
+        return abort(401, "Invalid webhook signature")
+
+    event = request.headers.get("X-GitHub-Event")
+    if event == "ping":
+        return {"message": "Webhook is active"}, 200
+    if event != "push":
+        return {"message": f"Ignored {event} event"}, 202
+
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or "full_name" not in payload.get(
+        "repository", {}
+    ):
+        return abort(400, "Invalid push payload")
+
+    full_name = payload["repository"]["full_name"].lower()
+    teams = []
+    for team in Teams.query.filter(Teams.github_repo_url.isnot(None)).all():
+        try:
+            if parse_repo_url(team.github_repo_url).lower() == full_name:
+                teams.append(team)
+        except ValueError:
+            continue
+    if not teams:
+        return abort(404, "Repository not registered")
+
+    if not is_default_branch_push(payload):
+        return {"message": "Ignored push to a non-default branch"}, 202
+
+    repo_url = teams[0].github_repo_url
+    repo_name = parse_repo_url(repo_url)
+
+    new_commits = None
+    if current_app.config["GITHUB_STATS_BACKEND"] != "mirror":
+        try:
+            new_commits = ingest_push(
+                github_client,
+                repo_name,
+                payload,
+                current_app.config["GITHUB_FETCH_WORKERS"],
+            )
+        except GithubException as e:
+            db.session.rollback()
+            return abort(502, (e.data or {}).get("message", "GitHub API error"))
+
+    if new_commits is None:
+        error = sync_repository(repo_url, repo_name)
+        if error:
+            return abort(502, error.get("message"))
+
+    commit_details = aggregate_commit_stats(repo_name)
+    for team in teams:
+        save_github_snapshot(team.id, commit_details)
+
+    return {
+        "repository": repo_name,
+        "new_commits": new_commits,
+        "teams": [team.id for team in teams],
+    }, 200
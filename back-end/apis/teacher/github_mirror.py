@@ -0,0 +1,466 @@
+"""
+Module: Git Mirror Commit Sync
+-------------------------------
+This module fills the commit statistics store from local bare mirrors of the team repositories instead of
+the GitHub API. Every repository is cloned once and then fetched incrementally, and the statistics of the
+new commits are read from `git log --numstat` in a single streaming pass. The synced commits are
+aggregated exactly like the ones of the API syncs, without any GitHub rate limit: commit authors are
+resolved to the same GitHub logins as the API syncs, looking up every unknown author email once.
+Only repositories hosted on GitHub are mirrored, and the GitHub access token is only sent to GitHub.
+
+Dependencies:
+-------------
+- SQLAlchemy ORM: For database operations.
+- subprocess: For running git.
+- base64: For authenticating to GitHub over HTTPS.
+- urllib: For reading the host of the repository URLs.
+- PyGithub: For looking up the GitHub logins of the commit authors.
+- datetime: For parsing the commit dates.
+
+Functions:
+----------
+1. `mirror_path(mirror_folder, repo_name)`
+2. `repo_host(repo_url)`
+3. `run_git(args, token=None)`
+4. `update_mirror(repo_url, path, token=None)`
+5. `github_login_lookup(github_client, repo_name)`
+6. `load_author_logins(lookup_login=None)`
+7. `resolve_author(name, email, sha, logins, lookup_login=None)`
+8. `read_log(path, revisions)`
+9. `sync_commits_mirror(repo_url, repo_name, mirror_folder, token=None, lookup_login=None, allow_local=False)`
+
+Classes:
+--------
+1. GitMirrorError: Raised when a git command fails.
+"""
+
+from application.models import CommitAuthors, CommitStats, GithubSyncState, Users, db
+from apis.teacher.github_stats import (
+    CACHE_BATCH_SIZE,
+    commit_day,
+    mark_activity_days,
+    parse_milestone_id,
+    prune_commits,
+)
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+from github import GithubException
+import base64
+import os
+import re
+import subprocess
+
+# Field and record separators of the `git log` output
+FIELD_SEPARATOR = "\x1f"
+HEADER_START = "\x1e"
+HEADER_END = "\x1d"
+LOG_FORMAT = f"{HEADER_START}%H%x1f%an%x1f%ae%x1f%aI%x1f%B%x1d"
+
+# GitHub login in the noreply address of a commit author, e.g. 12345+octocat@users.noreply.github.com
+NOREPLY_EMAIL = re.compile(r"^(?:\d+\+)?([^@]+)@users\.noreply\.github\.com$")
+
+# The only host repositories are mirrored from, and the GitHub access token is sent to
+GITHUB_HOST = "github.com"
+
+
+class GitMirrorError(Exception):
+    """
+    Class: GitMirrorError
+    ----------------------
+    Raised when a git command on a repository mirror fails.
+
+    Attributes:
+    - data (dict): The error in the format of the GitHub API errors, with `status` and `message` keys.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.data = {"status": str(status), "message": message}
+
+
+def mirror_path(mirror_folder, repo_name):
+    """
+    Function: Mirror Path
+    ----------------------
+    Returns the location of the bare mirror of a repository.
+
+    Parameters:
+    - mirror_folder (str): The folder holding all mirrors.
+    - repo_name (str): The repository identifier in the `owner/name` format.
+
+    Returns:
+    - str: The path of the mirror.
+    """
+    return os.path.join(mirror_folder, f"{repo_name}.git")
+
+
+def repo_host(repo_url):
+    """
+    Function: Repository Host
+    --------------------------
+    Returns the host of a repository URL.
+
+    Parameters:
+    - repo_url (str): URL of the repository (HTTPS, SSH or file URL).
+
+    Returns:
+    - str: The host of the repository, in lowercase.
+    - None: For the file URL of a local repository.
+    """
+    if repo_url.startswith("file://"):
+        return None
+    if repo_url.startswith("git@"):
+        return repo_url[4:].split(":", 1)[0].lower()
+    return (urlsplit(repo_url).hostname or "").lower()
+
+
+def run_git(args, token=None):
+    """
+    Function: Run Git
+    ------------------
+    Runs a git command and returns its output.
+
+    Parameters:
+    - args (list): The git arguments.
+    - token (str, optional): GitHub access token, sent as HTTP authentication to GitHub only. Defaults to None.
+
+    Returns:
+    - str: The standard output of the command, stripped.
+
+    Raises:
+    - GitMirrorError: If the command fails.
+    """
+    command = ["git"]
+    if token:
+        credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+        # Scoped to GitHub, so the token is not sent to a redirect or a remote on another host
+        command += [
+            "-c",
+            f"http.https://{GITHUB_HOST}/.extraHeader=Authorization: Basic {credentials}",
+        ]
+
+    result = subprocess.run(
+        command + args,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    )
+    if result.returncode != 0:
+        raise GitMirrorError(502, result.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout.strip()
+
+
+def update_mirror(repo_url, path, token=None):
+    """
+    Function: Update Mirror
+    ------------------------
+    Creates the bare mirror of a repository, or fetches the refs that changed since the last update.
+
+    Parameters:
+    - repo_url (str): URL of the repository.
+    - path (str): The path of the mirror.
+    - token (str, optional): GitHub access token for private repositories. Defaults to None.
+
+    Returns:
+    - str: The SHA of the head commit of the default branch.
+
+    Raises:
+    - GitMirrorError: If the repository cannot be fetched or is empty.
+    """
+    if os.path.isdir(path):
+        run_git(["--git-dir", path, "fetch", "--prune", "--quiet", "origin"], token)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        run_git(["clone", "--mirror", "--quiet", repo_url, path], token)
+
+    try:
+        return run_git(["--git-dir", path, "rev-parse", "--verify", "HEAD^{commit}"])
+    except GitMirrorError:
+        raise GitMirrorError(409, "Git Repository is empty.")
+
+
+def github_login_lookup(github_client, repo_name):
+    """
+    Function: GitHub Login Lookup
+    ------------------------------
+    Returns a function looking up the GitHub login of the author of a commit of a repository, the way the API
+    syncs read it.
+
+    Parameters:
+    - github_client (Github): The PyGithub client.
+    - repo_name (str): The repository identifier in the `owner/name` format.
+
+    Returns:
+    - function: Takes the SHA of a commit and returns the login of its author, or None if GitHub does not
+      link the author to an account. Raises `GithubException` if the request fails.
+    """
+    repo = github_client.get_repo(repo_name, lazy=True)
+
+    def lookup_login(sha):
+        author = repo.get_commit(sha).author
+        return author.login if author else None
+
+    return lookup_login
+
+
+def load_author_logins(lookup_login=None):
+    """
+    Function: Load Author Logins
+    -----------------------------
+    Loads the known GitHub logins of commit author emails.
+
+    Parameters:
+    - lookup_login (function, optional): The login lookup of the sync, see `github_login_lookup`.
+      Defaults to None.
+
+    Returns:
+    - dict: The GitHub logins (or None) keyed by lowercase email: the logins looked up from GitHub before when
+      a lookup is given, or else the GitHub usernames of the users of the application.
+    """
+    if lookup_login:
+        query = db.session.query(CommitAuthors.email, CommitAuthors.login).order_by(
+            CommitAuthors.id
+        )
+    else:
+        query = db.session.query(Users.email, Users.github_username).filter(
+            Users.github_username.isnot(None)
+        )
+    return {email.lower(): login for email, login in query}
+
+
+def resolve_author(name, email, sha, logins, lookup_login=None):
+    """
+    Function: Resolve Author
+    -------------------------
+    Resolves the GitHub login of a commit author, like the author login of the commits of the GitHub API.
+
+    Parameters:
+    - name (str): The author name of the commit.
+    - email (str): The author email of the commit.
+    - sha (str): The SHA of the commit.
+    - logins (dict): The known logins, see `load_author_logins`. Looked up logins are added to it.
+    - lookup_login (function, optional): The login lookup of the sync, see `github_login_lookup`.
+      Defaults to None.
+
+    Returns:
+    - str: The GitHub login, or the author name for a local repository if the email is unknown.
+    - None: If GitHub does not link the email to an account.
+
+    Behavior:
+    - Logins are read from the noreply addresses GitHub assigns to its users without any lookup.
+    - Other emails are looked up from GitHub once, from the first commit they are found in, and the login is
+      stored in the `CommitAuthors` cache for the later syncs of every repository.
+    - Without a lookup (local repositories), emails are matched against the users of the application.
+    """
+    match = NOREPLY_EMAIL.match(email)
+    if match:
+        return match.group(1)
+
+    email = email.lower()
+    if email not in logins:
+        if not lookup_login:
+            return name
+        logins[email] = lookup_login(sha)
+        db.session.add(
+            CommitAuthors(
+                email=email,
+                login=logins[email],
+                resolved_at=datetime.now(timezone.utc),
+            )
+        )
+    return logins[email]
+
+
+def read_log(path, revisions):
+    """
+    Function: Read Log
+    -------------------
+    Streams the commits of a mirror with their line statistics from `git log --numstat`.
+
+    Parameters:
+    - path (str): The path of the mirror.
+    - revisions (list): The revisions to list, e.g. `["HEAD"]` or `["<old>..<new>"]`.
+
+    Yields:
+    - dict: The `sha`, `author_name`, `author_email`, `committed_at`, `message`, `additions` and `deletions`
+      of every commit.
+
+    Raises:
+    - GitMirrorError: If git fails.
+
+    Behavior:
+    - Merge commits are diffed against their first parent, like the commit statistics of GitHub.
+    - Binary files count as no added or deleted lines, like on GitHub.
+    """
+    process = subprocess.Popen(
+        [
+            "git",
+            "--git-dir",
+            path,
+            "log",
+            "--numstat",
+            "--diff-merges=first-parent",
+            "--no-renames",
+            f"--format={LOG_FORMAT}",
+            *revisions,
+            "--",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+
+    commit = None
+    header = None
+    for line in process.stdout:
+        if header is not None:
+            header += line
+        elif line.startswith(HEADER_START):
+            if commit:
+                yield commit
+            header = line[1:]
+        elif commit and line.strip():
+            added, deleted, _ = line.split("\t", 2)
+            commit["additions"] += int(added) if added != "-" else 0
+            commit["deletions"] += int(deleted) if deleted != "-" else 0
+
+        if header is not None and HEADER_END in header:
+            header = header[: header.index(HEADER_END)]
+            sha, name, email, date, message = header.split(FIELD_SEPARATOR, 4)
+            commit = {
+                "sha": sha,
+                "author_name": name,
+                "author_email": email,
+                "committed_at": datetime.fromisoformat(date).astimezone(timezone.utc),
+                "message": message.strip(),
+                "additions": 0,
+                "deletions": 0,
+            }
+            header = None
+    if commit:
+        yield commit
+
+    if process.wait() != 0:
+        raise GitMirrorError(502, process.stderr.read().strip())
+
+
+def sync_commits_mirror(
+    repo_url, repo_name, mirror_folder, token=None, lookup_login=None, allow_local=False
+):
+    """
+    Function: Sync Commits from Mirror
+    -----------------------------------
+    Brings the commit cache of a repository up to date from its local bare mirror, reading only the
+    commits that are newer than the stored sync watermark of the repository.
+
+    Parameters:
+    - repo_url (str): URL of the repository (HTTPS, SSH or file URL).
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - mirror_folder (str): The folder holding all mirrors.
+    - token (str, optional): GitHub access token for private repositories. Defaults to None.
+    - lookup_login (function, optional): Looks up the GitHub login of the author of a commit, see
+      `github_login_lookup`. Defaults to None.
+    - allow_local (bool, optional): Whether file URLs of local repositories can be mirrored. Defaults to False.
+
+    Returns:
+    - int: The number of newly cached commits.
+
+    Raises:
+    - GitMirrorError: If the repository is not hosted on GitHub (400), or the mirror cannot be updated or read.
+    - GithubException: If the login of an author cannot be looked up.
+
+    Behavior:
+    - Clones the mirror on the first sync and fetches it incrementally afterwards.
+    - Reads the commits between the watermark commit and the new head when the head moved forward.
+    - Reads the whole history (pruning commits that disappeared) when the repository has never been synced
+      or its history was rewritten since the last sync.
+    - Commit authors are resolved to GitHub logins, see `resolve_author`.
+    """
+    host = repo_host(repo_url)
+    if host != GITHUB_HOST and not (host is None and allow_local):
+        raise GitMirrorError(
+            400, f"Only repositories hosted on {GITHUB_HOST} can be mirrored."
+        )
+
+    state = GithubSyncState.query.filter_by(repo=repo_name).first()
+    if not state:
+        state = GithubSyncState(repo=repo_name)
+        db.session.add(state)
+
+    path = mirror_path(mirror_folder, repo_name)
+    try:
+        head = update_mirror(repo_url, path, token if host == GITHUB_HOST else None)
+    except GitMirrorError:
+        db.session.rollback()
+        raise
+    state.synced_at = datetime.now(timezone.utc)
+
+    if head == state.last_sha:
+        db.session.commit()
+        return 0
+
+    incremental = False
+    if state.last_sha:
+        try:
+            run_git(
+                ["--git-dir", path, "merge-base", "--is-ancestor", state.last_sha, head]
+            )
+            incremental = True
+        except GitMirrorError:
+            # The watermark commit is gone or no longer an ancestor of the head
+            incremental = False
+
+    known_shas = {
+        sha
+        for (sha,) in db.session.query(CommitStats.sha).filter(
+            CommitStats.repo == repo_name
+        )
+    }
+    seen_shas = set()
+    new_commits = 0
+    new_days = set()
+    logins = load_author_logins(lookup_login)
+
+    revisions = [f"{state.last_sha}..{head}"] if incremental else [head]
+    try:
+        for commit in read_log(path, revisions):
+            seen_shas.add(commit["sha"])
+            if commit["sha"] in known_shas:
+                continue
+
+            name, email = commit.pop("author_name"), commit.pop("author_email")
+            db.session.add(
+                CommitStats(
+                    repo=repo_name,
+                    milestone_id=parse_milestone_id(commit["message"]),
+                    author=resolve_author(
+                        name, email, commit["sha"], logins, lookup_login
+                    ),
+                    **commit,
+                )
+            )
+            new_days.add(commit_day(commit["committed_at"]))
+            known_shas.add(commit["sha"])
+            new_commits += 1
+
+            if new_commits % CACHE_BATCH_SIZE == 0:
+                mark_activity_days(repo_name, new_days)
+                db.session.commit()
+    except GithubException:
+        # The watermark is kept, so the next sync reads the commits again
+        db.session.rollback()
+        raise
+
+    mark_activity_days(repo_name, new_days)
+    if not incremental and known_shas - seen_shas:
+        prune_commits(repo_name, known_shas - seen_shas)
+
+    state.last_sha = head
+    state.last_commit_at = datetime.fromisoformat(
+        run_git(["--git-dir", path, "log", "-1", "--format=%cI", head])
+    ).astimezone(timezone.utc)
+    state.etag = None
+    db.session.commit()
+    return new_commits
@@ -0,0 +1,123 @@
+"""
+Module: GitHub Statistics Snapshots
+------------------------------------
+This module maintains the latest precomputed GitHub statistics of every team, refreshed by the GitHub
+statistics worker, so the team listings and dashboards read the statistics of the teams without contacting
+GitHub on every request.
+
+Dependencies:
+-------------
+- Flask: For logging.
+- SQLAlchemy ORM: For database operations.
+- ranking_cache: For clearing the cached AI rankings when the GitHub statistics change.
+- datetime: For timestamping the snapshots.
+
+Functions:
+----------
+1. `get_github_snapshot(team_id)`
+2. `get_github_snapshots(team_ids)`
+3. `save_github_snapshot(team_id, commit_details)`
+4. `refresh_github_snapshots()`
+"""
+
+from apis.teacher.setup import fetch_commit_details
+from apis.teacher.ranking_cache import invalidate_rankings
+from application.models import GithubSnapshots, Teams, db
+from flask import current_app
+from datetime import datetime, timezone
+
+
+def get_github_snapshot(team_id):
+    """
+    Function: Get GitHub Snapshot
+    ------------------------------
+    Fetches the latest precomputed GitHub statistics snapshot of a team.
+
+    Parameters:
+    - team_id (int): The ID of the team.
+
+    Returns:
+    - A `GithubSnapshots` object if a snapshot has been computed for the team.
+    - None if the team has no snapshot yet.
+    """
+    return GithubSnapshots.query.filter_by(team_id=team_id).first()
+
+
+def get_github_snapshots(team_ids):
+    """
+    Function: Get GitHub Snapshots
+    -------------------------------
+    Fetches the latest precomputed GitHub statistics snapshots of several teams in a single query.
+
+    Parameters:
+    - team_ids (list): The IDs of the teams.
+
+    Returns:
+    - dict: The `GithubSnapshots` objects keyed by team ID. Teams without a snapshot are omitted.
+    """
+    return {
+        snapshot.team_id: snapshot
+        for snapshot in GithubSnapshots.query.filter(
+            GithubSnapshots.team_id.in_(team_ids)
+        )
+    }
+
+
+def save_github_snapshot(team_id, commit_details):
+    """
+    Function: Save GitHub Snapshot
+    -------------------------------
+    Stores the GitHub statistics of a team as its latest snapshot, replacing the previous one.
+
+    Parameters:
+    - team_id (int): The ID of the team.
+    - commit_details (dict): The statistics in the format returned by `fetch_commit_details`.
+
+    Returns:
+    - The updated `GithubSnapshots` object.
+    """
+    snapshot = get_github_snapshot(team_id)
+    if not snapshot:
+        snapshot = GithubSnapshots(team_id=team_id)
+        db.session.add(snapshot)
+
+    snapshot.total_commits = commit_details["total_commits"]
+    snapshot.lines_of_code_added = commit_details["lines_of_code_added"]
+    snapshot.lines_of_code_deleted = commit_details["lines_of_code_deleted"]
+    snapshot.milestones = commit_details["milestones"]
+    snapshot.created_at = datetime.now(timezone.utc)
+    db.session.commit()
+    invalidate_rankings()
+    return snapshot
+
+
+def refresh_github_snapshots():
+    """
+    Function: Refresh GitHub Snapshots
+    -----------------------------------
+    Recomputes the GitHub statistics snapshot of every team that has a GitHub repository. Used by the
+    GitHub statistics worker.
+
+    Returns:
+    - int: The number of refreshed snapshots.
+
+    Behavior:
+    - Teams whose statistics cannot be fetched from GitHub keep their previous snapshot, and the error is logged.
+    """
+    refreshed = 0
+    for team in Teams.query.filter(Teams.github_repo_url.isnot(None)).all():
+        try:
+            commit_details = fetch_commit_details(team.github_repo_url)
+        except ValueError as e:
+            current_app.logger.error(f"Skipping GitHub stats of team {team.id}: {e}")
+            continue
+
+        if "status" in commit_details:
+            current_app.logger.error(
+                f"Fetching GitHub stats of team {team.id} failed: {commit_details.get('message')}"
+            )
+            continue
+
+        save_github_snapshot(team.id, commit_details)
+        refreshed += 1
+    return refreshed
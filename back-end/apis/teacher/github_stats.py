@@ -0,0 +1,639 @@
+"""
+Module: GitHub Commit Statistics Store
+---------------------------------------
+This module maintains the local store of GitHub commit statistics used by the teacher APIs. Commits are
+immutable, so the statistics of each commit are fetched from GitHub only once and cached in the database.
+Each repository keeps a sync watermark, so a refresh only pulls the commits pushed since the previous one.
+Team and member statistics are then computed with SQL aggregates over the cached rows. The daily activity
+rows materialized from the cached commits are only recomputed for the days whose commits changed.
+
+Dependencies:
+-------------
+- SQLAlchemy ORM: For database operations.
+- PyGithub: For interacting with the GitHub API.
+- datetime, json: For parsing the GitHub API responses.
+
+Functions:
+----------
+1. `parse_repo_url(repo_url)`
+2. `parse_milestone_id(message)`
+3. `commit_day(committed_at)`
+4. `mark_activity_days(repo_name, days)`
+5. `prune_commits(repo_name, shas)`
+6. `cache_commits(github_client, repo, repo_name, commits, prune=False, workers=1)`
+7. `sync_commits(github_client, repo_name, workers=1)`
+8. `aggregate_commit_stats(repo_name, username=None)`
+9. `aggregate_member_stats(repo_name, usernames)`
+10. `materialize_commit_activity(repo_name)`
+11. `aggregate_daily_activity(repo_name, since=None, until=None)`
+12. `format_activity_series(days, limit=ACTIVITY_PROMPT_DAYS)`
+13. `aggregate_repository_days(repo_names)`
+"""
+
+from application.models import (
+    CommitActivity,
+    CommitStats,
+    GithubSyncState,
+    Milestones,
+    db,
+)
+from apis.teacher.github_fetcher import fetch_commit_stats
+from github import UnknownObjectException
+from datetime import datetime, timezone
+import json
+
+# Number of newly cached commits written per database commit
+CACHE_BATCH_SIZE = 100
+# Number of most recent active days described to the AI
+ACTIVITY_PROMPT_DAYS = 30
+
+
+def parse_repo_url(repo_url):
+    """
+    Function: Parse Repository URL
+    -------------------------------
+    Extracts the `owner/name` identifier of a GitHub repository from its URL.
+
+    Parameters:
+    - repo_url (str): URL of the GitHub repository (HTTPS or SSH format, or a file URL for local mirrors).
+
+    Returns:
+    - str: The repository identifier in the `owner/name` format.
+
+    Raises:
+    - ValueError: If the repository URL format is invalid.
+    """
+    repo_url = repo_url.rstrip("/")  # Remove trailing slash if any
+    if repo_url.startswith(("https://", "file://")):
+        parts = repo_url.split("/")
+        owner = parts[-2]
+        repo_name = parts[-1].replace(".git", "")
+    elif repo_url.startswith("git@"):
+        repo_part = repo_url.split(":")[1]
+        owner, repo_name = repo_part.replace(".git", "").split("/")
+    else:
+        raise ValueError(f"Invalid GitHub URL format: {repo_url}")
+    return f"{owner}/{repo_name}"
+
+
+def parse_milestone_id(message):
+    """
+    Function: Parse Milestone ID
+    -----------------------------
+    Extracts the milestone ID from a commit message in the format "Milestone-<id> <message>".
+
+    Parameters:
+    - message (str): The commit message.
+
+    Returns:
+    - int: The milestone ID referenced by the commit message.
+    - None: If the message does not follow the milestone format strictly.
+    """
+    if not message or not message.lower().startswith("milestone-"):
+        return None
+    try:
+        return int(message.split()[0].split("-")[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def commit_day(committed_at):
+    """
+    Function: Commit Day
+    ---------------------
+    Returns the UTC day of a commit date, the day of its daily activity row.
+
+    Parameters:
+    - committed_at (datetime): The commit date, or None.
+
+    Returns:
+    - date: The UTC day, or None for a commit without a date.
+    """
+    return committed_at.astimezone(timezone.utc).date() if committed_at else None
+
+
+def mark_activity_days(repo_name, days):
+    """
+    Function: Mark Activity Days
+    -----------------------------
+    Records the days whose cached commits of a repository were added or removed, so the next
+    `materialize_commit_activity` only recomputes the activity rows of those days. Called before the commit
+    changes are committed, so that the days are stored in the same transaction.
+
+    Parameters:
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - days (iterable): The days, as dates or YYYY-MM-DD strings. None values are ignored.
+
+    Behavior:
+    - Nothing is recorded for a repository whose activity rows were never materialized, as all of its rows
+      are built by the next materialization.
+    """
+    state = GithubSyncState.query.filter_by(repo=repo_name).first()
+    days = {str(day) for day in days if day is not None}
+    if state and state.activity_days is not None and days - set(state.activity_days):
+        state.activity_days = sorted(days.union(state.activity_days))
+
+
+def prune_commits(repo_name, shas):
+    """
+    Function: Prune Commits
+    ------------------------
+    Removes cached commits that are no longer part of the history of a repository, and records their days
+    (see `mark_activity_days`).
+
+    Parameters:
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - shas (iterable): The SHAs of the commits to remove.
+    """
+    query = CommitStats.query.filter(
+        CommitStats.repo == repo_name, CommitStats.sha.in_(shas)
+    )
+    mark_activity_days(
+        repo_name,
+        [
+            day
+            for (day,) in query.with_entities(
+                db.func.date(CommitStats.committed_at)
+            ).distinct()
+        ],
+    )
+    query.delete(synchronize_session=False)
+
+
+def cache_commits(github_client, repo, repo_name, commits, prune=False, workers=1):
+    """
+    Function: Cache Commits
+    ------------------------
+    Stores the statistics of every commit in the given commit list that is not cached yet. Only unseen
+    SHAs cost a `get_commit` call to GitHub.
+
+    Parameters:
+    - github_client (github.Github): The GitHub client used for the API calls.
+    - repo (github.Repository.Repository): The GitHub repository the commits belong to.
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - commits (iterable): The commits to cache, as returned by PyGithub.
+    - prune (bool, optional): If True, the commit list is the full history of the repository and cached
+      commits that are no longer part of it (e.g. after a force push) are removed. Defaults to False.
+    - workers (int, optional): Number of commits fetched concurrently. Defaults to 1.
+
+    Returns:
+    - int: The number of newly cached commits.
+
+    Behavior:
+    - Newly cached commits are committed in batches, so progress survives a failure halfway through the walk.
+    """
+    known_shas = {
+        sha
+        for (sha,) in db.session.query(CommitStats.sha).filter(
+            CommitStats.repo == repo_name
+        )
+    }
+    seen_shas = set()
+    pending = []
+
+    def flush():
+        stats = fetch_commit_stats(
+            github_client, repo, repo_name, [c.sha for c in pending], workers
+        )
+        for commit in pending:
+            additions, deletions = stats[commit.sha]
+            db.session.add(
+                CommitStats(
+                    repo=repo_name,
+                    sha=commit.sha,
+                    author=commit.author.login if commit.author else None,
+                    committed_at=commit.commit.author.date.astimezone(timezone.utc),
+                    message=commit.commit.message,
+                    additions=additions,
+                    deletions=deletions,
+                    milestone_id=parse_milestone_id(commit.commit.message),
+                )
+            )
+        mark_activity_days(
+            repo_name, [commit_day(commit.commit.author.date) for commit in pending]
+        )
+        db.session.commit()
+        pending.clear()
+
+    new_commits = 0
+    for commit in commits:
+        seen_shas.add(commit.sha)
+        if commit.sha in known_shas:
+            continue
+
+        pending.append(commit)
+        known_shas.add(commit.sha)
+        new_commits += 1
+
+        if len(pending) == CACHE_BATCH_SIZE:
+            flush()
+
+    if pending:
+        flush()
+
+    if prune and known_shas - seen_shas:
+        prune_commits(repo_name, known_shas - seen_shas)
+
+    db.session.commit()
+    return new_commits
+
+
+def sync_commits(github_client, repo_name, workers=1):
+    """
+    Function: Sync Commits
+    -----------------------
+    Brings the commit cache of a GitHub repository up to date, pulling only the commits that are newer than
+    the stored sync watermark of the repository.
+
+    Parameters:
+    - github_client (github.Github): The GitHub client used for the API calls.
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - workers (int, optional): Number of commits fetched concurrently. Defaults to 1.
+
+    Returns:
+    - int: The number of newly cached commits.
+
+    Raises:
+    - GithubException: If any error occurs while interacting with the GitHub API.
+
+    Behavior:
+    - Requests the head commit of the default branch with the stored ETag. An unchanged repository answers
+      with 304 Not Modified, which does not count against the GitHub rate limit.
+    - If the head moved, compares the watermark commit with the new head and caches only the commits in
+      between, so a warm refresh costs O(new commits) API calls.
+    - Falls back to a full walk (pruning commits that disappeared) when the repository has never been synced
+      or its history was rewritten since the last sync.
+    - Advances the watermark to the new head commit and ETag.
+    """
+    state = GithubSyncState.query.filter_by(repo=repo_name).first()
+    if not state:
+        state = GithubSyncState(repo=repo_name)
+        db.session.add(state)
+
+    requester = github_client.requester
+    status, headers, output = requester.requestJson(
+        "GET",
+        f"/repos/{repo_name}/commits",
+        parameters={"per_page": 1},
+        headers={"If-None-Match": state.etag} if state.etag else None,
+    )
+    state.synced_at = datetime.now(timezone.utc)
+
+    # Nothing was pushed since the last sync
+    if status == 304:
+        db.session.commit()
+        return 0
+
+    data = json.loads(output) if output else None
+    if status >= 400:
+        db.session.rollback()
+        raise requester.createException(status, headers, data)
+
+    head = data[0] if data else None
+    new_commits = 0
+
+    if head and head["sha"] != state.last_sha:
+        repo = github_client.get_repo(repo_name, lazy=True)
+        comparison = None
+        if state.last_sha:
+            try:
+                comparison = repo.compare(state.last_sha, head["sha"])
+            except UnknownObjectException:
+                # The watermark commit no longer exists
+                comparison = None
+
+        if comparison and comparison.behind_by == 0:
+            new_commits = cache_commits(
+                github_client, repo, repo_name, comparison.commits, workers=workers
+            )
+        else:
+            new_commits = cache_commits(
+                github_client,
+                repo,
+                repo_name,
+                repo.get_commits(),
+                prune=True,
+                workers=workers,
+            )
+
+        state.last_sha = head["sha"]
+        state.last_commit_at = datetime.fromisoformat(
+            head["commit"]["committer"]["date"].replace("Z", "+00:00")
+        ).astimezone(timezone.utc)
+
+    state.etag = headers.get("etag")
+    db.session.commit()
+    return new_commits
+
+
+def aggregate_commit_stats(repo_name, username=None):
+    """
+    Function: Aggregate Commit Statistics
+    --------------------------------------
+    Computes the commit statistics of a repository from the cached commits, optionally restricted to the
+    commits authored by a specific GitHub user.
+
+    Parameters:
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - username (str, optional): GitHub username to filter commits by. Defaults to None (all commits).
+
+    Returns:
+    - dict: A dictionary in the format returned by `fetch_commit_details`.
+
+    Behavior:
+    - Commits referencing milestones that are not present in the database are counted in the totals only.
+    """
+    filters = [CommitStats.repo == repo_name]
+    if username:
+        filters.append(db.func.lower(CommitStats.author) == username.lower())
+
+    total_commits, lines_added, lines_deleted = (
+        db.session.query(
+            db.func.count(CommitStats.id),
+            db.func.coalesce(db.func.sum(CommitStats.additions), 0),
+            db.func.coalesce(db.func.sum(CommitStats.deletions), 0),
+        )
+        .filter(*filters)
+        .one()
+    )
+
+    milestone_rows = (
+        db.session.query(
+            Milestones.id,
+            Milestones.title,
+            db.func.count(CommitStats.id),
+            db.func.sum(CommitStats.additions),
+            db.func.sum(CommitStats.deletions),
+        )
+        .select_from(CommitStats)
+        .join(Milestones, Milestones.id == CommitStats.milestone_id)
+        .filter(*filters)
+        .group_by(Milestones.id, Milestones.title)
+        .order_by(Milestones.id)
+        .all()
+    )
+
+    return {
+        "total_commits": total_commits,
+        "lines_of_code_added": lines_added,
+        "lines_of_code_deleted": lines_deleted,
+        "milestones": [
+            {
+                "milestone_id": milestone_id,
+                "name": name,
+                "commits": commits,
+                "lines_of_code_added": added,
+                "lines_of_code_deleted": deleted,
+            }
+            for milestone_id, name, commits, added, deleted in milestone_rows
+        ],
+    }
+
+
+def aggregate_member_stats(repo_name, usernames):
+    """
+    Function: Aggregate Member Statistics
+    --------------------------------------
+    Computes the commit statistics of a repository together with the statistics of each given GitHub user,
+    in a single grouped query over the cached commits.
+
+    Parameters:
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - usernames (iterable): GitHub usernames of the team members.
+
+    Returns:
+    - dict: A dictionary in the format returned by `fetch_commit_details` for the whole repository, with an
+      additional `members` dictionary holding the statistics of each given username in the same format.
+
+    Behavior:
+    - Usernames are matched case-insensitively. Users without commits get zero statistics.
+    - Commits referencing milestones that are not present in the database are counted in the totals only.
+    """
+    rows = (
+        db.session.query(
+            db.func.lower(CommitStats.author),
+            Milestones.id,
+            Milestones.title,
+            db.func.count(CommitStats.id),
+            db.func.coalesce(db.func.sum(CommitStats.additions), 0),
+            db.func.coalesce(db.func.sum(CommitStats.deletions), 0),
+        )
+        .select_from(CommitStats)
+        .outerjoin(Milestones, Milestones.id == CommitStats.milestone_id)
+        .filter(CommitStats.repo == repo_name)
+        .group_by(db.func.lower(CommitStats.author), Milestones.id, Milestones.title)
+        .order_by(Milestones.id)
+        .all()
+    )
+
+    def empty_stats():
+        return {
+            "total_commits": 0,
+            "lines_of_code_added": 0,
+            "lines_of_code_deleted": 0,
+            "milestones": {},
+        }
+
+    def add(stats, milestone_id, name, commits, added, deleted):
+        stats["total_commits"] += commits
+        stats["lines_of_code_added"] += added
+        stats["lines_of_code_deleted"] += deleted
+        if milestone_id is None:
+            return
+        milestone = stats["milestones"].setdefault(
+            milestone_id,
+            {
+                "milestone_id": milestone_id,
+                "name": name,
+                "commits": 0,
+                "lines_of_code_added": 0,
+                "lines_of_code_deleted": 0,
+            },
+        )
+        milestone["commits"] += commits
+        milestone["lines_of_code_added"] += added
+        milestone["lines_of_code_deleted"] += deleted
+
+    team = empty_stats()
+    members = {username.lower(): empty_stats() for username in usernames}
+    for author, *totals in rows:
+        add(team, *totals)
+        if author in members:
+            add(members[author], *totals)
+
+    for stats in [team, *members.values()]:
+        stats["milestones"] = list(stats["milestones"].values())
+
+    team["members"] = {username: members[username.lower()] for username in usernames}
+    return team
+
+
+def materialize_commit_activity(repo_name):
+    """
+    Function: Materialize Commit Activity
+    --------------------------------------
+    Brings the daily activity rows of a repository up to date with its cached commits, in a single grouped
+    INSERT ... SELECT. The caller commits the session.
+
+    Parameters:
+    - repo_name (str): The repository identifier in the `owner/name` format.
+
+    Behavior:
+    - Commits are bucketed by the UTC day of their commit date, per author.
+    - Only the rows of the days recorded by the syncs since the last materialization are recomputed (see
+      `mark_activity_days`). All rows are rebuilt when the repository has no activity rows yet, or when its
+      changed days are unknown.
+    """
+    state = GithubSyncState.query.filter_by(repo=repo_name).first()
+    days = state.activity_days if state else None
+    day = db.func.date(CommitStats.committed_at)
+
+    rows = CommitActivity.query.filter_by(repo=repo_name)
+    filters = [CommitStats.repo == repo_name, CommitStats.committed_at.isnot(None)]
+    if days is not None and rows.first():
+        if not days:
+            return
+        rows = rows.filter(
+            CommitActivity.day.in_([datetime.fromisoformat(d).date() for d in days])
+        )
+        filters.append(day.in_(days))
+
+    rows.delete(synchronize_session=False)
+    db.session.execute(
+        db.insert(CommitActivity).from_select(
+            ["repo", "author", "day", "commits", "additions", "deletions"],
+            db.select(
+                CommitStats.repo,
+                CommitStats.author,
+                day,
+                db.func.count(CommitStats.id),
+                db.func.coalesce(db.func.sum(CommitStats.additions), 0),
+                db.func.coalesce(db.func.sum(CommitStats.deletions), 0),
+            )
+            .where(*filters)
+            .group_by(CommitStats.repo, CommitStats.author, day),
+        )
+    )
+    if state:
+        state.activity_days = []
+
+
+def aggregate_daily_activity(repo_name, since=None, until=None):
+    """
+    Function: Aggregate Daily Activity
+    -----------------------------------
+    Reads the daily activity series of a repository and of each of its commit authors from the materialized
+    activity rows.
+
+    Parameters:
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - since (date, optional): First day of the series. Defaults to None (no lower bound).
+    - until (date, optional): Last day of the series. Defaults to None (no upper bound).
+
+    Returns:
+    - dict: A dictionary containing:
+        - `days` (list): The activity of the repository on each day with commits, oldest first, each
+          containing the `date` (YYYY-MM-DD), `commits`, `lines_of_code_added` and `lines_of_code_deleted`.
+        - `authors` (dict): The activity of each commit author in the same format, keyed by lowercase
+          GitHub username.
+
+    Behavior:
+    - Days without commits are omitted. The cost is linear in the number of active days and authors,
+      whatever the number of commits.
+    """
+    filters = [CommitActivity.repo == repo_name]
+    if since:
+        filters.append(CommitActivity.day >= since)
+    if until:
+        filters.append(CommitActivity.day <= until)
+
+    rows = (
+        CommitActivity.query.filter(*filters)
+        .order_by(CommitActivity.day, CommitActivity.author)
+        .all()
+    )
+
+    def add(series, row):
+        if series and series[-1]["date"] == row.day.isoformat():
+            entry = series[-1]
+        else:
+            entry = {
+                "date": row.day.isoformat(),
+                "commits": 0,
+                "lines_of_code_added": 0,
+                "lines_of_code_deleted": 0,
+            }
+            series.append(entry)
+        entry["commits"] += row.commits
+        entry["lines_of_code_added"] += row.additions
+        entry["lines_of_code_deleted"] += row.deletions
+
+    days, authors = [], {}
+    for row in rows:
+        add(days, row)
+        if row.author:
+            add(authors.setdefault(row.author.lower(), []), row)
+    return {"days": days, "authors": authors}
+
+
+def format_activity_series(days, limit=ACTIVITY_PROMPT_DAYS):
+    """
+    Function: Format Activity Series
+    ---------------------------------
+    Formats a daily activity series as compact text for the AI prompts.
+
+    Parameters:
+    - days (list): The series in the format returned by `aggregate_daily_activity`.
+    - limit (int, optional): Number of most recent active days to include. Defaults to `ACTIVITY_PROMPT_DAYS`.
+
+    Returns:
+    - str: One line with the number of active days and the latest commit date, and one line with the
+      `date:commits(+added/-deleted)` entries of the most recent active days.
+    """
+    if not days:
+        return "Active Days: 0\n"
+    recent = " ".join(
+        f"{day['date']}:{day['commits']}(+{day['lines_of_code_added']}/-{day['lines_of_code_deleted']})"
+        for day in days[-limit:]
+    )
+    return (
+        f"Active Days: {len(days)}, Last Commit: {days[-1]['date']}\n"
+        f"Daily Commits (last {min(len(days), limit)} active days, date:commits(+added/-deleted)): {recent}\n"
+    )
+
+
+def aggregate_repository_days(repo_names):
+    """
+    Function: Aggregate Repository Days
+    ------------------------------------
+    Reads the daily activity series of several repositories with a single grouped query.
+
+    Parameters:
+    - repo_names (list): The repository identifiers in the `owner/name` format.
+
+    Returns:
+    - dict: The series of each repository in the `days` format of `aggregate_daily_activity`, keyed by
+      repository identifier. Repositories without activity are omitted.
+    """
+    series = {}
+    for repo, day, commits, additions, deletions in (
+        db.session.query(
+            CommitActivity.repo,
+            CommitActivity.day,
+            db.func.sum(CommitActivity.commits),
+            db.func.sum(CommitActivity.additions),
+            db.func.sum(CommitActivity.deletions),
+        )
+        .filter(CommitActivity.repo.in_(repo_names))
+        .group_by(CommitActivity.repo, CommitActivity.day)
+        .order_by(CommitActivity.repo, CommitActivity.day)
+    ):
+        series.setdefault(repo, []).append(
+            {
+                "date": day.isoformat(),
+                "commits": commits,
+                "lines_of_code_added": additions,
+                "lines_of_code_deleted": deletions,
+            }
+        )
+    return series
@@ -0,0 +1,342 @@
+"""
+Module: GitHub Caching Transport and Telemetry
+-----------------------------------------------
+This module provides the HTTP transport of the GitHub clients. The transport remembers the ETag and
+Last-Modified validators of every GET response, replays them on the next request to the same URL, and
+serves the stored response when GitHub answers 304 Not Modified, which does not count against the rate
+limit. It also records telemetry about the GitHub API usage of the process: number of calls, 304 hits,
+response statuses, remaining rate limit and a latency histogram.
+
+Dependencies:
+-------------
+- PyGithub: For the HTTP connection classes of the GitHub client.
+- requests: For the case-insensitive response headers.
+- collections, threading, time: For the response store and the telemetry.
+- inspect, logging: For checking the connection hook of PyGithub and reporting when it is missing.
+
+Functions:
+----------
+1. `check_connection_hook(requester, base)`
+2. `install_transport(github_client, store=None, telemetry=None)`
+
+Classes:
+--------
+1. StoredResponse: A GitHub response kept in the response store.
+2. ResponseStore: Bounded store of the latest GET responses, keyed by URL.
+3. GithubTelemetry: Counters of the GitHub API usage.
+4. CachingConnectionMixin: Connection behaviour replaying validators and serving 304s from the store.
+"""
+
+from github.Requester import HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass
+from requests.structures import CaseInsensitiveDict
+from collections import OrderedDict
+import inspect
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Private attribute of the PyGithub requester holding its connection class, replaced by the transport. The
+# hook was checked against PyGithub 2.5.0, pinned in requirements.txt.
+CONNECTION_CLASS_ATTRIBUTE = "_Requester__connectionClass"
+
+# Parameters of the connection methods the transport overrides or relies on
+CONNECTION_METHODS = {
+    "request": ["self", "verb", "url", "input", "headers"],
+    "getresponse": ["self"],
+}
+
+# Upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Response headers that describe the stored body and are not refreshed from a 304 response
+BODY_HEADERS = (
+    "content-length",
+    "content-type",
+    "content-encoding",
+    "transfer-encoding",
+)
+
+
+class StoredResponse:
+    """
+    Class: StoredResponse
+    ----------------------
+    A GitHub response kept in the response store, mimicking the response objects of PyGithub.
+
+    Attributes:
+    - status (int): The HTTP status of the response.
+    - headers (CaseInsensitiveDict): The response headers.
+    - text (str): The response body.
+
+    Methods:
+    - getheaders(): Returns the response headers.
+    - read(): Returns the response body.
+    - validators(): Returns the conditional request headers that revalidate this response.
+    - replay(headers): Returns a copy of the response, with the headers of a 304 revalidation applied.
+    """
+
+    def __init__(self, status, headers, text):
+        self.status = status
+        self.headers = CaseInsensitiveDict(headers)
+        self.text = text
+
+    def getheaders(self):
+        return self.headers.items()
+
+    def read(self):
+        return self.text
+
+    def validators(self):
+        validators = {}
+        if "etag" in self.headers:
+            validators["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["last-modified"]
+        return validators
+
+    def replay(self, headers):
+        replayed = StoredResponse(self.status, self.headers, self.text)
+        for key, value in headers.items():
+            if key.lower() not in BODY_HEADERS:
+                replayed.headers[key] = value
+        return replayed
+
+
+class ResponseStore:
+    """
+    Class: ResponseStore
+    ---------------------
+    Thread-safe store of the latest GET responses that carry a validator, keyed by URL. The least recently
+    used responses are evicted beyond `max_entries`.
+
+    Methods:
+    - get(key): Returns the stored response of a URL, or None.
+    - put(key, response): Stores a response if it carries an ETag or Last-Modified header.
+    - clear(): Removes all stored responses.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.responses = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.responses)
+
+    def get(self, key):
+        with self.lock:
+            response = self.responses.get(key)
+            if response:
+                self.responses.move_to_end(key)
+            return response
+
+    def put(self, key, response):
+        stored = StoredResponse(response.status, response.headers, response.text)
+        if not stored.validators():
+            return
+        with self.lock:
+            self.responses[key] = stored
+            self.responses.move_to_end(key)
+            while len(self.responses) > self.max_entries:
+                self.responses.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.responses.clear()
+
+
+class GithubTelemetry:
+    """
+    Class: GithubTelemetry
+    -----------------------
+    Thread-safe counters of the GitHub API calls made by the process.
+
+    Methods:
+    - record(status, headers, seconds): Records a response of the GitHub API.
+    - snapshot(): Returns the counters as a dictionary.
+    - reset(): Resets all counters.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.calls = 0
+            self.not_modified = 0
+            self.statuses = {}
+            self.rate_limit = {"limit": None, "remaining": None, "reset_at": None}
+            self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+            self.latency_sum = 0.0
+
+    def record(self, status, headers, seconds):
+        with self.lock:
+            self.calls += 1
+            if status == 304:
+                self.not_modified += 1
+            self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+
+            for key, header in (
+                ("limit", "x-ratelimit-limit"),
+                ("remaining", "x-ratelimit-remaining"),
+                ("reset_at", "x-ratelimit-reset"),
+            ):
+                if header in headers:
+                    self.rate_limit[key] = int(headers[header])
+
+            bucket = next(
+                (i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound),
+                len(LATENCY_BUCKETS),
+            )
+            self.latency_counts[bucket] += 1
+            self.latency_sum += seconds
+
+    def snapshot(self):
+        with self.lock:
+            buckets, cumulative = {}, 0
+            for bound, count in zip(
+                [*map(str, LATENCY_BUCKETS), "+Inf"], self.latency_counts
+            ):
+                cumulative += count
+                buckets[bound] = cumulative
+
+            return {
+                "calls": self.calls,
+                "not_modified": self.not_modified,
+                "statuses": dict(self.statuses),
+                "rate_limit": dict(self.rate_limit),
+                "latency_seconds": {
+                    "buckets": buckets,
+                    "count": self.calls,
+                    "sum": round(self.latency_sum, 6),
+                },
+            }
+
+
+class CachingConnectionMixin:
+    """
+    Class: CachingConnectionMixin
+    ------------------------------
+    Behaviour added to the HTTP connection classes of PyGithub. GET requests without a conditional header
+    are sent with the validators of the stored response of their URL, and a 304 answer is replaced by the
+    stored response. Every response is recorded in the telemetry.
+
+    Attributes:
+    - store (ResponseStore): The response store.
+    - telemetry (GithubTelemetry): The telemetry counters.
+    """
+
+    store = None
+    telemetry = None
+
+    def getresponse(self):
+        key, stored = None, None
+        conditional = any(
+            header.lower() in ("if-none-match", "if-modified-since")
+            for header in self.headers
+        )
+        if self.verb == "GET" and not conditional:
+            key = f"{self.protocol}://{self.host}:{self.port}{self.url}"
+            stored = self.store.get(key)
+            if stored:
+                self.headers = {**self.headers, **stored.validators()}
+
+        started = time.perf_counter()
+        response = super().getresponse()
+        self.telemetry.record(
+            response.status, response.headers, time.perf_counter() - started
+        )
+
+        if key and response.status == 304 and stored:
+            return stored.replay(response.headers)
+        if key and response.status == 200:
+            self.store.put(key, response)
+        return response
+
+
+# Response store and telemetry shared by the GitHub clients of the process
+response_store = ResponseStore()
+github_telemetry = GithubTelemetry()
+
+
+def check_connection_hook(requester, base):
+    """
+    Function: Check Connection Hook
+    --------------------------------
+    Checks that a PyGithub requester still has the connection hook the transport replaces.
+
+    Parameters:
+    - requester (github.Requester.Requester): The requester of a GitHub client.
+    - base (type): The PyGithub connection class the transport extends.
+
+    Raises:
+    - TypeError: If the connection class attribute is missing, or the connection methods do not have the
+      expected parameters.
+    """
+    current = getattr(requester, CONNECTION_CLASS_ATTRIBUTE, None)
+    if not isinstance(current, type):
+        raise TypeError(f"Requester has no {CONNECTION_CLASS_ATTRIBUTE} class")
+
+    for name, parameters in CONNECTION_METHODS.items():
+        method = getattr(base, name, None)
+        if method is None or list(inspect.signature(method).parameters) != parameters:
+            raise TypeError(f"Unexpected signature of {base.__name__}.{name}")
+
+
+def install_transport(github_client, store=None, telemetry=None):
+    """
+    Function: Install Transport
+    ----------------------------
+    Makes a GitHub client send its requests through the caching transport.
+
+    Parameters:
+    - github_client (github.Github): The GitHub client.
+    - store (ResponseStore, optional): The response store. Defaults to the store shared by the process.
+    - telemetry (GithubTelemetry, optional): The telemetry counters. Defaults to the counters shared by
+      the process.
+
+    Returns:
+    - github.Github: The given client.
+
+    Behavior:
+    - PyGithub only offers a process-wide hook for its connection classes, so the connection class of the
+      client's requester is replaced directly. The transport is remembered on the requester, so clones of
+      the client (see `clone_github_client`) can share it.
+    - If the installed PyGithub does not have the expected hook (see `check_connection_hook`), an error is
+      logged and the client keeps its normal transport.
+    """
+    if store is None:
+        store = response_store
+    if telemetry is None:
+        telemetry = github_telemetry
+
+    requester = github_client.requester
+    base = (
+        HTTPSRequestsConnectionClass
+        if requester.scheme == "https"
+        else HTTPRequestsConnectionClass
+    )
+    try:
+        check_connection_hook(requester, base)
+    except TypeError as e:
+        logger.error(
+            f"GitHub caching transport not installed, using the PyGithub transport:\n{e}"
+        )
+        return github_client
+
+    setattr(
+        requester,
+        CONNECTION_CLASS_ATTRIBUTE,
+        type(
+            f"Caching{base.__name__}",
+            (CachingConnectionMixin, base),
+            {"store": store, "telemetry": telemetry},
+        ),
+    )
+    requester.transport = (store, telemetry)
+    # Drop the connection opened with the previous class, if any
+    requester.close()
+    return github_client
@@ -0,0 +1,156 @@
+"""
+Module: GitHub Push Webhook Ingestion
+--------------------------------------
+This module updates the commit statistics store from the `push` webhooks of GitHub. A push payload lists the
+commits it added to a branch, so the commit cache and the sync watermark of a repository can be advanced
+without listing or comparing commits through the API. Push payloads do not carry line statistics, so the
+additions and deletions of the pushed commits are still fetched, one request per commit.
+
+Dependencies:
+-------------
+- SQLAlchemy ORM: For database operations.
+- github_fetcher: For fetching the line statistics of the pushed commits.
+- hmac, hashlib: For verifying the webhook signatures.
+- datetime: For parsing the commit dates.
+
+Functions:
+----------
+1. `verify_signature(secret, body, signature)`
+2. `is_default_branch_push(payload)`
+3. `ingest_push(github_client, repo_name, payload, workers=1)`
+"""
+
+from application.models import CommitStats, GithubSyncState, db
+from apis.teacher.github_fetcher import fetch_commit_stats
+from apis.teacher.github_stats import (
+    commit_day,
+    parse_milestone_id,
+    mark_activity_days,
+    materialize_commit_activity,
+)
+from datetime import datetime, timezone
+import hashlib
+import hmac
+
+
+def verify_signature(secret, body, signature):
+    """
+    Function: Verify Signature
+    ---------------------------
+    Checks the `X-Hub-Signature-256` header of a webhook delivery against the shared webhook secret.
+
+    Parameters:
+    - secret (str): The webhook secret configured on GitHub.
+    - body (bytes): The raw request body.
+    - signature (str): The value of the `X-Hub-Signature-256` header, e.g. "sha256=<hex digest>".
+
+    Returns:
+    - bool: True if the body was signed with the secret.
+    """
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.removeprefix("sha256="))
+
+
+def is_default_branch_push(payload):
+    """
+    Function: Is Default Branch Push
+    ---------------------------------
+    Checks whether a push payload updates the default branch of its repository, the only branch the commit
+    statistics are computed on.
+
+    Parameters:
+    - payload (dict): The push payload.
+
+    Returns:
+    - bool: True if the push targets the default branch.
+    """
+    default_branch = payload.get("repository", {}).get("default_branch")
+    return bool(default_branch) and payload.get("ref") == f"refs/heads/{default_branch}"
+
+
+def ingest_push(github_client, repo_name, payload, workers=1):
+    """
+    Function: Ingest Push
+    ----------------------
+    Caches the commits of a push to the default branch of a repository and advances its sync watermark.
+
+    Parameters:
+    - github_client (github.Github): The GitHub client used to fetch the line statistics.
+    - repo_name (str): The repository identifier in the `owner/name` format.
+    - payload (dict): The push payload.
+    - workers (int, optional): Number of commits fetched concurrently. Defaults to 1.
+
+    Returns:
+    - int: The number of newly cached commits.
+    - None: If the push cannot be applied on top of the cache and the repository needs a regular sync.
+
+    Raises:
+    - GithubException: If the statistics of a commit cannot be fetched.
+
+    Behavior:
+    - The push is applied only if it starts at the watermark commit of the repository and fast-forwards
+      the branch. Force pushes, branch deletions, pushes following a missed delivery and truncated commit
+      lists return None.
+    - Commits that are already cached are skipped, so a redelivered payload is a no-op.
+    - The daily activity rows of the days of the pushed commits are recomputed.
+    """
+    state = GithubSyncState.query.filter_by(repo=repo_name).first()
+    commits = payload.get("commits") or []
+    if (
+        not state
+        or not state.last_sha
+        or payload.get("forced")
+        or payload.get("deleted")
+        or payload.get("before") != state.last_sha
+        or not commits
+        or commits[-1]["id"] != payload.get("after")
+    ):
+        return None
+
+    known_shas = {
+        sha
+        for (sha,) in db.session.query(CommitStats.sha).filter(
+            CommitStats.repo == repo_name,
+            CommitStats.sha.in_([commit["id"] for commit in commits]),
+        )
+    }
+    pending = [commit for commit in commits if commit["id"] not in known_shas]
+
+    repo = github_client.get_repo(repo_name, lazy=True)
+    stats = fetch_commit_stats(
+        github_client, repo, repo_name, [c["id"] for c in pending], workers
+    )
+    days = []
+    for commit in pending:
+        additions, deletions = stats[commit["id"]]
+        committed_at = datetime.fromisoformat(
+            commit["timestamp"].replace("Z", "+00:00")
+        ).astimezone(timezone.utc)
+        db.session.add(
+            CommitStats(
+                repo=repo_name,
+                sha=commit["id"],
+                author=commit.get("author", {}).get("username"),
+                committed_at=committed_at,
+                message=commit["message"],
+                additions=additions,
+                deletions=deletions,
+                milestone_id=parse_milestone_id(commit["message"]),
+            )
+        )
+        days.append(commit_day(committed_at))
+
+    mark_activity_days(repo_name, days)
+    materialize_commit_activity(repo_name)
+
+    state.last_sha = payload["after"]
+    state.last_commit_at = datetime.fromisoformat(
+        commits[-1]["timestamp"].replace("Z", "+00:00")
+    ).astimezone(timezone.utc)
+    # The ETag of the REST sync no longer describes the watermark
+    state.etag = None
+    state.synced_at = datetime.now(timezone.utc)
+    db.session.commit()
+    return len(pending)
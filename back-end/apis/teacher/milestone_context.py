@@ -0,0 +1,93 @@
+"""
+Module: Milestone Context
+--------------------------
+This module keeps the rendered milestone context of the student chat assistant: the system prompt listing
+every milestone with its description, deadline and tasks. The prompt is the same for every student until an
+instructor changes a milestone, so it is rendered once per version of the milestones and reused by every
+chat message without querying the milestones. Sending the exact same prompt also lets the AI provider reuse
+its own cache of the prompt.
+
+The version is stored in the database and bumped by the APIs that create, update and delete milestones, so
+every worker process reads it with a single query per message and renders the prompt again as soon as any
+process changes a milestone.
+
+Dependencies:
+-------------
+- SQLAlchemy ORM: For reading and increasing the version of the milestones.
+- threading: For the cached prompt.
+
+Functions:
+----------
+1. `read_milestone_version()`
+2. `bump_milestone_version()`
+
+Classes:
+--------
+1. MilestoneContext: The rendered milestone context and its version.
+"""
+
+from application.models import MilestoneVersions, db
+import threading
+
+
+class MilestoneContext:
+    """
+    Class: MilestoneContext
+    ------------------------
+    Thread-safe store of the rendered milestone context, tagged with the version of the milestones it was
+    rendered from.
+
+    Methods:
+    - get(render): Returns the rendered context, rendering it with `render()` if the milestones changed.
+    - clear(): Removes the rendered context.
+    """
+
+    def __init__(self):
+        self.rendered = None
+        self.lock = threading.Lock()
+
+    def get(self, render):
+        # The version is read before rendering, so a context rendered while the milestones changed is tagged
+        # with the previous version and rendered again on the next use
+        version = read_milestone_version()
+        with self.lock:
+            if self.rendered and self.rendered[0] == version:
+                return self.rendered[1]
+
+        context = render()
+        with self.lock:
+            self.rendered = (version, context)
+        return context
+
+    def clear(self):
+        with self.lock:
+            self.rendered = None
+
+
+# Milestone context shared by the chat requests of the process
+milestone_context = MilestoneContext()
+
+
+def read_milestone_version():
+    """
+    Function: Read Milestone Version
+    ---------------------------------
+    Reads the version of the milestones.
+
+    Returns:
+    - int: The version of the milestones.
+    """
+    return db.session.query(MilestoneVersions.version).scalar() or 0
+
+
+def bump_milestone_version():
+    """
+    Function: Bump Milestone Version
+    ---------------------------------
+    Increases the version of the milestones, so every worker process renders the milestone context again.
+    Called with every change of the milestones or their tasks, before it is committed, so the change and the
+    new version are committed together.
+    """
+    MilestoneVersions.query.update(
+        {MilestoneVersions.version: MilestoneVersions.version + 1}
+    )
@@ -9,6 +9,8 @@ Dependencies:
 - Flask-Security: For role-based access control.
 - SQLAlchemy ORM: For database operations.
 - datetime, timezone: For date and time operations.
+- milestone_context: For refreshing the milestone context of the student chat assistant.
+- pagination: For the filters of the team listings.
 
 Roles Required:
 - Instructor: Full access to all endpoints.
@@ -23,12 +25,16 @@ Endpoints:
 5. DELETE /teacher/milestone_management/<int:milestone_id>
 """
 
-from apis.teacher.setup import (
-    teacher,
-    get_teams_under_user,
+from apis.teacher.setup import teacher, get_teams_under_user
+from apis.teacher.pagination import get_team_filters
+from apis.teacher.team_progress import (
+    update_team_progress,
+    delete_milestone_progress,
+    get_team_progress_rows,
 )
+from apis.teacher.milestone_context import bump_milestone_version
 from flask_security import current_user, roles_accepted, roles_required
-from application.models import Tasks, db, Submissions, Milestones
+from application.models import Tasks, db, Milestones
 from flask import abort, current_app, request
 from datetime import datetime, timezone
 
@@ -41,6 +47,9 @@ from datetime import datetime, timezone
     - Instructor
     - TA
 
+    Query Parameters:
+    - search, status (optional): Only count the teams matching these filters, as for the Get All Teams API.
+
     Response:
     - 200: JSON object containing:
         - Total number of teams and students under the user.
@@ -50,11 +59,12 @@ from datetime import datetime, timezone
             - Description
             - Deadline
             - Completion rate (percentage of teams that have completed the milestone).
+    - 400: If a query parameter is invalid.
     - 403: If the user does not have the required role.
     - 500: Internal server error.
 
     Behavior:
-    - Calculates completion rates by analyzing submissions against the tasks in each milestone.
+    - Calculates completion rates from the materialized progress of the teams in each milestone.
 """
 
 
@@ -64,13 +74,16 @@ def get_all_milestones():
 
     milestone_objects = Milestones.query.all()
 
-    teams = get_teams_under_user(current_user)
+    teams = get_teams_under_user(
+        current_user, **get_team_filters(request.args, paginate=False)
+    )
 
     no_of_students = 0
     for team in teams:
         no_of_students += len(team.members)
 
     total_teams = len(teams)
+    progress = get_team_progress_rows([team.id for team in teams])
 
     response_data = {
         "no_of_teams": total_teams,
@@ -84,18 +97,11 @@ def get_all_milestones():
             milestone.completion_rate = 0.0
             continue
 
-        completed_teams = (
-            db.session.query(Submissions.team_id)
-            .join(Tasks, Tasks.id == Submissions.task_id)
-            .filter(
-                Tasks.milestone_id == milestone.id,
-                Submissions.team_id.in_([team.id for team in teams]),
-            )
-            .group_by(Submissions.team_id)
-            .having(db.func.count(db.distinct(Submissions.task_id)) == len(tasks))
-            .count()
-            or 0
-        )
+        completed_teams = 0
+        for team in teams:
+            row = progress.get((team.id, milestone.id))
+            if row and row.total_tasks and row.submitted_tasks == row.total_tasks:
+                completed_teams += 1
 
         response_data["milestones"].append(
             {
@@ -138,6 +144,8 @@ def get_all_milestones():
     Behavior:
     - Validates input data and ensures the deadline is in the future.
     - Creates tasks and associates them with the milestone.
+    - Creates the progress of every team in the milestone.
+    - Discards the milestone context of the student chat assistant, so the next message sees the change.
 """
 
 
@@ -204,6 +212,10 @@ def create_milestone():
         task = Tasks(description=task_description, milestone_id=milestone_object.id)
         db.session.add(task)
 
+    update_team_progress([milestone_object.id])
+
+    bump_milestone_version()
+
     # Commit all changes
     db.session.commit()
     current_app.logger.info(
@@ -289,8 +301,10 @@ def get_milestone(milestone_id):
     - 500: Internal server error.
 
     Behavior:
-    - Replaces existing tasks with the new task list if provided.
+    - Replaces existing tasks with the new task list if provided, and recomputes the progress of every team in
+      the milestone.
     - Validates all updated fields before committing changes.
+    - Discards the milestone context of the student chat assistant, so the next message sees the change.
 """
 
 
@@ -366,6 +380,11 @@ def update_milestone(milestone_id):
     if errors:
         return abort(400, errors)
 
+    if "tasks" in data:
+        update_team_progress([milestone_id])
+
+    bump_milestone_version()
+
     # Commit changes
     db.session.commit()
 
@@ -391,7 +410,8 @@ def update_milestone(milestone_id):
     - 500: Internal server error.
 
     Behavior:
-    - Removes the milestone and all its associated tasks from the database.
+    - Removes the milestone, all its associated tasks and the progress of the teams in it from the database.
+    - Discards the milestone context of the student chat assistant, so the next message sees the change.
 """
 
 
@@ -403,7 +423,9 @@ def delete_milestone(milestone_id):
     if not delete_object:
         return abort(404, "Milestone not found.")
 
+    delete_milestone_progress(milestone_id)
     db.session.delete(delete_object)
+    bump_milestone_version()
     db.session.commit()
     current_app.logger.info(
         f"Milestone {milestone_id} is deleted by user {current_user.id}"
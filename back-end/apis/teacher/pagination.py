@@ -0,0 +1,101 @@
+"""
+Module: Listing Pagination
+---------------------------
+This module provides the helpers of the paginated listings of the teacher APIs. Listings are paginated by
+keyset: a page holds the rows whose ID is greater than the `after` ID, the last row of the previous page,
+and the response links to the next page in a `Link` header.
+
+Dependencies:
+-------------
+- Flask: For reading the query parameters of the request and returning errors.
+- team_progress: For the deadline statuses of the teams.
+- urllib.parse: For the links to the next page.
+
+Functions:
+----------
+1. `get_page_filters(args)`
+2. `get_team_filters(args, paginate=True)`
+3. `split_page(rows, limit)`
+"""
+
+from flask import abort, request
+from apis.teacher.team_progress import TEAM_STATUSES
+from urllib.parse import urlencode
+
+
+def get_page_filters(args):
+    """
+    Function: Get Page Filters
+    ---------------------------
+    Reads the page of a paginated listing from the query parameters of a request.
+
+    Parameters:
+    - args (MultiDict): The query parameters: `after`, the ID of the last row of the previous page, and `limit`
+      (at most 100).
+
+    Returns:
+    - dict: The `after` and `limit` filters, None if not given.
+
+    Raises:
+    - 400 Bad Request: If a parameter is invalid.
+    """
+    # Invalid integers are read as None
+    filters = {
+        "after": args.get("after", type=int),
+        "limit": args.get("limit", type=int),
+    }
+    if "after" in args and filters["after"] is None:
+        abort(400, "after must be an integer")
+    if "limit" in args and not 1 <= (filters["limit"] or 0) <= 100:
+        abort(400, "limit must be an integer between 1 and 100")
+    return filters
+
+
+def get_team_filters(args, paginate=True):
+    """
+    Function: Get Team Filters
+    ---------------------------
+    Reads the filters of a team listing from the query parameters of a request.
+
+    Parameters:
+    - args (MultiDict): The query parameters: `search`, `status` and, if paginated, `after` and `limit` (at
+      most 100).
+    - paginate (bool, optional): Whether the listing is paginated. Defaults to True.
+
+    Returns:
+    - dict: The keyword arguments of `get_teams_under_user`.
+
+    Raises:
+    - 400 Bad Request: If a parameter is invalid.
+    """
+    filters = {"search": args.get("search") or None, "status": args.get("status")}
+    if filters["status"] and filters["status"] not in TEAM_STATUSES:
+        abort(400, f"status must be one of {', '.join(TEAM_STATUSES)}")
+
+    if paginate:
+        filters.update(get_page_filters(args))
+    return filters
+
+
+def split_page(rows, limit):
+    """
+    Function: Split Page
+    ---------------------
+    Splits rows fetched by ID after the `after` row, e.g. the teams fetched by `get_teams_under_user`, into the
+    current page and the link to the next page.
+
+    Parameters:
+    - rows (list): The rows, ordered by ID, including the extra row fetched after the page, if any.
+    - limit (int): The page size, or None if the listing is not paginated.
+
+    Returns:
+    - tuple: The rows of the page, and the response headers: a `Link` header pointing to the next page (with
+      the same query parameters and `after` set to the last row of the page), if there is one.
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, {}
+
+    rows = rows[:limit]
+    args = request.args.to_dict()
+    args["after"] = rows[-1].id
+    return rows, {"Link": f'<{request.base_url}?{urlencode(args)}>; rel="next"'}
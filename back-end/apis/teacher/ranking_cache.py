@@ -0,0 +1,112 @@
+"""
+Module: AI Ranking Cache
+-------------------------
+This module caches the AI rankings of the teams, keyed by a hash of the exact progress summaries the AI
+ranks, the model and the version of the ranking prompt. A dashboard reloaded while nothing changed is
+then ranked from the cache instead of spending AI tokens and seconds. Rankings expire after a time to
+live, and the cache is cleared whenever the progress of a team changes.
+
+Dependencies:
+-------------
+- hashlib, json: For the cache keys.
+- collections, threading, time: For the cached entries.
+
+Functions:
+----------
+1. `ranking_cache_key(ai_prompt, model, prompt_version)`
+2. `invalidate_rankings()`
+
+Classes:
+--------
+1. RankingCache: Bounded store of the latest AI rankings, with a time to live.
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+
+
+class RankingCache:
+    """
+    Class: RankingCache
+    --------------------
+    Thread-safe store of AI rankings keyed by the hash of their input. The least recently used rankings are
+    evicted beyond `max_entries`, and rankings older than `ttl` seconds are not returned.
+
+    Methods:
+    - configure(max_entries, ttl): Changes the size and time to live of the cache.
+    - get(key): Returns the ranking stored under a key, or None if missing or expired.
+    - put(key, ranking): Stores a ranking.
+    - clear(): Removes all rankings.
+    """
+
+    def __init__(self, max_entries=128, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.rankings = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rankings)
+
+    def configure(self, max_entries, ttl):
+        with self.lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self.rankings.clear()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.rankings.get(key)
+            if not entry:
+                return None
+            stored_at, ranking = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self.rankings[key]
+                return None
+            self.rankings.move_to_end(key)
+            return ranking
+
+    def put(self, key, ranking):
+        with self.lock:
+            self.rankings[key] = (time.monotonic(), ranking)
+            self.rankings.move_to_end(key)
+            while len(self.rankings) > self.max_entries:
+                self.rankings.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.rankings.clear()
+
+
+# Ranking cache shared by the requests and ranking jobs of the process
+ranking_cache = RankingCache()
+
+
+def ranking_cache_key(ai_prompt, model, prompt_version):
+    """
+    Function: Ranking Cache Key
+    ----------------------------
+    Computes the cache key of an AI ranking.
+
+    Parameters:
+    - ai_prompt (list): The progress summary of every team.
+    - model (str): The AI model ranking the teams.
+    - prompt_version (int): The version of the ranking instructions given to the AI.
+
+    Returns:
+    - str: The SHA-256 hex digest of the inputs.
+    """
+    payload = json.dumps([model, prompt_version, ai_prompt], separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def invalidate_rankings():
+    """
+    Function: Invalidate Rankings
+    ------------------------------
+    Removes all cached rankings. Called by every write that changes the progress of a team.
+    """
+    ranking_cache.clear()
@@ -2,14 +2,19 @@
 Module: Teacher Blueprint Setup with GitHub and AI Integration
 ---------------------------------------------------------------
 This module sets up the Flask Blueprint for teacher-related functionalities and includes helper functions 
-for managing teams, fetching GitHub commit statistics, and integrating with AI tools.
+for managing teams, fetching GitHub commit statistics, and integrating with AI tools. The helpers of the
+streamed responses, of the paginated listings and of the GitHub statistics snapshots are in the `streaming`,
+`pagination` and `github_snapshots` modules.
 
 Dependencies:
 -------------
 - Flask: For creating a Blueprint.
 - SQLAlchemy ORM: For database operations.
 - PyGithub: For interacting with the GitHub API.
-- Groq: For AI tool integration.
+- github_stats, github_graphql, github_mirror: For caching and aggregating commit statistics.
+- github_transport: For conditional requests and telemetry of the GitHub client.
+- team_progress: For filtering teams by deadline status.
+- ai_gateway: For sending the AI requests.
 - os: For environment variable access.
 
 Blueprint:
@@ -21,23 +26,54 @@ Submodules:
 -----------
 1. milestone_management: Handles milestone-related functionalities.
 2. team_management: Manages team-related operations.
+3. github_management: Monitors the GitHub integration.
+4. ai_management: Monitors the AI integration.
 
 Global Variables:
 -----------------
-1. `github_client`: Configured GitHub client using an access token.
-2. `ai_client`: Configured AI client using an API key.
+1. `github_client`: Configured GitHub client using an access token, sending its requests through the caching
+   transport.
+2. `ai_client`: The AI gateway shared by all AI requests, with a pooled connection, deadlines, retries and a
+   limit of concurrent requests.
 
 Functions:
 ----------
-1. `get_teams_under_user(user)`
+1. `get_teams_under_user(user, search=None, status=None, after=None, limit=None)`
 2. `get_single_team_under_user(user, team_id)`
-3. `fetch_commit_details(repo_url, username=None)`
+3. `sync_repository(repo_url, repo_name)`
+4. `fetch_commit_details(repo_url, username=None)`
+5. `fetch_member_commit_details(repo_url, usernames)`
+6. `fetch_commit_activity(repo_url, since=None, until=None, refresh=False)`
 """
 
-from flask import Blueprint
-from application.models import Teams, Milestones, db
-from github import Github, Auth
-from groq import Groq
+from flask import Blueprint, current_app
+from sqlalchemy.orm import lazyload
+from application.models import (
+    Teams,
+    GithubSyncState,
+    CommitActivity,
+    db,
+)
+from apis.teacher.github_stats import (
+    parse_repo_url,
+    sync_commits,
+    aggregate_commit_stats,
+    aggregate_member_stats,
+    materialize_commit_activity,
+    aggregate_daily_activity,
+)
+from apis.teacher.github_graphql import sync_commits_graphql
+from apis.teacher.github_mirror import (
+    sync_commits_mirror,
+    github_login_lookup,
+    repo_host,
+    GitMirrorError,
+    GITHUB_HOST,
+)
+from apis.teacher.github_transport import install_transport
+from apis.teacher.ai_gateway import ai_gateway
+from apis.teacher.team_progress import filter_teams_by_status
+from github import Github, Auth, GithubException
 import os
 
 
@@ -45,13 +81,13 @@ teacher = Blueprint("teacher", __name__, url_prefix="/teacher")
 
 # GitHub configuration
 github_auth = Auth.Token(os.environ.get("GITHUB_ACCESS_TOKEN"))
-github_client = Github(auth=github_auth)
+github_client = install_transport(Github(auth=github_auth, per_page=100))
 
 # AI configuration
-ai_client = Groq(api_key=os.environ.get("AI_ACCESS_TOKEN"))
+ai_client = ai_gateway
 
 
-def get_teams_under_user(user):
+def get_teams_under_user(user, search=None, status=None, after=None, limit=None):
     """
     Function: Get Teams Under User
     -------------------------------
@@ -61,15 +97,38 @@ def get_teams_under_user(user):
 
     Parameters:
     - user: The current user object.
+    - search (str, optional): Only fetch teams whose name contains this text, ignoring case.
+    - status (str, optional): Only fetch teams of this deadline status (see `filter_teams_by_status`).
+    - after (int, optional): Only fetch teams whose ID is greater than this one, i.e. the teams after the
+      last team of the previous page.
+    - limit (int, optional): Fetch at most `limit` teams, plus one to tell whether there is a next page (see
+      `pagination.split_page`).
 
     Returns:
-    - List of `Teams` objects associated with the user.
+    - List of `Teams` objects associated with the user, ordered by ID.
+
+    Behavior:
+    - The members of the teams are loaded with the teams; their submissions, instructor and TA are only
+      loaded when accessed, so listing teams does not load the submissions of every team.
     """
     if user.has_role("Instructor"):
-        teams = Teams.query.filter(Teams.instructor_id == user.id).all()
+        query = Teams.query.filter(Teams.instructor_id == user.id)
     else:
-        teams = Teams.query.filter(Teams.ta_id == user.id).all()
-    return teams
+        query = Teams.query.filter(Teams.ta_id == user.id)
+
+    query = query.options(
+        lazyload(Teams.submissions), lazyload(Teams.instructor), lazyload(Teams.ta)
+    )
+    if search:
+        query = query.filter(Teams.name.icontains(search, autoescape=True))
+    if status:
+        query = filter_teams_by_status(query, status)
+    if after is not None:
+        query = query.filter(Teams.id > after)
+    query = query.order_by(Teams.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query.all()
 
 
 def get_single_team_under_user(user, team_id):
@@ -97,6 +156,63 @@ def get_single_team_under_user(user, team_id):
     return team
 
 
+def sync_repository(repo_url, repo_name):
+    """
+    Function: Sync Repository
+    --------------------------
+    Fetches the statistics of the commits pushed to a repository since its last sync and stores them in the
+    commit cache.
+
+    Parameters:
+    - repo_url (str): URL of the GitHub repository.
+    - repo_name (str): The repository identifier in the `owner/name` format.
+
+    Returns:
+    - None if the commit cache is up to date.
+    - dict: The error payload (containing `status` and `message`) on a GitHub API or git error.
+
+    Behavior:
+    - The `GITHUB_STATS_BACKEND` setting selects the source: "rest" fetches every commit with
+      `GITHUB_FETCH_WORKERS` concurrent requests, "graphql" fetches 100 commits per request, and "mirror"
+      reads the commits from a local bare mirror of the repository in `GIT_MIRROR_FOLDER`, looking up the
+      GitHub logins of the commit authors from GitHub.
+    - Updates the daily activity rows of the days whose commits changed, or builds them if they were never
+      built (see `materialize_commit_activity`).
+    """
+    try:
+        backend = current_app.config["GITHUB_STATS_BACKEND"]
+        if backend == "graphql":
+            sync_commits_graphql(github_client, repo_name)
+        elif backend == "mirror":
+            sync_commits_mirror(
+                repo_url,
+                repo_name,
+                current_app.config["GIT_MIRROR_FOLDER"],
+                os.environ.get("GITHUB_ACCESS_TOKEN"),
+                (
+                    github_login_lookup(github_client, repo_name)
+                    if repo_host(repo_url) == GITHUB_HOST
+                    else None
+                ),
+                current_app.config["GIT_MIRROR_LOCAL_REPOS"],
+            )
+        else:
+            sync_commits(
+                github_client, repo_name, current_app.config["GITHUB_FETCH_WORKERS"]
+            )
+    except (GithubException, GitMirrorError) as e:
+        return e.data
+
+    state = GithubSyncState.query.filter_by(repo=repo_name).first()
+    if (
+        state.activity_days != []
+        or not CommitActivity.query.filter_by(repo=repo_name).first()
+    ):
+        materialize_commit_activity(repo_name)
+        db.session.commit()
+    return None
+
+
 def fetch_commit_details(repo_url, username=None):
     """
     Function: Fetch Commit Details from GitHub Repository
@@ -122,102 +238,90 @@ def fetch_commit_details(repo_url, username=None):
 
     Raises:
     - ValueError: If the repository URL format is invalid.
-    - Exception: If any error occurs while interacting with the GitHub API.
+
+    On a GitHub API or git error, the error payload (containing `status` and `message`) is returned instead.
 
     Behavior:
     - Parses the repository URL to extract owner and repo name.
-    - Fetches all commits or those by the specified user.
-    - Processes commit messages to identify milestone-related statistics.
-    - Summarizes and sorts milestone data.
+    - Fetches the statistics of commits pushed since the last sync of the repository and stores them in the
+      commit cache (see `sync_repository`).
+    - Aggregates the overall and milestone-specific statistics over the cached commits, filtered by
+      the specified user if given.
+    - Milestones are identified by commit messages in the format "Milestone-<id> <message>".
     """
 
-    # Extract owner and repo name from the URL
-    repo_url = repo_url.rstrip("/")  # Remove trailing slash if any
-    if repo_url.startswith("https://"):
-        parts = repo_url.split("/")
-        owner = parts[-2]
-        repo_name = parts[-1].replace(".git", "")
-    elif repo_url.startswith("git@"):
-        repo_part = repo_url.split(":")[1]
-        owner, repo_name = repo_part.replace(".git", "").split("/")
-    else:
-        raise ValueError(f"Invalid GitHub URL format: {repo_url}")
+    repo_name = parse_repo_url(repo_url)
 
-    # Get all milestone names and IDs from the database
-    milestone_names = {
-        milestone.id: milestone.title
-        for milestone in db.session.query(Milestones.id, Milestones.title).all()
-    }
+    # Cache the statistics of commits pushed since the last sync
+    error = sync_repository(repo_url, repo_name)
+    if error:
+        return error
 
-    # Get the repository
-    try:
-        repo = github_client.get_repo(f"{owner}/{repo_name}")
-
-        # Initialize general statistics
-        commits = repo.get_commits(author=username) if username else repo.get_commits()
-
-        total_commits = 0
-        lines_added = 0
-        lines_deleted = 0
-        milestones_stats = {}
-
-        # Process each commit to collect milestone-related stats
-        for commit in commits:
-            total_commits += 1
-            detailed_commit = repo.get_commit(commit.sha)
-            commit_message = commit.commit.message
-
-            # Update general stats
-            lines_added += detailed_commit.stats.additions
-            lines_deleted += detailed_commit.stats.deletions
-
-            # Check for milestone in commit message in the format "Milestone-<id> <message>"
-            if commit_message.lower().startswith("milestone-"):
-                try:
-                    # Extract milestone ID and fetch the corresponding name
-                    milestone_id_str = commit_message.split()[0].split("-")[1]
-                    milestone_id = int(milestone_id_str)
-
-                    # Look up the milestone name in the dictionary
-                    milestone_name = milestone_names.get(milestone_id)
-
-                    # Ignore the milestone whose IDs are not present in the database
-                    if not milestone_name:
-                        continue
-
-                    # Initialize milestone stats if it doesn't exist
-                    if milestone_id not in milestones_stats:
-                        milestones_stats[milestone_id] = {
-                            "milestone_id": milestone_id,
-                            "name": milestone_name,
-                            "commits": 0,
-                            "lines_of_code_added": 0,
-                            "lines_of_code_deleted": 0,
-                        }
-
-                    # Update milestone-specific stats
-                    milestones_stats[milestone_id]["commits"] += 1
-                    milestones_stats[milestone_id][
-                        "lines_of_code_added"
-                    ] += detailed_commit.stats.additions
-                    milestones_stats[milestone_id][
-                        "lines_of_code_deleted"
-                    ] += detailed_commit.stats.deletions
-
-                except (IndexError, ValueError):
-                    # Skip commits that don't follow the milestone format strictly
-                    continue
-
-        # Prepare final milestone list sorted by milestone ID
-        milestones = sorted(milestones_stats.values(), key=lambda m: m["milestone_id"])
-        return {
-            "total_commits": total_commits,
-            "lines_of_code_added": lines_added,
-            "lines_of_code_deleted": lines_deleted,
-            "milestones": milestones,
-        }
-    except Exception as e:
-        return e.data
+    # Aggregate the statistics over the cached commits
+    return aggregate_commit_stats(repo_name, username)
+
+
+def fetch_member_commit_details(repo_url, usernames):
+    """
+    Function: Fetch Member Commit Details from GitHub Repository
+    -------------------------------------------------------------
+    Analyzes the commit statistics of a GitHub repository together with the statistics of each team member,
+    syncing the repository once.
+
+    Parameters:
+    - repo_url (str): URL of the GitHub repository (HTTPS or SSH format).
+    - usernames (iterable): GitHub usernames of the team members.
+
+    Returns:
+    - dict: A dictionary in the format returned by `fetch_commit_details`, with an additional `members`
+      dictionary holding the statistics of each username in the same format.
+
+    Raises:
+    - ValueError: If the repository URL format is invalid.
+
+    On a GitHub API or git error, the error payload (containing `status` and `message`) is returned instead.
+    """
+    repo_name = parse_repo_url(repo_url)
+
+    error = sync_repository(repo_url, repo_name)
+    if error:
+        return error
+
+    return aggregate_member_stats(repo_name, usernames)
+
+
+def fetch_commit_activity(repo_url, since=None, until=None, refresh=False):
+    """
+    Function: Fetch Commit Activity
+    --------------------------------
+    Reads the daily activity series of a GitHub repository and of its commit authors.
+
+    Parameters:
+    - repo_url (str): URL of the GitHub repository (HTTPS or SSH format).
+    - since (date, optional): First day of the series. Defaults to None (no lower bound).
+    - until (date, optional): Last day of the series. Defaults to None (no upper bound).
+    - refresh (bool, optional): If True, syncs the commits pushed since the last sync first. Defaults to False.
+
+    Returns:
+    - dict: The series in the format returned by `aggregate_daily_activity`.
+
+    Raises:
+    - ValueError: If the repository URL format is invalid.
+
+    On a GitHub API or git error, the error payload (containing `status` and `message`) is returned instead.
+
+    Behavior:
+    - The series is read from the materialized activity rows. The repository is synced only if a refresh
+      is requested or it has never been synced.
+    """
+    repo_name = parse_repo_url(repo_url)
+
+    if refresh or not GithubSyncState.query.filter_by(repo=repo_name).first():
+        error = sync_repository(repo_url, repo_name)
+        if error:
+            return error
+
+    return aggregate_daily_activity(repo_name, since, until)
 
 
-from . import milestone_management, team_management
+from . import milestone_management, team_management, github_management, ai_management
@@ -0,0 +1,135 @@
+"""
+Module: Streamed Responses
+---------------------------
+This module provides the helpers of the streamed responses of the teacher and student APIs. Endpoints that
+produce their results progressively (AI answers, team listings) send them as events, serialized as JSON lines
+or server-sent events, so clients can render them as soon as they are produced.
+
+Dependencies:
+-------------
+- Flask: For building the streamed responses within the context of the request.
+- Werkzeug: For reporting HTTP errors raised while streaming.
+
+Global Variables:
+-----------------
+1. `STREAM_FORMATS`: The media types of the streamed responses.
+
+Functions:
+----------
+1. `stream_events(events, stream_format)`
+2. `stream_response(events, stream_format, headers=None, completion=None)`
+3. `completion_events(chunks, on_complete=None)`
+"""
+
+from flask import current_app, stream_with_context
+from werkzeug.exceptions import HTTPException
+
+# Media types of streamed responses, see `stream_events`
+STREAM_FORMATS = ("application/x-ndjson", "text/event-stream")
+
+
+def stream_events(events, stream_format):
+    """
+    Function: Stream Events
+    ------------------------
+    Serializes events for a streamed response.
+
+    Parameters:
+    - events (iterable): The (name, data) tuples of the events.
+    - stream_format (str): "application/x-ndjson" for one JSON object per line, with the `event` name and its
+      `data`, or "text/event-stream" for server-sent events.
+
+    Yields:
+    - str: The serialized events.
+
+    Behavior:
+    - An error ends the stream with an "error" event, as the status of the response is already sent. The event
+      has the description of HTTP errors (see `abort`), and a generic message otherwise.
+    """
+    try:
+        for event, data in events:
+            if stream_format == "text/event-stream":
+                yield f"event: {event}\ndata: {current_app.json.dumps(data)}\n\n"
+            else:
+                yield current_app.json.dumps({"event": event, "data": data}) + "\n"
+    except Exception as e:
+        current_app.logger.error(f"Streamed response failed:\n{e}")
+        error = (
+            e.description
+            if isinstance(e, HTTPException)
+            else "An unexpected error occurred. Try again later."
+        )
+        if stream_format == "text/event-stream":
+            yield f"event: error\ndata: {current_app.json.dumps(error)}\n\n"
+        else:
+            yield current_app.json.dumps({"event": "error", "data": error}) + "\n"
+
+
+def stream_response(events, stream_format, headers=None, completion=None):
+    """
+    Function: Stream Response
+    --------------------------
+    Builds a response streaming events to the client as they are produced.
+
+    Parameters:
+    - events (iterable): The (name, data) tuples of the events.
+    - stream_format (str): One of `STREAM_FORMATS`, see `stream_events`.
+    - headers (dict, optional): Additional headers of the response.
+    - completion (CompletionStream, optional): The streamed AI completion relayed by the events.
+
+    Returns:
+    - Response: The streamed response. The events are produced within the context of the request, and
+      proxies are asked not to buffer them.
+
+    Behavior:
+    - The completion is closed with the response, so its AI request slot is freed even if the events were
+      never read, e.g. when the client disconnects before the first event.
+    """
+    response = current_app.response_class(
+        stream_with_context(stream_events(events, stream_format)),
+        mimetype=stream_format,
+        headers={
+            **(headers or {}),
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+    if completion is not None and hasattr(completion, "close"):
+        response.call_on_close(completion.close)
+    return response
+
+
+def completion_events(chunks, on_complete=None):
+    """
+    Function: Completion Events
+    ----------------------------
+    Relays the text of a streamed AI chat completion as events, as soon as it is generated.
+
+    Parameters:
+    - chunks (iterable): The chunks of a chat completion requested with `stream=True`.
+    - on_complete (callable, optional): Called with the full text once the completion ends, e.g. to cache it.
+      Defaults to None.
+
+    Yields:
+    - ("token", {"content"}) for every generated piece of text.
+    - ("done", {"finish_reason"}) once the completion ends.
+
+    Behavior:
+    - The text is only collected when `on_complete` is given, so relaying a completion does not hold it in
+      memory.
+    """
+    parts = [] if on_complete else None
+    finish_reason = None
+    for chunk in chunks:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if choice.delta.content:
+            if parts is not None:
+                parts.append(choice.delta.content)
+            yield "token", {"content": choice.delta.content}
+        finish_reason = choice.finish_reason or finish_reason
+
+    if on_complete:
+        on_complete("".join(parts))
+    yield "done", {"finish_reason": finish_reason}
@@ -0,0 +1,348 @@
+"""
+Module: AI Submission Review
+-----------------------------
+This module holds the AI analysis of the submissions of the teams, used by the Get AI Analysis API for a single
+team, and by the review jobs, which analyze the submissions of all the teams of a user for a task in the
+background (see `background_jobs`). A review job analyzes several submissions at once, records the analysis of every submission as
+soon as it is done, so the progress of the job and the analyses completed so far can be read while it runs.
+Analyses share the analysis cache (see `analysis_cache`), so unchanged submissions are not analyzed again,
+whether by the API or by a job.
+
+Dependencies:
+-------------
+- SQLAlchemy ORM: For storing the review jobs and their results.
+- PyPDF2: For extracting text from PDF submissions.
+- analysis_cache: For reusing the AI analyses of unchanged submissions.
+- background_jobs: For running the review jobs in background threads.
+- concurrent.futures: For running the analyses of a job in parallel.
+- datetime, os: For timestamps and file checks.
+
+Functions:
+----------
+1. `analysis_messages(submission, text)`
+2. `extract_document_text(file_url)`
+3. `submission_cache_key(submission, prompt_version)`
+4. `analyze_submission(submission)`
+5. `get_review_submissions(team_ids, task_id)`
+6. `submit_review_job(user_id, task_id, team_submissions)`
+7. `run_review_job(app, job)`
+8. `review_submission(app, job_id, team_id, submission_id)`
+9. `get_review_job(job_id, user_id)`
+"""
+
+from apis.teacher.setup import ai_client
+from apis.teacher.analysis_cache import (
+    hash_document,
+    analysis_cache_key,
+    get_cached_analysis,
+    save_analysis,
+)
+from apis.teacher.background_jobs import BackgroundJobs
+from application.models import Documents, ReviewJobs, ReviewResults, Submissions, db
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from PyPDF2 import PdfReader
+import os
+
+# Model and version of the submission analysis prompt, part of the cache key of the analyses
+ANALYSIS_MODEL = "llama-3.1-8b-instant"
+ANALYSIS_PROMPT_VERSION = "teacher-analysis/1"
+
+# Background threads running the review jobs
+review_jobs = BackgroundJobs("review", "AI_REVIEW_WORKERS")
+
+
+def analysis_messages(submission, text):
+    """
+    Function: Analysis Messages
+    ----------------------------
+    Builds the AI messages analyzing a submission.
+
+    Parameters:
+    - submission (Submissions): The submission, with its task and milestone.
+    - text (str): The text of the submitted document.
+
+    Returns:
+    - list: The system and user messages of the chat completion.
+    """
+    return [
+        {
+            "role": "system",
+            "content": """
+                    You are an AI expert specializing in analyzing document submissions for quality and clarity.   
+
+                    ## AI Document Analysis Report
+
+                    ### 1. Overview
+                    - **Overall Quality Score**: [To be determined by AI]
+
+                    ### 2. Content Review
+                    - **Grammar Assessment**: 
+                    - **Structural Analysis**: 
+                    - **Clarity Evaluation**: 
+                    - **Professional Standards Compliance**: 
+
+                    ### 3. Task Requirements Check
+                    - **Requirements Met**: 
+                    - **Requirements Partially Met**: 
+                    - **Requirements Not Met**: 
+
+                    ### 4. Detailed Findings
+
+                    #### 4.1 Strengths
+                    [Highlight positive aspects of the submission]
+
+                    #### 4.2 Areas for Improvement
+                    [Specific, actionable suggestions]
+
+                    ### 5. Recommendations
+                    [Concise, targeted recommendations for improvement]
+
+                    ### Final Assessment
+                    [Summarize key insights and overall evaluation]
+                    """,
+        },
+        {
+            "role": "user",
+            "content": f"""
+                    ## Submission Analysis Inputs
+
+                    ### 1. Milestone Details
+                    **Milestone Description**: {submission.task.milestone.description}
+
+                    ### 2. Task Specifications
+                    **Task Description**: {submission.task.description}
+
+                    ### 3. Submission Content
+                    {text}
+                    """,
+        },
+    ]
+
+
+def extract_document_text(file_url):
+    """
+    Function: Extract Document Text
+    --------------------------------
+    Extracts the text of a submitted PDF document, on a single line.
+
+    Parameters:
+    - file_url (str): The path of the document.
+
+    Returns:
+    - str: The text of all the pages.
+    """
+    with open(file_url, "rb") as pdf_file:
+        pdf_reader = PdfReader(pdf_file)
+        text = ""
+        for page in pdf_reader.pages:
+            text += page.extract_text() + " "
+    return text.replace("\n", " ")
+
+
+def submission_cache_key(submission, prompt_version=ANALYSIS_PROMPT_VERSION):
+    """
+    Function: Submission Cache Key
+    -------------------------------
+    Computes the key of the analysis of a submission in the analysis cache.
+
+    Parameters:
+    - submission (Submissions): The submission, with a document, its task and milestone.
+    - prompt_version (str): The version of the analysis prompt, the teacher prompt by default.
+
+    Returns:
+    - tuple: The hash of the document, and the cache key of its analysis.
+
+    Raises:
+    - OSError: If the document can not be read.
+    """
+    document_hash = hash_document(submission.documents.file_url)
+    return document_hash, analysis_cache_key(
+        document_hash,
+        submission.task.milestone.description,
+        submission.task.description,
+        prompt_version,
+        ANALYSIS_MODEL,
+    )
+
+
+def analyze_submission(submission):
+    """
+    Function: Analyze Submission
+    -----------------------------
+    Analyzes the document of a submission with the AI, or reuses its cached analysis.
+
+    Parameters:
+    - submission (Submissions): The submission, with a document.
+
+    Returns:
+    - tuple: The analysis, and whether it was reused from the analysis cache.
+
+    Raises:
+    - FileNotFoundError: If the document does not exist.
+    - Any error of the AI request.
+    """
+    if not os.path.exists(submission.documents.file_url):
+        raise FileNotFoundError("File not found")
+
+    document_hash, cache_key = submission_cache_key(submission)
+    analysis = get_cached_analysis(cache_key)
+    if analysis is not None:
+        return analysis, True
+
+    chat_completion = ai_client.chat.completions.create(
+        messages=analysis_messages(
+            submission, extract_document_text(submission.documents.file_url)
+        ),
+        model=ANALYSIS_MODEL,
+    )
+    analysis = chat_completion.choices[0].message.content
+    save_analysis(cache_key, document_hash, analysis)
+    return analysis, False
+
+
+def get_review_submissions(team_ids, task_id):
+    """
+    Function: Get Review Submissions
+    ---------------------------------
+    Finds the submissions of several teams for a task that have a document to review, in a single query.
+
+    Parameters:
+    - team_ids (list): The IDs of the teams.
+    - task_id (int): The ID of the task.
+
+    Returns:
+    - list: (team ID, submission ID) pairs, with the first submission of each team, ordered by team ID.
+    """
+    team_submissions = {}
+    for team_id, submission_id in (
+        db.session.query(Submissions.team_id, Submissions.id)
+        .join(Documents, Documents.submission_id == Submissions.id)
+        .filter(Submissions.team_id.in_(team_ids), Submissions.task_id == task_id)
+        .order_by(Submissions.id)
+    ):
+        team_submissions.setdefault(team_id, submission_id)
+    return sorted(team_submissions.items())
+
+
+def submit_review_job(user_id, task_id, team_submissions):
+    """
+    Function: Submit Review Job
+    ----------------------------
+    Stores a review job and schedules it on the background threads.
+
+    Parameters:
+    - user_id (int): The ID of the user reviewing the submissions.
+    - task_id (int): The ID of the task.
+    - team_submissions (list): The (team ID, submission ID) pairs to review, see `get_review_submissions`.
+
+    Returns:
+    - ReviewJobs: The pending job.
+
+    Behavior:
+    - The number of jobs run at once is set by the `AI_REVIEW_WORKERS` setting. Jobs submitted while all
+      threads are busy wait for a free thread.
+    - A job without submissions is stored as done, without being scheduled.
+    """
+    job = ReviewJobs(
+        user_id=user_id,
+        task_id=task_id,
+        status="pending",
+        team_submissions=[list(pair) for pair in team_submissions],
+        submission_count=len(team_submissions),
+        created_at=datetime.now(timezone.utc),
+    )
+    db.session.add(job)
+    if not team_submissions:
+        job.status = "done"
+        job.finished_at = job.created_at
+        db.session.commit()
+        return job
+
+    db.session.commit()
+    review_jobs.submit(job, run_review_job)
+    return job
+
+
+def run_review_job(app, job):
+    """
+    Function: Run Review Job
+    -------------------------
+    Reviews the submissions of a job, several at once. Run by `review_jobs`, which marks the job as done, or
+    failed if it could not run.
+
+    Parameters:
+    - app (Flask): The application, whose context the job runs in.
+    - job (ReviewJobs): The running job.
+
+    Behavior:
+    - At most `AI_REVIEW_CONCURRENCY` submissions of a job are analyzed at once. The setting is kept below
+      `AI_MAX_CONCURRENCY`, so a job does not take all the AI request slots of the process.
+    - A submission that could not be analyzed is recorded as failed, and does not stop the job.
+    """
+    with ThreadPoolExecutor(
+        max_workers=app.config["AI_REVIEW_CONCURRENCY"],
+        thread_name_prefix=f"review-{job.id}",
+    ) as executor:
+        for team_id, submission_id in job.team_submissions:
+            executor.submit(review_submission, app, job.id, team_id, submission_id)
+
+
+def review_submission(app, job_id, team_id, submission_id):
+    """
+    Function: Review Submission
+    ----------------------------
+    Analyzes a submission of a review job and records its analysis, or its error, and the progress of the job.
+
+    Parameters:
+    - app (Flask): The application, whose context the analysis runs in.
+    - job_id (int): The ID of the job.
+    - team_id (int): The ID of the team.
+    - submission_id (int): The ID of the submission.
+    """
+    with app.app_context():
+        try:
+            result = ReviewResults(
+                job_id=job_id, team_id=team_id, submission_id=submission_id
+            )
+            try:
+                submission = db.session.get(Submissions, submission_id)
+                if not submission or not submission.documents:
+                    raise LookupError("Submission or document not found")
+                result.analysis, result.cached = analyze_submission(submission)
+                result.status = "done"
+                counter = ReviewJobs.reviewed_count
+            except Exception as e:
+                db.session.rollback()
+                result.status = "failed"
+                result.error = str(e)
+                counter = ReviewJobs.failed_count
+
+            result.finished_at = datetime.now(timezone.utc)
+            db.session.add(result)
+            # Counted in the database, as the submissions of a job are recorded concurrently
+            ReviewJobs.query.filter_by(id=job_id).update({counter: counter + 1})
+            db.session.commit()
+        except Exception as e:
+            app.logger.error(
+                f"Review of submission {submission_id} of job {job_id} not recorded:\n{e}"
+            )
+        finally:
+            db.session.remove()
+
+
+def get_review_job(job_id, user_id):
+    """
+    Function: Get Review Job
+    -------------------------
+    Fetches a review job of a user.
+
+    Parameters:
+    - job_id (int): The ID of the job.
+    - user_id (int): The ID of the user.
+
+    Returns:
+    - A `ReviewJobs` object if the job exists and was submitted by the user.
+    - None otherwise.
+    """
+    return ReviewJobs.query.filter_by(id=job_id, user_id=user_id).first()
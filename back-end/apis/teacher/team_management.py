@@ -10,10 +10,13 @@ Dependencies:
 - Flask: For creating API routes and handling requests.
 - Flask-Security: For role-based access control.
 - SQLAlchemy ORM: For database operations.
-- PyPDF2: For extracting text from PDF submissions.
-- Pydantic: For defining and validating data models.
 - PyGithub: For interacting with the GitHub API.
-- os, datetime, typing, json: For general utilities.
+- Groq, ai_gateway: For detecting AI requests that timed out or were rejected by the AI gateway.
+- analysis_cache: For reusing the AI analyses of unchanged submissions.
+- submission_review: For the analysis of the submissions and the review jobs.
+- streaming, pagination, github_snapshots: For the streamed responses, the paginated listings and the
+  precomputed GitHub statistics of the teams.
+- os, datetime, time: For general utilities.
 
 Roles Accepted:
 ---------------
@@ -29,7 +32,16 @@ Endpoints:
 5. GET /teacher/team_management/individual/submission/<int:team_id>/<int:task_id>
 6. POST /teacher/team_management/individual/feedback/<int:team_id>/<int:task_id>
 7. GET /teacher/team_management/individual/github/<int:team_id>
-8. GET /teacher/team_management/individual/ai_analysis/<int:team_id>/<int:task_id>
+8. GET /teacher/team_management/individual/github/<int:team_id>/members
+9. GET /teacher/team_management/individual/github/<int:team_id>/activity
+10. GET /teacher/team_management/individual/ai_analysis/<int:team_id>/<int:task_id>
+11. GET /teacher/team_management/overall/ranking/<int:job_id>
+12. POST /teacher/team_management/overall/ai_review/<int:task_id>
+13. GET /teacher/team_management/overall/ai_review/job/<int:job_id>
+
+Functions:
+----------
+1. `overall_progress_events(user, teams, refresh=False, ranking="sync", timings=None)`
 """
 
 from apis.teacher.setup import (
@@ -37,86 +49,126 @@ from apis.teacher.setup import (
     get_teams_under_user,
     get_single_team_under_user,
     fetch_commit_details,
+    fetch_member_commit_details,
+    fetch_commit_activity,
     ai_client,
 )
+from apis.teacher.github_snapshots import (
+    get_github_snapshot,
+    get_github_snapshots,
+    save_github_snapshot,
+)
+from apis.teacher.streaming import stream_response, completion_events, STREAM_FORMATS
+from apis.teacher.pagination import get_team_filters, get_page_filters, split_page
+from apis.teacher.team_progress import (
+    update_team_progress,
+    get_team_progress_rows,
+    get_task_submissions,
+)
+from apis.teacher.team_ranking import (
+    rank_teams,
+    rank_teams_locally,
+    apply_ranking,
+    ranking_jobs,
+    submit_ranking_job,
+    get_ranking_job,
+)
+from apis.teacher.github_stats import (
+    parse_repo_url,
+    aggregate_daily_activity,
+    aggregate_repository_days,
+    format_activity_series,
+)
 from flask_security import current_user, roles_accepted
-from application.models import Tasks, db, Submissions, Milestones
-from flask import abort, current_app, request, send_file
-from datetime import datetime, timezone
+from application.models import db, Submissions, Milestones, ReviewResults, Tasks
+from flask import abort, current_app, g, request, send_file
+from sqlalchemy.orm import joinedload
+from datetime import date, datetime, timezone
 import os
-from PyPDF2 import PdfReader
-from typing import List
-from pydantic import BaseModel
-import json
+import time
+from apis.teacher.ai_gateway import AIGatewayBusy
+from apis.teacher.analysis_cache import get_cached_analysis, save_analysis
+from apis.teacher.submission_review import (
+    ANALYSIS_MODEL,
+    analysis_messages,
+    extract_document_text,
+    submission_cache_key,
+    get_review_submissions,
+    review_jobs,
+    submit_review_job,
+    get_review_job,
+)
+from groq import APIConnectionError
 from datetime import datetime
 
 
-class TeamAnalysis(BaseModel):
-    team_name: str
-    rank: int
-    status: str
-    reason: str
-
-
-class AIResponse(BaseModel):
-    teams: List[TeamAnalysis]
-
-
-"""
-    API: Get Overall Team Progress
-    -------------------------------
-    Analyzes and retrieves the progress of all teams under the current user. Progress is calculated based on
-    milestones, tasks, and GitHub activity.
-
-    Roles Accepted:
-    - Instructor
-    - TA
-
-    Response:
-    - 200: JSON array of team progress, including:
-        - Team name
-        - Progress percentage
-        - AI-generated analysis including ranks, statuses, and reasons for progress.
-    - 403: If the user does not have the required role.
-    - 500: Internal server error or Invalid AI response or fetching from AI failed.
-
-    Behavior:
-    - Uses AI to generate a detailed ranking and analysis based on task completion, GitHub activity, and feedback.
+def overall_progress_events(user, teams, refresh=False, ranking="sync", timings=None):
     """
-
-
-@teacher.route("/team_management/overall", methods=["GET"])
-@roles_accepted("Instructor", "TA")
-def get_overall_teams_progress():
-
-    response_data = []
+    Function: Overall Progress Events
+    ----------------------------------
+    Computes the overall progress of teams under a user as a sequence of events, each produced as soon as its
+    data is ready.
+
+    Parameters:
+    - user (Users): The instructor or TA.
+    - teams (list): The `Teams` objects, e.g. a page of the teams under the user.
+    - refresh (bool, optional): If True, the GitHub statistics are recomputed instead of read from the latest
+      snapshots. Defaults to False.
+    - ranking (str, optional): "async" to submit the AI ranking as a background job instead of waiting for it,
+      "local" to rank the teams from their metrics without the AI. Defaults to "sync".
+    - timings (dict, optional): If given, the seconds spent on the progress (`progress`), the GitHub statistics
+      (`github`) and the stages of the AI ranking (see `rank_teams`) are stored in it.
+
+    Yields:
+    - tuple: The name and data of an event, in this order:
+        - ("progress", {team_name, progress}) for every team, from its task completion.
+        - ("github", {team_name, total_commits, lines_of_code_added, lines_of_code_deleted, github_stale_as_of})
+          for every team with a GitHub repository. `github_stale_as_of` is only set if a snapshot exists.
+        - ("ranking", [{team_name, rank, status, reason}]) with the AI or local ranking, ("ranking_job", {id,
+          status}) with the submitted ranking job if `ranking` is "async", or ("error", message) if the AI
+          ranking failed.
+        - ("ranking_fallback", {error}) before the local ranking, if the AI could not be reached in time.
+    """
+    if timings is None:
+        timings = {}
+    started = time.perf_counter()
     milestones = db.session.query(Milestones).all()
     milestone_count = len(milestones)
-    teams = get_teams_under_user(current_user)
-    ai_prompt = []
+    ai_prompts = {}
+    team_progress = {}
+    team_metrics = {}
+    now = datetime.now(timezone.utc)
+
+    # Read the progress, submissions, snapshots and activity of all teams up front, so the number of queries
+    # does not grow with the number of teams
+    team_ids = [team.id for team in teams]
+    progress = get_team_progress_rows(team_ids)
+    submissions = get_task_submissions(team_ids)
+    snapshots = get_github_snapshots(team_ids)
+    repo_names = {}
+    for team in teams:
+        if team.github_repo_url:
+            repo_names[team.id] = parse_repo_url(team.github_repo_url)
+    activity = aggregate_repository_days(set(repo_names.values()))
 
     for team in teams:
         completion_rate = 0
-        team_data = {
+        team_ai_prompt = f"Team: {team.name}\n"
+        metrics = {
             "team_name": team.name,
-            "progress": 0,
+            "due_tasks": 0,
+            "on_time_tasks": 0,
+            "submitted_tasks": 0,
+            "feedback_count": 0,
+            "total_commits": 0,
         }
-        team_ai_prompt = f"Team: {team.name}\n"
 
         for milestone in milestones:
             task_count = len(milestone.task_milestones)
-            submissions = (
-                db.session.query(Submissions)
-                .join(Tasks, Submissions.task_id == Tasks.id)
-                .filter(Submissions.team_id == team.id)
-                .filter(Tasks.milestone_id == milestone.id)
-                .all()
-            )
-            submission_count = len(submissions)
+            row = progress.get((team.id, milestone.id))
+            submission_count = row.submitted_tasks if row else 0
 
-            milestone_completion = (
-                submission_count / task_count if task_count > 0 else 0
-            )
+            milestone_completion = row.completion_rate() if row else 0
             completion_rate += milestone_completion / milestone_count
 
             team_ai_prompt += f"\nMilestone: {milestone.title}\n"
@@ -124,29 +176,58 @@ def get_overall_teams_progress():
                 f"Deadline: {milestone.deadline.strftime('%Y-%m-%d %H:%M:%S')}\n"
             )
             team_ai_prompt += f"Tasks completed: {submission_count}/{task_count}\n"
+            if row and row.last_activity_at:
+                team_ai_prompt += f"Last activity: {row.last_activity_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
 
+            due = milestone.deadline.replace(tzinfo=timezone.utc) < now
             for task in milestone.task_milestones:
-                submission = next(
-                    (s for s in submissions if s.task_id == task.id), None
-                )
+                submission = submissions.get((team.id, task.id))
                 team_ai_prompt += f"Task: {task.description}\n"
                 team_ai_prompt += f"Submitted: {'Yes' if submission else 'No'}\n"
+                metrics["due_tasks"] += due
                 if submission:
-                    team_ai_prompt += f"Submission time: {submission.submission_time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                    if submission.feedback:
-                        team_ai_prompt += f"Feedback: {submission.feedback}\n"
-
-        team_data["progress"] = round(completion_rate * 100)
+                    metrics["submitted_tasks"] += 1
+                    metrics["feedback_count"] += bool(submission["feedback"])
+                    metrics["on_time_tasks"] += (
+                        due and submission["submission_time"] <= milestone.deadline
+                    )
+                    team_ai_prompt += f"Submission time: {submission['submission_time'].strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    if submission["feedback"]:
+                        team_ai_prompt += f"Feedback: {submission['feedback']}\n"
+
+        team_progress[team.id] = round(completion_rate * 100)
+        ai_prompts[team.id] = team_ai_prompt
+        metrics["progress"] = team_progress[team.id]
+        team_metrics[team.id] = metrics
+        yield "progress", {"team_name": team.name, "progress": team_progress[team.id]}
+
+    timings["progress"] = time.perf_counter() - started
+    started = time.perf_counter()
+    for team in teams:
+        team_ai_prompt = ai_prompts[team.id]
 
         if team.github_repo_url:
-            github_stats = fetch_commit_details(team.github_repo_url)
-            if "status" in github_stats:
+            # Read the precomputed snapshot, computing it only if requested or missing
+            snapshot = snapshots.get(team.id)
+            if refresh or not snapshot:
+                commit_details = fetch_commit_details(team.github_repo_url)
+                if "status" not in commit_details:
+                    snapshot = save_github_snapshot(team.id, commit_details)
+                    # The sync may have added activity rows
+                    activity[repo_names[team.id]] = aggregate_daily_activity(
+                        repo_names[team.id]
+                    )["days"]
+
+            if snapshot:
+                github_stats = snapshot.as_commit_details()
+            else:
                 github_stats = {
                     "total_commits": 0,
                     "lines_of_code_added": 0,
                     "lines_of_code_deleted": 0,
                     "milestones": [],
                 }
+            team_metrics[team.id]["total_commits"] = github_stats["total_commits"]
             team_ai_prompt += f"\nGitHub Stats:\n"
             team_ai_prompt += f"Total Commits: {github_stats['total_commits']}\n"
             team_ai_prompt += f"Lines Added: {github_stats['lines_of_code_added']}\n"
@@ -164,74 +245,147 @@ def get_overall_teams_progress():
                     f"    Lines Deleted: {milestone_stat['lines_of_code_deleted']}\n"
                 )
 
-        team_ai_prompt += f"\nOverall Progress: {team_data['progress']}%\n"
-        ai_prompt.append(team_ai_prompt)
-        response_data.append(team_data)
+            team_ai_prompt += format_activity_series(
+                activity.get(repo_names[team.id], [])
+            )
 
-    try:
-        chat_completion = ai_client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"""Analyze the progress of each team and provide a JSON response   using the following schema:
-                            {json.dumps(AIResponse.model_json_schema(), indent=2)}
-                            
-                            Ranking Rules:
-                            1. Consider multiple factors for ranking in this priority order:
-                               - Progress percentage (higher is better)
-                               - Task completion relative to deadlines
-                               - GitHub activity (commit frequency and code changes)
-                               - Quality of submissions (based on feedback)
-                            
-                            2. Status Assignment Rules:
-                               - 'on_track': Teams that have completed tasks on time and show consistent progress
-                               - 'at_risk': Teams showing some progress but falling behind schedule
-                               - 'off_track': Teams with minimal progress or significant delays
-                            
-                            3. Rank Assignment Rules:
-                               - The ranks should be assigned from 1 to {len(teams)} consecutively
-                               - No teams should have same ranks assigned
-                               - Lower rank (closer to 1) indicates better performance
-                               - Teams with same status should be ranked based on their relative progress
-                               - Generally, 'on_track' teams should rank better than 'at_risk' teams
-                               - 'at_risk' teams should rank better than 'off_track' teams
-                            
-                            4. Reason Format:
-                               - Start with the primary factor affecting the ranking
-                               - Include both positive and areas of concern
-                               - Mention specific metrics (progress %, commit counts, etc.)
-                               - Keep it concise but informative (2-3 sentences)
-                            
-                            Important: Ensure the ranking is consistent with the actual progress metrics and status assignments. Significant rank differences should be justified by clear metric differences.""",
-                },
-                {
-                    "role": "user",
-                    "content": str(ai_prompt),
-                },
-            ],
-            model="llama-3.1-8b-instant",
-            response_format={"type": "json_object"},
-        )
+            github_data = {
+                "team_name": team.name,
+                "total_commits": github_stats["total_commits"],
+                "lines_of_code_added": github_stats["lines_of_code_added"],
+                "lines_of_code_deleted": github_stats["lines_of_code_deleted"],
+            }
+            if snapshot:
+                github_data["github_stale_as_of"] = snapshot.created_at
+            yield "github", github_data
 
-        ai_response = AIResponse.model_validate_json(
-            chat_completion.choices[0].message.content
-        )
+        team_ai_prompt += f"\nOverall Progress: {team_progress[team.id]}%\n"
+        ai_prompts[team.id] = team_ai_prompt
+
+    timings["github"] = time.perf_counter() - started
+    ai_prompt = [ai_prompts[team.id] for team in teams]
+
+    team_metrics = [team_metrics[team.id] for team in teams]
+
+    if ranking == "local":
+        started = time.perf_counter()
+        ai_response = rank_teams_locally(team_metrics)
+        timings["ranking_local"] = time.perf_counter() - started
+        yield "ranking", ai_response.model_dump()["teams"]
+        return
+
+    if ranking == "async":
+        job = submit_ranking_job(user.id, ai_prompt, team_metrics)
+        yield "ranking_job", {"id": job.id, "status": job.status}
+        return
+
+    try:
+        ai_response = rank_teams(ai_prompt, team_metrics, timings)
+    except (APIConnectionError, AIGatewayBusy) as e:
+        # The AI timed out, is unreachable or busy: rank the teams from their metrics instead
+        current_app.logger.warning(f"AI ranking unavailable, ranking locally:\n{e}")
+        yield "ranking_fallback", {"error": str(e)}
+        started = time.perf_counter()
+        ai_response = rank_teams_locally(team_metrics)
+        timings["ranking_local"] = time.perf_counter() - started
     except Exception as e:
-        return abort(500, str(e))
-
-    for team_analysis in ai_response.teams:
-        for team in response_data:
-            if team["team_name"] == team_analysis.team_name:
-                team.update(
-                    {
-                        "rank": team_analysis.rank,
-                        "status": team_analysis.status,
-                        "reason": team_analysis.reason,
-                    }
-                )
-                break
+        yield "error", str(e)
+        return
+
+    yield "ranking", ai_response.model_dump()["teams"]
+
+
+"""
+    API: Get Overall Team Progress
+    -------------------------------
+    Analyzes and retrieves the progress of all teams under the current user. Progress is calculated based on
+    milestones, tasks, and GitHub activity.
+
+    Roles Accepted:
+    - Instructor
+    - TA
 
-    return response_data, 200
+    Query Parameters:
+    - refresh (str, optional): "1" to recompute the GitHub statistics instead of reading the latest snapshots.
+    - search, status, after, limit (optional): Filters and pagination of the teams, as for the Get All Teams
+      API. The teams of a page are ranked among themselves.
+    - ranking (str, optional): "async" to compute the AI ranking in the background instead of waiting for it,
+      "local" to rank the teams from their metrics without the AI.
+
+    Response:
+    - 200: JSON array of team progress, including:
+        - Team name
+        - Progress percentage
+        - Commit and line counts of the GitHub repository, if any.
+        - Time of the GitHub statistics snapshot used (`github_stale_as_of`), if any.
+        - AI-generated analysis including ranks, statuses, and reasons for progress.
+    - 202: With `ranking=async`, JSON object containing:
+        - teams: The team progress, without the AI-generated analysis.
+        - ranking_job: The ID and status of the ranking job, to poll with the Get Ranking Job API.
+    - 200 (streamed): If the client accepts `application/x-ndjson` or `text/event-stream` first, the events of
+      `overall_progress_events` as JSON lines (`{"event": ..., "data": ...}`) or server-sent events: the
+      progress of every team, then its GitHub statistics, then the AI ranking (or ranking job, or error).
+    - 403: If the user does not have the required role.
+    - 500: Internal server error or Invalid AI response or fetching from AI failed.
+
+    Behavior:
+    - Reads the task completion of the teams from their materialized progress.
+    - Reads the GitHub statistics from the snapshots refreshed by the GitHub statistics worker. Teams without a
+      snapshot have their statistics computed and stored on the spot.
+    - Describes the daily commit activity of each team to the AI, read from the materialized activity rows.
+    - Uses AI to generate a detailed ranking and analysis based on task completion, GitHub activity, and feedback.
+    - With `ranking=async`, the metrics are returned right away and the ranking is computed by a background job.
+    - With `ranking=local`, or if the AI times out or cannot be reached, the teams are ranked from their
+      progress, on-time submissions, commits and feedback instead. The `X-Ranking-Source` header of the JSON
+      response tells whether the ranking comes from the AI ("ai") or from the metrics ("local").
+    - Reports the latency of the progress, GitHub statistics and AI ranking stages in the `Server-Timing`
+      header of the JSON response.
+    - The streamed variant sends the progress of the teams before their GitHub statistics and AI ranking are
+      ready, so the first teams are shown without waiting for the slowest step.
+    """
+
+
+@teacher.route("/team_management/overall", methods=["GET"])
+@roles_accepted("Instructor", "TA")
+def get_overall_teams_progress():
+
+    filters = get_team_filters(request.args)
+    teams, headers = split_page(
+        get_teams_under_user(current_user, **filters), filters["limit"]
+    )
+
+    g.server_timing = {}
+    events = overall_progress_events(
+        current_user,
+        teams,
+        refresh=request.args.get("refresh") == "1",
+        ranking=request.args.get("ranking", "sync"),
+        timings=g.server_timing,
+    )
+
+    stream_format = request.accept_mimetypes.best
+    if stream_format in STREAM_FORMATS:
+        return stream_response(events, stream_format, headers)
+
+    response_data = []
+    teams_by_name = {}
+    ranking_source = "local" if request.args.get("ranking") == "local" else "ai"
+    for event, data in events:
+        if event == "progress":
+            response_data.append(data)
+            teams_by_name[data["team_name"]] = data
+        elif event == "github":
+            teams_by_name[data["team_name"]].update(data)
+        elif event == "ranking_job":
+            return {"teams": response_data, "ranking_job": data}, 202, headers
+        elif event == "ranking":
+            apply_ranking(response_data, data)
+        elif event == "ranking_fallback":
+            ranking_source = "local"
+        elif event == "error":
+            return abort(500, data)
+
+    return response_data, 200, {**headers, "X-Ranking-Source": ranking_source}
 
 
 """
@@ -243,12 +397,25 @@ def get_overall_teams_progress():
     - Instructor
     - TA
 
+    Query Parameters:
+    - search (str, optional): Only list teams whose name contains this text, ignoring case.
+    - status (str, optional): Only list teams that are "on_track" (all tasks past their deadline submitted),
+      "at_risk" (at least half of them submitted) or "off_track".
+    - limit (int, optional): Maximum number of teams per page, from 1 to 100. Defaults to all teams.
+    - after (int, optional): ID of the last team of the previous page.
+
     Response:
     - 200: JSON array of teams, each with:
         - ID
         - Name
+      When more teams follow, the `Link` header points to the next page.
+    - 400: If a query parameter is invalid.
     - 403: If the user does not have the required role.
     - 500: Internal server error.
+
+    Behavior:
+    - Teams are listed by ID, and pages are fetched from the ID of the last team of the previous page, so only
+      the teams of the requested page are loaded.
 """
 
 
@@ -256,7 +423,10 @@ def get_overall_teams_progress():
 @roles_accepted("Instructor", "TA")
 def get_teams():
 
-    teams = get_teams_under_user(current_user)
+    filters = get_team_filters(request.args)
+    teams, headers = split_page(
+        get_teams_under_user(current_user, **filters), filters["limit"]
+    )
     team_list = [
         {
             "id": team.id,
@@ -264,7 +434,7 @@ def get_teams():
         }
         for team in teams
     ]
-    return {"teams": team_list}, 200
+    return {"teams": team_list}, 200, headers
 
 
 """
@@ -336,6 +506,7 @@ def get_team_details(team_id):
         - Title
         - Description
         - Deadline
+        - Completion percentage and time of the latest submission or feedback (`last_activity_at`).
         - List of tasks, each with:
             - Task ID
             - Description
@@ -357,35 +528,37 @@ def get_team_progress(team_id):
         return abort(404, "Team not found")
 
     milestones = Milestones.query.all()
-    team_submissions = db.session.query(Submissions).filter(
-        Submissions.team_id == team_id
-    )
+    progress = get_team_progress_rows([team_id])
+    team_submissions = get_task_submissions([team_id])
     milestones_data = []
 
     for milestone in milestones:
+        row = progress.get((team_id, milestone.id))
         individual_milestone = {
             "id": milestone.id,
             "title": milestone.title,
             "description": milestone.description,
             "deadline": milestone.deadline,
             "created_at": milestone.created_at,
+            "completion_percentage": row.completion_rate() * 100 if row else 0,
+            "last_activity_at": row.last_activity_at if row else None,
             "tasks": [],
         }
         for task in milestone.task_milestones:
-            task_submission = team_submissions.filter(
-                Submissions.task_id == task.id
-            ).first()
+            task_submission = team_submissions.get((team_id, task.id))
             individual_milestone["tasks"].append(
                 {
                     "task_id": task.id,
                     "description": task.description,
                     "is_completed": True if task_submission else False,
                     "submission_time": (
-                        task_submission.submission_time if task_submission else None
+                        task_submission["submission_time"] if task_submission else None
+                    ),
+                    "feedback": (
+                        task_submission["feedback"] if task_submission else None
                     ),
-                    "feedback": (task_submission.feedback if task_submission else None),
                     "feedback_time": (
-                        task_submission.feedback_time if task_submission else None
+                        task_submission["feedback_time"] if task_submission else None
                     ),
                 }
             )
@@ -466,6 +639,9 @@ def view_submission(team_id, task_id):
     - 404: If the team or submission is not found.
     - 403: If the user does not have the required role.
     - 500: Internal server error.
+
+    Behavior:
+    - Updates the last activity time of the team in the milestone of the task in the same transaction.
 """
 
 
@@ -499,6 +675,7 @@ def provide_feedback(team_id, task_id):
     submission.feedback_by = current_user.id
     submission.feedback = feedback_content.strip()  # sanitize whitespace
     submission.feedback_time = datetime.now(timezone.utc)
+    update_team_progress([submission.task.milestone_id], [team_id])
     db.session.commit()
     current_app.logger.info(
         f"Feedback given for team {team_id} and task {task_id} by user {current_user.id}"
@@ -520,18 +697,25 @@ def provide_feedback(team_id, task_id):
 
     Query Parameters:
     - user_id (int, optional): ID of a specific team member to filter GitHub activity.
+    - refresh (str, optional): "1" to recompute the team statistics instead of reading the latest snapshot.
 
     Response:
     - 200: JSON object containing:
         - Repository details
         - Total commits
         - Lines of code added/deleted
-        - Milestone-specific GitHub stats.
+        - Milestone-specific GitHub stats
+        - Time the statistics were computed (`stale_as_of`).
     - 400: If the user id, if given, not an integer.
     - 404: If the team, GitHub repository, or team member is not found.
     - 403: If the user does not have the required role.
     - 500: Internal server error.
     - 502: If the fetching from github failed.
+
+    Behavior:
+    - Team statistics are read from the latest snapshot refreshed by the GitHub statistics worker, and are
+      computed and stored on the spot if the team has no snapshot yet or a refresh is requested.
+    - Member statistics are computed from the commit cache, after syncing the commits pushed since the last sync.
 """
 
 
@@ -543,6 +727,7 @@ def provide_feedback(team_id, task_id):
 def get_github_details(team_id):
 
     user_id = request.args.get("user_id")
+    refresh = request.args.get("refresh") == "1"
 
     if user_id:
         try:
@@ -566,19 +751,198 @@ def get_github_details(team_id):
     if not team.github_repo_url:
         return abort(404, "No GitHub repository URL found for this team")
 
-    # Fetch commit details, passing in the username if provided
-    commit_details = fetch_commit_details(team.github_repo_url, github_username)
+    if github_username:
+        # Fetch the commit details of the team member
+        commit_details = fetch_commit_details(team.github_repo_url, github_username)
+        if "status" in commit_details:
+            return abort(502, commit_details["message"])
+        stale_as_of = datetime.now(timezone.utc)
+    else:
+        # Read the precomputed snapshot, computing it only if requested or missing
+        snapshot = get_github_snapshot(team.id)
+        if refresh or not snapshot:
+            commit_details = fetch_commit_details(team.github_repo_url)
+            if "status" in commit_details:
+                return abort(502, commit_details["message"])
+            snapshot = save_github_snapshot(team.id, commit_details)
+        commit_details = snapshot.as_commit_details()
+        stale_as_of = snapshot.created_at
+
+    return {
+        "name": github_username or team.name,
+        "github_repo_url": team.github_repo_url,
+        "total_commits": commit_details["total_commits"],
+        "lines_of_code_added": commit_details["lines_of_code_added"],
+        "lines_of_code_deleted": commit_details["lines_of_code_deleted"],
+        "milestones": commit_details["milestones"],
+        "stale_as_of": stale_as_of,
+    }, 200
+
+
+"""
+    API: Get GitHub Member Details
+    -------------------------------
+    Fetches the GitHub activity details of a team's repository together with the activity of every team
+    member, computed in a single pass over the repository's commits.
+
+    Roles Accepted:
+    - Instructor
+    - TA
+
+    Path Parameters:
+    - team_id (int): ID of the team.
+
+    Response:
+    - 200: JSON object containing:
+        - Repository details
+        - Total commits, lines of code added/deleted and milestone-specific GitHub stats of the team
+        - The same statistics for each team member (`members`)
+        - Time the statistics were computed (`stale_as_of`).
+    - 404: If the team or GitHub repository is not found.
+    - 403: If the user does not have the required role.
+    - 500: Internal server error.
+    - 502: If the fetching from github failed.
+
+    Behavior:
+    - Syncs the commits pushed since the last sync once, then computes the team, member and member milestone
+      statistics with one grouped query over the commit cache.
+    - Members without a GitHub username get zero statistics.
+"""
+
+
+@teacher.route(
+    "/team_management/individual/github/<int:team_id>/members",
+    methods=["GET"],
+)
+@roles_accepted("Instructor", "TA")
+def get_github_member_details(team_id):
+
+    team = get_single_team_under_user(current_user, team_id)
+
+    if not team:
+        return abort(404, "Team not found")
+
+    if not team.github_repo_url:
+        return abort(404, "No GitHub repository URL found for this team")
 
+    usernames = {
+        member.github_username for member in team.members if member.github_username
+    }
+    commit_details = fetch_member_commit_details(team.github_repo_url, usernames)
     if "status" in commit_details:
         return abort(502, commit_details["message"])
 
+    empty_stats = {
+        "total_commits": 0,
+        "lines_of_code_added": 0,
+        "lines_of_code_deleted": 0,
+        "milestones": [],
+    }
+    members = [
+        {
+            "user_id": member.id,
+            "username": member.username,
+            "github_username": member.github_username,
+            **commit_details["members"].get(member.github_username, empty_stats),
+        }
+        for member in team.members
+    ]
+
     return {
-        "name": github_username or team.name,
+        "name": team.name,
         "github_repo_url": team.github_repo_url,
         "total_commits": commit_details["total_commits"],
         "lines_of_code_added": commit_details["lines_of_code_added"],
         "lines_of_code_deleted": commit_details["lines_of_code_deleted"],
         "milestones": commit_details["milestones"],
+        "members": members,
+        "stale_as_of": datetime.now(timezone.utc),
+    }, 200
+
+
+"""
+    API: Get GitHub Activity
+    -------------------------
+    Fetches the daily commit activity of a team's repository and of every team member, for rendering
+    activity charts.
+
+    Roles Accepted:
+    - Instructor
+    - TA
+
+    Path Parameters:
+    - team_id (int): ID of the team.
+
+    Query Parameters:
+    - since (str, optional): First day of the series, in the YYYY-MM-DD format.
+    - until (str, optional): Last day of the series, in the YYYY-MM-DD format.
+    - refresh (str, optional): "1" to sync the commits pushed since the last sync first.
+
+    Response:
+    - 200: JSON object containing:
+        - Repository details
+        - The `days` with commits, oldest first, with their commits and lines of code added/deleted
+        - The same series for each team member (`members`)
+    - 400: If a date is not in the YYYY-MM-DD format.
+    - 404: If the team or GitHub repository is not found.
+    - 403: If the user does not have the required role.
+    - 500: Internal server error.
+    - 502: If the fetching from github failed.
+
+    Behavior:
+    - Reads the materialized daily activity rows of the repository, without scanning its commits. The rows
+      are rebuilt whenever the repository is synced with new commits.
+    - The repository is synced only if a refresh is requested or it has never been synced.
+"""
+
+
+@teacher.route(
+    "/team_management/individual/github/<int:team_id>/activity",
+    methods=["GET"],
+)
+@roles_accepted("Instructor", "TA")
+def get_github_activity(team_id):
+
+    refresh = request.args.get("refresh") == "1"
+    try:
+        since = request.args.get("since")
+        since = date.fromisoformat(since) if since else None
+        until = request.args.get("until")
+        until = date.fromisoformat(until) if until else None
+    except ValueError:
+        return abort(400, "Dates must be in the YYYY-MM-DD format.")
+
+    team = get_single_team_under_user(current_user, team_id)
+
+    if not team:
+        return abort(404, "Team not found")
+
+    if not team.github_repo_url:
+        return abort(404, "No GitHub repository URL found for this team")
+
+    activity = fetch_commit_activity(team.github_repo_url, since, until, refresh)
+    if "status" in activity:
+        return abort(502, activity["message"])
+
+    members = [
+        {
+            "user_id": member.id,
+            "username": member.username,
+            "github_username": member.github_username,
+            "days": (
+                activity["authors"].get(member.github_username.lower(), [])
+                if member.github_username
+                else []
+            ),
+        }
+        for member in team.members
+    ]
+
+    return {
+        "name": team.name,
+        "github_repo_url": team.github_repo_url,
+        "days": activity["days"],
+        "members": members,
     }, 200
 
 
@@ -599,9 +963,15 @@ def get_github_details(team_id):
     - 200: JSON object containing the AI-generated analysis, including:
         - Content review
         - Task requirement checks.
+      The `X-Analysis-Cache` header is "hit" if the analysis of the same document, milestone and task was
+      reused from the analysis cache, "miss" otherwise.
+    - 200 (streamed): If the client accepts `application/x-ndjson` or `text/event-stream` first, the analysis
+      as JSON lines (`{"event": ..., "data": ...}`) or server-sent events, as it is generated: a "token" event
+      with every piece of text, then a "done" event. A cached analysis is sent in a single "token" event.
     - 404: If the team, submission, or document is not found.
     - 500: If the document cannot be read or the AI analysis fails or Internal server error.
     - 403: If the user does not have the required role.
+    - 503: If too many AI requests are in progress.
 """
 
 
@@ -621,82 +991,249 @@ def get_ai_analysis(team_id, task_id):
     if not submission or not submission.documents:
         return abort(404, "Submission or document not found")
 
-    document = submission.documents
-
     # Check file existence
-    if not os.path.exists(document.file_url):
+    if not os.path.exists(submission.documents.file_url):
         return abort(404, "File not found")
 
     try:
-        with open(document.file_url, "rb") as pdf_file:
-            pdf_reader = PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + " "
-            text = text.replace("\n", " ")
+        document_hash, cache_key = submission_cache_key(submission)
+    except Exception as e:
+        return abort(500, f"Error reading document: {str(e)}")
+
+    stream_format = request.accept_mimetypes.best
+    analysis = get_cached_analysis(cache_key)
+    if analysis is not None:
+        if stream_format in STREAM_FORMATS:
+            events = [
+                ("token", {"content": analysis}),
+                ("done", {"finish_reason": "stop"}),
+            ]
+            return stream_response(events, stream_format, {"X-Analysis-Cache": "hit"})
+        return {"analysis": analysis}, 200, {"X-Analysis-Cache": "hit"}
+
+    try:
+        text = extract_document_text(submission.documents.file_url)
     except Exception as e:
         return abort(500, f"Error reading document: {str(e)}")
 
     try:
         chat_completion = ai_client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": """
-                    You are an AI expert specializing in analyzing document submissions for quality and clarity.   
+            messages=analysis_messages(submission, text),
+            model=ANALYSIS_MODEL,
+            stream=stream_format in STREAM_FORMATS,
+        )
+        if stream_format in STREAM_FORMATS:
+            events = completion_events(
+                chat_completion,
+                lambda analysis: save_analysis(cache_key, document_hash, analysis),
+            )
+            return stream_response(
+                events, stream_format, {"X-Analysis-Cache": "miss"}, chat_completion
+            )
+
+        response = chat_completion.choices[0].message.content
+        save_analysis(cache_key, document_hash, response)
+        return {"analysis": response}, 200, {"X-Analysis-Cache": "miss"}
 
-                    ## AI Document Analysis Report
+    except AIGatewayBusy as e:
+        return abort(503, f"{e}. Try again later.")
+    except Exception as e:
+        return abort(500, f"AI analysis error: {str(e)}")
 
-                    ### 1. Overview
-                    - **Overall Quality Score**: [To be determined by AI]
 
-                    ### 2. Content Review
-                    - **Grammar Assessment**: 
-                    - **Structural Analysis**: 
-                    - **Clarity Evaluation**: 
-                    - **Professional Standards Compliance**: 
+"""
+    API: Get Ranking Job
+    ---------------------
+    Retrieves the status and result of an AI ranking job submitted by the Get Overall Team Progress API.
 
-                    ### 3. Task Requirements Check
-                    - **Requirements Met**: 
-                    - **Requirements Partially Met**: 
-                    - **Requirements Not Met**: 
+    Roles Accepted:
+    - Instructor
+    - TA
 
-                    ### 4. Detailed Findings
+    Path Parameters:
+    - job_id (int): ID of the ranking job.
 
-                    #### 4.1 Strengths
-                    [Highlight positive aspects of the submission]
+    Query Parameters:
+    - wait (int, optional): Number of seconds to wait for the job to finish before responding, at most 30.
+      Defaults to 0 (respond right away).
 
-                    #### 4.2 Areas for Improvement
-                    [Specific, actionable suggestions]
+    Response:
+    - 200: JSON object containing:
+        - id: ID of the job.
+        - status: "pending", "running", "done" or "failed".
+        - teams: The rank, status and reason of every team once the job is done, null otherwise.
+        - source: "ai" if the teams were ranked by the AI, "local" if they were ranked from their metrics
+          because the AI timed out, could not be reached or was busy (as the `X-Ranking-Source` header of the
+          Get Overall Team Progress API), null until the job is done.
+        - error: The error of a failed job, null otherwise.
+        - created_at, finished_at: Times the job was submitted and finished.
+    - 400: If `wait` is not an integer.
+    - 403: If the user does not have the required role.
+    - 404: If the job is not found or was submitted by another user.
+"""
 
-                    ### 5. Recommendations
-                    [Concise, targeted recommendations for improvement]
 
-                    ### Final Assessment
-                    [Summarize key insights and overall evaluation]
-                    """,
-                },
-                {
-                    "role": "user",
-                    "content": f"""
-                    ## Submission Analysis Inputs
+@teacher.route("/team_management/overall/ranking/<int:job_id>", methods=["GET"])
+@roles_accepted("Instructor", "TA")
+def get_overall_ranking_job(job_id):
 
-                    ### 1. Milestone Details
-                    **Milestone Description**: {submission.task.milestone.description}
+    try:
+        wait = min(max(int(request.args.get("wait", 0)), 0), 30)
+    except ValueError:
+        return abort(400, "wait must be an integer")
 
-                    ### 2. Task Specifications
-                    **Task Description**: {submission.task.description}
+    job = get_ranking_job(job_id, current_user.id)
+    if not job:
+        return abort(404, "Ranking job not found")
 
-                    ### 3. Submission Content
-                    {text}
-                    """,
-                },
-            ],
-            model="llama-3.1-8b-instant",
-        )
+    if wait:
+        job = ranking_jobs.wait(job, wait)
 
-        response = chat_completion.choices[0].message.content
-        return {"analysis": response}, 200
+    return {
+        "id": job.id,
+        "status": job.status,
+        "teams": job.result,
+        "source": job.source,
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }, 200
 
-    except Exception as e:
-        return abort(500, f"AI analysis error: {str(e)}")
+
+"""
+    API: Submit AI Review Job
+    --------------------------
+    Starts an AI review of the submissions of all the teams of the user for a task, run in the background.
+    The submission of every team is analyzed like with the Get AI Analysis API, several submissions at once,
+    and the analyses are read with the Get AI Review Job API as they complete.
+
+    Roles Accepted:
+    - Instructor
+    - TA
+
+    Path Parameters:
+    - task_id (int): ID of the task.
+
+    Response:
+    - 202: JSON object containing:
+        - id: ID of the review job, to poll with the Get AI Review Job API.
+        - status: "pending", or "done" if no team submitted a document for the task.
+        - task_id: ID of the task.
+        - submission_count: Number of submissions to review, one per team with a submitted document.
+    - 403: If the user does not have the required role.
+    - 404: If the task is not found.
+"""
+
+
+@teacher.route("/team_management/overall/ai_review/<int:task_id>", methods=["POST"])
+@roles_accepted("Instructor", "TA")
+def submit_ai_review_job(task_id):
+
+    if not db.session.get(Tasks, task_id):
+        return abort(404, "Task not found")
+
+    team_ids = [team.id for team in get_teams_under_user(current_user)]
+    job = submit_review_job(
+        current_user.id, task_id, get_review_submissions(team_ids, task_id)
+    )
+
+    return {
+        "id": job.id,
+        "status": job.status,
+        "task_id": job.task_id,
+        "submission_count": job.submission_count,
+    }, 202
+
+
+"""
+    API: Get AI Review Job
+    -----------------------
+    Retrieves the progress of an AI review job and the analyses of the submissions reviewed so far.
+
+    Roles Accepted:
+    - Instructor
+    - TA
+
+    Path Parameters:
+    - job_id (int): ID of the review job.
+
+    Query Parameters:
+    - wait (int, optional): Number of seconds to wait for the job to finish before responding, at most 30.
+      Defaults to 0 (respond right away).
+    - after (int, optional): ID of the last result of the previous page.
+    - limit (int, optional): Maximum number of results, between 1 and 100. Defaults to all the results.
+
+    Response:
+    - 200: JSON object containing:
+        - id, task_id: IDs of the job and of the task.
+        - status: "pending", "running", "done" or "failed".
+        - submission_count: Number of submissions to review.
+        - reviewed_count, failed_count: Number of submissions analyzed, and that could not be analyzed.
+        - error: The error of a failed job, null otherwise.
+        - created_at, finished_at: Times the job was submitted and finished.
+        - results: The submissions reviewed so far, in the order they completed, with their `id`, `team_id`,
+          `team_name`, `status` ("done" or "failed"), `analysis`, `error`, whether the analysis was `cached`
+          and `finished_at`.
+      If there are more results, a `Link` header points to the next page.
+    - 400: If `wait`, `after` or `limit` is invalid.
+    - 403: If the user does not have the required role.
+    - 404: If the job is not found or was submitted by another user.
+"""
+
+
+@teacher.route("/team_management/overall/ai_review/job/<int:job_id>", methods=["GET"])
+@roles_accepted("Instructor", "TA")
+def get_ai_review_job(job_id):
+
+    try:
+        wait = min(max(int(request.args.get("wait", 0)), 0), 30)
+    except ValueError:
+        return abort(400, "wait must be an integer")
+    page = get_page_filters(request.args)
+
+    job = get_review_job(job_id, current_user.id)
+    if not job:
+        return abort(404, "Review job not found")
+
+    if wait:
+        job = review_jobs.wait(job, wait)
+
+    # The names of the teams are loaded in the same query as their results
+    query = ReviewResults.query.options(joinedload(ReviewResults.team)).filter(
+        ReviewResults.job_id == job.id
+    )
+    if page["after"] is not None:
+        query = query.filter(ReviewResults.id > page["after"])
+    query = query.order_by(ReviewResults.id)
+    if page["limit"] is not None:
+        query = query.limit(page["limit"] + 1)
+    results, headers = split_page(query.all(), page["limit"])
+
+    return (
+        {
+            "id": job.id,
+            "task_id": job.task_id,
+            "status": job.status,
+            "submission_count": job.submission_count,
+            "reviewed_count": job.reviewed_count,
+            "failed_count": job.failed_count,
+            "error": job.error,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+            "results": [
+                {
+                    "id": result.id,
+                    "team_id": result.team_id,
+                    "team_name": result.team.name,
+                    "status": result.status,
+                    "analysis": result.analysis,
+                    "error": result.error,
+                    "cached": result.cached,
+                    "finished_at": result.finished_at,
+                }
+                for result in results
+            ],
+        },
+        200,
+        headers,
+    )
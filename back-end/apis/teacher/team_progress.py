@@ -0,0 +1,235 @@
+"""
+Module: Materialized Team Progress
+-----------------------------------
+This module maintains the `TeamMilestoneProgress` rows, which hold the progress of every team in every
+milestone. The rows are updated in the same transaction as the submissions, feedback and milestones they
+summarize, so the dashboards read progress as one row per team and milestone instead of counting the
+submissions on every request. Every change of the progress clears the cached AI rankings.
+
+Dependencies:
+-------------
+- SQLAlchemy ORM: For database operations.
+- apis.teacher.ranking_cache: For clearing the cached AI rankings.
+
+Functions:
+----------
+1. `update_team_progress(milestone_ids, team_ids=None)`
+2. `delete_milestone_progress(milestone_id)`
+3. `rebuild_team_progress()`
+4. `get_team_progress_rows(team_ids, milestone_ids=None)`
+5. `filter_teams_by_status(query, status)`
+6. `get_task_submissions(team_ids)`
+"""
+
+from apis.teacher.ranking_cache import invalidate_rankings
+from datetime import datetime, timezone
+from application.models import (
+    Milestones,
+    Submissions,
+    Tasks,
+    TeamMilestoneProgress,
+    Teams,
+    db,
+)
+
+
+def update_team_progress(milestone_ids, team_ids=None):
+    """
+    Function: Update Team Progress
+    -------------------------------
+    Recomputes the progress rows of teams in milestones from their tasks and submissions.
+
+    Parameters:
+    - milestone_ids (list): The IDs of the milestones.
+    - team_ids (list, optional): The IDs of the teams. Defaults to None (all teams).
+
+    Behavior:
+    - Pending changes of the session are taken into account, and the rows are added to the session without
+      committing, so the caller commits them together with the change they summarize.
+    - The cost is one query for the tasks, one for the submissions and one for the existing rows, whatever the
+      number of teams and milestones.
+    """
+    if team_ids is None:
+        team_ids = [team_id for (team_id,) in db.session.query(Teams.id)]
+    if not milestone_ids or not team_ids:
+        return
+    invalidate_rankings()
+
+    total_tasks = dict(
+        db.session.query(Tasks.milestone_id, db.func.count(Tasks.id))
+        .filter(Tasks.milestone_id.in_(milestone_ids))
+        .group_by(Tasks.milestone_id)
+    )
+
+    submissions = {
+        (team_id, milestone_id): (submitted, last_submission, last_feedback)
+        for team_id, milestone_id, submitted, last_submission, last_feedback in (
+            db.session.query(
+                Submissions.team_id,
+                Tasks.milestone_id,
+                db.func.count(db.distinct(Submissions.task_id)),
+                db.func.max(Submissions.submission_time),
+                db.func.max(Submissions.feedback_time),
+            )
+            .join(Tasks, Submissions.task_id == Tasks.id)
+            .filter(
+                Submissions.team_id.in_(team_ids),
+                Tasks.milestone_id.in_(milestone_ids),
+            )
+            .group_by(Submissions.team_id, Tasks.milestone_id)
+        )
+    }
+
+    rows = get_team_progress_rows(team_ids, milestone_ids)
+
+    for team_id in team_ids:
+        for milestone_id in milestone_ids:
+            row = rows.get((team_id, milestone_id))
+            if not row:
+                row = TeamMilestoneProgress(team_id=team_id, milestone_id=milestone_id)
+                db.session.add(row)
+
+            submitted, last_submission, last_feedback = submissions.get(
+                (team_id, milestone_id), (0, None, None)
+            )
+            row.submitted_tasks = submitted
+            row.total_tasks = total_tasks.get(milestone_id, 0)
+            row.last_activity_at = max(
+                (time for time in (last_submission, last_feedback) if time),
+                default=None,
+            )
+
+
+def delete_milestone_progress(milestone_id):
+    """
+    Function: Delete Milestone Progress
+    ------------------------------------
+    Removes the progress rows of a milestone, without committing.
+
+    Parameters:
+    - milestone_id (int): The ID of the milestone.
+    """
+    TeamMilestoneProgress.query.filter_by(milestone_id=milestone_id).delete()
+    invalidate_rankings()
+
+
+def rebuild_team_progress():
+    """
+    Function: Rebuild Team Progress
+    --------------------------------
+    Recomputes the progress rows of all teams in all milestones from scratch, repairing rows that went out of
+    sync, and commits them.
+
+    Returns:
+    - int: The number of progress rows.
+    """
+    TeamMilestoneProgress.query.delete()
+    update_team_progress(
+        [milestone_id for (milestone_id,) in db.session.query(Milestones.id)]
+    )
+    db.session.commit()
+    return TeamMilestoneProgress.query.count()
+
+
+def get_team_progress_rows(team_ids, milestone_ids=None):
+    """
+    Function: Get Team Progress Rows
+    ---------------------------------
+    Fetches the progress rows of several teams in a single query.
+
+    Parameters:
+    - team_ids (list): The IDs of the teams.
+    - milestone_ids (list, optional): The IDs of the milestones. Defaults to None (all milestones).
+
+    Returns:
+    - dict: The `TeamMilestoneProgress` objects keyed by (team ID, milestone ID).
+    """
+    filters = [TeamMilestoneProgress.team_id.in_(team_ids)]
+    if milestone_ids is not None:
+        filters.append(TeamMilestoneProgress.milestone_id.in_(milestone_ids))
+    return {
+        (row.team_id, row.milestone_id): row
+        for row in TeamMilestoneProgress.query.filter(*filters)
+    }
+
+
+# Deadline statuses of the teams, see `filter_teams_by_status`
+TEAM_STATUSES = ("on_track", "at_risk", "off_track")
+
+
+def filter_teams_by_status(query, status):
+    """
+    Function: Filter Teams By Status
+    ---------------------------------
+    Restricts a query of teams to the teams of a deadline status, computed from their progress in the
+    milestones whose deadline has passed.
+
+    Parameters:
+    - query (Query): The query of `Teams` objects.
+    - status (str): "on_track" for teams that submitted all their due tasks, "at_risk" for teams that submitted
+      at least half of them, "off_track" for the others.
+
+    Returns:
+    - Query: The filtered query.
+
+    Behavior:
+    - The status is computed in the database from the progress rows, so only the matching teams are loaded.
+      Teams without due tasks are on track.
+    """
+    due = (
+        db.session.query(
+            TeamMilestoneProgress.team_id.label("team_id"),
+            db.func.sum(TeamMilestoneProgress.submitted_tasks).label("submitted"),
+            db.func.sum(TeamMilestoneProgress.total_tasks).label("total"),
+        )
+        .join(Milestones, TeamMilestoneProgress.milestone_id == Milestones.id)
+        .filter(Milestones.deadline < datetime.now(timezone.utc).replace(tzinfo=None))
+        .group_by(TeamMilestoneProgress.team_id)
+        .subquery()
+    )
+    submitted = db.func.coalesce(due.c.submitted, 0)
+    total = db.func.coalesce(due.c.total, 0)
+
+    query = query.outerjoin(due, due.c.team_id == Teams.id)
+    if status == "on_track":
+        return query.filter(submitted >= total)
+    if status == "at_risk":
+        return query.filter(submitted < total, submitted * 2 >= total)
+    return query.filter(submitted * 2 < total)
+
+
+def get_task_submissions(team_ids):
+    """
+    Function: Get Task Submissions
+    -------------------------------
+    Reads the submissions of several teams in a single query, so the number of queries does not grow with the
+    number of teams or tasks.
+
+    Parameters:
+    - team_ids (list): The IDs of the teams.
+
+    Returns:
+    - dict: The `submission_time`, `feedback` and `feedback_time` of the first submission of each team for
+      each task, keyed by (team ID, task ID).
+    """
+    submissions = {}
+    for team_id, task_id, submission_time, feedback, feedback_time in (
+        db.session.query(
+            Submissions.team_id,
+            Submissions.task_id,
+            Submissions.submission_time,
+            Submissions.feedback,
+            Submissions.feedback_time,
+        )
+        .filter(Submissions.team_id.in_(team_ids))
+        .order_by(Submissions.id)
+    ):
+        submissions.setdefault(
+            (team_id, task_id),
+            {
+                "submission_time": submission_time,
+                "feedback": feedback,
+                "feedback_time": feedback_time,
+            },
+        )
+    return submissions
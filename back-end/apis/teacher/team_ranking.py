@@ -0,0 +1,571 @@
+"""
+Module: AI Team Ranking
+------------------------
+This module ranks the teams of a user with the AI from the progress summaries built by the overall progress
+API. The ranking can be computed while the request waits, or as a background job: the API then returns the
+progress metrics right away, and the ranking is read later from the job, so no request thread waits for the
+AI. Rankings are cached by their input (see `ranking_cache`), so unchanged progress is not ranked again.
+
+Large cohorts do not fit in a single AI request: their summaries are split into batches that fit a token
+budget, ranked in parallel (map), and the partial rankings are merged into one ranking of all teams
+(reduce). The positions of teams ranked in different batches are not comparable, so the merge orders the
+teams by the status the AI gave them, then by their local score.
+
+The teams can also be ranked without the AI, by a deterministic score of their progress metrics. This local
+ranking is much faster, and replaces the AI ranking when the AI cannot be reached in time.
+
+Dependencies:
+-------------
+- SQLAlchemy ORM: For storing the ranking jobs.
+- Pydantic: For validating the AI response.
+- Groq: For the AI completions.
+- ai_tokens: For estimating the size of the progress summaries.
+- background_jobs: For running the ranking jobs in background threads.
+- concurrent.futures: For ranking the batches in parallel.
+- datetime, json, time: For timestamps, the AI prompt and the stage latencies.
+
+Functions:
+----------
+1. `request_ranking(ai_prompt, team_count, timeout=None)`
+2. `batch_prompts(ai_prompt, token_budget)`
+3. `is_batch_ranking_valid(batch_response, batch_metrics)`
+4. `merge_rankings(batch_responses, batch_metrics)`
+5. `rank_teams(ai_prompt, team_metrics, timings=None)`
+6. `score_team(metrics, max_commits)`
+7. `rank_teams_locally(team_metrics, max_commits=None)`
+8. `apply_ranking(response_data, team_analyses)`
+9. `submit_ranking_job(user_id, ai_prompt, team_metrics)`
+10. `run_ranking_job(app, job)`
+11. `get_ranking_job(job_id, user_id)`
+
+Classes:
+--------
+1. TeamAnalysis: The AI analysis of a team.
+2. AIResponse: The AI response, listing the analysis of every team.
+"""
+
+from apis.teacher.setup import ai_client
+from apis.teacher.ranking_cache import ranking_cache, ranking_cache_key
+from apis.teacher.ai_tokens import estimate_tokens
+from apis.teacher.background_jobs import BackgroundJobs
+from apis.teacher.ai_gateway import AIGatewayBusy
+from application.models import RankingJobs, db
+from flask import current_app
+from groq import APIConnectionError
+from pydantic import BaseModel
+from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import json
+import time
+
+
+class TeamAnalysis(BaseModel):
+    team_name: str
+    rank: int
+    status: str
+    reason: str
+
+
+class AIResponse(BaseModel):
+    teams: List[TeamAnalysis]
+
+
+# AI model ranking the teams
+RANKING_MODEL = "llama-3.1-8b-instant"
+
+# Version of the ranking instructions, to be increased whenever they change so cached rankings are not reused
+RANKING_PROMPT_VERSION = 1
+
+# Order of the statuses when merging partial rankings, best first
+STATUS_ORDER = {"on_track": 0, "at_risk": 1, "off_track": 2}
+
+# Weights of the progress metrics in the local ranking score
+LOCAL_SCORE_WEIGHTS = {"progress": 0.5, "on_time": 0.2, "commits": 0.2, "feedback": 0.1}
+
+# Minimum local ranking scores of the "on_track" and "at_risk" statuses
+LOCAL_STATUS_THRESHOLDS = (("on_track", 0.6), ("at_risk", 0.3))
+
+# Background threads running the ranking jobs
+ranking_jobs = BackgroundJobs("ranking", "AI_RANKING_WORKERS")
+
+
+def request_ranking(ai_prompt, team_count, timeout=None):
+    """
+    Function: Request Ranking
+    --------------------------
+    Ranks teams with a single AI request.
+
+    Parameters:
+    - ai_prompt (list): The progress summary of every team.
+    - team_count (int): The number of teams.
+    - timeout (float, optional): Maximum number of seconds to wait for the AI. Defaults to None (the timeout
+      of the AI client).
+
+    Returns:
+    - AIResponse: The rank, status and reason of every team.
+
+    Raises:
+    - Exception: If the AI request fails or its response is not valid.
+    """
+    chat_completion = ai_client.chat.completions.create(
+        messages=[
+            {
+                "role": "system",
+                "content": f"""Analyze the progress of each team and provide a JSON response   using the following schema:
+                            {json.dumps(AIResponse.model_json_schema(), indent=2)}
+                            
+                            Ranking Rules:
+                            1. Consider multiple factors for ranking in this priority order:
+                               - Progress percentage (higher is better)
+                               - Task completion relative to deadlines
+                               - GitHub activity (commit frequency and code changes)
+                               - Quality of submissions (based on feedback)
+                            
+                            2. Status Assignment Rules:
+                               - 'on_track': Teams that have completed tasks on time and show consistent progress
+                               - 'at_risk': Teams showing some progress but falling behind schedule
+                               - 'off_track': Teams with minimal progress or significant delays
+                            
+                            3. Rank Assignment Rules:
+                               - The ranks should be assigned from 1 to {team_count} consecutively
+                               - No teams should have same ranks assigned
+                               - Lower rank (closer to 1) indicates better performance
+                               - Teams with same status should be ranked based on their relative progress
+                               - Generally, 'on_track' teams should rank better than 'at_risk' teams
+                               - 'at_risk' teams should rank better than 'off_track' teams
+                            
+                            4. Reason Format:
+                               - Start with the primary factor affecting the ranking
+                               - Include both positive and areas of concern
+                               - Mention specific metrics (progress %, commit counts, etc.)
+                               - Keep it concise but informative (2-3 sentences)
+                            
+                            Important: Ensure the ranking is consistent with the actual progress metrics and status assignments. Significant rank differences should be justified by clear metric differences.""",
+            },
+            {
+                "role": "user",
+                "content": str(ai_prompt),
+            },
+        ],
+        model=RANKING_MODEL,
+        response_format={"type": "json_object"},
+        timeout=timeout,
+    )
+
+    return AIResponse.model_validate_json(chat_completion.choices[0].message.content)
+
+
+def batch_prompts(ai_prompt, token_budget):
+    """
+    Function: Batch Prompts
+    ------------------------
+    Splits the progress summaries of the teams into consecutive batches whose estimated size fits a token
+    budget.
+
+    Parameters:
+    - ai_prompt (list): The progress summary of every team.
+    - token_budget (int): Maximum number of estimated tokens of the summaries of a batch.
+
+    Returns:
+    - list: The batches, as lists of summaries. A summary larger than the budget forms a batch on its own.
+    """
+    batches, batch_tokens = [], 0
+    for team_prompt in ai_prompt:
+        tokens = estimate_tokens(team_prompt)
+        if not batches or batch_tokens + tokens > token_budget:
+            batches.append([])
+            batch_tokens = 0
+        batches[-1].append(team_prompt)
+        batch_tokens += tokens
+    return batches
+
+
+def is_batch_ranking_valid(batch_response, batch_metrics):
+    """
+    Function: Is Batch Ranking Valid
+    ---------------------------------
+    Checks that the AI ranking of a batch, or of all the teams, ranks exactly the teams sent in it.
+
+    Parameters:
+    - batch_response (AIResponse): The AI ranking of the batch, or None if the AI request failed.
+    - batch_metrics (list): The metrics of the teams of the batch, see `rank_teams_locally`.
+
+    Returns:
+    - bool: Whether every team of the batch is ranked once, no other team is ranked, the ranks are 1 to the
+      number of teams, and every status is known.
+    """
+    if batch_response is None:
+        return False
+    analyses = batch_response.teams
+    return (
+        sorted(analysis.team_name for analysis in analyses)
+        == sorted(metrics["team_name"] for metrics in batch_metrics)
+        and sorted(analysis.rank for analysis in analyses)
+        == list(range(1, len(analyses) + 1))
+        and all(analysis.status in STATUS_ORDER for analysis in analyses)
+    )
+
+
+def merge_rankings(batch_responses, batch_metrics):
+    """
+    Function: Merge Rankings
+    -------------------------
+    Merges the rankings of several batches of teams into a single ranking.
+
+    Parameters:
+    - batch_responses (list): The `AIResponse` of every batch, or None for a batch whose AI request failed.
+    - batch_metrics (list): The metrics of the teams of every batch, see `rank_teams_locally`.
+
+    Returns:
+    - AIResponse: The analysis of every team, ranked from 1 to the number of teams.
+
+    Behavior:
+    - A batch whose ranking is not valid (see `is_batch_ranking_valid`) is ranked locally instead.
+    - Positions in different batches are not comparable, so teams are ordered by status (on track, at risk,
+      off track), then by decreasing local score over the whole cohort (see `score_team`), then by name. The
+      merge does not depend on the order of the batches.
+    """
+    max_commits = max(
+        (metrics["total_commits"] for batch in batch_metrics for metrics in batch),
+        default=0,
+    )
+    ordered = []
+    for batch_response, metrics_list in zip(batch_responses, batch_metrics):
+        if not is_batch_ranking_valid(batch_response, metrics_list):
+            current_app.logger.warning(
+                f"AI ranking of a batch of {len(metrics_list)} teams is not valid, ranking it locally"
+            )
+            batch_response = rank_teams_locally(metrics_list, max_commits)
+
+        scores = {
+            metrics["team_name"]: score_team(metrics, max_commits)
+            for metrics in metrics_list
+        }
+        for analysis in batch_response.teams:
+            ordered.append(
+                (
+                    STATUS_ORDER[analysis.status],
+                    -round(scores[analysis.team_name], 6),
+                    analysis.team_name,
+                    analysis,
+                )
+            )
+    ordered.sort(key=lambda item: item[:3])
+
+    return AIResponse(
+        teams=[
+            analysis.model_copy(update={"rank": rank})
+            for rank, (*_, analysis) in enumerate(ordered, start=1)
+        ]
+    )
+
+
+def rank_teams(ai_prompt, team_metrics, timings=None):
+    """
+    Function: Rank Teams
+    ---------------------
+    Ranks teams with the AI.
+
+    Parameters:
+    - ai_prompt (list): The progress summary of every team.
+    - team_metrics (list): The metrics of every team, in the same order, see `rank_teams_locally`.
+    - timings (dict, optional): If given, the seconds spent ranking the batches (`ranking_map`) and merging
+      their rankings (`ranking_reduce`) are stored in it.
+
+    Returns:
+    - AIResponse: The rank, status and reason of every team.
+
+    Raises:
+    - Exception: If an AI request fails or its response is not valid.
+
+    Behavior:
+    - Returns an empty ranking, without calling the AI, if there are no teams (e.g. an empty page of teams).
+    - Returns the cached ranking of the same progress summaries, model and instructions, if any. Otherwise the
+      ranking of the AI is cached if it is valid (see `is_batch_ranking_valid`). A ranking of all the teams in
+      a single request that is not valid is ranked locally instead, like an invalid batch, and not cached.
+    - Summaries that exceed the `AI_RANKING_TOKEN_BUDGET` setting are ranked in batches, up to
+      `AI_RANKING_BATCH_WORKERS` at a time, and the partial rankings are merged with `merge_rankings`. A batch
+      whose AI request fails or whose ranking is not valid is ranked locally, and the merged ranking is then
+      not cached. The error is raised if the AI request of every batch fails.
+    - Every AI request waits at most `AI_RANKING_TIMEOUT` seconds, then raises `groq.APITimeoutError`.
+    """
+    team_count = len(team_metrics)
+    if not team_count:
+        return AIResponse(teams=[])
+
+    cache_key = ranking_cache_key(ai_prompt, RANKING_MODEL, RANKING_PROMPT_VERSION)
+    cached = ranking_cache.get(cache_key)
+    if cached:
+        return cached
+
+    batches = batch_prompts(ai_prompt, current_app.config["AI_RANKING_TOKEN_BUDGET"])
+    timeout = current_app.config["AI_RANKING_TIMEOUT"]
+    started = time.perf_counter()
+
+    if len(batches) <= 1:
+        batch_responses = [request_ranking(ai_prompt, team_count, timeout)]
+        batch_metrics = [team_metrics]
+        mapped = time.perf_counter()
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(
+                len(batches), current_app.config["AI_RANKING_BATCH_WORKERS"]
+            )
+        ) as executor:
+            futures = [
+                executor.submit(request_ranking, batch, len(batch), timeout)
+                for batch in batches
+            ]
+
+        batch_responses, errors = [], []
+        for future in futures:
+            try:
+                batch_responses.append(future.result())
+            except Exception as e:
+                current_app.logger.warning(f"AI ranking of a batch failed:\n{e}")
+                batch_responses.append(None)
+                errors.append(e)
+        if len(errors) == len(batches):
+            raise errors[0]
+
+        batch_metrics, start = [], 0
+        for batch in batches:
+            batch_metrics.append(team_metrics[start : start + len(batch)])
+            start += len(batch)
+
+        mapped = time.perf_counter()
+
+    complete = all(
+        is_batch_ranking_valid(batch_response, metrics)
+        for batch_response, metrics in zip(batch_responses, batch_metrics)
+    )
+    if len(batch_responses) == 1 and complete:
+        # The ranks of a single valid ranking are kept as the AI gave them
+        ai_response = batch_responses[0]
+    else:
+        ai_response = merge_rankings(batch_responses, batch_metrics)
+
+    merged = time.perf_counter()
+    current_app.logger.info(
+        f"Ranked {team_count} teams in {len(batches)} batches: "
+        f"{mapped - started:.3f}s ranking, {merged - mapped:.3f}s merging"
+    )
+    if timings is not None:
+        timings["ranking_map"] = mapped - started
+        timings["ranking_reduce"] = merged - mapped
+
+    if complete:
+        ranking_cache.put(cache_key, ai_response)
+    return ai_response
+
+
+def score_team(metrics, max_commits):
+    """
+    Function: Score Team
+    ---------------------
+    Scores the progress of a team from 0 to 1, for the local ranking.
+
+    Parameters:
+    - metrics (dict): The progress metrics of the team, see `rank_teams_locally`.
+    - max_commits (int): The largest number of commits of a team of the cohort.
+
+    Returns:
+    - float: The weighted sum of the progress, the share of due tasks submitted on time, the number of
+      commits relative to the most active team, and the share of submissions with feedback.
+    """
+    on_time = (
+        metrics["on_time_tasks"] / metrics["due_tasks"] if metrics["due_tasks"] else 1
+    )
+    commits = metrics["total_commits"] / max_commits if max_commits else 0
+    feedback = (
+        metrics["feedback_count"] / metrics["submitted_tasks"]
+        if metrics["submitted_tasks"]
+        else 0
+    )
+    return (
+        LOCAL_SCORE_WEIGHTS["progress"] * metrics["progress"] / 100
+        + LOCAL_SCORE_WEIGHTS["on_time"] * on_time
+        + LOCAL_SCORE_WEIGHTS["commits"] * commits
+        + LOCAL_SCORE_WEIGHTS["feedback"] * feedback
+    )
+
+
+def rank_teams_locally(team_metrics, max_commits=None):
+    """
+    Function: Rank Teams Locally
+    -----------------------------
+    Ranks teams without the AI, from a score of their progress metrics.
+
+    Parameters:
+    - team_metrics (list): The metrics of every team, as dictionaries with:
+        - team_name (str): The name of the team.
+        - progress (int): The overall progress percentage.
+        - due_tasks (int): The number of tasks whose deadline has passed.
+        - on_time_tasks (int): The number of due tasks submitted by their deadline.
+        - submitted_tasks (int): The number of submitted tasks.
+        - feedback_count (int): The number of submitted tasks with feedback.
+        - total_commits (int): The number of commits of the GitHub repository of the team.
+    - max_commits (int, optional): The largest number of commits of a team of the cohort, when the teams are
+      part of a larger cohort. Defaults to None (the largest number of commits of the given teams).
+
+    Returns:
+    - AIResponse: The rank, status and reason of every team, in the format of the AI ranking.
+
+    Behavior:
+    - Teams are ranked by decreasing score (see `score_team`), then by name, so the same metrics always give
+      the same ranking. Teams scoring at least 0.6 are on track, at least 0.3 at risk, and off track otherwise.
+    """
+    if max_commits is None:
+        max_commits = max(
+            (metrics["total_commits"] for metrics in team_metrics), default=0
+        )
+    scored = sorted(
+        (
+            (-round(score_team(metrics, max_commits), 6), metrics["team_name"], metrics)
+            for metrics in team_metrics
+        ),
+        key=lambda item: item[:2],
+    )
+
+    teams = []
+    for rank, (negative_score, _, metrics) in enumerate(scored, start=1):
+        status = next(
+            (
+                status
+                for status, threshold in LOCAL_STATUS_THRESHOLDS
+                if -negative_score >= threshold
+            ),
+            "off_track",
+        )
+        teams.append(
+            TeamAnalysis(
+                team_name=metrics["team_name"],
+                rank=rank,
+                status=status,
+                reason=(
+                    f"Progress is {metrics['progress']}% with {metrics['on_time_tasks']} of "
+                    f"{metrics['due_tasks']} due tasks submitted on time. The repository has "
+                    f"{metrics['total_commits']} commits, and {metrics['feedback_count']} of "
+                    f"{metrics['submitted_tasks']} submissions received feedback."
+                ),
+            )
+        )
+    return AIResponse(teams=teams)
+
+
+def apply_ranking(response_data, team_analyses):
+    """
+    Function: Apply Ranking
+    ------------------------
+    Adds the rank, status and reason of every ranked team to its progress data.
+
+    Parameters:
+    - response_data (list): The progress data of the teams, each with its `team_name`.
+    - team_analyses (list): The rank, status and reason of every ranked team, as dictionaries with its
+      `team_name`.
+    """
+    for team_analysis in team_analyses:
+        for team in response_data:
+            if team["team_name"] == team_analysis["team_name"]:
+                team.update(
+                    {
+                        "rank": team_analysis["rank"],
+                        "status": team_analysis["status"],
+                        "reason": team_analysis["reason"],
+                    }
+                )
+                break
+
+
+def submit_ranking_job(user_id, ai_prompt, team_metrics):
+    """
+    Function: Submit Ranking Job
+    -----------------------------
+    Stores a ranking job and schedules it on the background threads.
+
+    Parameters:
+    - user_id (int): The ID of the user the teams are ranked for.
+    - ai_prompt (list): The progress summary of every team.
+    - team_metrics (list): The metrics of every team, in the same order, see `rank_teams_locally`.
+
+    Returns:
+    - RankingJobs: The pending job.
+
+    Behavior:
+    - The number of background threads is set by the `AI_RANKING_WORKERS` setting. Jobs submitted while all
+      threads are busy wait for a free thread.
+    - A job without teams, or whose ranking is cached, is stored as done, without being scheduled.
+    """
+    job = RankingJobs(
+        user_id=user_id,
+        status="pending",
+        prompt=ai_prompt,
+        metrics=team_metrics,
+        team_count=len(team_metrics),
+        created_at=datetime.now(timezone.utc),
+    )
+    db.session.add(job)
+
+    cached = (
+        ranking_cache.get(
+            ranking_cache_key(ai_prompt, RANKING_MODEL, RANKING_PROMPT_VERSION)
+        )
+        if team_metrics
+        else AIResponse(teams=[])
+    )
+    if cached:
+        job.status = "done"
+        job.result = cached.model_dump()["teams"]
+        job.source = "ai"
+        job.finished_at = job.created_at
+        db.session.commit()
+        return job
+
+    db.session.commit()
+    ranking_jobs.submit(job, run_ranking_job)
+    return job
+
+
+def run_ranking_job(app, job):
+    """
+    Function: Run Ranking Job
+    --------------------------
+    Ranks the teams of a job with the AI and stores the result. Run by `ranking_jobs`, which records the
+    error if the ranking failed.
+
+    Parameters:
+    - app (Flask): The application, whose context the job runs in.
+    - job (RankingJobs): The running job.
+
+    Behavior:
+    - If the AI times out, cannot be reached or is busy, the teams are ranked from their metrics instead (see
+      `rank_teams_locally`), and the source of the job is "local".
+    """
+    try:
+        ai_response = rank_teams(job.prompt, job.metrics)
+        job.source = "ai"
+    except (APIConnectionError, AIGatewayBusy) as e:
+        app.logger.warning(
+            f"AI ranking of job {job.id} unavailable, ranking locally:\n{e}"
+        )
+        ai_response = rank_teams_locally(job.metrics)
+        job.source = "local"
+    job.result = ai_response.model_dump()["teams"]
+
+
+def get_ranking_job(job_id, user_id):
+    """
+    Function: Get Ranking Job
+    --------------------------
+    Fetches a ranking job of a user.
+
+    Parameters:
+    - job_id (int): The ID of the job.
+    - user_id (int): The ID of the user.
+
+    Returns:
+    - A `RankingJobs` object if the job exists and was submitted by the user.
+    - None otherwise.
+    """
+    return RankingJobs.query.filter_by(id=job_id, user_id=user_id).first()
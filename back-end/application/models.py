@@ -25,6 +25,18 @@ Classes:
 8. Notifications
 9. UserNotifications
 10. NotificationPreferences
+11. CommitStats
+12. GithubSyncState
+13. GithubSnapshots
+14. CommitActivity
+15. TeamMilestoneProgress
+16. RankingJobs
+17. DocumentAnalyses
+18. ChatSessions
+19. ReviewJobs
+20. ReviewResults
+21. CommitAuthors
+22. MilestoneVersions
 
 Relationships:
 -------------
@@ -354,3 +366,243 @@ class NotificationPreferences(db.Model):
         back_populates="notification_preferences",
         uselist=False,
     )
+
+
+class CommitStats(db.Model):
+    """
+    Caches the statistics of a single GitHub commit, keyed by repository and SHA.
+    Commits are immutable, so a row is written once and reused for every later statistics request.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    repo = db.Column(db.String, nullable=False)
+    sha = db.Column(db.String(40), nullable=False)
+    author = db.Column(db.String)
+    committed_at = db.Column(db.DateTime)
+    message = db.Column(db.Text)
+    additions = db.Column(db.Integer, default=0, nullable=False)
+    deletions = db.Column(db.Integer, default=0, nullable=False)
+    milestone_id = db.Column(db.Integer)
+
+    __table_args__ = (db.UniqueConstraint("repo", "sha"),)
+
+
+class GithubSyncState(db.Model):
+    """
+    Stores the sync watermark of a GitHub repository: the last synced head commit and the ETag of the
+    last commit listing, so that later refreshes only pull commits newer than the watermark. Also stores
+    the days whose commits changed since the activity rows of the repository were last materialized (None
+    until they are first materialized).
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    repo = db.Column(db.String, nullable=False, unique=True)
+    last_sha = db.Column(db.String(40))
+    last_commit_at = db.Column(db.DateTime)
+    etag = db.Column(db.String)
+    synced_at = db.Column(db.DateTime)
+    activity_days = db.Column(db.JSON)
+
+
+class GithubSnapshots(db.Model):
+    """
+    Stores the latest precomputed GitHub statistics of a team, refreshed by the GitHub statistics worker,
+    so that the GitHub endpoints do not have to contact GitHub on every request.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    team_id = db.Column(
+        db.Integer,
+        db.ForeignKey("teams.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+    )
+    total_commits = db.Column(db.Integer, default=0, nullable=False)
+    lines_of_code_added = db.Column(db.Integer, default=0, nullable=False)
+    lines_of_code_deleted = db.Column(db.Integer, default=0, nullable=False)
+    milestones = db.Column(db.JSON, default=list, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    def as_commit_details(self):
+        """
+        Return the snapshot in the format returned by `fetch_commit_details`
+        """
+        return {
+            "total_commits": self.total_commits,
+            "lines_of_code_added": self.lines_of_code_added,
+            "lines_of_code_deleted": self.lines_of_code_deleted,
+            "milestones": self.milestones,
+        }
+
+
+class CommitActivity(db.Model):
+    """
+    Stores the number of commits and changed lines of a commit author on a single day in a GitHub repository.
+    Materialized from the cached commit statistics, so activity series are read without scanning the commits.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    repo = db.Column(db.String, nullable=False, index=True)
+    author = db.Column(db.String)
+    day = db.Column(db.Date, nullable=False)
+    commits = db.Column(db.Integer, default=0, nullable=False)
+    additions = db.Column(db.Integer, default=0, nullable=False)
+    deletions = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint("repo", "author", "day"),)
+
+
+class TeamMilestoneProgress(db.Model):
+    """
+    Stores the progress of a team in a milestone: the number of tasks the team submitted, the number of tasks
+    of the milestone and the time of the latest submission or feedback. Maintained whenever submissions,
+    feedback or milestones change, so progress is read without scanning the submissions.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    team_id = db.Column(
+        db.Integer,
+        db.ForeignKey("teams.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    milestone_id = db.Column(
+        db.Integer, db.ForeignKey("milestones.id", ondelete="CASCADE"), nullable=False
+    )
+    submitted_tasks = db.Column(db.Integer, default=0, nullable=False)
+    total_tasks = db.Column(db.Integer, default=0, nullable=False)
+    last_activity_at = db.Column(db.DateTime)
+
+    __table_args__ = (db.UniqueConstraint("team_id", "milestone_id"),)
+
+    def completion_rate(self):
+        """
+        Return the fraction of the tasks of the milestone submitted by the team
+        """
+        return self.submitted_tasks / self.total_tasks if self.total_tasks else 0
+
+
+class RankingJobs(db.Model):
+    """
+    Stores an AI ranking of the teams of a user, computed in the background after the progress of the teams
+    was returned, with the prompt and the progress metrics it is computed from and its result or error. The
+    source tells whether the result was ranked by the AI ("ai") or from the metrics ("local").
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"))
+    status = db.Column(db.String, default="pending", nullable=False)
+    prompt = db.Column(db.JSON, nullable=False)
+    metrics = db.Column(db.JSON, nullable=False)
+    team_count = db.Column(db.Integer, nullable=False)
+    result = db.Column(db.JSON)
+    source = db.Column(db.String)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+
+class DocumentAnalyses(db.Model):
+    """
+    Stores an AI analysis of a submitted document, keyed by a hash of the document content and of everything
+    else the analysis depends on, so repeated views of the analysis do not call the AI again.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), unique=True, nullable=False)
+    document_hash = db.Column(db.String(64), nullable=False, index=True)
+    analysis = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    last_used_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class ChatSessions(db.Model):
+    """
+    Stores a conversation of a student with the chat assistant: the latest messages, within a token budget, and
+    a summary of the older ones. Sessions expire when they are not used for a while. The version is increased by
+    every change of the messages, so concurrent changes are detected instead of overwriting each other.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    summary = db.Column(db.Text)
+    history = db.Column(db.JSON, default=list, nullable=False)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    last_used_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class ReviewJobs(db.Model):
+    """
+    Stores an AI review of the submissions of all the teams of a user for a task, run in the background, with
+    the submissions to review and the number of submissions reviewed so far.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="SET NULL"))
+    task_id = db.Column(
+        db.Integer, db.ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False
+    )
+    status = db.Column(db.String, default="pending", nullable=False)
+    team_submissions = db.Column(db.JSON, nullable=False)
+    submission_count = db.Column(db.Integer, nullable=False)
+    reviewed_count = db.Column(db.Integer, default=0, nullable=False)
+    failed_count = db.Column(db.Integer, default=0, nullable=False)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+
+class ReviewResults(db.Model):
+    """
+    Stores the AI analysis of a submission reviewed by a review job, or the error if it could not be analyzed.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(
+        db.Integer,
+        db.ForeignKey("review_jobs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    team_id = db.Column(
+        db.Integer, db.ForeignKey("teams.id", ondelete="CASCADE"), nullable=False
+    )
+    submission_id = db.Column(
+        db.Integer, db.ForeignKey("submissions.id", ondelete="SET NULL")
+    )
+    status = db.Column(db.String, nullable=False)
+    analysis = db.Column(db.Text)
+    error = db.Column(db.Text)
+    cached = db.Column(db.Boolean, default=False, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=False)
+    team = db.relationship("Teams", lazy="joined")
+
+    __table_args__ = (db.UniqueConstraint("job_id", "team_id"),)
+
+
+class CommitAuthors(db.Model):
+    """
+    Caches the GitHub login of a commit author email, looked up once from the GitHub API by the git mirror
+    sync. The login is empty if GitHub does not link the email to an account.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String, nullable=False, index=True)
+    login = db.Column(db.String)
+    resolved_at = db.Column(db.DateTime, nullable=False)
+
+
+class MilestoneVersions(db.Model):
+    """
+    Stores the version of the milestones, in a single row increased by every change of the milestones or their
+    tasks, so every worker process can tell whether its rendered milestone context is current with one query.
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
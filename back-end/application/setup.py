@@ -23,7 +23,9 @@ Functions:
 3. register_blueprints(app)
 4. setup_error_handlers(app)
 5. configure_logging(app)
-6. create_app(database_uri, testing=False)
+6. track_query_count(app)
+7. report_server_timing(app)
+8. create_app(database_uri, testing=False)
 
 Classes:
 --------
@@ -34,17 +36,27 @@ Classes:
 import os
 import logging
 from logging.handlers import RotatingFileHandler
-from flask import Flask, Response, json
+from flask import Flask, Response, g, has_request_context, json
 from flask.sessions import SecureCookieSessionInterface, SessionMixin
 from flask_migrate import Migrate
 from flask_security import Security, SQLAlchemyUserDatastore
+from sqlalchemy import event
 from werkzeug.datastructures import Headers
 from werkzeug.exceptions import HTTPException
 
-from application.models import Users, Roles, db
+from application.models import (
+    Users,
+    Roles,
+    TeamMilestoneProgress,
+    MilestoneVersions,
+    db,
+)
 from application.initial_data import seed_database
 from apis.student.setup import student
 from apis.teacher.setup import teacher
+from apis.teacher.team_progress import rebuild_team_progress
+from apis.teacher.ranking_cache import ranking_cache
+from apis.teacher.ai_gateway import ai_gateway
 
 
 class CustomSessionInterface(SecureCookieSessionInterface):
@@ -134,6 +146,35 @@ def configure_app(app, database_uri, testing):
     - SECRET_KEY: Secret key for sessions and cookies.
     - SECURITY_PASSWORD_SALT: Salt for password hashing.
     - Various other Flask-Security and app-specific configurations.
+    - GITHUB_FETCH_WORKERS: Number of commits fetched concurrently from GitHub.
+    - GITHUB_STATS_BACKEND: Source of the commit statistics ("rest", "graphql" or "mirror").
+    - GIT_MIRROR_FOLDER: Folder holding the local repository mirrors of the "mirror" source.
+    - GIT_MIRROR_LOCAL_REPOS: Whether the "mirror" source accepts file URLs of repositories on the server,
+      besides the repositories hosted on GitHub. Enabled in testing mode.
+    - GITHUB_WEBHOOK_SECRET: Secret of the GitHub push webhook. The webhook is disabled when unset.
+    - QUERY_COUNT_HEADER: Whether to report the number of database queries of each request in the
+      `X-Query-Count` response header. Enabled in testing mode.
+    - AI_RANKING_WORKERS: Number of AI team rankings computed concurrently in the background.
+    - AI_RANKING_CACHE_SIZE: Maximum number of AI team rankings kept in the ranking cache.
+    - AI_RANKING_CACHE_TTL: Number of seconds an AI team ranking is reused from the ranking cache.
+    - AI_RANKING_TOKEN_BUDGET: Estimated number of tokens of team summaries sent in a single AI ranking
+      request. Larger cohorts are ranked in batches.
+    - AI_RANKING_BATCH_WORKERS: Number of batches of a cohort ranked concurrently.
+    - AI_RANKING_TIMEOUT: Number of seconds an AI ranking request may take before the local ranking is used.
+    - AI_TIMEOUT: Default number of seconds an AI request, retries included, may take.
+    - AI_MAX_RETRIES: Number of times an AI request is retried after a transient error.
+    - AI_MAX_CONCURRENCY: Maximum number of AI requests in progress at once in a worker process.
+    - AI_QUEUE_TIMEOUT: Number of seconds an AI request waits for one of the requests in progress to complete
+      before it is rejected.
+    - AI_ANALYSIS_CACHE_SIZE: Maximum number of AI analyses of submissions kept in the analysis cache.
+    - AI_ANALYSIS_CACHE_TTL: Number of seconds an AI analysis of a submission is reused from the analysis cache.
+    - AI_CHAT_SESSION_TTL: Number of seconds a chat session is kept after its last message.
+    - AI_CHAT_HISTORY_BUDGET: Estimated number of tokens of the latest messages of a chat session sent with a
+      new message. Older messages are summarized.
+    - AI_SUMMARY_WORKERS: Number of chat sessions summarized concurrently in the background.
+    - AI_REVIEW_WORKERS: Number of AI review jobs run concurrently in the background.
+    - AI_REVIEW_CONCURRENCY: Number of submissions of an AI review job analyzed concurrently. Kept below
+      AI_MAX_CONCURRENCY, so review jobs leave AI request slots to the other requests.
     """
 
     app.config.update(
@@ -152,6 +193,32 @@ def configure_app(app, database_uri, testing):
         SECURITY_TOKEN_MAX_AGE=60 * 60 * 24,
         WTF_CSRF_ENABLED=False,
         UPLOAD_FOLDER="student_submissions",
+        GITHUB_FETCH_WORKERS=int(os.environ.get("GITHUB_FETCH_WORKERS", 8)),
+        GITHUB_STATS_BACKEND=os.environ.get("GITHUB_STATS_BACKEND", "rest"),
+        GIT_MIRROR_FOLDER=os.environ.get("GIT_MIRROR_FOLDER", "git_mirrors"),
+        GIT_MIRROR_LOCAL_REPOS=testing
+        or os.environ.get("GIT_MIRROR_LOCAL_REPOS") == "1",
+        GITHUB_WEBHOOK_SECRET=os.environ.get("GITHUB_WEBHOOK_SECRET"),
+        QUERY_COUNT_HEADER=testing or os.environ.get("QUERY_COUNT_HEADER") == "1",
+        AI_RANKING_WORKERS=int(os.environ.get("AI_RANKING_WORKERS", 2)),
+        AI_RANKING_CACHE_SIZE=int(os.environ.get("AI_RANKING_CACHE_SIZE", 128)),
+        AI_RANKING_CACHE_TTL=int(os.environ.get("AI_RANKING_CACHE_TTL", 600)),
+        AI_RANKING_TOKEN_BUDGET=int(os.environ.get("AI_RANKING_TOKEN_BUDGET", 4000)),
+        AI_RANKING_BATCH_WORKERS=int(os.environ.get("AI_RANKING_BATCH_WORKERS", 4)),
+        AI_RANKING_TIMEOUT=float(os.environ.get("AI_RANKING_TIMEOUT", 20)),
+        AI_TIMEOUT=float(os.environ.get("AI_TIMEOUT", 30)),
+        AI_MAX_RETRIES=int(os.environ.get("AI_MAX_RETRIES", 2)),
+        AI_MAX_CONCURRENCY=int(os.environ.get("AI_MAX_CONCURRENCY", 4)),
+        AI_QUEUE_TIMEOUT=float(os.environ.get("AI_QUEUE_TIMEOUT", 5)),
+        AI_ANALYSIS_CACHE_SIZE=int(os.environ.get("AI_ANALYSIS_CACHE_SIZE", 1000)),
+        AI_ANALYSIS_CACHE_TTL=int(
+            os.environ.get("AI_ANALYSIS_CACHE_TTL", 7 * 24 * 3600)
+        ),
+        AI_CHAT_SESSION_TTL=int(os.environ.get("AI_CHAT_SESSION_TTL", 3600)),
+        AI_CHAT_HISTORY_BUDGET=int(os.environ.get("AI_CHAT_HISTORY_BUDGET", 1500)),
+        AI_SUMMARY_WORKERS=int(os.environ.get("AI_SUMMARY_WORKERS", 1)),
+        AI_REVIEW_WORKERS=int(os.environ.get("AI_REVIEW_WORKERS", 1)),
+        AI_REVIEW_CONCURRENCY=int(os.environ.get("AI_REVIEW_CONCURRENCY", 2)),
     )
 
 
@@ -169,6 +236,11 @@ def init_extensions(app):
     - Initializes the database and sets up the migration system.
     - Creates the necessary tables in the database if they do not already exist.
     - Seeds the database with initial data if no users are present.
+    - Builds the materialized team progress if it is empty, e.g. on the first start after an upgrade.
+    - Creates the version row of the milestones if it is missing.
+    - Sizes the AI ranking cache from the `AI_RANKING_CACHE_SIZE` and `AI_RANKING_CACHE_TTL` settings.
+    - Configures the AI gateway from the `AI_TIMEOUT`, `AI_MAX_RETRIES`, `AI_MAX_CONCURRENCY` and
+      `AI_QUEUE_TIMEOUT` settings.
     - Configures the custom session interface and response class.
     """
     db.init_app(app)
@@ -181,6 +253,21 @@ def init_extensions(app):
         db.create_all()
         if not Users.query.first():
             seed_database(db)
+        if not TeamMilestoneProgress.query.first():
+            rebuild_team_progress()
+        if not MilestoneVersions.query.first():
+            db.session.add(MilestoneVersions(version=0))
+            db.session.commit()
+
+    ranking_cache.configure(
+        app.config["AI_RANKING_CACHE_SIZE"], app.config["AI_RANKING_CACHE_TTL"]
+    )
+    ai_gateway.configure(
+        app.config["AI_TIMEOUT"],
+        app.config["AI_MAX_RETRIES"],
+        app.config["AI_MAX_CONCURRENCY"],
+        app.config["AI_QUEUE_TIMEOUT"],
+    )
 
     app.session_interface = CustomSessionInterface()
     app.response_class = CustomResponse
@@ -274,6 +361,60 @@ def configure_logging(app):
     app.logger.setLevel(logging.INFO)
 
 
+def track_query_count(app):
+    """
+    Function: Track Query Count
+    ---------------------------
+    Counts the database queries run while handling each request and reports the count in the
+    `X-Query-Count` response header, to check that the number of queries of an endpoint does not grow with
+    the amount of data.
+
+    Parameters:
+    - app (Flask): The Flask application instance.
+
+    Behavior:
+    - The header is only added when `QUERY_COUNT_HEADER` is enabled or the application runs in debug mode.
+    - Queries run outside of a request, e.g. by the background workers, are not counted.
+    """
+    with app.app_context():
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def count_query(*args):
+            if has_request_context():
+                g.query_count = g.get("query_count", 0) + 1
+
+    @app.after_request
+    def add_query_count_header(response):
+        if app.config["QUERY_COUNT_HEADER"] or app.debug:
+            response.headers["X-Query-Count"] = str(g.get("query_count", 0))
+        return response
+
+
+def report_server_timing(app):
+    """
+    Function: Report Server Timing
+    -------------------------------
+    Reports the latency of the stages of a request in the `Server-Timing` response header, where browsers
+    show it next to the network timings.
+
+    Parameters:
+    - app (Flask): The Flask application instance.
+
+    Behavior:
+    - The stages are read from `g.server_timing`, a dictionary of stage names and their duration in seconds
+      filled by the endpoints. Requests without stages get no header.
+    """
+
+    @app.after_request
+    def add_server_timing_header(response):
+        timings = g.get("server_timing")
+        if timings:
+            response.headers["Server-Timing"] = ", ".join(
+                f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()
+            )
+        return response
+
+
 def create_app(database_uri, testing=False):
     """
     Function: Create Flask Application
@@ -291,6 +432,8 @@ def create_app(database_uri, testing=False):
     init_extensions(app)
     register_blueprints(app)
     setup_error_handlers(app)
+    track_query_count(app)
+    report_server_timing(app)
     if not testing:
         configure_logging(app)
 
@@ -0,0 +1,84 @@
+"""
+Module: Commit Fetch Benchmark
+-------------------------------
+This module benchmarks filling a cold commit statistics cache against the local fake GitHub server, with
+the REST sync for several sizes of the worker pool and with the GraphQL sync. Every request to the fake
+server takes a fixed latency, so the time spent by the sequential mode grows with the number of commits
+while the concurrent modes divide it by the pool size, and the GraphQL sync needs one request per 100
+commits.
+
+Usage:
+------
+    python -m benchmarks.bench_commit_fetch [--commits N] [--latency SECONDS] [--workers 1 4 8 16]
+"""
+
+import os
+
+os.environ.setdefault("AI_ACCESS_TOKEN", "benchmark")
+os.environ.setdefault("GITHUB_ACCESS_TOKEN", "benchmark")
+
+from application.setup import create_app
+from application.models import CommitStats, GithubSyncState, db
+from apis.teacher.github_stats import sync_commits
+from apis.teacher.github_graphql import sync_commits_graphql
+from tests.fake_github import FakeGithub
+from github import Github
+import argparse
+import time
+
+
+def run(commits, latency, workers):
+    """
+    Function: Run Benchmark
+    ------------------------
+    Syncs a repository of the given size into an empty cache once per pool size and once with GraphQL,
+    and prints the timings and numbers of API requests.
+
+    Parameters:
+    - commits (int): Number of commits in the repository.
+    - latency (float): Seconds every request to the fake server takes.
+    - workers (list): The pool sizes to benchmark.
+    """
+    app = create_app("sqlite:///benchmark.sqlite3", testing=True)
+    with app.app_context(), FakeGithub(latency=latency) as server:
+        server.add_commits("example/repo", commits)
+        print(f"{commits} commits, {latency * 1000:.0f}ms latency per request")
+        print(f"{'mode':>12} {'seconds':>8} {'speedup':>8} {'requests':>9}")
+
+        modes = [(f"rest x{size}", sync_commits, (size,)) for size in workers]
+        modes.append(("graphql", sync_commits_graphql, ()))
+
+        baseline = None
+        for mode, sync, args in modes:
+            db.session.query(CommitStats).delete()
+            db.session.query(GithubSyncState).delete()
+            db.session.commit()
+            server.requests.clear()
+
+            github_client = Github(
+                base_url=server.url,
+                per_page=100,
+                seconds_between_requests=None,
+                seconds_between_writes=None,
+            )
+            started = time.perf_counter()
+            sync(github_client, "example/repo", *args)
+            elapsed = time.perf_counter() - started
+            github_client.close()
+
+            baseline = baseline or elapsed
+            requests = sum(server.requests.values())
+            print(
+                f"{mode:>12} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x {requests:>9}"
+            )
+
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--commits", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+    run(args.commits, args.latency, args.workers)
@@ -0,0 +1,112 @@
+"""
+Module: Git Mirror Benchmark
+-----------------------------
+This module benchmarks the git mirror source of the commit statistics on a generated local repository:
+the first sync (clone and full `git log --numstat` pass), a refresh of the unchanged repository, a
+refresh after a push, and the aggregation of the statistics.
+
+Usage:
+------
+    python -m benchmarks.bench_git_mirror [--commits N]
+"""
+
+import os
+
+os.environ.setdefault("AI_ACCESS_TOKEN", "benchmark")
+os.environ.setdefault("GITHUB_ACCESS_TOKEN", "benchmark")
+
+from application.setup import create_app
+from application.models import CommitStats, GithubSyncState, db
+from apis.teacher.github_mirror import sync_commits_mirror
+from apis.teacher.github_stats import aggregate_commit_stats
+import argparse
+import functools
+import subprocess
+import tempfile
+import time
+
+
+def generate_repository(path, commits, start=0):
+    """
+    Function: Generate Repository
+    ------------------------------
+    Appends commits touching one file each to a local repository with `git fast-import`.
+
+    Parameters:
+    - path (str): The path of the repository.
+    - commits (int): Number of commits to append.
+    - start (int, optional): Index of the first generated commit. Defaults to 0.
+    """
+    stream = []
+    for index in range(start, start + commits):
+        message = f"Milestone-{1 + index % 6} Change {index}".encode()
+        content = "\n".join(f"line {index} {n}" for n in range(index % 20 + 1)).encode()
+        stream += [
+            b"commit refs/heads/main",
+            f"author Student {index % 4} <{index % 4}+student{index % 4}@users.noreply.github.com> "
+            f"{1700000000 + index * 60} +0000".encode(),
+            f"committer Student {index % 4} <student@example.com> {1700000000 + index * 60} +0000".encode(),
+            b"data " + str(len(message)).encode(),
+            message,
+        ]
+        if index == start > 0:
+            # Continue the existing history
+            stream.append(b"from refs/heads/main^0")
+        stream += [
+            f"M 100644 inline src/file_{index % 50}.txt".encode(),
+            b"data " + str(len(content)).encode(),
+            content,
+            b"",
+        ]
+    subprocess.run(
+        ["git", "-C", path, "fast-import", "--quiet"],
+        input=b"\n".join(stream) + b"\n",
+        check=True,
+    )
+
+
+def timed(label, function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    print(f"{label:>24} {(time.perf_counter() - started) * 1000:>9.1f}ms")
+    return result
+
+
+def run(commits):
+    """
+    Function: Run Benchmark
+    ------------------------
+    Syncs a generated repository of the given size through its local mirror and prints the timings.
+
+    Parameters:
+    - commits (int): Number of commits in the repository.
+    """
+    app = create_app("sqlite:///benchmark.sqlite3", testing=True)
+    with app.app_context(), tempfile.TemporaryDirectory() as folder:
+        origin = os.path.join(folder, "origin", "repo")
+        subprocess.run(["git", "init", "-q", "-b", "main", origin], check=True)
+        generate_repository(origin, commits)
+
+        mirrors = os.path.join(folder, "mirrors")
+        db.session.query(CommitStats).delete()
+        db.session.query(GithubSyncState).delete()
+        db.session.commit()
+
+        print(f"{commits} commits")
+        url = f"file://{origin}"
+        sync = functools.partial(sync_commits_mirror, allow_local=True)
+        timed("first sync", sync, url, "origin/repo", mirrors)
+        timed("unchanged refresh", sync, url, "origin/repo", mirrors)
+        generate_repository(origin, 10, start=commits)
+        timed("refresh after 10 pushes", sync, url, "origin/repo", mirrors)
+        timed("team statistics", aggregate_commit_stats, "origin/repo")
+        timed("member statistics", aggregate_commit_stats, "origin/repo", "student1")
+
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--commits", type=int, default=10000)
+    args = parser.parse_args()
+    run(args.commits)
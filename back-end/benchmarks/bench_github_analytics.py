@@ -0,0 +1,365 @@
+"""
+Module: GitHub Analytics Benchmark Suite
+-----------------------------------------
+This module benchmarks the GitHub statistics path end to end, `fetch_commit_details` and the
+`get_github_details` endpoint, against the fake GitHub server for every statistics source and repository
+size. Every strategy is measured on four scenarios:
+
+- cold: first computation of the statistics with an empty commit cache.
+- warm: recomputation without new commits.
+- push: recomputation after new commits were pushed.
+- endpoint: a `get_github_details` request with `refresh=1` after the push.
+
+Every scenario reports its wall time, number of GitHub API requests and peak memory (Python allocations of
+the application process traced with tracemalloc; the fake server runs in a separate process, so neither its
+CPU time nor its memory is counted). The results can be saved as JSON and compared with the results of a
+previous release to detect regressions.
+
+The "mirror" source needs git repositories instead of the GitHub API, see `bench_git_mirror`.
+
+Usage:
+------
+    python -m benchmarks.bench_github_analytics [--sizes 10 1000 10000 50000]
+        [--strategies rest-1 rest-8 graphql] [--fixture PATH] [--latency SECONDS] [--push N]
+        [--output results.json] [--baseline results.json] [--tolerance 0.2] [--skip-memory]
+"""
+
+import os
+
+os.environ.setdefault("AI_ACCESS_TOKEN", "benchmark")
+os.environ.setdefault("GITHUB_ACCESS_TOKEN", "benchmark")
+
+from application.setup import create_app
+from application.models import (
+    CommitActivity,
+    CommitStats,
+    GithubSnapshots,
+    GithubSyncState,
+    db,
+)
+from apis.teacher.setup import fetch_commit_details
+from apis.teacher.github_transport import (
+    GithubTelemetry,
+    ResponseStore,
+    install_transport,
+)
+from github import Github
+from unittest.mock import patch
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+# Statistics sources and their settings
+STRATEGIES = {
+    "rest-1": {"GITHUB_STATS_BACKEND": "rest", "GITHUB_FETCH_WORKERS": 1},
+    "rest-8": {"GITHUB_STATS_BACKEND": "rest", "GITHUB_FETCH_WORKERS": 8},
+    "graphql": {"GITHUB_STATS_BACKEND": "graphql"},
+}
+SCENARIOS = ("cold", "warm", "push", "endpoint")
+
+# Repository of the first team of the seed data, served by the fake server
+TEAM_ID = 1
+REPO_URL = "https://github.com/shrasinh/team_alpha"
+REPO_NAME = "shrasinh/team_alpha"
+
+BACKEND_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeGithubProcess:
+    """
+    Class: FakeGithubProcess
+    -------------------------
+    The fake GitHub server running in a child process and serving the benchmarked repository.
+
+    Methods:
+    - requests(): Returns the number of API requests served so far.
+    - push(count): Pushes synthetic commits to the repository.
+    - stop(): Stops the server.
+    """
+
+    def __init__(self, commits=0, fixture=None, latency=0.0):
+        command = [
+            sys.executable,
+            "-m",
+            "tests.fake_github",
+            "--repo",
+            REPO_NAME,
+            "--commits",
+            str(commits),
+            "--latency",
+            str(latency),
+            "--rate-limit",
+            str(10**9),
+        ]
+        if fixture:
+            command += ["--fixture", fixture]
+        self.process = subprocess.Popen(
+            command, cwd=BACKEND_FOLDER, stdout=subprocess.PIPE, text=True
+        )
+        self.url = self.process.stdout.readline().strip()
+
+    def call(self, method, path, body=None):
+        request = urllib.request.Request(
+            f"{self.url}{path}",
+            data=json.dumps(body).encode() if body is not None else None,
+            method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.load(response)
+
+    def requests(self):
+        return sum(self.call("GET", "/_fake/requests")["requests"].values())
+
+    def push(self, count):
+        self.call("POST", "/_fake/commits", {"repo": REPO_NAME, "count": count})
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+def measure(server, action, trace_memory=True):
+    """
+    Function: Measure
+    ------------------
+    Runs a benchmark scenario and measures its cost.
+
+    Parameters:
+    - server (FakeGithubProcess): The fake GitHub server.
+    - action (callable): The scenario.
+    - trace_memory (bool, optional): If False, the peak memory is not measured, which removes the overhead of
+      tracemalloc from the wall time. Defaults to True.
+
+    Returns:
+    - dict: The `seconds`, GitHub API `requests` and `peak_mb` (None if not measured) of the scenario.
+    """
+    requests = server.requests()
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    action()
+    seconds = time.perf_counter() - started
+    peak_mb = None
+    if trace_memory:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return {
+        "seconds": round(seconds, 4),
+        "requests": server.requests() - requests,
+        "peak_mb": round(peak_mb, 2) if peak_mb is not None else None,
+    }
+
+
+def run_strategy(app, token, strategy, server, push, trace_memory=True):
+    """
+    Function: Run Strategy
+    -----------------------
+    Runs every scenario of a statistics source against a freshly started fake server, starting from an empty
+    commit cache.
+
+    Parameters:
+    - app (Flask): The application.
+    - token (str): Authentication token of the instructor of the benchmarked team.
+    - strategy (str): Name of the statistics source, a key of `STRATEGIES`.
+    - server (FakeGithubProcess): The fake GitHub server.
+    - push (int): Number of commits pushed before the push scenario.
+    - trace_memory (bool, optional): Whether to measure the peak memory. Defaults to True.
+
+    Returns:
+    - dict: The measurements of every scenario, keyed by scenario.
+    """
+    github_client = install_transport(
+        Github(
+            base_url=server.url,
+            per_page=100,
+            seconds_between_requests=None,
+            seconds_between_writes=None,
+        ),
+        ResponseStore(),
+        GithubTelemetry(),
+    )
+
+    def fetch():
+        commit_details = fetch_commit_details(REPO_URL)
+        if "status" in commit_details:
+            raise RuntimeError(f"Fetching the statistics failed: {commit_details}")
+
+    def request_endpoint():
+        response = app.test_client().get(
+            f"/teacher/team_management/individual/github/{TEAM_ID}?refresh=1",
+            headers={"Authentication-Token": token},
+        )
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"The endpoint failed: {response.get_data(as_text=True)}"
+            )
+
+    results = {}
+    with app.app_context(), patch("apis.teacher.setup.github_client", github_client):
+        for model in (CommitStats, CommitActivity, GithubSyncState, GithubSnapshots):
+            db.session.query(model).delete()
+        db.session.commit()
+        app.config.update(STRATEGIES[strategy])
+
+        results["cold"] = measure(server, fetch, trace_memory)
+        results["warm"] = measure(server, fetch, trace_memory)
+        server.push(push)
+        results["push"] = measure(server, fetch, trace_memory)
+        results["endpoint"] = measure(server, request_endpoint, trace_memory)
+
+    github_client.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Function: Compare
+    ------------------
+    Finds the measurements that regressed compared with a previous run.
+
+    Parameters:
+    - results (list): The measurements of this run.
+    - baseline (list): The measurements of the previous run.
+    - tolerance (float): Relative increase of the wall time or peak memory tolerated, e.g. 0.2 for 20%.
+      Any increase of the number of API requests is a regression.
+
+    Returns:
+    - dict: The description of the regressions of every measurement, keyed by (size, strategy, scenario).
+    """
+    previous = {(r["size"], r["strategy"], r["scenario"]): r for r in baseline}
+    regressions = {}
+    for result in results:
+        key = (result["size"], result["strategy"], result["scenario"])
+        before = previous.get(key)
+        if not before:
+            continue
+
+        found = []
+        if result["requests"] > before["requests"]:
+            found.append(f"requests {before['requests']} -> {result['requests']}")
+        if result["seconds"] > before["seconds"] * (1 + tolerance):
+            found.append(f"seconds {before['seconds']} -> {result['seconds']}")
+        if (
+            result["peak_mb"] is not None
+            and before["peak_mb"] is not None
+            and result["peak_mb"] > before["peak_mb"] * (1 + tolerance)
+        ):
+            found.append(f"peak {before['peak_mb']}MB -> {result['peak_mb']}MB")
+        if found:
+            regressions[key] = ", ".join(found)
+    return regressions
+
+
+def run(sizes, strategies, latency=0.0, push=10, fixture=None, trace_memory=True):
+    """
+    Function: Run Benchmark
+    ------------------------
+    Runs every scenario of every strategy for every repository size and prints the measurements.
+
+    Parameters:
+    - sizes (list): Numbers of commits of the synthetic repositories.
+    - strategies (list): Names of the statistics sources, keys of `STRATEGIES`.
+    - latency (float, optional): Seconds every request to the fake server takes. Defaults to 0.
+    - push (int, optional): Number of commits pushed before the push scenario. Defaults to 10.
+    - fixture (str, optional): JSON fixture of a recorded repository (see `record_github_fixture`) to
+      benchmark instead of synthetic repositories. Defaults to None.
+    - trace_memory (bool, optional): Whether to measure the peak memory. Defaults to True.
+
+    Returns:
+    - list: The measurements, each containing the `size`, `strategy`, `scenario`, `seconds`, `requests`
+      and `peak_mb`.
+    """
+    repositories = [(size, size, None) for size in sizes]
+    if fixture:
+        with open(fixture) as file:
+            name, commits = next(iter(json.load(file)["repos"].items()))
+        recorded = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        with recorded:
+            json.dump({"repos": {REPO_NAME: commits}}, recorded)
+        repositories = [(name, 0, recorded.name)]
+
+    app = create_app("sqlite:///benchmark.sqlite3", testing=True)
+    response = app.test_client().post(
+        "/login?include_auth_token",
+        json={"username": "profsmith", "password": "password123"},
+    )
+    token = response.json["response"]["user"]["authentication_token"]
+
+    print(
+        f"{'size':>8} {'strategy':>9} {'scenario':>9} {'seconds':>9} {'requests':>9} {'peak MB':>8}"
+    )
+    results = []
+    try:
+        for size, commits, path in repositories:
+            for strategy in strategies:
+                server = FakeGithubProcess(commits, path, latency)
+                try:
+                    measurements = run_strategy(
+                        app, token, strategy, server, push, trace_memory
+                    )
+                finally:
+                    server.stop()
+
+                for scenario in SCENARIOS:
+                    result = {
+                        "size": size,
+                        "strategy": strategy,
+                        "scenario": scenario,
+                        **measurements[scenario],
+                    }
+                    results.append(result)
+                    peak = result["peak_mb"] if trace_memory else "-"
+                    print(
+                        f"{size:>8} {strategy:>9} {scenario:>9} {result['seconds']:>9.3f} "
+                        f"{result['requests']:>9} {peak:>8}"
+                    )
+    finally:
+        with app.app_context():
+            db.drop_all()
+        if fixture:
+            os.remove(repositories[0][2])
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument(
+        "--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES)
+    )
+    parser.add_argument("--fixture", help="JSON fixture of a recorded repository")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--push", type=int, default=10)
+    parser.add_argument("--output", help="file to save the results to, as JSON")
+    parser.add_argument("--baseline", help="results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--skip-memory", action="store_true")
+    args = parser.parse_args()
+
+    results = run(
+        args.sizes,
+        args.strategies,
+        args.latency,
+        args.push,
+        args.fixture,
+        not args.skip_memory,
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"results": results}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)["results"], args.tolerance)
+        for (size, strategy, scenario), description in regressions.items():
+            print(f"REGRESSION {size} {strategy} {scenario}: {description}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
@@ -0,0 +1,72 @@
+"""
+Module: GitHub Fixture Recorder
+--------------------------------
+This module records the commits of GitHub repositories, with their line statistics, into a JSON fixture
+that the fake GitHub server can replay offline (see `FakeGithub.load_fixture` and the `--fixture` option of
+`bench_github_analytics`). Recording needs network access and costs one GitHub API request per commit,
+plus one per 100 commits for the commit listing.
+
+Usage:
+------
+    python -m benchmarks.record_github_fixture owner/name [owner/name ...] --output fixture.json [--limit N]
+"""
+
+from github import Github, Auth
+import argparse
+import json
+import os
+
+
+def record(github_client, repo_names, limit=None):
+    """
+    Function: Record
+    -----------------
+    Reads the commits of the default branch of GitHub repositories.
+
+    Parameters:
+    - github_client (github.Github): The GitHub client used for the API calls.
+    - repo_names (list): The repository identifiers in the `owner/name` format.
+    - limit (int, optional): Maximum number of most recent commits recorded per repository. Defaults to None
+      (all commits).
+
+    Returns:
+    - dict: The commits of every repository, newest first, in the format of `FakeGithub.repos`.
+    """
+    repos = {}
+    for repo_name in repo_names:
+        commits = []
+        for commit in github_client.get_repo(repo_name).get_commits():
+            if limit is not None and len(commits) == limit:
+                break
+            commits.append(
+                {
+                    "sha": commit.sha,
+                    "author": (
+                        commit.author.login
+                        if commit.author
+                        else commit.commit.author.name
+                    ),
+                    "message": commit.commit.message,
+                    "date": commit.commit.author.date.isoformat(),
+                    "additions": commit.stats.additions,
+                    "deletions": commit.stats.deletions,
+                }
+            )
+        repos[repo_name] = commits
+    return repos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "repos", nargs="+", help="repositories in the owner/name format"
+    )
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args()
+
+    github_client = Github(
+        auth=Auth.Token(os.environ["GITHUB_ACCESS_TOKEN"]), per_page=100
+    )
+    with open(args.output, "w") as file:
+        json.dump({"repos": record(github_client, args.repos, args.limit)}, file)
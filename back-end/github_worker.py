@@ -0,0 +1,72 @@
+"""
+Module: GitHub Statistics Worker
+---------------------------------
+This module runs the background worker that refreshes the GitHub statistics of all teams on a schedule and
+stores them as snapshots. The GitHub endpoints read these snapshots instead of contacting GitHub on every
+request.
+
+Usage:
+------
+    python github_worker.py [--interval SECONDS] [--once]
+
+Options:
+--------
+- --interval: Seconds to wait between two refreshes (default: the GITHUB_WORKER_INTERVAL environment
+  variable, or 600).
+- --once: Refresh the snapshots a single time and exit.
+"""
+
+from application.setup import app
+from apis.teacher.github_snapshots import refresh_github_snapshots
+from apis.teacher.github_transport import github_telemetry
+import argparse
+import os
+import time
+
+
+def run(interval, once=False):
+    """
+    Function: Run Worker
+    ---------------------
+    Refreshes the GitHub statistics snapshots of all teams, then waits for the given interval and repeats.
+
+    Parameters:
+    - interval (int): Seconds to wait between two refreshes.
+    - once (bool, optional): If True, refreshes a single time and returns. Defaults to False.
+    """
+    while True:
+        with app.app_context():
+            started = time.monotonic()
+            try:
+                refreshed = refresh_github_snapshots()
+                app.logger.info(
+                    f"Refreshed {refreshed} GitHub snapshots in {time.monotonic() - started:.1f}s"
+                )
+                usage = github_telemetry.snapshot()
+                app.logger.info(
+                    f"GitHub API: {usage['calls']} calls, {usage['not_modified']} not modified, "
+                    f"{usage['rate_limit']['remaining']} requests left"
+                )
+            except Exception as e:
+                app.logger.error(f"Refreshing GitHub snapshots failed:\n{e}")
+
+        if once:
+            return
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Refresh the GitHub statistics snapshots of all teams."
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=int(os.environ.get("GITHUB_WORKER_INTERVAL", 600)),
+        help="seconds to wait between two refreshes",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="refresh a single time and exit"
+    )
+    args = parser.parse_args()
+    run(args.interval, args.once)
@@ -0,0 +1,20 @@
+"""
+Module: Team Progress Rebuild
+------------------------------
+This module recomputes the materialized progress of every team in every milestone from the tasks and
+submissions. The progress is kept up to date by the APIs that change submissions, feedback and milestones;
+this command repairs it after the database was changed by other means, e.g. by hand or by a restored backup.
+
+Usage:
+------
+    python rebuild_progress.py
+"""
+
+from application.setup import app
+from apis.teacher.team_progress import rebuild_team_progress
+
+if __name__ == "__main__":
+    with app.app_context():
+        rows = rebuild_team_progress()
+        app.logger.info(f"Rebuilt {rows} team progress rows")
+        print(f"Rebuilt {rows} team progress rows")
@@ -1,6 +1,8 @@
 import pytest
 from application.setup import create_app
-from application.models import db
+from application.models import DocumentAnalyses, db
+from apis.teacher.ranking_cache import ranking_cache
+from apis.teacher.milestone_context import milestone_context
 
 
 @pytest.fixture(scope="module")
@@ -12,6 +14,27 @@ def client():
         db.drop_all()
 
 
+@pytest.fixture(autouse=True)
+def clear_ranking_cache():
+    # Rankings cached by a previous test would hide the AI response mocked by the next one
+    ranking_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_milestone_context():
+    # A chat prompt rendered by a previous test would hide the milestones mocked by the next one
+    milestone_context.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_analysis_cache(request):
+    # Analyses cached by a previous test would hide the AI response mocked by the next one
+    if "client" in request.fixturenames:
+        with request.getfixturevalue("client").application.app_context():
+            DocumentAnalyses.query.delete()
+            db.session.commit()
+
+
 @pytest.fixture
 def ta_token(client):
     response = client.post(
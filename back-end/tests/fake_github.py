@@ -0,0 +1,442 @@
+"""
+Module: Fake GitHub Server
+---------------------------
+This module runs a local HTTP server implementing the subset of the GitHub REST and GraphQL APIs used by
+the commit statistics store, so the GitHub integration can be tested and benchmarked without network access. The
+server serves synthetic repositories of any size (tens of thousands of commits) or repositories recorded from
+GitHub (see `benchmarks/record_github_fixture.py`), and simulates network latency, pagination, rate limit
+headers, primary rate limit exhaustion and secondary rate limit responses.
+
+Usage:
+------
+    with FakeGithub(latency=0.05) as server:
+        server.add_commits("example/repo", 100)
+        github_client = Github(base_url=server.url)
+
+    python -m tests.fake_github --repo example/repo --commits 50000 [--fixture PATH] [--latency SECONDS]
+
+Run as a script, the server prints its URL and serves until interrupted. Besides the GitHub routes, it
+answers the control routes `GET /_fake/requests` (requests served per endpoint) and `POST /_fake/commits`
+(JSON `{"repo": ..., "count": ...}`, pushes synthetic commits), which do not count as API requests.
+
+Classes:
+--------
+1. FakeGithub: The fake GitHub server.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import argparse
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+
+PRIMARY_RATE_LIMIT_MESSAGE = "API rate limit exceeded for 127.0.0.1."
+SECONDARY_RATE_LIMIT_MESSAGE = "You have exceeded a secondary rate limit. Please wait a few minutes before you try again."
+# Largest page size accepted by the GitHub REST API
+MAX_PER_PAGE = 100
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class FakeGithub:
+    """
+    Class: FakeGithub
+    ------------------
+    A local GitHub REST API stand-in serving commits of in-memory repositories.
+
+    Attributes:
+    - url (str): Base URL of the server, to be passed as `base_url` to a GitHub client.
+    - latency (float): Seconds every request takes to answer.
+    - rate_limit (int): Size of the primary rate limit window.
+    - remaining (int): Requests left in the current rate limit window.
+    - reset_at (int): UNIX timestamp at which the rate limit window resets. Once the window is exhausted, the
+      API requests are answered with a primary rate limit error until then.
+    - secondary_limits (int): Number of upcoming commit detail requests answered with a secondary rate limit.
+    - repos (dict): The commits of every repository, newest first.
+    - requests (dict): Number of requests served, keyed by endpoint.
+    - max_in_flight (int): Highest number of requests served at the same time.
+
+    Methods:
+    - add_commits(repo_name, count, authors=("alice", "bob"), milestone_id=1): Pushes commits to a repository.
+    - add_commit(repo_name, sha, author, message, date, additions, deletions): Pushes a single commit. An
+      author of None is a git author GitHub does not link to an account.
+    - save_fixture(path): Writes the repositories to a JSON fixture.
+    - load_fixture(path): Adds the repositories of a JSON fixture.
+    - start(): Starts serving in a background thread.
+    - stop(): Stops the server.
+    """
+
+    def __init__(
+        self, latency=0.0, rate_limit=5000, reset_in=3600, secondary_limits=0, port=0
+    ):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset_in = reset_in
+        self.reset_at = int(time.time()) + reset_in
+        self.secondary_limits = secondary_limits
+        self.repos = {}
+        self.indexes = {}
+        self.requests = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = FakeServer(("127.0.0.1", port), self.handler_class())
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_commits(self, repo_name, count, authors=("alice", "bob"), milestone_id=1):
+        commits = self.repos.get(repo_name, [])
+        pushed = [
+            {
+                "sha": hashlib.sha1(f"{repo_name}/{index}".encode()).hexdigest(),
+                "author": authors[index % len(authors)],
+                "message": f"Milestone-{milestone_id} Change {index}",
+                "date": f"2024-11-{1 + index % 28:02d}T10:00:00Z",
+                "additions": 10 + index % 7,
+                "deletions": index % 3,
+            }
+            for index in range(len(commits), len(commits) + count)
+        ]
+        self.repos[repo_name] = pushed[::-1] + commits
+
+    def add_commit(self, repo_name, sha, author, message, date, additions, deletions):
+        commit = {
+            "sha": sha,
+            "author": author,
+            "message": message,
+            "date": date,
+            "additions": additions,
+            "deletions": deletions,
+        }
+        self.repos[repo_name] = [commit] + self.repos.get(repo_name, [])
+
+    def save_fixture(self, path):
+        with open(path, "w") as file:
+            json.dump({"repos": self.repos}, file)
+
+    def load_fixture(self, path):
+        with open(path) as file:
+            self.repos.update(json.load(file)["repos"])
+
+    def find_commit(self, repo_name, sha):
+        # The SHA index is rebuilt whenever the commit list of the repository was replaced or changed size
+        commits = self.repos.get(repo_name, [])
+        with self.lock:
+            index = self.indexes.get(repo_name)
+            if not index or index[0] is not commits or index[1] != len(commits):
+                index = (commits, len(commits), {c["sha"]: c for c in commits})
+                self.indexes[repo_name] = index
+        return index[2].get(sha)
+
+    def commit_json(self, repo_name, commit, detailed=False):
+        signature = {
+            "name": commit["author"] or "unknown",
+            "email": f"{commit['author'] or 'unknown'}@example.com",
+            "date": commit["date"],
+        }
+        data = {
+            "sha": commit["sha"],
+            "url": f"{self.url}/repos/{repo_name}/commits/{commit['sha']}",
+            "commit": {
+                "message": commit["message"],
+                "author": signature,
+                "committer": signature,
+            },
+            "author": {"login": commit["author"]} if commit["author"] else None,
+        }
+        if detailed:
+            data["stats"] = {
+                "additions": commit["additions"],
+                "deletions": commit["deletions"],
+                "total": commit["additions"] + commit["deletions"],
+            }
+            data["files"] = []
+        return data
+
+    def handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self.serve()
+
+            def do_POST(self):
+                self.serve()
+
+            def serve(self):
+                with fake.lock:
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                    fake.route(self)
+                finally:
+                    with fake.lock:
+                        fake.in_flight -= 1
+
+        return Handler
+
+    def count(self, endpoint, charged=True):
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            if charged:
+                self.remaining = max(self.remaining - 1, 0)
+            return self.remaining
+
+    def rate_limited(self):
+        with self.lock:
+            if time.time() >= self.reset_at:
+                self.remaining = self.rate_limit
+                self.reset_at = int(time.time()) + self.reset_in
+            return self.remaining == 0
+
+    def respond(self, handler, status, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json; charset=utf-8")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.send_header("X-RateLimit-Limit", str(self.rate_limit))
+        handler.send_header("X-RateLimit-Remaining", str(self.remaining))
+        handler.send_header("X-RateLimit-Reset", str(self.reset_at))
+        handler.send_header("X-RateLimit-Used", str(self.rate_limit - self.remaining))
+        handler.send_header("X-RateLimit-Resource", "core")
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def route(self, handler):
+        url = urlparse(handler.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path.startswith("/_fake/"):
+            return self.control(handler, url.path)
+        if url.path != "/rate_limit" and self.rate_limited():
+            self.count("rate_limited", charged=False)
+            return self.respond(handler, 403, {"message": PRIMARY_RATE_LIMIT_MESSAGE})
+
+        match = re.fullmatch(r"/repos/([^/]+/[^/]+)/commits/([0-9a-f]+)", url.path)
+        if match:
+            return self.get_commit(handler, *match.groups())
+        match = re.fullmatch(r"/repos/([^/]+/[^/]+)/commits", url.path)
+        if match:
+            return self.list_commits(handler, match.group(1), query)
+        match = re.fullmatch(
+            r"/repos/([^/]+/[^/]+)/compare/([0-9a-f]+)\.\.\.([0-9a-f]+)", url.path
+        )
+        if match:
+            return self.compare(handler, *match.groups())
+        if url.path == "/graphql" and handler.command == "POST":
+            return self.graphql(handler)
+        if url.path == "/rate_limit":
+            self.count("rate_limit")
+            core = {
+                "limit": self.rate_limit,
+                "remaining": self.remaining,
+                "reset": self.reset_at,
+            }
+            return self.respond(
+                handler, 200, {"resources": {"core": core}, "rate": core}
+            )
+        self.respond(handler, 404, {"message": "Not Found"})
+
+    def get_commit(self, handler, repo_name, sha):
+        with self.lock:
+            limited = self.secondary_limits > 0
+            if limited:
+                self.secondary_limits -= 1
+        if limited:
+            self.count("secondary_limit")
+            return self.respond(
+                handler,
+                403,
+                {"message": SECONDARY_RATE_LIMIT_MESSAGE},
+                {"Retry-After": "0"},
+            )
+
+        self.count("commit")
+        commit = self.find_commit(repo_name, sha)
+        if commit is None:
+            return self.respond(handler, 404, {"message": "Not Found"})
+        self.respond(handler, 200, self.commit_json(repo_name, commit, detailed=True))
+
+    def list_commits(self, handler, repo_name, query):
+        commits = self.repos.get(repo_name)
+        per_page = min(int(query.get("per_page", 30)), MAX_PER_PAGE)
+        page = int(query.get("page", 1))
+
+        # Not Modified answers do not count against the rate limit
+        etag = f'"{commits[0]["sha"]}-{per_page}-{page}"' if commits else None
+        if etag and handler.headers.get("If-None-Match") == etag:
+            self.count("commits", charged=False)
+            return self.respond(handler, 304, headers={"ETag": etag})
+
+        self.count("commits")
+        if commits is None:
+            return self.respond(handler, 404, {"message": "Not Found"})
+        if not commits:
+            return self.respond(handler, 409, {"message": "Git Repository is empty."})
+
+        chunk = commits[(page - 1) * per_page : page * per_page]
+        last_page = max(math.ceil(len(commits) / per_page), 1)
+        link = f"{self.url}/repos/{repo_name}/commits?per_page={per_page}&page="
+        links = []
+        if page < last_page:
+            links += [
+                f'<{link}{page + 1}>; rel="next"',
+                f'<{link}{last_page}>; rel="last"',
+            ]
+        if page > 1:
+            links += [f'<{link}{page - 1}>; rel="prev"', f'<{link}1>; rel="first"']
+        headers = {"ETag": etag}
+        if links:
+            headers["Link"] = ", ".join(links)
+        self.respond(
+            handler, 200, [self.commit_json(repo_name, c) for c in chunk], headers
+        )
+
+    def compare(self, handler, repo_name, base, head):
+        self.count("compare")
+        shas = [c["sha"] for c in self.repos.get(repo_name, [])]
+        if base not in shas or head not in shas:
+            return self.respond(handler, 404, {"message": "Not Found"})
+
+        behind_by = max(shas.index(head) - shas.index(base), 0)
+        ahead = self.repos[repo_name][shas.index(head) : shas.index(base)]
+        self.respond(
+            handler,
+            200,
+            {
+                "url": f"{self.url}/repos/{repo_name}/compare/{base}...{head}",
+                "status": "ahead" if not behind_by else "diverged",
+                "ahead_by": len(ahead),
+                "behind_by": behind_by,
+                "total_commits": len(ahead),
+                "commits": [self.commit_json(repo_name, c) for c in reversed(ahead)],
+            },
+        )
+
+    def graphql(self, handler):
+        self.count("graphql")
+        length = int(handler.headers.get("Content-Length", 0))
+        variables = json.loads(handler.rfile.read(length))["variables"]
+        repo_name = f"{variables['owner']}/{variables['name']}"
+
+        commits = self.repos.get(repo_name)
+        if commits is None:
+            return self.respond(
+                handler,
+                200,
+                {
+                    "data": {"repository": None},
+                    "errors": [
+                        {
+                            "type": "NOT_FOUND",
+                            "message": f"Could not resolve to a Repository with the name '{repo_name}'.",
+                        }
+                    ],
+                },
+            )
+        if not commits:
+            return self.respond(
+                handler, 200, {"data": {"repository": {"defaultBranchRef": None}}}
+            )
+
+        offset = int(variables.get("cursor") or 0)
+        chunk = commits[offset : offset + variables["first"]]
+        nodes = [
+            {
+                "oid": c["sha"],
+                "message": c["message"],
+                "additions": c["additions"],
+                "deletions": c["deletions"],
+                "authoredDate": c["date"],
+                "author": {"user": {"login": c["author"]} if c["author"] else None},
+            }
+            for c in chunk
+        ]
+        history = {
+            "pageInfo": {
+                "hasNextPage": offset + len(chunk) < len(commits),
+                "endCursor": str(offset + len(chunk)),
+            },
+            "nodes": nodes,
+        }
+        target = {
+            "oid": commits[0]["sha"],
+            "committedDate": commits[0]["date"],
+            "history": history,
+        }
+        self.respond(
+            handler,
+            200,
+            {"data": {"repository": {"defaultBranchRef": {"target": target}}}},
+        )
+
+    def control(self, handler, path):
+        if path == "/_fake/requests" and handler.command == "GET":
+            with self.lock:
+                return self.respond(handler, 200, {"requests": dict(self.requests)})
+        if path == "/_fake/commits" and handler.command == "POST":
+            length = int(handler.headers.get("Content-Length", 0))
+            body = json.loads(handler.rfile.read(length))
+            self.add_commits(body["repo"], body["count"])
+            return self.respond(
+                handler, 201, {"commits": len(self.repos[body["repo"]])}
+            )
+        self.respond(handler, 404, {"message": "Not Found"})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake GitHub API.")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=5000)
+    parser.add_argument("--repo", default="example/repo")
+    parser.add_argument("--commits", type=int, default=0)
+    parser.add_argument("--fixture", help="JSON fixture of recorded repositories")
+    args = parser.parse_args()
+
+    fake = FakeGithub(latency=args.latency, rate_limit=args.rate_limit, port=args.port)
+    if args.fixture:
+        fake.load_fixture(args.fixture)
+    if args.commits:
+        fake.add_commits(args.repo, args.commits)
+
+    print(fake.url, flush=True)
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
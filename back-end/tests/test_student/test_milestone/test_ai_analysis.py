@@ -41,7 +41,7 @@ def past_deadline_submission():
 @patch("apis.student.milestone_management.Submissions.query")
 @patch("os.path.exists")
 @patch("builtins.open", new_callable=mock_open, read_data=b"Mocked PDF content")
-@patch("apis.student.milestone_management.PdfReader")
+@patch("apis.teacher.submission_review.PdfReader")
 def test_get_ai_analysis_success(
     mock_pdf_reader,
     mock_file,
@@ -154,7 +154,7 @@ def test_get_ai_analysis_file_not_found(
 @patch("apis.student.milestone_management.Submissions.query")
 @patch("os.path.exists")
 @patch("builtins.open", new_callable=mock_open, read_data=b"Mocked PDF content")
-@patch("apis.student.milestone_management.PdfReader")
+@patch("apis.teacher.submission_review.PdfReader")
 def test_get_ai_analysis_ai_error(
     mock_pdf_reader,
     mock_file,
@@ -0,0 +1,123 @@
+from io import BytesIO
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+import pytest
+from apis.teacher.analysis_cache import (
+    get_cached_analysis,
+    save_analysis,
+    invalidate_document_analyses,
+)
+from application.models import DocumentAnalyses, Milestones, db
+
+
+@pytest.fixture
+def upload_folder(client, tmp_path):
+    previous = client.application.config["UPLOAD_FOLDER"]
+    client.application.config["UPLOAD_FOLDER"] = str(tmp_path)
+    yield
+    client.application.config["UPLOAD_FOLDER"] = previous
+
+
+@pytest.fixture
+def cache_settings(client):
+    previous = {
+        key: client.application.config[key]
+        for key in ("AI_ANALYSIS_CACHE_SIZE", "AI_ANALYSIS_CACHE_TTL")
+    }
+    yield client.application.config
+    client.application.config.update(previous)
+
+
+def ai_response(content):
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+
+def test_repeated_analysis_is_served_from_cache(
+    client, instructor_token, student_token, upload_folder
+):
+    """
+    Test that the analysis of an unchanged document is reused, and recomputed once the document is replaced.
+    """
+    deadline = datetime.now(timezone.utc) + timedelta(days=1)
+    response = client.post(
+        "/teacher/milestone_management",
+        json={
+            "title": "Cached Analysis Milestone",
+            "description": "Milestone analyzed by the AI",
+            "deadline": deadline.strftime("%a, %d %b %Y %H:%M:%S %Z"),
+            "tasks": [{"description": "Write the report"}],
+        },
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 201
+
+    with client.application.app_context():
+        milestone = Milestones.query.filter_by(title="Cached Analysis Milestone").one()
+        milestone_id, task_id = milestone.id, milestone.task_milestones[0].id
+
+    def submit(content):
+        response = client.post(
+            f"/student/milestone_management/individual/{milestone_id}",
+            data={str(task_id): (BytesIO(content), "report.pdf")},
+            content_type="multipart/form-data",
+            headers={"Authentication-Token": student_token},
+        )
+        assert response.status_code == 201
+
+    def analyze():
+        return client.get(
+            f"/student/milestone_management/individual/ai_analysis/{task_id}",
+            headers={"Authentication-Token": student_token},
+        )
+
+    submit(b"First version")
+    with patch("apis.teacher.submission_review.PdfReader") as pdf_reader, patch(
+        "apis.student.milestone_management.ai_client.chat.completions.create",
+        side_effect=[ai_response("First analysis"), ai_response("Second analysis")],
+    ) as create:
+        pdf_reader.return_value.pages = [MagicMock(extract_text=lambda: "Report")]
+
+        first, second = analyze(), analyze()
+        assert first.json["analysis"] == second.json["analysis"] == "First analysis"
+        assert first.headers["X-Analysis-Cache"] == "miss"
+        assert second.headers["X-Analysis-Cache"] == "hit"
+        assert create.call_count == pdf_reader.call_count == 1
+
+        submit(b"Second version")
+        with client.application.app_context():
+            assert DocumentAnalyses.query.count() == 0
+
+        third = analyze()
+        assert third.json["analysis"] == "Second analysis"
+        assert third.headers["X-Analysis-Cache"] == "miss"
+        assert create.call_count == 2
+
+    response = client.delete(
+        f"/teacher/milestone_management/{milestone_id}",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 200
+
+
+def test_cache_evicts_least_recently_used_and_expired_analyses(client, cache_settings):
+    """
+    Test that the cache keeps the most recently used analyses and does not return expired ones.
+    """
+    cache_settings["AI_ANALYSIS_CACHE_SIZE"] = 2
+    with client.application.app_context():
+        save_analysis("a", "document-a", "Analysis A")
+        save_analysis("b", "document-b", "Analysis B")
+        assert get_cached_analysis("a") == "Analysis A"
+        save_analysis("c", "document-c", "Analysis C")
+
+        assert get_cached_analysis("b") is None
+        assert get_cached_analysis("a") == "Analysis A"
+        assert get_cached_analysis("c") == "Analysis C"
+
+        invalidate_document_analyses("document-c")
+        db.session.commit()
+        assert get_cached_analysis("c") is None
+
+        cache_settings["AI_ANALYSIS_CACHE_TTL"] = 0
+        assert get_cached_analysis("a") is None
+        assert DocumentAnalyses.query.count() == 0
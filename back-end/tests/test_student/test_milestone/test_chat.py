@@ -1,4 +1,6 @@
 from datetime import datetime
+from types import SimpleNamespace
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -124,3 +126,52 @@ def test_chat_no_milestones(mock_ai_client, mock_db_query, client, student_token
     data = response.get_json()
     assert "analysis" in data
     assert data["analysis"] == "No milestones available"
+
+
+def completion_chunk(content, finish_reason=None):
+    return SimpleNamespace(
+        choices=[
+            SimpleNamespace(
+                delta=SimpleNamespace(content=content), finish_reason=finish_reason
+            )
+        ]
+    )
+
+
+@patch("apis.student.milestone_management.db.session.query")
+@patch("apis.student.milestone_management.ai_client.chat.completions.create")
+def test_chat_streams_server_sent_events(
+    mock_ai_client, mock_db_query, client, student_token, mock_milestones
+):
+    """
+    Test that the answer is relayed as server-sent events, piece by piece, when the client accepts them.
+    """
+    mock_db_query.return_value.all.return_value = mock_milestones
+    mock_ai_client.return_value = iter(
+        [
+            completion_chunk("Milestone 1 has "),
+            completion_chunk("two tasks."),
+            completion_chunk(None, "stop"),
+        ]
+    )
+
+    response = client.post(
+        "/student/chat",
+        json={"message": "What are the tasks for Milestone 1?"},
+        headers={"Authentication-Token": student_token, "Accept": "text/event-stream"},
+    )
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert mock_ai_client.call_args.kwargs["stream"] is True
+
+    events = [
+        (lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: ")))
+        for lines in (event.split("\n") for event in body.strip().split("\n\n"))
+    ]
+    assert events == [
+        ("token", {"content": "Milestone 1 has "}),
+        ("token", {"content": "two tasks."}),
+        ("done", {"finish_reason": "stop"}),
+    ]
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from apis.teacher.milestone_context import (
+    MilestoneContext,
+    bump_milestone_version,
+    read_milestone_version,
+)
+from application.models import Milestones, db
+
+
+def ai_response():
+    return MagicMock(choices=[MagicMock(message=MagicMock(content="AI response"))])
+
+
+def chat(client, student_token):
+    with patch(
+        "apis.student.milestone_management.ai_client.chat.completions.create",
+        return_value=ai_response(),
+    ) as create:
+        response = client.post(
+            "/student/chat",
+            json={"message": "When is the next deadline?"},
+            headers={"Authentication-Token": student_token},
+        )
+    assert response.status_code == 200
+    return create.call_args.kwargs["messages"][0]["content"], response
+
+
+def test_chat_reuses_milestone_context_until_milestones_change(
+    client, instructor_token, student_token
+):
+    """
+    Test that chat messages reuse the same prompt, only reading the version of the milestones, until a
+    milestone is changed.
+    """
+    first_prompt, first = chat(client, student_token)
+    second_prompt, second = chat(client, student_token)
+    # The queries of the authentication, without the chat
+    authentication = client.post(
+        "/student/chat", json={}, headers={"Authentication-Token": student_token}
+    )
+
+    assert second_prompt == first_prompt
+    assert int(second.headers["X-Query-Count"]) == (
+        int(authentication.headers["X-Query-Count"]) + 1
+    )
+    assert int(first.headers["X-Query-Count"]) > int(second.headers["X-Query-Count"])
+
+    deadline = datetime.now(timezone.utc) + timedelta(days=1)
+    response = client.post(
+        "/teacher/milestone_management",
+        json={
+            "title": "Chat Context Milestone",
+            "description": "Milestone described to the chat assistant",
+            "deadline": deadline.strftime("%a, %d %b %Y %H:%M:%S %Z"),
+            "tasks": [{"description": "Prepare the demo"}],
+        },
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 201
+
+    third_prompt, _ = chat(client, student_token)
+    assert "Chat Context Milestone" in third_prompt
+    assert "Prepare the demo" in third_prompt
+
+    with client.application.app_context():
+        milestone = Milestones.query.filter_by(title="Chat Context Milestone").one()
+        db.session.delete(milestone)
+        db.session.commit()
+
+
+def test_context_rendered_during_a_change_is_not_kept(client):
+    """
+    Test that a context rendered while the milestones changed is rendered again on the next use.
+    """
+    context = MilestoneContext()
+    renders = []
+
+    def render():
+        renders.append(None)
+        if len(renders) == 1:
+            bump_milestone_version()
+            db.session.commit()
+        return f"context {len(renders)}"
+
+    with client.application.app_context():
+        assert context.get(render) == "context 1"
+        assert context.get(render) == "context 2"
+        assert context.get(render) == "context 2"
+
+
+def test_milestone_version_is_shared_by_worker_processes(client):
+    """
+    Test that a milestone changed through another worker process, whose rendered context is separate, is
+    picked up by the next use of the context.
+    """
+    context = MilestoneContext()
+    renders = []
+
+    def render():
+        renders.append(None)
+        return f"context {len(renders)}"
+
+    with client.application.app_context():
+        version = read_milestone_version()
+        assert context.get(render) == "context 1"
+        assert context.get(render) == "context 1"
+
+        # Another process only changes the version stored in the database
+        bump_milestone_version()
+        db.session.commit()
+        assert read_milestone_version() == version + 1
+        assert context.get(render) == "context 2"
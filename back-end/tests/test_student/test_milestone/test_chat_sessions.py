@@ -0,0 +1,327 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import json
+import pytest
+from werkzeug.test import EnvironBuilder
+from apis.student.chat_sessions import split_chat_history, summary_jobs
+from apis.teacher.ai_gateway import ai_gateway
+from application.models import ChatSessions, db
+
+CREATE = "apis.student.chat_sessions.ai_client.chat.completions.create"
+
+
+def ai_response(content):
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+
+@pytest.fixture
+def session_id(client, student_token):
+    response = client.post(
+        "/student/chat/sessions", headers={"Authentication-Token": student_token}
+    )
+    assert response.status_code == 201
+    assert "expires_at" in response.get_json()
+    return response.get_json()["session_id"]
+
+
+def send(client, student_token, session_id, message, answer="AI response"):
+    with patch(CREATE, return_value=ai_response(answer)) as create:
+        response = client.post(
+            f"/student/chat/sessions/{session_id}",
+            json={"message": message},
+            headers={"Authentication-Token": student_token},
+        )
+    return response, create
+
+
+def test_chat_session_sends_previous_messages(client, student_token, session_id):
+    """
+    Test that a message of a chat session is sent with the previous messages of the session.
+    """
+    response, _ = send(
+        client, student_token, session_id, "When is milestone 1 due?", "Friday"
+    )
+    assert response.status_code == 200
+    assert response.get_json() == {"analysis": "Friday", "session_id": session_id}
+
+    response, create = send(client, student_token, session_id, "And its tasks?")
+    assert response.status_code == 200
+
+    messages = create.call_args.kwargs["messages"]
+    assert messages[0]["role"] == "system"
+    assert messages[1:] == [
+        {"role": "user", "content": "When is milestone 1 due?"},
+        {"role": "assistant", "content": "Friday"},
+        {"role": "user", "content": "And its tasks?"},
+    ]
+
+
+def test_chat_session_summarizes_messages_beyond_budget(
+    client, student_token, session_id
+):
+    """
+    Test that the older messages of a chat session are summarized once the history exceeds its token budget,
+    in a background thread after the answer is sent.
+    """
+    summaries = []
+    submit_task = summary_jobs.submit_task
+
+    def record_summary(*args):
+        summaries.append(submit_task(*args))
+        return summaries[-1]
+
+    client.application.config["AI_CHAT_HISTORY_BUDGET"] = 100
+    try:
+        send(client, student_token, session_id, "a" * 160, "b" * 160)
+        with patch.object(
+            summary_jobs, "submit_task", side_effect=record_summary
+        ), patch(
+            CREATE,
+            side_effect=[ai_response("c" * 160), ai_response("Summary of a and b")],
+        ) as create:
+            response = client.post(
+                f"/student/chat/sessions/{session_id}",
+                json={"message": "d" * 160},
+                headers={"Authentication-Token": student_token},
+            )
+            assert response.status_code == 200
+            assert create.call_count == 1
+            with client.application.app_context():
+                assert len(db.session.get(ChatSessions, session_id).history) == 4
+
+            # The older messages are summarized in the background once the answer is sent
+            assert response.get_json()["analysis"] == "c" * 160
+            assert not summaries
+            response.close()
+            assert len(summaries) == 1
+            summaries[0].result(timeout=10)
+        assert create.call_count == 2
+
+        summary_messages = create.call_args_list[1].kwargs["messages"]
+        assert "a" * 160 in summary_messages[1]["content"]
+        assert "d" * 160 not in summary_messages[1]["content"]
+        assert create.call_args_list[1].kwargs["max_tokens"] == 25
+
+        response, create = send(client, student_token, session_id, "e")
+        assert response.status_code == 200
+    finally:
+        client.application.config["AI_CHAT_HISTORY_BUDGET"] = 1500
+
+    messages = create.call_args.kwargs["messages"]
+    assert messages[1] == {
+        "role": "system",
+        "content": "Summary of the earlier conversation: Summary of a and b",
+    }
+    assert messages[2:] == [
+        {"role": "user", "content": "d" * 160},
+        {"role": "assistant", "content": "c" * 160},
+        {"role": "user", "content": "e"},
+    ]
+
+
+def test_chat_session_changed_meanwhile(client, student_token, session_id):
+    """
+    Test 409 response when another message of the session is answered while the AI answers, and that the
+    answer is not recorded.
+    """
+    send(client, student_token, session_id, "When is milestone 1 due?", "Friday")
+
+    def answer_after_other_message(**kwargs):
+        with client.application.app_context():
+            chat_session = db.session.get(ChatSessions, session_id)
+            chat_session.history = [
+                *chat_session.history,
+                {"role": "user", "content": "Other"},
+            ]
+            chat_session.version += 1
+            db.session.commit()
+        return ai_response("Monday")
+
+    with patch(CREATE, side_effect=answer_after_other_message):
+        response = client.post(
+            f"/student/chat/sessions/{session_id}",
+            json={"message": "And milestone 2?"},
+            headers={"Authentication-Token": student_token},
+        )
+    assert response.status_code == 409
+    assert response.get_json()["response"]["errors"][0] == (
+        "Chat session changed by another message. Send the message again."
+    )
+
+    with client.application.app_context():
+        history = db.session.get(ChatSessions, session_id).history
+    assert history[1:] == [
+        {"role": "assistant", "content": "Friday"},
+        {"role": "user", "content": "Other"},
+    ]
+
+
+def test_chat_session_streams_and_records_answer(client, student_token, session_id):
+    """
+    Test that a streamed answer is recorded in the chat session once the stream ends.
+    """
+    chunks = [
+        SimpleNamespace(
+            choices=[
+                SimpleNamespace(delta=SimpleNamespace(content=text), finish_reason=None)
+            ]
+        )
+        for text in ("Next ", "Friday")
+    ]
+    with patch(CREATE, return_value=iter(chunks)):
+        response = client.post(
+            f"/student/chat/sessions/{session_id}",
+            json={"message": "When is the next deadline?"},
+            headers={
+                "Authentication-Token": student_token,
+                "Accept": "application/x-ndjson",
+            },
+        )
+        events = [
+            json.loads(line) for line in response.get_data(as_text=True).splitlines()
+        ]
+
+    assert [event["event"] for event in events] == ["token", "token", "done"]
+    with client.application.app_context():
+        history = db.session.get(ChatSessions, session_id).history
+    assert history[-1] == {"role": "assistant", "content": "Next Friday"}
+
+
+def test_chat_session_stream_closed_unread_frees_its_slot(
+    client, student_token, session_id, monkeypatch
+):
+    """
+    Test that a streamed answer closed by the server before it is read, e.g. when the client disconnects or
+    for a HEAD request, frees its AI request slot.
+    """
+
+    class Chunks(list):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    chunks = Chunks(["Next ", "Friday"])
+    monkeypatch.setattr(
+        ai_gateway,
+        "client",
+        SimpleNamespace(
+            chat=SimpleNamespace(
+                completions=SimpleNamespace(create=lambda **kwargs: chunks)
+            )
+        ),
+    )
+    environ = EnvironBuilder(
+        path=f"/student/chat/sessions/{session_id}",
+        method="POST",
+        json={"message": "When is the next deadline?"},
+        headers={
+            "Authentication-Token": student_token,
+            "Accept": "application/x-ndjson",
+        },
+    ).get_environ()
+    statuses = []
+
+    # Called as a WSGI server would, as the test client reads the first event of streamed responses. The
+    # context of the last request of the test client is still pushed, so the request gets a context of its own.
+    with client.application.app_context():
+        app_iter = client.application(
+            environ, lambda status, headers, exc_info=None: statuses.append(status)
+        )
+        assert statuses == ["200 OK"]
+        assert ai_gateway.telemetry.snapshot()["in_flight"] == 1
+
+        app_iter.close()
+    assert chunks.closed
+    assert ai_gateway.telemetry.snapshot()["in_flight"] == 0
+    with client.application.app_context():
+        assert db.session.get(ChatSessions, session_id).history == []
+
+
+def test_chat_session_expire(client, student_token, session_id):
+    """
+    Test that an expired chat session can not be continued.
+    """
+    response = client.delete(
+        f"/student/chat/sessions/{session_id}",
+        headers={"Authentication-Token": student_token},
+    )
+    assert response.status_code == 200
+    assert response.get_json()["message"] == "Chat session expired"
+
+    response, create = send(client, student_token, session_id, "Hello")
+    assert response.status_code == 404
+    assert response.get_json()["response"]["errors"][0] == "Chat session not found"
+    create.assert_not_called()
+
+    response = client.delete(
+        f"/student/chat/sessions/{session_id}",
+        headers={"Authentication-Token": student_token},
+    )
+    assert response.status_code == 404
+
+
+def test_chat_session_expires_after_ttl(client, student_token, session_id):
+    """
+    Test that a chat session unused for longer than its time to live is not found, and removed by the next
+    created session.
+    """
+    with client.application.app_context():
+        expired = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=1)
+        db.session.get(ChatSessions, session_id).last_used_at = expired - timedelta(
+            hours=1
+        )
+        db.session.commit()
+
+    response, _ = send(client, student_token, session_id, "Hello")
+    assert response.status_code == 404
+
+    response = client.post(
+        "/student/chat/sessions", headers={"Authentication-Token": student_token}
+    )
+    assert response.status_code == 201
+    with client.application.app_context():
+        assert (
+            ChatSessions.query.filter(ChatSessions.last_used_at < expired).count() == 0
+        )
+
+
+def test_chat_session_empty_message(client, student_token, session_id):
+    """
+    Test 400 response when the message is missing.
+    """
+    response = client.post(
+        f"/student/chat/sessions/{session_id}",
+        json={},
+        headers={"Authentication-Token": student_token},
+    )
+    assert response.status_code == 400
+    assert (
+        response.get_json()["response"]["errors"][0] == "User message can not be empty"
+    )
+
+
+def test_chat_session_invalid_role(client, instructor_token):
+    """
+    Test 403 response when an unauthorized user tries to create a chat session.
+    """
+    response = client.post(
+        "/student/chat/sessions", headers={"Authentication-Token": instructor_token}
+    )
+    assert response.status_code == 403
+
+
+def test_split_chat_history_keeps_latest_exchanges_within_budget():
+    """
+    Test that the latest exchanges are kept within the budget, and the latest one beyond it.
+    """
+    history = [
+        {"role": role, "content": "x" * 36}
+        for _ in range(3)
+        for role in ("user", "assistant")
+    ]
+
+    assert split_chat_history(history, 40) == (history[:2], history[2:])
+    assert split_chat_history(history, 100) == ([], history)
+    assert split_chat_history(history, 1) == (history[:4], history[4:])
@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from application.models import TeamMilestoneProgress
 
 
 @pytest.fixture
@@ -7,10 +8,16 @@ def mock_team():
     return {"id": 1, "name": "Team Alpha"}
 
 
+@patch("apis.student.milestone_management.get_team_progress_rows")
 @patch("apis.student.milestone_management.get_team_id")
 @patch("apis.student.milestone_management.db.session.query")
 def test_get_team_milestones_success(
-    mock_query, mock_get_team_id, mock_team, client, student_token
+    mock_query,
+    mock_get_team_id,
+    mock_get_team_progress_rows,
+    mock_team,
+    client,
+    student_token,
 ):
     """Test successful retrieval of team milestones."""
     mock_get_team_id.return_value = 1
@@ -23,14 +30,10 @@ def test_get_team_milestones_success(
     ]
     mock_query.return_value.all.return_value = mock_milestones
 
-    mock_query.return_value.filter.return_value.scalar.side_effect = [
-        5,
-        3,
-    ]
-    mock_query.return_value.join.return_value.filter.return_value.filter.return_value.scalar.side_effect = [
-        4,
-        2,
-    ]
+    mock_get_team_progress_rows.return_value = {
+        (1, 1): TeamMilestoneProgress(submitted_tasks=4, total_tasks=5),
+        (1, 2): TeamMilestoneProgress(submitted_tasks=2, total_tasks=3),
+    }
 
     response = client.get(
         "/student/milestone_management/overall",
@@ -48,11 +51,7 @@ def test_get_team_milestones_success(
 
     mock_get_team_id.assert_called_once()
     mock_query.return_value.all.assert_called_once()
-    assert mock_query.return_value.filter.return_value.scalar.call_count == 2
-    assert (
-        mock_query.return_value.join.return_value.filter.return_value.filter.return_value.scalar.call_count
-        == 2
-    )
+    mock_get_team_progress_rows.assert_called_once_with([1])
 
     assert data["milestones"][0]["milestone_id"] == 1
     assert data["milestones"][0]["title"] == "Milestone 1"
@@ -0,0 +1,140 @@
+import threading
+from types import SimpleNamespace
+import httpx
+import pytest
+from groq import APIConnectionError, APITimeoutError, BadRequestError
+from apis.teacher.ai_gateway import AIGateway, AIGatewayBusy, CompletionStream
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+def fake_client(create):
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+def test_transient_errors_are_retried(monkeypatch):
+    """
+    Test that connection errors are retried until the request succeeds, within the deadline of the call.
+    """
+    monkeypatch.setattr("apis.teacher.ai_gateway.time.sleep", lambda seconds: None)
+    timeouts = []
+
+    def create(timeout, **kwargs):
+        timeouts.append(timeout)
+        if len(timeouts) < 3:
+            raise APITimeoutError(request=REQUEST)
+        return "completion"
+
+    gateway = AIGateway(max_retries=2, client=fake_client(create))
+
+    assert gateway.chat.completions.create(model="model", timeout=10) == "completion"
+    assert len(timeouts) == 3
+    assert all(0 < timeout <= 10 for timeout in timeouts)
+
+    usage = gateway.telemetry.snapshot()
+    assert usage["calls"] == 3
+    assert usage["retries"] == 2
+    assert usage["errors"] == {"APITimeoutError": 2}
+    assert usage["in_flight"] == 0
+    assert usage["latency_seconds"]["buckets"]["+Inf"] == 3
+
+
+def test_retries_are_bounded(monkeypatch):
+    """
+    Test that the last error is raised once the retries are exhausted, and that other errors are not retried.
+    """
+    monkeypatch.setattr("apis.teacher.ai_gateway.time.sleep", lambda seconds: None)
+    calls = []
+
+    def unreachable(**kwargs):
+        calls.append(kwargs)
+        raise APIConnectionError(request=REQUEST)
+
+    gateway = AIGateway(max_retries=1, client=fake_client(unreachable))
+    with pytest.raises(APIConnectionError):
+        gateway.chat.completions.create(model="model")
+    assert len(calls) == 2
+
+    def rejected(**kwargs):
+        calls.append(kwargs)
+        raise BadRequestError(
+            "Invalid request", response=httpx.Response(400, request=REQUEST), body=None
+        )
+
+    calls.clear()
+    gateway = AIGateway(max_retries=3, client=fake_client(rejected))
+    with pytest.raises(BadRequestError):
+        gateway.chat.completions.create(model="model")
+    assert len(calls) == 1
+    assert gateway.telemetry.snapshot()["retries"] == 0
+
+
+def test_requests_beyond_concurrency_limit_are_rejected():
+    """
+    Test that a request is rejected when all the slots stay busy beyond the queue timeout.
+    """
+    started, release = threading.Event(), threading.Event()
+
+    def create(**kwargs):
+        started.set()
+        release.wait(5)
+        return "completion"
+
+    gateway = AIGateway(
+        max_concurrency=1, queue_timeout=0.05, client=fake_client(create)
+    )
+    results = []
+    worker = threading.Thread(
+        target=lambda: results.append(gateway.chat.completions.create(model="model"))
+    )
+    worker.start()
+    started.wait(5)
+
+    assert gateway.telemetry.snapshot()["in_flight"] == 1
+    with pytest.raises(AIGatewayBusy):
+        gateway.chat.completions.create(model="model")
+
+    release.set()
+    worker.join()
+    assert results == ["completion"]
+    assert gateway.telemetry.snapshot()["rejected"] == 1
+    assert gateway.chat.completions.create(model="model") == "completion"
+
+
+def test_stream_holds_its_slot_until_closed():
+    """
+    Test that a streamed completion keeps its slot until it is consumed, and frees it when closed early.
+    """
+
+    class Chunks(list):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    streams = []
+
+    def create(stream=False, **kwargs):
+        streams.append(Chunks(["Hello", " world"]))
+        return streams[-1]
+
+    gateway = AIGateway(
+        max_concurrency=1, queue_timeout=0.05, client=fake_client(create)
+    )
+
+    stream = gateway.chat.completions.create(model="model", stream=True)
+    assert isinstance(stream, CompletionStream)
+    with pytest.raises(AIGatewayBusy):
+        gateway.chat.completions.create(model="model", stream=True)
+
+    assert list(stream) == ["Hello", " world"]
+    assert streams[0].closed
+    assert gateway.telemetry.snapshot()["in_flight"] == 0
+
+    stream = gateway.chat.completions.create(model="model", stream=True)
+    next(iter(stream))
+    stream.close()
+    assert streams[1].closed
+    assert gateway.chat.completions.create(model="model") == streams[2]
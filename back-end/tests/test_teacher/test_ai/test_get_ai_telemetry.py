@@ -0,0 +1,59 @@
+from unittest.mock import patch
+from apis.teacher.ai_gateway import AIGatewayBusy
+
+
+def test_get_ai_telemetry_success(client, instructor_token):
+    """
+    Test that the instructor can read the AI telemetry.
+    """
+    response = client.get(
+        "/teacher/ai/telemetry",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    for key in (
+        "calls",
+        "retries",
+        "rejected",
+        "in_flight",
+        "errors",
+        "latency_seconds",
+        "max_concurrency",
+    ):
+        assert key in data
+    assert data["max_concurrency"] == client.application.config["AI_MAX_CONCURRENCY"]
+    assert data["latency_seconds"]["buckets"]["+Inf"] == data["calls"]
+
+
+def test_get_ai_telemetry_forbidden(client, ta_token):
+    """
+    Test that a TA cannot read the AI telemetry.
+    """
+    response = client.get(
+        "/teacher/ai/telemetry",
+        headers={"Authentication-Token": ta_token},
+    )
+
+    assert response.status_code == 403
+
+
+def test_busy_ai_gateway_is_reported(client, student_token):
+    """
+    Test that the AI chat answers 503 when too many AI requests are in progress.
+    """
+    with patch(
+        "apis.student.milestone_management.ai_client.chat.completions.create",
+        side_effect=AIGatewayBusy("Too many AI requests in progress"),
+    ):
+        response = client.post(
+            "/student/chat",
+            json={"message": "When is the next deadline?"},
+            headers={"Authentication-Token": student_token},
+        )
+
+    assert response.status_code == 503
+    assert response.json["response"]["errors"] == [
+        "Too many AI requests in progress. Try again later."
+    ]
@@ -0,0 +1,107 @@
+import json
+import urllib.error
+import urllib.request
+from github import Github, RateLimitExceededException
+import pytest
+from benchmarks.bench_github_analytics import compare
+from tests.fake_github import FakeGithub
+
+
+def get(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(request) as response:
+        return response.status, response.headers, json.load(response)
+
+
+def test_commit_listing_is_paginated_like_github():
+    """
+    Test that the commit listing caps the page size and links to the next and last pages.
+    """
+    with FakeGithub() as server:
+        server.add_commits("example/repo", 250)
+        status, headers, body = get(
+            f"{server.url}/repos/example/repo/commits?per_page=500"
+        )
+
+    assert status == 200
+    assert len(body) == 100
+    assert 'page=2>; rel="next"' in headers["Link"]
+    assert 'page=3>; rel="last"' in headers["Link"]
+    assert headers["X-RateLimit-Used"] == "1"
+
+
+def test_not_modified_listing_is_not_charged():
+    """
+    Test that a revalidated commit listing answers 304 without consuming the rate limit.
+    """
+    with FakeGithub() as server:
+        server.add_commits("example/repo", 3)
+        _, headers, _ = get(f"{server.url}/repos/example/repo/commits")
+        with pytest.raises(urllib.error.HTTPError) as error:
+            get(
+                f"{server.url}/repos/example/repo/commits",
+                {"If-None-Match": headers["ETag"]},
+            )
+
+        assert error.value.code == 304
+        assert server.requests["commits"] == 2
+        assert server.remaining == 4999
+
+
+def test_exhausted_rate_limit_is_rejected():
+    """
+    Test that requests beyond the primary rate limit are rejected until the limit resets.
+    """
+    with FakeGithub(rate_limit=1) as server:
+        server.add_commits("example/repo", 3)
+        repo = Github(base_url=server.url, retry=None).get_repo(
+            "example/repo", lazy=True
+        )
+        repo.get_commit(server.repos["example/repo"][0]["sha"]).stats
+
+        with pytest.raises(RateLimitExceededException):
+            repo.get_commit(server.repos["example/repo"][1]["sha"]).stats
+
+        assert server.requests["rate_limited"] == 1
+
+
+def test_fixture_round_trip(tmp_path):
+    """
+    Test that recorded repositories are served again after a save and load.
+    """
+    path = tmp_path / "fixture.json"
+    with FakeGithub() as recorded:
+        recorded.add_commits("example/repo", 5)
+        recorded.save_fixture(path)
+
+    with FakeGithub() as server:
+        server.load_fixture(path)
+        sha = recorded.repos["example/repo"][2]["sha"]
+        _, _, body = get(f"{server.url}/repos/example/repo/commits/{sha}")
+
+    assert server.repos == recorded.repos
+    assert body["sha"] == sha
+
+
+def test_benchmark_reports_regressions():
+    """
+    Test that the benchmark comparison flags extra requests and slowdowns beyond the tolerance.
+    """
+    baseline = [
+        {"size": 10, "strategy": "rest-1", "scenario": "cold"}
+        | {"seconds": 1.0, "requests": 12, "peak_mb": 1.0},
+        {"size": 10, "strategy": "rest-1", "scenario": "warm"}
+        | {"seconds": 1.0, "requests": 1, "peak_mb": 1.0},
+    ]
+    results = [
+        {"size": 10, "strategy": "rest-1", "scenario": "cold"}
+        | {"seconds": 1.1, "requests": 12, "peak_mb": 1.1},
+        {"size": 10, "strategy": "rest-1", "scenario": "warm"}
+        | {"seconds": 1.5, "requests": 2, "peak_mb": 1.0},
+    ]
+
+    regressions = compare(results, baseline, tolerance=0.2)
+
+    assert list(regressions) == [(10, "rest-1", "warm")]
+    assert "requests 1 -> 2" in regressions[(10, "rest-1", "warm")]
+    assert "seconds 1.0 -> 1.5" in regressions[(10, "rest-1", "warm")]
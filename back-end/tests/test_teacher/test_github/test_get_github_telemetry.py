@@ -0,0 +1,34 @@
+def test_get_github_telemetry_success(client, instructor_token):
+    """
+    Test that the instructor can read the GitHub API telemetry.
+    """
+    response = client.get(
+        "/teacher/github/telemetry",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    for key in (
+        "calls",
+        "not_modified",
+        "statuses",
+        "rate_limit",
+        "latency_seconds",
+        "stored_responses",
+    ):
+        assert key in data
+    assert set(data["rate_limit"]) == {"limit", "remaining", "reset_at"}
+    assert data["latency_seconds"]["buckets"]["+Inf"] == data["calls"]
+
+
+def test_get_github_telemetry_forbidden(client, ta_token):
+    """
+    Test that a TA cannot read the GitHub API telemetry.
+    """
+    response = client.get(
+        "/teacher/github/telemetry",
+        headers={"Authentication-Token": ta_token},
+    )
+
+    assert response.status_code == 403
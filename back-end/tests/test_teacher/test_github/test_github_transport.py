@@ -0,0 +1,139 @@
+import pytest
+from github import Github
+from apis.teacher.github_fetcher import clone_github_client
+from apis.teacher.github_stats import sync_commits
+from apis.teacher.github_transport import (
+    CONNECTION_CLASS_ATTRIBUTE,
+    CachingConnectionMixin,
+    GithubTelemetry,
+    ResponseStore,
+    check_connection_hook,
+    install_transport,
+)
+from github.Requester import HTTPSRequestsConnectionClass
+from application.models import CommitStats, GithubSyncState, db
+from tests.fake_github import FakeGithub
+
+
+@pytest.fixture
+def app_context(client):
+    with client.application.app_context():
+        yield
+        db.session.query(CommitStats).delete()
+        db.session.query(GithubSyncState).delete()
+        db.session.commit()
+
+
+def test_repeated_request_is_served_from_store():
+    """
+    Test that a repeated GET is revalidated with its ETag and answered from the response store.
+    """
+    store, telemetry = ResponseStore(), GithubTelemetry()
+    with FakeGithub() as server:
+        server.add_commits("example/repo", 3)
+        github_client = install_transport(Github(base_url=server.url), store, telemetry)
+        repo = github_client.get_repo("example/repo", lazy=True)
+
+        first = [commit.sha for commit in repo.get_commits()]
+        second = [commit.sha for commit in repo.get_commits()]
+
+        assert server.requests["commits"] == 2
+
+    assert first == second
+    assert len(first) == 3
+    assert len(store) == 1
+
+    usage = telemetry.snapshot()
+    assert usage["calls"] == 2
+    assert usage["not_modified"] == 1
+    assert usage["statuses"] == {"200": 1, "304": 1}
+    assert usage["rate_limit"]["limit"] == 5000
+    assert usage["rate_limit"]["remaining"] == 4999
+    assert usage["latency_seconds"]["count"] == 2
+    assert usage["latency_seconds"]["buckets"]["+Inf"] == 2
+
+
+def test_changed_resource_is_refetched():
+    """
+    Test that a GET whose resource changed is answered by GitHub and replaces the stored response.
+    """
+    store, telemetry = ResponseStore(), GithubTelemetry()
+    with FakeGithub() as server:
+        server.add_commits("example/repo", 3)
+        github_client = install_transport(Github(base_url=server.url), store, telemetry)
+        repo = github_client.get_repo("example/repo", lazy=True)
+
+        list(repo.get_commits())
+        server.add_commits("example/repo", 2)
+        commits = list(repo.get_commits())
+
+    assert len(commits) == 5
+    assert telemetry.snapshot()["statuses"] == {"200": 2}
+
+
+def test_response_store_evicts_least_recently_used():
+    """
+    Test that the response store keeps at most its maximum number of responses.
+    """
+    with FakeGithub() as server:
+        for name in ("a", "b", "c"):
+            server.add_commits(f"example/{name}", 1)
+        store = ResponseStore(max_entries=2)
+        github_client = install_transport(
+            Github(base_url=server.url), store, GithubTelemetry()
+        )
+
+        for name in ("a", "b", "c"):
+            list(github_client.get_repo(f"example/{name}", lazy=True).get_commits())
+
+    assert len(store) == 2
+    assert not any("example/a" in key for key in store.responses)
+
+
+def test_sync_keeps_its_own_etag(app_context):
+    """
+    Test that the commit sync revalidates with its own ETag, and that its worker clients share the transport.
+    """
+    store, telemetry = ResponseStore(), GithubTelemetry()
+    with FakeGithub() as server:
+        server.add_commits("example/repo", 4)
+        github_client = install_transport(
+            Github(base_url=server.url, per_page=100), store, telemetry
+        )
+
+        assert sync_commits(github_client, "example/repo", workers=2) == 4
+        assert sync_commits(github_client, "example/repo", workers=2) == 0
+
+        clone = clone_github_client(github_client)
+        assert clone.requester.transport == (store, telemetry)
+        clone.close()
+
+    usage = telemetry.snapshot()
+    assert usage["calls"] == sum(server.requests.values())
+    assert usage["not_modified"] == 1
+
+
+def test_pygithub_has_connection_hook():
+    """
+    Test that the installed PyGithub has the connection hook replaced by the transport.
+    """
+    github_client = Github()
+    check_connection_hook(github_client.requester, HTTPSRequestsConnectionClass)
+
+    install_transport(github_client, ResponseStore(), GithubTelemetry())
+    assert issubclass(
+        getattr(github_client.requester, CONNECTION_CLASS_ATTRIBUTE),
+        CachingConnectionMixin,
+    )
+
+
+def test_missing_connection_hook_keeps_normal_transport(caplog):
+    """
+    Test that the client keeps the PyGithub transport, and the error is logged, when the hook is missing.
+    """
+    github_client = Github()
+    delattr(github_client.requester, CONNECTION_CLASS_ATTRIBUTE)
+
+    assert install_transport(github_client) is github_client
+    assert not hasattr(github_client.requester, "transport")
+    assert "caching transport not installed" in caplog.text
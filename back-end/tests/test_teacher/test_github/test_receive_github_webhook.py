@@ -0,0 +1,239 @@
+import hashlib
+import hmac
+import json
+import os
+import pytest
+from unittest.mock import patch
+from github import Github
+from application.models import (
+    CommitActivity,
+    CommitStats,
+    GithubSnapshots,
+    GithubSyncState,
+    db,
+)
+from tests.fake_github import FakeGithub
+
+SECRET = "webhook-secret"
+PAYLOAD_PATH = os.path.join(os.path.dirname(__file__), "payloads", "push.json")
+
+
+def load_payload(**changes):
+    with open(PAYLOAD_PATH) as file:
+        payload = json.load(file)
+    payload.update(changes)
+    return payload
+
+
+def deliver(client, payload, event="push", secret=SECRET):
+    body = json.dumps(payload).encode()
+    signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return client.post(
+        "/teacher/github/webhook",
+        data=body,
+        content_type="application/json",
+        headers={
+            "X-GitHub-Event": event,
+            "X-Hub-Signature-256": f"sha256={signature}",
+        },
+    )
+
+
+@pytest.fixture
+def webhook(client):
+    """
+    Enables the webhook and serves the pushed commits from a fake GitHub server, with the repository
+    synced up to the commit preceding the push.
+    """
+    payload = load_payload()
+    config = client.application.config
+    config.update(GITHUB_WEBHOOK_SECRET=SECRET, GITHUB_FETCH_WORKERS=1)
+
+    with client.application.app_context():
+        db.session.add(
+            GithubSyncState(repo="shrasinh/team_alpha", last_sha=payload["before"])
+        )
+        db.session.commit()
+
+    with FakeGithub() as server:
+        for commit, (additions, deletions) in zip(
+            payload["commits"], [(120, 4), (35, 10)]
+        ):
+            server.add_commit(
+                "shrasinh/team_alpha",
+                commit["id"],
+                commit["author"]["username"],
+                commit["message"],
+                commit["timestamp"],
+                additions,
+                deletions,
+            )
+        with patch(
+            "apis.teacher.github_management.github_client",
+            Github(base_url=server.url),
+        ):
+            yield server
+
+    config.update(GITHUB_WEBHOOK_SECRET=None)
+    with client.application.app_context():
+        db.session.query(CommitStats).delete()
+        db.session.query(CommitActivity).delete()
+        db.session.query(GithubSyncState).delete()
+        db.session.query(GithubSnapshots).delete()
+        db.session.commit()
+
+
+def test_receive_github_webhook_push(client, webhook):
+    """
+    Test that a push is ingested from its payload, fetching only the statistics of the pushed commits.
+    """
+    response = deliver(client, load_payload())
+
+    assert response.status_code == 200
+    assert response.json == {
+        "repository": "shrasinh/team_alpha",
+        "new_commits": 2,
+        "teams": [1],
+    }
+    assert webhook.requests == {"commit": 2}
+
+    with client.application.app_context():
+        state = GithubSyncState.query.filter_by(repo="shrasinh/team_alpha").one()
+        assert state.last_sha == load_payload()["after"]
+        assert state.etag is None
+
+        authors = {
+            commit.author: commit.milestone_id
+            for commit in CommitStats.query.filter_by(repo="shrasinh/team_alpha")
+        }
+        assert authors == {"shrasinh": 1, "Matrixmang0": 2}
+
+        activity = CommitActivity.query.filter_by(repo="shrasinh/team_alpha").all()
+        assert sorted((row.author, row.day.isoformat()) for row in activity) == [
+            ("Matrixmang0", "2024-11-20"),
+            ("shrasinh", "2024-11-20"),
+        ]
+
+        snapshot = GithubSnapshots.query.filter_by(team_id=1).one()
+        assert snapshot.total_commits == 2
+        assert snapshot.lines_of_code_added == 155
+        assert snapshot.lines_of_code_deleted == 14
+
+
+def test_receive_github_webhook_redelivery(client, webhook):
+    """
+    Test that a redelivered push does not fetch or cache its commits again.
+    """
+    deliver(client, load_payload())
+    response = deliver(client, load_payload(before=load_payload()["after"]))
+
+    assert response.status_code == 200
+    assert response.json["new_commits"] == 0
+    assert webhook.requests == {"commit": 2}
+
+
+@patch("apis.teacher.github_management.sync_repository", return_value=None)
+def test_receive_github_webhook_force_push(mock_sync_repository, client, webhook):
+    """
+    Test that a force push falls back to a regular sync of the repository.
+    """
+    response = deliver(client, load_payload(forced=True))
+
+    assert response.status_code == 200
+    assert response.json["new_commits"] is None
+    mock_sync_repository.assert_called_once_with(
+        "https://github.com/shrasinh/team_alpha", "shrasinh/team_alpha"
+    )
+    assert webhook.requests == {}
+
+
+@patch("apis.teacher.github_management.sync_repository", return_value=None)
+def test_receive_github_webhook_missed_delivery(mock_sync_repository, client, webhook):
+    """
+    Test that a push that does not start at the sync watermark falls back to a regular sync.
+    """
+    response = deliver(client, load_payload(before="0" * 40))
+
+    assert response.status_code == 200
+    assert response.json["new_commits"] is None
+    mock_sync_repository.assert_called_once()
+
+
+@patch(
+    "apis.teacher.github_management.sync_repository",
+    return_value={"status": "404", "message": "Not Found"},
+)
+def test_receive_github_webhook_sync_error(mock_sync_repository, client, webhook):
+    """
+    Test that a failed sync of the repository is reported as a bad gateway.
+    """
+    response = deliver(client, load_payload(forced=True))
+
+    assert response.status_code == 502
+
+
+def test_receive_github_webhook_other_branch(client, webhook):
+    """
+    Test that a push to a branch other than the default branch is ignored.
+    """
+    response = deliver(client, load_payload(ref="refs/heads/feature"))
+
+    assert response.status_code == 202
+    assert webhook.requests == {}
+
+
+def test_receive_github_webhook_ping(client, webhook):
+    """
+    Test that the ping event sent when the webhook is created is acknowledged.
+    """
+    response = deliver(client, {"zen": "Keep it logically awesome."}, event="ping")
+
+    assert response.status_code == 200
+
+
+def test_receive_github_webhook_other_event(client, webhook):
+    """
+    Test that events other than pushes are ignored.
+    """
+    response = deliver(client, load_payload(), event="issues")
+
+    assert response.status_code == 202
+
+
+def test_receive_github_webhook_unknown_repository(client, webhook):
+    """
+    Test that a push to a repository no team works on is rejected.
+    """
+    payload = load_payload()
+    payload["repository"]["full_name"] = "someone/else"
+    response = deliver(client, payload)
+
+    assert response.status_code == 404
+
+
+def test_receive_github_webhook_invalid_payload(client, webhook):
+    """
+    Test that a push without a repository is rejected.
+    """
+    response = deliver(client, {"ref": "refs/heads/main"})
+
+    assert response.status_code == 400
+
+
+def test_receive_github_webhook_invalid_signature(client, webhook):
+    """
+    Test that a delivery signed with another secret is rejected.
+    """
+    response = deliver(client, load_payload(), secret="another-secret")
+
+    assert response.status_code == 401
+    assert webhook.requests == {}
+
+
+def test_receive_github_webhook_not_configured(client):
+    """
+    Test that the webhook is disabled without a webhook secret.
+    """
+    response = deliver(client, load_payload())
+
+    assert response.status_code == 404
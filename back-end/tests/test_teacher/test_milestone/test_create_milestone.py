@@ -7,9 +7,12 @@ def future_deadline():
     return future_time.strftime("%a, %d %b %Y %H:%M:%S %Z")
 
 
+@patch("apis.teacher.milestone_management.update_team_progress")
 @patch("apis.teacher.milestone_management.db.session.add")
 @patch("apis.teacher.milestone_management.db.session.commit")
-def test_create_milestone_success(mock_commit, mock_add, client, instructor_token):
+def test_create_milestone_success(
+    mock_commit, mock_add, mock_update_team_progress, client, instructor_token
+):
     """
     Test successful creation of a milestone.
     """
@@ -33,6 +36,7 @@ def test_create_milestone_success(mock_commit, mock_add, client, instructor_toke
     assert data["message"] == "Milestone published successfully."
     assert mock_add.call_count == 3  # 1 for milestone, 2 for tasks
     mock_commit.assert_called_once()
+    mock_update_team_progress.assert_called_once()
 
 
 def test_create_milestone_missing_title(client, instructor_token):
@@ -1,11 +1,12 @@
 from unittest.mock import patch, MagicMock
+from application.models import TeamMilestoneProgress
 
 
 @patch("apis.teacher.milestone_management.Milestones.query")
 @patch("apis.teacher.milestone_management.get_teams_under_user")
-@patch("apis.teacher.milestone_management.db.session.query")
+@patch("apis.teacher.milestone_management.get_team_progress_rows")
 def test_get_all_milestones_success(
-    mock_query,
+    mock_get_team_progress_rows,
     mock_get_teams_under_user,
     mock_milestones_query,
     client,
@@ -26,9 +27,9 @@ def test_get_all_milestones_success(
     mock_team = MagicMock(id=1, members=["Student1", "Student2"])
     mock_get_teams_under_user.return_value = [mock_team]
 
-    mock_query.return_value.join.return_value.filter.return_value.group_by.return_value.having.return_value.count.return_value = (
-        1
-    )
+    mock_get_team_progress_rows.return_value = {
+        (1, 1): TeamMilestoneProgress(submitted_tasks=2, total_tasks=2)
+    }
 
     response = client.get(
         "/teacher/milestone_management",
@@ -69,9 +70,9 @@ def test_get_all_milestones_no_teams(
 
 @patch("apis.teacher.milestone_management.Milestones.query")
 @patch("apis.teacher.milestone_management.get_teams_under_user")
-@patch("apis.teacher.milestone_management.db.session.query")
+@patch("apis.teacher.milestone_management.get_team_progress_rows")
 def test_get_all_milestones_partial_completion(
-    mock_query,
+    mock_get_team_progress_rows,
     mock_get_teams_under_user,
     mock_milestones_query,
     client,
@@ -93,9 +94,10 @@ def test_get_all_milestones_partial_completion(
     mock_team2 = MagicMock(id=2, members=["Student3"])
     mock_get_teams_under_user.return_value = [mock_team1, mock_team2]
 
-    mock_query.return_value.join.return_value.filter.return_value.group_by.return_value.having.return_value.count.return_value = (
-        1
-    )
+    mock_get_team_progress_rows.return_value = {
+        (1, 2): TeamMilestoneProgress(submitted_tasks=2, total_tasks=2),
+        (2, 2): TeamMilestoneProgress(submitted_tasks=1, total_tasks=2),
+    }
 
     response = client.get(
         "/teacher/milestone_management",
@@ -0,0 +1,123 @@
+from io import BytesIO
+from datetime import datetime, timedelta, timezone
+import pytest
+from apis.student.setup import get_team_id
+from apis.teacher.team_progress import rebuild_team_progress
+from application.models import Milestones, Teams, TeamMilestoneProgress, Users, db
+
+
+def future_deadline():
+    future_time = datetime.now(timezone.utc) + timedelta(days=1)
+    return future_time.strftime("%a, %d %b %Y %H:%M:%S %Z")
+
+
+@pytest.fixture
+def upload_folder(client, tmp_path):
+    previous = client.application.config["UPLOAD_FOLDER"]
+    client.application.config["UPLOAD_FOLDER"] = str(tmp_path)
+    yield
+    client.application.config["UPLOAD_FOLDER"] = previous
+
+
+def progress_rows(client, milestone_id):
+    with client.application.app_context():
+        return {
+            row.team_id: (row.submitted_tasks, row.total_tasks, row.last_activity_at)
+            for row in TeamMilestoneProgress.query.filter_by(milestone_id=milestone_id)
+        }
+
+
+def test_progress_follows_milestone_and_submission_changes(
+    client, instructor_token, student_token, upload_folder
+):
+    """
+    Test that the progress rows are maintained by the milestone, submission and feedback endpoints.
+    """
+    response = client.post(
+        "/teacher/milestone_management",
+        json={
+            "title": "Progress Milestone",
+            "description": "Milestone tracked by the progress table",
+            "deadline": future_deadline(),
+            "tasks": [{"description": "Task 1"}, {"description": "Task 2"}],
+        },
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 201
+
+    with client.application.app_context():
+        milestone = Milestones.query.filter_by(title="Progress Milestone").first()
+        milestone_id = milestone.id
+        task_ids = [task.id for task in milestone.task_milestones]
+        team_id = get_team_id(Users.query.filter_by(username="student1").first())
+        team_count = Teams.query.count()
+
+    rows = progress_rows(client, milestone_id)
+    assert len(rows) == team_count
+    assert rows[team_id] == (0, 2, None)
+
+    response = client.post(
+        f"/student/milestone_management/individual/{milestone_id}",
+        data={str(task_ids[0]): (BytesIO(b"PDF content"), "task.pdf")},
+        content_type="multipart/form-data",
+        headers={"Authentication-Token": student_token},
+    )
+    assert response.status_code == 201
+    submitted, total, submitted_at = progress_rows(client, milestone_id)[team_id]
+    assert (submitted, total) == (1, 2)
+    assert submitted_at is not None
+
+    response = client.post(
+        f"/teacher/team_management/individual/feedback/{team_id}/{task_ids[0]}",
+        json={"feedback": "Well done"},
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 201
+    submitted, total, feedback_at = progress_rows(client, milestone_id)[team_id]
+    assert (submitted, total) == (1, 2)
+    assert feedback_at >= submitted_at
+
+    response = client.get(
+        "/student/milestone_management/overall",
+        headers={"Authentication-Token": student_token},
+    )
+    milestone_data = next(
+        m for m in response.json["milestones"] if m["milestone_id"] == milestone_id
+    )
+    assert milestone_data["completion_percentage"] == 50.0
+
+    # Replacing the tasks removes their submissions
+    response = client.put(
+        f"/teacher/milestone_management/{milestone_id}",
+        json={"tasks": [{"description": "Task A"}, {"description": "Task B"}] * 2},
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 201
+    assert progress_rows(client, milestone_id)[team_id] == (0, 4, None)
+
+    response = client.delete(
+        f"/teacher/milestone_management/{milestone_id}",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 200
+    assert progress_rows(client, milestone_id) == {}
+
+
+def test_rebuild_team_progress_repairs_rows(client):
+    """
+    Test that rebuilding the progress replaces rows that went out of sync.
+    """
+    with client.application.app_context():
+        expected = {
+            (row.team_id, row.milestone_id): (row.submitted_tasks, row.total_tasks)
+            for row in TeamMilestoneProgress.query.all()
+        }
+        row = TeamMilestoneProgress.query.first()
+        row.submitted_tasks = 99
+        db.session.commit()
+
+        assert rebuild_team_progress() == len(expected)
+        assert {
+            (row.team_id, row.milestone_id): (row.submitted_tasks, row.total_tasks)
+            for row in TeamMilestoneProgress.query.all()
+        } == expected
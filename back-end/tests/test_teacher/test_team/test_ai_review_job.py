@@ -0,0 +1,211 @@
+from io import BytesIO
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+import pytest
+from sqlalchemy import event
+from application.models import Documents, Milestones, Submissions, Teams, db
+
+
+@pytest.fixture
+def review_task(client, instructor_token, student_token, tmp_path):
+    """
+    A task with a submitted document for the team of the student, and a submission whose document is missing
+    for Team Beta.
+    """
+    previous = client.application.config["UPLOAD_FOLDER"]
+    client.application.config["UPLOAD_FOLDER"] = str(tmp_path)
+
+    deadline = datetime.now(timezone.utc) + timedelta(days=1)
+    response = client.post(
+        "/teacher/milestone_management",
+        json={
+            "title": "Review Job Milestone",
+            "description": "Milestone reviewed by the AI",
+            "deadline": deadline.strftime("%a, %d %b %Y %H:%M:%S %Z"),
+            "tasks": [{"description": "Write the design document"}],
+        },
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 201
+
+    with client.application.app_context():
+        milestone = Milestones.query.filter_by(title="Review Job Milestone").one()
+        milestone_id, task_id = milestone.id, milestone.task_milestones[0].id
+
+        beta = Teams.query.filter_by(name="Team Beta").one()
+        submission = Submissions(
+            task_id=task_id,
+            team_id=beta.id,
+            submission_time=datetime.now(timezone.utc),
+        )
+        submission.documents = Documents(
+            title="Missing", file_url=str(tmp_path / "missing.pdf")
+        )
+        db.session.add(submission)
+        db.session.commit()
+
+    response = client.post(
+        f"/student/milestone_management/individual/{milestone_id}",
+        data={str(task_id): (BytesIO(b"Design document"), "design.pdf")},
+        content_type="multipart/form-data",
+        headers={"Authentication-Token": student_token},
+    )
+    assert response.status_code == 201
+
+    yield task_id
+
+    client.delete(
+        f"/teacher/milestone_management/{milestone_id}",
+        headers={"Authentication-Token": instructor_token},
+    )
+    client.application.config["UPLOAD_FOLDER"] = previous
+
+
+def review(client, token, task_id):
+    response = client.post(
+        f"/teacher/team_management/overall/ai_review/{task_id}",
+        headers={"Authentication-Token": token},
+    )
+    assert response.status_code == 202
+    return response.get_json()
+
+
+def get_job(client, token, job_id, query="wait=10"):
+    return client.get(
+        f"/teacher/team_management/overall/ai_review/job/{job_id}?{query}",
+        headers={"Authentication-Token": token},
+    )
+
+
+def test_review_job_analyzes_every_submission(client, instructor_token, review_task):
+    """
+    Test that a review job records the analysis or the error of every submission, and reuses cached analyses.
+    """
+    with patch("apis.teacher.submission_review.PdfReader") as pdf_reader, patch(
+        "apis.teacher.submission_review.ai_client.chat.completions.create",
+        return_value=MagicMock(
+            choices=[MagicMock(message=MagicMock(content="Design analysis"))]
+        ),
+    ) as create:
+        pdf_reader.return_value.pages = [MagicMock(extract_text=lambda: "Design")]
+
+        job = review(client, instructor_token, review_task)
+        assert job["status"] == "pending"
+        assert job["submission_count"] == 2
+
+        response = get_job(client, instructor_token, job["id"])
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["status"] == "done"
+        assert data["reviewed_count"] == data["failed_count"] == 1
+        assert data["finished_at"] is not None
+
+        results = {result["team_name"]: result for result in data["results"]}
+        assert results["Team Alpha"]["status"] == "done"
+        assert results["Team Alpha"]["analysis"] == "Design analysis"
+        assert results["Team Alpha"]["cached"] is False
+        assert results["Team Beta"]["status"] == "failed"
+        assert results["Team Beta"]["error"] == "File not found"
+        assert (
+            "Write the design document"
+            in create.call_args.kwargs["messages"][1]["content"]
+        )
+
+        second = review(client, instructor_token, review_task)
+        data = get_job(client, instructor_token, second["id"]).get_json()
+        results = {result["team_name"]: result for result in data["results"]}
+        assert results["Team Alpha"]["cached"] is True
+        assert create.call_count == 1
+
+
+def test_review_job_results_are_paginated(client, instructor_token, review_task):
+    """
+    Test that the results of a review job are listed page by page.
+    """
+    with patch("apis.teacher.submission_review.PdfReader"), patch(
+        "apis.teacher.submission_review.ai_client.chat.completions.create",
+        side_effect=Exception("AI service failed"),
+    ):
+        job = review(client, instructor_token, review_task)
+        first = get_job(client, instructor_token, job["id"], "wait=10&limit=1")
+
+    assert first.status_code == 200
+    assert first.get_json()["failed_count"] == 2
+    assert len(first.get_json()["results"]) == 1
+    assert "after=" in first.headers["Link"]
+
+    after = first.get_json()["results"][0]["id"]
+    second = get_job(client, instructor_token, job["id"], f"limit=1&after={after}")
+    assert len(second.get_json()["results"]) == 1
+    assert "Link" not in second.headers
+    assert {
+        first.get_json()["results"][0]["team_name"],
+        second.get_json()["results"][0]["team_name"],
+    } == {"Team Alpha", "Team Beta"}
+
+
+def test_review_job_results_load_team_names_with_results(
+    client, instructor_token, review_task
+):
+    """
+    Test that the names of the teams of the results are loaded by the query of the results, not one by one.
+    """
+    with patch("apis.teacher.submission_review.PdfReader"), patch(
+        "apis.teacher.submission_review.ai_client.chat.completions.create",
+        side_effect=Exception("AI service failed"),
+    ):
+        job = review(client, instructor_token, review_task)
+        get_job(client, instructor_token, job["id"])
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with client.application.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = get_job(client, instructor_token, job["id"], "wait=0")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert {result["team_name"] for result in response.get_json()["results"]} == {
+        "Team Alpha",
+        "Team Beta",
+    }
+    assert not [
+        statement
+        for statement in statements
+        if "FROM teams" in statement and "review_results" not in statement
+    ]
+
+
+def test_review_job_task_not_found(client, instructor_token):
+    """
+    Test 404 response when the task does not exist.
+    """
+    response = client.post(
+        "/teacher/team_management/overall/ai_review/9999",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 404
+    assert response.get_json()["response"]["errors"][0] == "Task not found"
+
+
+def test_review_job_of_another_user(client, instructor_token, ta_token, review_task):
+    """
+    Test 404 response when the job was submitted by another user, and 400 on an invalid page size.
+    """
+    with patch("apis.teacher.submission_review.PdfReader"), patch(
+        "apis.teacher.submission_review.ai_client.chat.completions.create",
+        side_effect=Exception("AI service failed"),
+    ):
+        job = review(client, instructor_token, review_task)
+        response = get_job(client, ta_token, job["id"])
+        assert response.status_code == 404
+        assert (
+            get_job(client, instructor_token, job["id"], "limit=0").status_code == 400
+        )
+        # Lets the job finish before the AI is unpatched
+        get_job(client, instructor_token, job["id"])
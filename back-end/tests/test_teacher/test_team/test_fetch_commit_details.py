@@ -0,0 +1,179 @@
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+import json
+import pytest
+from github import GithubException, UnknownObjectException
+from apis.teacher.setup import fetch_commit_details
+from application.models import CommitStats, GithubSyncState, db
+
+
+def make_commit(sha, message, login, additions, deletions):
+    commit = MagicMock()
+    commit.sha = sha
+    commit.author.login = login
+    commit.commit.message = message
+    commit.commit.author.date = datetime(2024, 11, 1, tzinfo=timezone.utc)
+    commit.stats.additions = additions
+    commit.stats.deletions = deletions
+    return commit
+
+
+def head_response(sha, etag):
+    head = [{"sha": sha, "commit": {"committer": {"date": "2024-11-01T10:00:00Z"}}}]
+    return 200, {"etag": etag}, json.dumps(head)
+
+
+@pytest.fixture
+def app_context(client):
+    client.application.config["GITHUB_FETCH_WORKERS"] = 1
+    with client.application.app_context():
+        yield
+        db.session.query(CommitStats).delete()
+        db.session.query(GithubSyncState).delete()
+        db.session.commit()
+
+
+@pytest.fixture
+def mock_repo():
+    commits = [
+        make_commit("a1", "Milestone-1 Add user stories", "alice", 10, 2),
+        make_commit("b2", "Milestone-1 Fix typos", "bob", 5, 5),
+        make_commit("c3", "Initial commit", "alice", 100, 0),
+        make_commit("d4", "Milestone-999 Unknown milestone", "bob", 1, 1),
+    ]
+    repo = MagicMock()
+    repo.get_commits.return_value = commits
+    repo.get_commit.side_effect = lambda sha: next(
+        c for c in repo.get_commits.return_value if c.sha == sha
+    )
+    return repo
+
+
+@pytest.fixture
+def mock_github_client(mock_repo):
+    with patch("apis.teacher.setup.github_client") as github_client:
+        github_client.get_repo.return_value = mock_repo
+        github_client.requester.requestJson.return_value = head_response("a1", "v1")
+        github_client.requester.createException.side_effect = (
+            lambda status, headers, data: GithubException(status, data, headers)
+        )
+        yield github_client
+
+
+def test_fetch_commit_details_aggregates_cached_commits(
+    mock_github_client, mock_repo, app_context
+):
+    """
+    Test that the statistics are aggregated over all commits, with milestones resolved from the database.
+    """
+    details = fetch_commit_details("https://github.com/example/repo")
+
+    mock_github_client.get_repo.assert_called_once_with("example/repo", lazy=True)
+    assert details["total_commits"] == 4
+    assert details["lines_of_code_added"] == 116
+    assert details["lines_of_code_deleted"] == 8
+    assert len(details["milestones"]) == 1
+    assert details["milestones"][0]["milestone_id"] == 1
+    assert details["milestones"][0]["commits"] == 2
+    assert details["milestones"][0]["lines_of_code_added"] == 15
+    assert details["milestones"][0]["lines_of_code_deleted"] == 7
+
+
+def test_fetch_commit_details_only_fetches_new_commits(
+    mock_github_client, mock_repo, app_context
+):
+    """
+    Test that a refresh only pulls the commits pushed after the sync watermark.
+    """
+    first = fetch_commit_details("https://github.com/example/repo")
+    assert mock_repo.get_commit.call_count == 4
+
+    new_commit = make_commit("e5", "Milestone-2 Wireframes", "alice", 3, 0)
+    mock_repo.get_commits.return_value = [
+        new_commit
+    ] + mock_repo.get_commits.return_value
+    mock_repo.compare.return_value = MagicMock(behind_by=0, commits=[new_commit])
+    mock_github_client.requester.requestJson.return_value = head_response("e5", "v2")
+
+    second = fetch_commit_details("https://github.com/example/repo")
+
+    mock_repo.compare.assert_called_once_with("a1", "e5")
+    assert mock_repo.get_commits.call_count == 1
+    assert mock_repo.get_commit.call_count == 5
+    assert second["total_commits"] == first["total_commits"] + 1
+    assert [m["milestone_id"] for m in second["milestones"]] == [1, 2]
+
+    state = GithubSyncState.query.filter_by(repo="example/repo").first()
+    assert state.last_sha == "e5"
+    assert state.etag == "v2"
+
+
+def test_fetch_commit_details_unchanged_repository(
+    mock_github_client, mock_repo, app_context
+):
+    """
+    Test that an unchanged repository is answered from the cache after a conditional request.
+    """
+    first = fetch_commit_details("https://github.com/example/repo")
+    mock_github_client.requester.requestJson.return_value = (304, {}, "")
+
+    second = fetch_commit_details("https://github.com/example/repo")
+
+    _, kwargs = mock_github_client.requester.requestJson.call_args
+    assert kwargs["headers"] == {"If-None-Match": "v1"}
+    assert mock_repo.get_commits.call_count == 1
+    assert mock_repo.get_commit.call_count == 4
+    assert second == first
+
+
+def test_fetch_commit_details_rewritten_history(
+    mock_github_client, mock_repo, app_context
+):
+    """
+    Test that commits removed by a force push are pruned when the watermark commit disappears.
+    """
+    fetch_commit_details("https://github.com/example/repo")
+
+    mock_repo.get_commits.return_value = mock_repo.get_commits.return_value[1:]
+    mock_repo.compare.side_effect = UnknownObjectException(404, {}, {})
+    mock_github_client.requester.requestJson.return_value = head_response("b2", "v2")
+
+    details = fetch_commit_details("https://github.com/example/repo")
+
+    assert mock_repo.get_commit.call_count == 4
+    assert details["total_commits"] == 3
+    assert details["milestones"][0]["commits"] == 1
+
+
+def test_fetch_commit_details_filters_by_username(mock_github_client, app_context):
+    """
+    Test that the statistics can be restricted to a single GitHub user.
+    """
+    details = fetch_commit_details("git@github.com:example/repo.git", "Alice")
+
+    assert details["total_commits"] == 2
+    assert details["lines_of_code_added"] == 110
+    assert details["milestones"][0]["commits"] == 1
+
+
+def test_fetch_commit_details_github_error(mock_github_client, app_context):
+    """
+    Test that the GitHub error payload is returned when the API call fails.
+    """
+    mock_github_client.requester.requestJson.return_value = (
+        409,
+        {},
+        json.dumps({"status": "409", "message": "Git Repository is empty."}),
+    )
+
+    details = fetch_commit_details("https://github.com/example/repo")
+
+    assert details == {"status": "409", "message": "Git Repository is empty."}
+
+
+def test_fetch_commit_details_invalid_url(app_context):
+    """
+    Test that an invalid repository URL raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        fetch_commit_details("ftp://example.com/repo")
@@ -0,0 +1,68 @@
+import time
+import pytest
+from github import Github
+from apis.teacher.github_fetcher import RateLimitBudget, fetch_commit_stats
+from apis.teacher.github_stats import sync_commits, aggregate_commit_stats
+from application.models import CommitStats, GithubSyncState, db
+from tests.fake_github import FakeGithub
+
+
+@pytest.fixture
+def app_context(client):
+    with client.application.app_context():
+        yield
+        db.session.query(CommitStats).delete()
+        db.session.query(GithubSyncState).delete()
+        db.session.commit()
+
+
+def test_sync_commits_concurrently(app_context):
+    """
+    Test that a cold cache is filled by concurrent requests against the GitHub API.
+    """
+    with FakeGithub(latency=0.02) as server:
+        server.add_commits("example/repo", 40)
+        github_client = Github(base_url=server.url, per_page=100)
+
+        assert sync_commits(github_client, "example/repo", workers=8) == 40
+
+        assert server.requests["commit"] == 40
+        assert server.max_in_flight > 1
+
+    details = aggregate_commit_stats("example/repo")
+    assert details["total_commits"] == 40
+    assert details["lines_of_code_added"] == sum(10 + i % 7 for i in range(40))
+    assert details["milestones"][0]["commits"] == 40
+
+
+def test_fetch_commit_stats_backs_off_on_secondary_rate_limit():
+    """
+    Test that secondary rate limit responses are retried after the Retry-After time.
+    """
+    with FakeGithub(secondary_limits=3) as server:
+        server.add_commits("example/repo", 10)
+        github_client = Github(base_url=server.url)
+        shas = [commit["sha"] for commit in server.repos["example/repo"]]
+
+        stats = fetch_commit_stats(github_client, None, "example/repo", shas, workers=4)
+
+        assert server.requests["secondary_limit"] == 3
+        assert server.requests["commit"] == 10
+    assert set(stats) == set(shas)
+
+
+def test_rate_limit_budget_paces_requests():
+    """
+    Test that requests are paced only when the remaining rate limit does not cover them, keeping the
+    reserve untouched.
+    """
+    now = time.time()
+    budget = RateLimitBudget(remaining=60, reset_at=now + 100, reserve=50, demand=5)
+    assert [budget.reserve_slot(now) for _ in range(5)] == [0] * 5
+
+    budget = RateLimitBudget(remaining=60, reset_at=now + 100, reserve=50, demand=20)
+    assert budget.reserve_slot(now) == 0
+    assert budget.reserve_slot(now) == pytest.approx(10)
+
+    budget.update(50, now + 100)
+    assert budget.reserve_slot(now) == pytest.approx(100)
@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import patch, MagicMock, mock_open
 
@@ -16,7 +17,7 @@ def mock_team():
 @patch("apis.teacher.team_management.Submissions.query")
 @patch("os.path.exists")
 @patch("builtins.open", new_callable=mock_open, read_data=b"Mocked PDF content")
-@patch("apis.teacher.team_management.PdfReader")
+@patch("apis.teacher.submission_review.PdfReader")
 @patch("apis.teacher.team_management.ai_client.chat.completions.create")
 def test_get_ai_analysis_success(
     mock_ai_client,
@@ -142,7 +143,7 @@ def test_get_ai_analysis_file_not_found(
 @patch("apis.teacher.team_management.get_single_team_under_user")
 @patch("apis.teacher.team_management.Submissions.query")
 @patch("os.path.exists")
-@patch("apis.teacher.team_management.PdfReader")
+@patch("apis.teacher.submission_review.PdfReader")
 def test_get_ai_analysis_document_read_error(
     mock_pdf_reader,
     mock_path_exists,
@@ -180,7 +181,7 @@ def test_get_ai_analysis_document_read_error(
 @patch("apis.teacher.team_management.Submissions.query")
 @patch("os.path.exists")
 @patch("builtins.open", new_callable=mock_open, read_data=b"Mocked PDF content")
-@patch("apis.teacher.team_management.PdfReader")
+@patch("apis.teacher.submission_review.PdfReader")
 @patch("apis.teacher.team_management.ai_client.chat.completions.create")
 def test_get_ai_analysis_ai_error(
     mock_ai_client,
@@ -226,6 +227,77 @@ def test_get_ai_analysis_ai_error(
     assert "AI analysis error: AI analysis failed" in data["response"]["errors"][0]
 
 
+@patch("apis.teacher.team_management.get_single_team_under_user")
+@patch("apis.teacher.team_management.Submissions.query")
+@patch("os.path.exists")
+@patch("builtins.open", new_callable=mock_open, read_data=b"Mocked PDF content")
+@patch("apis.teacher.submission_review.PdfReader")
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_get_ai_analysis_streamed(
+    mock_ai_client,
+    mock_pdf_reader,
+    mock_file,
+    mock_path_exists,
+    mock_submissions_query,
+    mock_get_single_team,
+    client,
+    instructor_token,
+    mock_team,
+):
+    """
+    Test that the analysis is streamed as JSON lines when accepted, and cached once complete.
+    """
+    mock_get_single_team.return_value = type("Teams", (), mock_team)
+    mock_submissions_query.filter_by.return_value.first.return_value = MagicMock(
+        documents=MagicMock(file_url="/path/to/file.pdf"),
+        task=MagicMock(
+            description="Task description",
+            milestone=MagicMock(description="Milestone description"),
+        ),
+    )
+    mock_path_exists.return_value = True
+    mock_page = MagicMock()
+    mock_page.extract_text.return_value = "Mocked PDF content"
+    mock_pdf_reader.return_value.pages = [mock_page]
+
+    mock_ai_client.return_value = iter(
+        [
+            MagicMock(
+                choices=[
+                    MagicMock(delta=MagicMock(content=content), finish_reason=None)
+                ]
+            )
+            for content in ("AI ", "Analysis ", "result")
+        ]
+    )
+
+    response = client.get(
+        "/teacher/team_management/individual/ai_analysis/1/1",
+        headers={
+            "Authentication-Token": instructor_token,
+            "Accept": "application/x-ndjson",
+        },
+    )
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert response.status_code == 200
+    assert response.headers["X-Analysis-Cache"] == "miss"
+    assert [event["data"]["content"] for event in events[:-1]] == [
+        "AI ",
+        "Analysis ",
+        "result",
+    ]
+    assert events[-1]["event"] == "done"
+
+    response = client.get(
+        "/teacher/team_management/individual/ai_analysis/1/1",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.headers["X-Analysis-Cache"] == "hit"
+    assert response.get_json()["analysis"] == "AI Analysis result"
+    assert mock_ai_client.call_count == 1
+
+
 def test_get_ai_analysis_invalid_role(client, student_token):
     """
     Test 403 response when a user without the required role tries to access the endpoint.
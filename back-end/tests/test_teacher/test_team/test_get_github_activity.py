@@ -0,0 +1,197 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+import pytest
+from apis.teacher.github_stats import materialize_commit_activity
+from application.models import CommitActivity, CommitStats, GithubSyncState, db
+
+
+@pytest.fixture
+def activity(client):
+    """
+    Caches commits of Team Alpha's repository on three days and materializes their activity.
+    """
+    commits = [
+        ("shrasinh", datetime(2024, 11, 1, 9, tzinfo=timezone.utc), 10, 1),
+        ("Shrasinh", datetime(2024, 11, 1, 23, tzinfo=timezone.utc), 20, 2),
+        ("Matrixmang0", datetime(2024, 11, 1, 12, tzinfo=timezone.utc), 5, 0),
+        ("outside_contributor", datetime(2024, 11, 3, tzinfo=timezone.utc), 7, 7),
+        ("Matrixmang0", datetime(2024, 11, 5, 8, tzinfo=timezone.utc), 3, 3),
+    ]
+    with client.application.app_context():
+        for index, (author, committed_at, additions, deletions) in enumerate(commits):
+            db.session.add(
+                CommitStats(
+                    repo="shrasinh/team_alpha",
+                    sha=f"{index:040d}",
+                    author=author,
+                    committed_at=committed_at,
+                    message="Milestone-1 Change",
+                    additions=additions,
+                    deletions=deletions,
+                    milestone_id=1,
+                )
+            )
+        db.session.add(GithubSyncState(repo="shrasinh/team_alpha", last_sha="0" * 40))
+        materialize_commit_activity("shrasinh/team_alpha")
+        db.session.commit()
+
+    yield
+
+    with client.application.app_context():
+        db.session.query(CommitStats).delete()
+        db.session.query(CommitActivity).delete()
+        db.session.query(GithubSyncState).delete()
+        db.session.commit()
+
+
+@patch("apis.teacher.setup.sync_repository", return_value=None)
+def test_get_github_activity_success(
+    mock_sync_repository, client, instructor_token, activity
+):
+    """
+    Test that the daily series of the team and its members are read from the materialized activity.
+    """
+    with patch("apis.teacher.setup.aggregate_commit_stats") as mock_aggregate:
+        response = client.get(
+            "/teacher/team_management/individual/github/1/activity",
+            headers={"Authentication-Token": instructor_token},
+        )
+        mock_aggregate.assert_not_called()
+
+    assert response.status_code == 200
+    mock_sync_repository.assert_not_called()
+    data = response.get_json()
+    assert data["name"] == "Team Alpha"
+    assert data["days"] == [
+        {
+            "date": "2024-11-01",
+            "commits": 3,
+            "lines_of_code_added": 35,
+            "lines_of_code_deleted": 3,
+        },
+        {
+            "date": "2024-11-03",
+            "commits": 1,
+            "lines_of_code_added": 7,
+            "lines_of_code_deleted": 7,
+        },
+        {
+            "date": "2024-11-05",
+            "commits": 1,
+            "lines_of_code_added": 3,
+            "lines_of_code_deleted": 3,
+        },
+    ]
+
+    members = {member["github_username"]: member for member in data["members"]}
+    assert [day["commits"] for day in members["shrasinh"]["days"]] == [2]
+    assert [day["date"] for day in members["Matrixmang0"]["days"]] == [
+        "2024-11-01",
+        "2024-11-05",
+    ]
+    assert members["areebafarooqui0001"]["days"] == []
+
+
+def test_get_github_activity_date_range(client, instructor_token, activity):
+    """
+    Test that the series is restricted to the requested days.
+    """
+    response = client.get(
+        "/teacher/team_management/individual/github/1/activity?since=2024-11-02&until=2024-11-04",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 200
+    assert [day["date"] for day in response.get_json()["days"]] == ["2024-11-03"]
+
+
+@patch("apis.teacher.setup.sync_repository", return_value=None)
+def test_get_github_activity_refresh(
+    mock_sync_repository, client, instructor_token, activity
+):
+    """
+    Test that the repository is synced before reading the series when a refresh is requested.
+    """
+    response = client.get(
+        "/teacher/team_management/individual/github/1/activity?refresh=1",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 200
+    mock_sync_repository.assert_called_once_with(
+        "https://github.com/shrasinh/team_alpha", "shrasinh/team_alpha"
+    )
+
+
+@patch(
+    "apis.teacher.setup.sync_repository",
+    return_value={"status": "404", "message": "Not Found"},
+)
+def test_get_github_activity_fetch_error(
+    mock_sync_repository, client, instructor_token
+):
+    """
+    Test that a failed first sync of the repository returns a 502 error.
+    """
+    response = client.get(
+        "/teacher/team_management/individual/github/1/activity",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 502
+    assert response.get_json()["response"]["errors"] == ["Not Found"]
+
+
+def test_get_github_activity_invalid_date(client, instructor_token):
+    """
+    Test that malformed dates are rejected.
+    """
+    response = client.get(
+        "/teacher/team_management/individual/github/1/activity?since=01-11-2024",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 400
+
+
+@patch("apis.teacher.team_management.get_single_team_under_user")
+def test_get_github_activity_no_repo(
+    mock_get_single_team_under_user, client, instructor_token
+):
+    """
+    Test retrieval for a team without a GitHub repository.
+    """
+    mock_get_single_team_under_user.return_value = type(
+        "Team", (), {"id": 1, "github_repo_url": None, "members": []}
+    )
+
+    response = client.get(
+        "/teacher/team_management/individual/github/1/activity",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 404
+
+
+def test_get_github_activity_team_not_found(client, instructor_token):
+    """
+    Test retrieval for a team that is not managed by the user.
+    """
+    response = client.get(
+        "/teacher/team_management/individual/github/999/activity",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 404
+
+
+def test_get_github_activity_unauthorized(client, student_token):
+    """
+    Test that students cannot access the activity series.
+    """
+    response = client.get(
+        "/teacher/team_management/individual/github/1/activity",
+        headers={"Authentication-Token": student_token},
+    )
+
+    assert response.status_code == 403
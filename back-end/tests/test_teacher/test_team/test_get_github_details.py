@@ -16,6 +16,7 @@ def test_get_github_details_success(
         "Team",
         (),
         {
+            "id": 1,
             "github_repo_url": "https://github.com/example/repo",
             "name": "Team Alpha",
             "members": [],
@@ -44,6 +45,66 @@ def test_get_github_details_success(
     assert data["milestones"][0]["id"] == 1
     assert data["milestones"][0]["title"] == "Milestone 1"
     assert data["milestones"][0]["commits"] == 20
+    assert data["stale_as_of"] is not None
+
+
+@patch("apis.teacher.team_management.get_single_team_under_user")
+@patch("apis.teacher.team_management.fetch_commit_details")
+def test_get_github_details_reads_snapshot(
+    mock_fetch_commit_details,
+    mock_get_single_team_under_user,
+    client,
+    instructor_token,
+):
+    """
+    Test that the team statistics are served from the latest snapshot, and recomputed only on refresh.
+    """
+    mock_get_single_team_under_user.return_value = type(
+        "Team",
+        (),
+        {
+            "id": 3,
+            "github_repo_url": "https://github.com/example/repo",
+            "name": "Team Gamma",
+            "members": [],
+        },
+    )
+    mock_fetch_commit_details.return_value = {
+        "total_commits": 7,
+        "lines_of_code_added": 70,
+        "lines_of_code_deleted": 7,
+        "milestones": [],
+    }
+
+    first = client.get(
+        "/teacher/team_management/individual/github/3",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert first.status_code == 200
+    assert mock_fetch_commit_details.call_count == 1
+
+    mock_fetch_commit_details.return_value = {
+        "total_commits": 8,
+        "lines_of_code_added": 80,
+        "lines_of_code_deleted": 8,
+        "milestones": [],
+    }
+    second = client.get(
+        "/teacher/team_management/individual/github/3",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert second.status_code == 200
+    assert mock_fetch_commit_details.call_count == 1
+    assert second.get_json()["total_commits"] == 7
+    assert second.get_json()["stale_as_of"] == first.get_json()["stale_as_of"]
+
+    refreshed = client.get(
+        "/teacher/team_management/individual/github/3?refresh=1",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert refreshed.status_code == 200
+    assert mock_fetch_commit_details.call_count == 2
+    assert refreshed.get_json()["total_commits"] == 8
 
 
 @patch("apis.teacher.team_management.get_single_team_under_user")
@@ -114,7 +175,7 @@ def test_get_github_details_fetch_error(
     Test 502 response when fetching from GitHub fails.
     """
     mock_get_single_team_under_user.return_value = MagicMock(
-        github_repo_url="https://github.com/example/repo", members=[]
+        id=2, github_repo_url="https://github.com/example/repo", members=[]
     )
     mock_fetch_commit_details.return_value = {
         "status": "error",
@@ -0,0 +1,132 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+from application.models import CommitStats, db
+
+
+def add_commits(client, commits):
+    with client.application.app_context():
+        for index, (author, milestone_id, additions, deletions) in enumerate(commits):
+            db.session.add(
+                CommitStats(
+                    repo="shrasinh/team_alpha",
+                    sha=f"{index:040d}",
+                    author=author,
+                    committed_at=datetime(2024, 11, 1, tzinfo=timezone.utc),
+                    message=f"Milestone-{milestone_id} Change",
+                    additions=additions,
+                    deletions=deletions,
+                    milestone_id=milestone_id,
+                )
+            )
+        db.session.commit()
+
+
+@patch("apis.teacher.setup.sync_repository", return_value=None)
+def test_get_github_member_details_success(
+    mock_sync_repository, client, instructor_token
+):
+    """
+    Test that the team and per-member statistics are computed from a single sync of the repository.
+    """
+    add_commits(
+        client,
+        [
+            ("shrasinh", 1, 10, 1),
+            ("Shrasinh", 2, 20, 2),
+            ("Matrixmang0", 1, 5, 0),
+            ("outside_contributor", 1, 7, 7),
+            ("shrasinh", 999, 1, 1),
+        ],
+    )
+
+    response = client.get(
+        "/teacher/team_management/individual/github/1/members",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 200
+    mock_sync_repository.assert_called_once()
+    data = response.get_json()
+    assert data["name"] == "Team Alpha"
+    assert data["total_commits"] == 5
+    assert data["lines_of_code_added"] == 43
+    assert [m["commits"] for m in data["milestones"]] == [3, 1]
+    assert data["stale_as_of"] is not None
+
+    members = {member["github_username"]: member for member in data["members"]}
+    assert len(members) == 3
+    assert members["shrasinh"]["total_commits"] == 3
+    assert members["shrasinh"]["lines_of_code_added"] == 31
+    assert [m["milestone_id"] for m in members["shrasinh"]["milestones"]] == [1, 2]
+    assert members["Matrixmang0"]["total_commits"] == 1
+    assert members["Matrixmang0"]["milestones"][0]["lines_of_code_added"] == 5
+    assert members["areebafarooqui0001"]["total_commits"] == 0
+    assert members["areebafarooqui0001"]["milestones"] == []
+
+
+@patch("apis.teacher.team_management.fetch_member_commit_details")
+def test_get_github_member_details_fetch_error(
+    mock_fetch_member_commit_details, client, instructor_token
+):
+    """
+    Test that a failed sync of the repository returns a 502 error.
+    """
+    mock_fetch_member_commit_details.return_value = {
+        "status": "404",
+        "message": "Not Found",
+    }
+
+    response = client.get(
+        "/teacher/team_management/individual/github/1/members",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 502
+    assert response.get_json()["response"]["errors"] == ["Not Found"]
+
+
+@patch("apis.teacher.team_management.get_single_team_under_user")
+def test_get_github_member_details_no_repo(
+    mock_get_single_team_under_user, client, instructor_token
+):
+    """
+    Test retrieval for a team without a GitHub repository.
+    """
+    mock_get_single_team_under_user.return_value = type(
+        "Team", (), {"id": 1, "github_repo_url": None, "members": []}
+    )
+
+    response = client.get(
+        "/teacher/team_management/individual/github/1/members",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 404
+    assert response.get_json()["response"]["errors"] == [
+        "No GitHub repository URL found for this team"
+    ]
+
+
+def test_get_github_member_details_team_not_found(client, instructor_token):
+    """
+    Test retrieval for a team that is not managed by the user.
+    """
+    response = client.get(
+        "/teacher/team_management/individual/github/999/members",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 404
+    assert response.get_json()["response"]["errors"] == ["Team not found"]
+
+
+def test_get_github_member_details_unauthorized(client, student_token):
+    """
+    Test that students cannot access the member statistics.
+    """
+    response = client.get(
+        "/teacher/team_management/individual/github/1/members",
+        headers={"Authentication-Token": student_token},
+    )
+
+    assert response.status_code == 403
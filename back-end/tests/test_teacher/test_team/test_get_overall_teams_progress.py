@@ -1,5 +1,15 @@
 from unittest.mock import patch, MagicMock
 from flask import json
+from datetime import date, datetime, timezone
+from application.models import (
+    CommitActivity,
+    GithubSnapshots,
+    Submissions,
+    Tasks,
+    Teams,
+    Users,
+    db,
+)
 
 
 @patch("apis.teacher.team_management.fetch_commit_details")
@@ -14,7 +24,18 @@ def test_get_overall_teams_progress_success(
                 "rank": 1,
                 "status": "on_track",
                 "reason": "High progress with consistent GitHub activity.",
-            }
+            },
+            *(
+                {
+                    "team_name": team_name,
+                    "rank": rank,
+                    "status": "at_risk",
+                    "reason": "Some tasks are late.",
+                }
+                for rank, team_name in enumerate(
+                    ("Team Beta", "Team Gamma", "Team Delta"), start=2
+                )
+            ),
         ]
     }
     mock_choice_message_content = json.dumps(ai_response)
@@ -98,3 +119,141 @@ def test_get_overall_teams_progress_internal_error(
     assert "An unexpected error occurred. Try again later." in response.get_data(
         as_text=True
     )
+
+
+@patch("apis.teacher.team_management.fetch_commit_details")
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_get_overall_teams_progress_activity_in_prompt(
+    mock_ai_client, mock_fetch_commit_details, client, instructor_token
+):
+    """
+    Test that the daily commit activity of the teams is described in the AI prompt.
+    """
+    with client.application.app_context():
+        db.session.add(
+            CommitActivity(
+                repo="shrasinh/team_alpha",
+                author="shrasinh",
+                day=date(2024, 11, 20),
+                commits=2,
+                additions=155,
+                deletions=14,
+            )
+        )
+        db.session.commit()
+
+    mock_choice = MagicMock()
+    mock_choice.message.content = json.dumps({"teams": []})
+    mock_ai_client.return_value.choices = [mock_choice]
+    mock_fetch_commit_details.return_value = {
+        "total_commits": 2,
+        "lines_of_code_added": 155,
+        "lines_of_code_deleted": 14,
+        "milestones": [],
+    }
+
+    response = client.get(
+        "/teacher/team_management/overall",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 200
+    prompt = mock_ai_client.call_args.kwargs["messages"][1]["content"]
+    assert "2024-11-20:2(+155/-14)" in prompt
+
+    with client.application.app_context():
+        db.session.query(CommitActivity).delete()
+        db.session.commit()
+
+
+@patch("apis.teacher.team_management.fetch_commit_details")
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_get_overall_teams_progress_query_count_is_constant(
+    mock_ai_client, mock_fetch_commit_details, client, instructor_token
+):
+    """
+    Test that the number of database queries does not grow with the number of teams.
+    """
+    mock_choice = MagicMock()
+    mock_choice.message.content = json.dumps({"teams": []})
+    mock_ai_client.return_value.choices = [mock_choice]
+    mock_fetch_commit_details.return_value = {
+        "total_commits": 0,
+        "lines_of_code_added": 0,
+        "lines_of_code_deleted": 0,
+        "milestones": [],
+    }
+
+    def query_count():
+        response = client.get(
+            "/teacher/team_management/overall",
+            headers={"Authentication-Token": instructor_token},
+        )
+        assert response.status_code == 200
+        return int(response.headers["X-Query-Count"])
+
+    def add_teams(first, count):
+        with client.application.app_context():
+            instructor = Users.query.filter_by(username="profsmith").first()
+            tasks = Tasks.query.all()
+            teams = [
+                Teams(
+                    name=f"Query Count Team {i}",
+                    github_repo_url=f"https://github.com/example/query_count_{i}",
+                    instructor_id=instructor.id,
+                )
+                for i in range(first, first + count)
+            ]
+            db.session.add_all(teams)
+            db.session.flush()
+            for team in teams:
+                db.session.add(
+                    GithubSnapshots(
+                        team_id=team.id,
+                        total_commits=0,
+                        lines_of_code_added=0,
+                        lines_of_code_deleted=0,
+                        milestones=[],
+                        created_at=datetime.now(timezone.utc),
+                    )
+                )
+                for task in tasks:
+                    db.session.add(
+                        Submissions(
+                            task_id=task.id,
+                            team_id=team.id,
+                            submission_time=datetime(2024, 11, 20, 10, 0),
+                            feedback="Good work",
+                        )
+                    )
+            db.session.commit()
+            return [team.id for team in teams]
+
+    team_ids = add_teams(0, 2)
+    before = query_count()
+    team_ids += add_teams(2, 10)
+    after = query_count()
+
+    with client.application.app_context():
+        Submissions.query.filter(Submissions.team_id.in_(team_ids)).delete()
+        GithubSnapshots.query.filter(GithubSnapshots.team_id.in_(team_ids)).delete()
+        Teams.query.filter(Teams.id.in_(team_ids)).delete()
+        db.session.commit()
+
+    assert after == before
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_get_overall_teams_progress_empty_page(
+    mock_ai_client, client, instructor_token
+):
+    """
+    Test that an empty page of teams is ranked as an empty list, without calling the AI.
+    """
+    response = client.get(
+        "/teacher/team_management/overall?search=zzzznomatch",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 200
+    assert response.get_json() == []
+    mock_ai_client.assert_not_called()
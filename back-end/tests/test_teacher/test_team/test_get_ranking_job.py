@@ -0,0 +1,171 @@
+from unittest.mock import patch, MagicMock
+from flask import json
+from groq import APITimeoutError
+import httpx
+
+GITHUB_STATS = {
+    "total_commits": 10,
+    "lines_of_code_added": 500,
+    "lines_of_code_deleted": 100,
+    "milestones": [],
+}
+
+
+def submit_ranking(client, token):
+    with patch(
+        "apis.teacher.team_management.fetch_commit_details",
+        return_value=GITHUB_STATS,
+    ):
+        return client.get(
+            "/teacher/team_management/overall?ranking=async",
+            headers={"Authentication-Token": token},
+        )
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_async_ranking_is_polled(mock_ai_client, client, instructor_token):
+    """
+    Test that the progress is returned before the ranking, which is read from its job once done.
+    """
+    mock_choice = MagicMock()
+    mock_choice.message.content = json.dumps(
+        {
+            "teams": [
+                {
+                    "team_name": team_name,
+                    "rank": rank,
+                    "status": "on_track",
+                    "reason": "High progress with consistent GitHub activity.",
+                }
+                for rank, team_name in enumerate(
+                    ("Team Alpha", "Team Beta", "Team Gamma", "Team Delta"), start=1
+                )
+            ]
+        }
+    )
+    mock_ai_client.return_value.choices = [mock_choice]
+
+    response = submit_ranking(client, instructor_token)
+    assert response.status_code == 202
+    data = response.get_json()
+    assert "rank" not in data["teams"][0]
+    job_id = data["ranking_job"]["id"]
+
+    response = client.get(
+        f"/teacher/team_management/overall/ranking/{job_id}?wait=10",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job["status"] == "done"
+    assert job["teams"][0]["team_name"] == "Team Alpha"
+    assert job["teams"][0]["rank"] == 1
+    assert job["source"] == "ai"
+    assert job["error"] is None
+    assert job["finished_at"] is not None
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_failed_ranking_job(mock_ai_client, client, instructor_token):
+    """
+    Test that a ranking job records the error of the AI.
+    """
+    mock_ai_client.side_effect = Exception("AI service failed")
+
+    job_id = submit_ranking(client, instructor_token).get_json()["ranking_job"]["id"]
+
+    response = client.get(
+        f"/teacher/team_management/overall/ranking/{job_id}?wait=10",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job["status"] == "failed"
+    assert job["teams"] is None
+    assert "AI service failed" in job["error"]
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_ranking_job_of_empty_page(mock_ai_client, client, instructor_token):
+    """
+    Test that the ranking job of an empty page of teams is done right away, with an empty ranking.
+    """
+    response = client.get(
+        "/teacher/team_management/overall?ranking=async&search=zzzznomatch",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data["teams"] == []
+    assert data["ranking_job"]["status"] == "done"
+
+    response = client.get(
+        f"/teacher/team_management/overall/ranking/{data['ranking_job']['id']}",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "done"
+    assert response.get_json()["teams"] == []
+    mock_ai_client.assert_not_called()
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_ranking_job_falls_back_on_ai_timeout(mock_ai_client, client, instructor_token):
+    """
+    Test that a ranking job whose AI request times out ranks the teams from their metrics instead of failing.
+    """
+    mock_ai_client.side_effect = APITimeoutError(
+        request=httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    )
+
+    job_id = submit_ranking(client, instructor_token).get_json()["ranking_job"]["id"]
+
+    response = client.get(
+        f"/teacher/team_management/overall/ranking/{job_id}?wait=10",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 200
+    job = response.get_json()
+    assert job["status"] == "done"
+    assert job["source"] == "local"
+    assert job["error"] is None
+    assert sorted(team["rank"] for team in job["teams"]) == [1, 2, 3, 4]
+
+
+def test_ranking_job_of_another_user(client, instructor_token, ta_token):
+    """
+    Test that ranking jobs are only visible to the user who submitted them.
+    """
+    with patch(
+        "apis.teacher.team_management.ai_client.chat.completions.create",
+        side_effect=Exception("AI service failed"),
+    ):
+        job_id = submit_ranking(client, instructor_token).get_json()["ranking_job"][
+            "id"
+        ]
+        client.get(
+            f"/teacher/team_management/overall/ranking/{job_id}?wait=10",
+            headers={"Authentication-Token": instructor_token},
+        )
+
+    response = client.get(
+        f"/teacher/team_management/overall/ranking/{job_id}",
+        headers={"Authentication-Token": ta_token},
+    )
+    assert response.status_code == 404
+
+
+def test_ranking_job_not_found(client, instructor_token):
+    response = client.get(
+        "/teacher/team_management/overall/ranking/9999",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 404
+
+
+def test_ranking_job_invalid_wait(client, instructor_token):
+    response = client.get(
+        "/teacher/team_management/overall/ranking/1?wait=soon",
+        headers={"Authentication-Token": instructor_token},
+    )
+    assert response.status_code == 400
@@ -1,11 +1,11 @@
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from datetime import datetime, timedelta
 
 
 @patch("apis.teacher.team_management.get_single_team_under_user")
-@patch("apis.teacher.team_management.db.session.query")
+@patch("apis.teacher.team_management.get_task_submissions")
 def test_get_team_progress_success(
-    mock_query,
+    mock_get_task_submissions,
     mock_get_single_team_under_user,
     client,
     instructor_token,
@@ -15,21 +15,13 @@ def test_get_team_progress_success(
     """
     mock_get_single_team_under_user.return_value = True
 
-    mock_query_instance = MagicMock()
-    mock_query.return_value = mock_query_instance
-
-    mock_filtered_query = MagicMock()
-    mock_query_instance.filter.return_value = mock_filtered_query
-
-    def mock_submission():
-        return MagicMock(
-            task_id=1,
-            submission_time=datetime.now() - timedelta(days=5),
-            feedback="Great work!",
-            feedback_time=datetime.now() - timedelta(days=4),
-        )
-
-    mock_filtered_query.filter.return_value.first = mock_submission
+    mock_get_task_submissions.return_value = {
+        (1, 1): {
+            "submission_time": datetime.now() - timedelta(days=5),
+            "feedback": "Great work!",
+            "feedback_time": datetime.now() - timedelta(days=4),
+        }
+    }
 
     response = client.get(
         "/teacher/team_management/individual/progress/1",
@@ -47,6 +39,8 @@ def test_get_team_progress_success(
         assert "description" in milestone
         assert "deadline" in milestone
         assert "created_at" in milestone
+        assert "completion_percentage" in milestone
+        assert "last_activity_at" in milestone
         assert "tasks" in milestone
         assert isinstance(milestone["tasks"], list)
 
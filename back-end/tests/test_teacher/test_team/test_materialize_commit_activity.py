@@ -0,0 +1,157 @@
+from unittest.mock import patch
+import pytest
+from github import Github
+from apis.teacher.github_stats import format_activity_series
+from apis.teacher.setup import sync_repository
+from application.models import CommitActivity, CommitStats, GithubSyncState, db
+from tests.fake_github import FakeGithub
+
+
+@pytest.fixture
+def app_context(client):
+    client.application.config["GITHUB_FETCH_WORKERS"] = 1
+    with client.application.app_context():
+        yield
+        db.session.query(CommitStats).delete()
+        db.session.query(CommitActivity).delete()
+        db.session.query(GithubSyncState).delete()
+        db.session.commit()
+
+
+def test_sync_materializes_activity(app_context):
+    """
+    Test that the daily activity is rebuilt when a sync moves the head of the repository.
+    """
+    with FakeGithub() as server, patch(
+        "apis.teacher.setup.github_client", Github(base_url=server.url)
+    ):
+        server.add_commit(
+            "example/repo",
+            "a" * 40,
+            "alice",
+            "Milestone-1 A",
+            "2024-11-01T10:00:00Z",
+            5,
+            1,
+        )
+        server.add_commit(
+            "example/repo",
+            "b" * 40,
+            "bob",
+            "Milestone-1 B",
+            "2024-11-01T12:00:00Z",
+            7,
+            2,
+        )
+        assert sync_repository(server.url, "example/repo") is None
+
+        rows = CommitActivity.query.filter_by(repo="example/repo").all()
+        assert sorted((row.author, row.commits, row.additions) for row in rows) == [
+            ("alice", 1, 5),
+            ("bob", 1, 7),
+        ]
+
+        # Pushed at 23:30 on November 2nd in UTC-05:00, i.e. on November 3rd in UTC
+        server.add_commit(
+            "example/repo",
+            "c" * 40,
+            "alice",
+            "Milestone-1 C",
+            "2024-11-02T23:30:00-05:00",
+            3,
+            3,
+        )
+        assert sync_repository(server.url, "example/repo") is None
+
+    days = {
+        (row.author, row.day.isoformat()): row.commits
+        for row in CommitActivity.query.filter_by(repo="example/repo")
+    }
+    assert days == {
+        ("alice", "2024-11-01"): 1,
+        ("bob", "2024-11-01"): 1,
+        ("alice", "2024-11-03"): 1,
+    }
+
+
+def test_sync_backfills_activity(app_context):
+    """
+    Test that the daily activity of a repository synced before it was materialized is built on the next sync.
+    """
+    with FakeGithub() as server, patch(
+        "apis.teacher.setup.github_client", Github(base_url=server.url)
+    ):
+        server.add_commits("example/repo", 3)
+        assert sync_repository(server.url, "example/repo") is None
+
+        CommitActivity.query.delete()
+        db.session.commit()
+        assert sync_repository(server.url, "example/repo") is None
+
+    assert CommitActivity.query.filter_by(repo="example/repo").count() == 3
+
+
+def test_sync_recomputes_changed_days_only(app_context):
+    """
+    Test that a sync only recomputes the activity rows of the days of the added and pruned commits.
+    """
+    with FakeGithub() as server, patch(
+        "apis.teacher.setup.github_client", Github(base_url=server.url)
+    ):
+        push = lambda sha, author, date: server.add_commit(
+            "example/repo", sha * 40, author, "Milestone-1 Change", date, 1, 0
+        )
+        push("a", "alice", "2024-11-01T10:00:00Z")
+        push("b", "bob", "2024-11-02T10:00:00Z")
+        assert sync_repository(server.url, "example/repo") is None
+
+        def activity():
+            return {
+                (row.author, row.day.isoformat()): (row.id, row.commits)
+                for row in CommitActivity.query.filter_by(repo="example/repo")
+            }
+
+        before = activity()
+        push("c", "bob", "2024-11-01T11:00:00Z")
+        assert sync_repository(server.url, "example/repo") is None
+
+        after = activity()
+        assert after[("bob", "2024-11-01")][1] == 1
+        assert after[("bob", "2024-11-02")] == before[("bob", "2024-11-02")]
+        assert (
+            GithubSyncState.query.filter_by(repo="example/repo").one().activity_days
+            == []
+        )
+
+        # Force push dropping the commits of Bob
+        server.repos["example/repo"] = [
+            c for c in server.repos["example/repo"] if c["author"] == "alice"
+        ]
+        push("d", "alice", "2024-11-05T10:00:00Z")
+        assert sync_repository(server.url, "example/repo") is None
+
+        rewritten = activity()
+        assert set(rewritten) == {("alice", "2024-11-01"), ("alice", "2024-11-05")}
+        assert rewritten[("alice", "2024-11-01")] == before[("alice", "2024-11-01")]
+
+
+def test_format_activity_series():
+    """
+    Test that the activity series is described compactly, limited to the most recent active days.
+    """
+    days = [
+        {
+            "date": f"2024-11-0{day}",
+            "commits": day,
+            "lines_of_code_added": 10 * day,
+            "lines_of_code_deleted": day,
+        }
+        for day in range(1, 5)
+    ]
+
+    text = format_activity_series(days, limit=2)
+
+    assert "Active Days: 4, Last Commit: 2024-11-04" in text
+    assert "2024-11-03:3(+30/-3) 2024-11-04:4(+40/-4)" in text
+    assert "2024-11-02" not in text
+    assert format_activity_series([]) == "Active Days: 0\n"
@@ -9,9 +9,11 @@ def mock_submission():
 
 @patch("apis.teacher.team_management.get_single_team_under_user")
 @patch("apis.teacher.team_management.Submissions.query")
+@patch("apis.teacher.team_management.update_team_progress")
 @patch("apis.teacher.team_management.db.session.commit")
 def test_provide_feedback_success(
     mock_db_commit,
+    mock_update_team_progress,
     mock_submissions_query,
     mock_get_single_team_under_user,
     mock_submission,
@@ -39,6 +41,9 @@ def test_provide_feedback_success(
     assert "message" in response.json
     assert response.json["message"] == "The feedback is successfully provided."
     mock_db_commit.assert_called_once()
+    mock_update_team_progress.assert_called_once_with(
+        [mock_submission.task.milestone_id], [1]
+    )
 
 
 @patch("apis.teacher.team_management.get_single_team_under_user")
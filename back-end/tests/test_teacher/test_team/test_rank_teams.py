@@ -0,0 +1,244 @@
+from unittest.mock import patch, MagicMock
+import ast
+import pytest
+from flask import json
+from apis.teacher.team_ranking import (
+    AIResponse,
+    TeamAnalysis,
+    batch_prompts,
+    is_batch_ranking_valid,
+    merge_rankings,
+    rank_teams,
+)
+
+
+def batch_response(*analyses):
+    return AIResponse(
+        teams=[
+            TeamAnalysis(team_name=name, rank=rank, status=status, reason="")
+            for name, rank, status in analyses
+        ]
+    )
+
+
+def team_metrics(name, progress, total_commits=0):
+    return {
+        "team_name": name,
+        "progress": progress,
+        "due_tasks": 0,
+        "on_time_tasks": 0,
+        "submitted_tasks": 0,
+        "feedback_count": 0,
+        "total_commits": total_commits,
+    }
+
+
+def test_batch_prompts_fit_the_token_budget():
+    prompts = ["a" * 400, "b" * 400, "c" * 400, "d" * 2000]
+
+    batches = batch_prompts(prompts, 250)
+
+    assert batches == [prompts[:2], prompts[2:3], prompts[3:]]
+
+
+def test_merge_rankings_is_deterministic():
+    """
+    Test that partial rankings are merged into consecutive ranks, by status and by the score of the teams
+    across batches, not by their position in their batch.
+    """
+    first = batch_response(
+        ("Team A", 2, "at_risk"), ("Team B", 1, "on_track"), ("Team C", 3, "off_track")
+    )
+    second = batch_response(("Team D", 1, "at_risk"), ("Team E", 2, "on_track"))
+    first_metrics = [
+        team_metrics("Team A", 40),
+        team_metrics("Team B", 70),
+        team_metrics("Team C", 10),
+    ]
+    second_metrics = [team_metrics("Team D", 60), team_metrics("Team E", 95)]
+
+    merged = merge_rankings([first, second], [first_metrics, second_metrics])
+
+    assert [(team.team_name, team.rank) for team in merged.teams] == [
+        ("Team E", 1),
+        ("Team B", 2),
+        ("Team D", 3),
+        ("Team A", 4),
+        ("Team C", 5),
+    ]
+    assert merge_rankings([second, first], [second_metrics, first_metrics]) == merged
+
+
+def test_batch_ranking_must_rank_every_team_once():
+    """
+    Test that a ranking is only valid if it ranks exactly the teams sent, from 1 to their number.
+    """
+    metrics = [team_metrics("Team A", 90), team_metrics("Team B", 10)]
+
+    assert is_batch_ranking_valid(
+        batch_response(("Team A", 1, "on_track"), ("Team B", 2, "at_risk")), metrics
+    )
+    assert not is_batch_ranking_valid(
+        batch_response(("Team A", 1, "on_track"), ("Team B", 1, "at_risk")), metrics
+    )
+    assert not is_batch_ranking_valid(
+        batch_response(("Team A", 1, "on_track"), ("Team B", 3, "at_risk")), metrics
+    )
+    assert not is_batch_ranking_valid(
+        batch_response(("Team A", 1, "on_track"), ("Team B", 2, "unknown")), metrics
+    )
+    assert not is_batch_ranking_valid(
+        batch_response(("Team A", 1, "on_track")), metrics
+    )
+    assert not is_batch_ranking_valid(None, metrics)
+
+
+def test_merge_rankings_ranks_invalid_batches_locally(client):
+    """
+    Test that a batch whose AI ranking misses or adds teams, or whose AI request failed, is ranked locally.
+    """
+    metrics = [
+        [team_metrics("Team A", 90), team_metrics("Team B", 10)],
+        [team_metrics("Team C", 50), team_metrics("Team D", 45)],
+        [team_metrics("Team E", 10)],
+    ]
+    responses = [
+        batch_response(("Team A", 1, "on_track"), ("Team X", 2, "off_track")),
+        batch_response(
+            ("Team C", 1, "at_risk"), ("Team D", 2, "at_risk"), ("Team C", 3, "at_risk")
+        ),
+        None,
+    ]
+
+    with client.application.app_context():
+        merged = merge_rankings(responses, metrics)
+
+    assert [(team.team_name, team.status) for team in merged.teams] == [
+        ("Team A", "on_track"),
+        ("Team C", "at_risk"),
+        ("Team D", "at_risk"),
+        ("Team B", "off_track"),
+        ("Team E", "off_track"),
+    ]
+    assert [team.rank for team in merged.teams] == [1, 2, 3, 4, 5]
+
+
+@patch("apis.teacher.team_ranking.ai_client.chat.completions.create")
+def test_large_cohorts_are_ranked_in_batches(mock_ai_client, client):
+    """
+    Test that prompts over the token budget are ranked in several AI requests and merged.
+    """
+
+    def rank_batch(messages, **kwargs):
+        teams = [
+            line[len("Team: ") :] for line in ast.literal_eval(messages[1]["content"])
+        ]
+        mock_choice = MagicMock()
+        mock_choice.message.content = json.dumps(
+            {
+                "teams": [
+                    {
+                        "team_name": team,
+                        "rank": rank,
+                        "status": "on_track",
+                        "reason": "Steady progress.",
+                    }
+                    for rank, team in enumerate(teams, start=1)
+                ]
+            }
+        )
+        return MagicMock(choices=[mock_choice])
+
+    mock_ai_client.side_effect = rank_batch
+    prompts = [f"Team: Team {i:02}" for i in range(12)]
+    metrics = [team_metrics(f"Team {i:02}", i) for i in range(12)]
+    timings = {}
+
+    with client.application.app_context():
+        previous = client.application.config["AI_RANKING_TOKEN_BUDGET"]
+        client.application.config["AI_RANKING_TOKEN_BUDGET"] = 10
+        try:
+            ai_response = rank_teams(prompts, metrics, timings)
+        finally:
+            client.application.config["AI_RANKING_TOKEN_BUDGET"] = previous
+
+    assert mock_ai_client.call_count == 6
+    assert sorted(team.rank for team in ai_response.teams) == list(range(1, 13))
+    assert {team.team_name for team in ai_response.teams} == {
+        f"Team {i:02}" for i in range(12)
+    }
+    assert set(timings) == {"ranking_map", "ranking_reduce"}
+    # Teams with the same status are ordered by their progress, whatever their batch
+    assert [team.team_name for team in ai_response.teams] == [
+        f"Team {i:02}" for i in reversed(range(12))
+    ]
+
+
+@patch("apis.teacher.team_ranking.ai_client.chat.completions.create")
+def test_failing_batches_are_ranked_locally(mock_ai_client, client):
+    """
+    Test that a batch whose AI request fails is ranked locally and the ranking is not cached, and that the
+    error is raised when every batch fails.
+    """
+    mock_choice = MagicMock()
+    mock_choice.message.content = json.dumps(
+        {
+            "teams": [
+                {
+                    "team_name": "Team Y0",
+                    "rank": 1,
+                    "status": "on_track",
+                    "reason": "Steady progress.",
+                }
+            ]
+        }
+    )
+    mock_ai_client.side_effect = [
+        MagicMock(choices=[mock_choice]),
+        Exception("AI service failed"),
+    ]
+    prompts = ["Team: Team Y0", "Team: Team Y1"]
+    metrics = [team_metrics("Team Y0", 10), team_metrics("Team Y1", 90)]
+
+    with client.application.app_context():
+        previous = client.application.config["AI_RANKING_TOKEN_BUDGET"]
+        client.application.config["AI_RANKING_TOKEN_BUDGET"] = 5
+        try:
+            ai_response = rank_teams(prompts, metrics)
+            assert [
+                (team.team_name, team.rank, team.status) for team in ai_response.teams
+            ] == [("Team Y1", 1, "on_track"), ("Team Y0", 2, "on_track")]
+
+            mock_ai_client.side_effect = Exception("AI service failed")
+            with pytest.raises(Exception, match="AI service failed"):
+                rank_teams(prompts, metrics)
+            assert mock_ai_client.call_count == 4
+        finally:
+            client.application.config["AI_RANKING_TOKEN_BUDGET"] = previous
+
+
+@patch("apis.teacher.team_management.fetch_commit_details")
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_overall_progress_reports_server_timing(
+    mock_ai_client, mock_fetch_commit_details, client, instructor_token
+):
+    mock_choice = MagicMock()
+    mock_choice.message.content = json.dumps({"teams": []})
+    mock_ai_client.return_value.choices = [mock_choice]
+    mock_fetch_commit_details.return_value = {
+        "total_commits": 0,
+        "lines_of_code_added": 0,
+        "lines_of_code_deleted": 0,
+        "milestones": [],
+    }
+
+    response = client.get(
+        "/teacher/team_management/overall",
+        headers={"Authentication-Token": instructor_token},
+    )
+
+    assert response.status_code == 200
+    stages = [
+        timing.split(";")[0] for timing in response.headers["Server-Timing"].split(", ")
+    ]
+    assert stages == ["progress", "github", "ranking_map", "ranking_reduce"]
@@ -0,0 +1,107 @@
+from unittest.mock import patch
+import time
+import httpx
+from groq import APITimeoutError
+from apis.teacher.team_ranking import rank_teams_locally
+
+GITHUB_STATS = {
+    "total_commits": 10,
+    "lines_of_code_added": 500,
+    "lines_of_code_deleted": 100,
+    "milestones": [],
+}
+
+
+def metrics(name, progress, on_time=0, due=0, submitted=0, feedback=0, commits=0):
+    return {
+        "team_name": name,
+        "progress": progress,
+        "due_tasks": due,
+        "on_time_tasks": on_time,
+        "submitted_tasks": submitted,
+        "feedback_count": feedback,
+        "total_commits": commits,
+    }
+
+
+def get_overall(client, token, query=""):
+    with patch(
+        "apis.teacher.team_management.fetch_commit_details",
+        return_value=GITHUB_STATS,
+    ):
+        return client.get(
+            f"/teacher/team_management/overall{query}",
+            headers={"Authentication-Token": token},
+        )
+
+
+def test_local_ranking_orders_teams_by_score():
+    """
+    Test that teams are ranked by their metrics, with ties broken by name.
+    """
+    ranking = rank_teams_locally(
+        [
+            metrics("Team C", 0),
+            metrics(
+                "Team A", 100, on_time=4, due=4, submitted=4, feedback=4, commits=50
+            ),
+            metrics("Team B", 50, on_time=1, due=4, submitted=2, commits=10),
+            metrics("Team D", 0),
+        ]
+    )
+
+    assert [(team.team_name, team.rank, team.status) for team in ranking.teams] == [
+        ("Team A", 1, "on_track"),
+        ("Team B", 2, "at_risk"),
+        ("Team C", 3, "off_track"),
+        ("Team D", 4, "off_track"),
+    ]
+    assert "Progress is 50% with 1 of 4 due tasks submitted on time" in (
+        ranking.teams[1].reason
+    )
+
+
+def test_local_ranking_is_reproducible_and_fast():
+    cohort = [
+        metrics(f"Team {i:03}", i % 101, i % 5, 4, i % 7, i % 3, i * 7 % 90)
+        for i in range(200)
+    ]
+
+    started = time.perf_counter()
+    ranking = rank_teams_locally(cohort)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.05
+    assert ranking == rank_teams_locally(list(reversed(cohort)))
+    assert [team.rank for team in ranking.teams] == list(range(1, 201))
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_local_ranking_skips_the_ai(mock_ai_client, client, instructor_token):
+    response = get_overall(client, instructor_token, "?ranking=local")
+
+    assert response.status_code == 200
+    assert response.headers["X-Ranking-Source"] == "local"
+    data = response.get_json()
+    assert sorted(team["rank"] for team in data) == list(range(1, len(data) + 1))
+    assert all(team["status"] for team in data)
+    mock_ai_client.assert_not_called()
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_ai_timeout_falls_back_to_local_ranking(
+    mock_ai_client, client, instructor_token
+):
+    """
+    Test that the teams are ranked from their metrics when the AI times out.
+    """
+    mock_ai_client.side_effect = APITimeoutError(
+        request=httpx.Request("POST", "https://api.groq.com")
+    )
+
+    response = get_overall(client, instructor_token)
+
+    assert response.status_code == 200
+    assert response.headers["X-Ranking-Source"] == "local"
+    assert all("rank" in team for team in response.get_json())
+    assert mock_ai_client.call_args.kwargs["timeout"] == 20
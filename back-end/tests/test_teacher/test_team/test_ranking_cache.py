@@ -0,0 +1,136 @@
+from unittest.mock import patch, MagicMock
+from flask import json
+from apis.teacher.ranking_cache import RankingCache, ranking_cache, ranking_cache_key
+from apis.teacher.team_progress import update_team_progress
+from application.models import Milestones
+
+GITHUB_STATS = {
+    "total_commits": 10,
+    "lines_of_code_added": 500,
+    "lines_of_code_deleted": 100,
+    "milestones": [],
+}
+
+# Teams of the instructor
+TEAM_NAMES = ("Team Alpha", "Team Beta", "Team Gamma", "Team Delta")
+
+
+def mock_ranking(mock_ai_client, team_names=TEAM_NAMES):
+    mock_choice = MagicMock()
+    mock_choice.message.content = json.dumps(
+        {
+            "teams": [
+                {
+                    "team_name": team_name,
+                    "rank": rank,
+                    "status": "on_track",
+                    "reason": "High progress with consistent GitHub activity.",
+                }
+                for rank, team_name in enumerate(team_names, start=1)
+            ]
+        }
+    )
+    mock_ai_client.return_value.choices = [mock_choice]
+
+
+def get_overall(client, token, query=""):
+    with patch(
+        "apis.teacher.team_management.fetch_commit_details",
+        return_value=GITHUB_STATS,
+    ):
+        return client.get(
+            f"/teacher/team_management/overall{query}",
+            headers={"Authentication-Token": token},
+        )
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_repeated_loads_are_ranked_once(mock_ai_client, client, instructor_token):
+    """
+    Test that reloading the dashboard while nothing changed reuses the cached ranking.
+    """
+    mock_ranking(mock_ai_client)
+
+    first = get_overall(client, instructor_token)
+    second = get_overall(client, instructor_token)
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == second.get_json()
+    assert second.get_json()[0]["rank"] == 1
+    assert mock_ai_client.call_count == 1
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_invalid_rankings_are_not_cached(mock_ai_client, client, instructor_token):
+    """
+    Test that an AI ranking missing teams or inventing others is replaced by the local ranking and not cached.
+    """
+    mock_ranking(mock_ai_client, ("Team Alpha", "Team Beta", "Team Omega"))
+
+    first = get_overall(client, instructor_token)
+    second = get_overall(client, instructor_token)
+
+    assert first.status_code == second.status_code == 200
+    assert sorted(team["rank"] for team in first.get_json()) == [1, 2, 3, 4]
+    assert mock_ai_client.call_count == 2
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_cached_ranking_job_is_done_right_away(
+    mock_ai_client, client, instructor_token
+):
+    """
+    Test that a ranking job of an already ranked input is stored as done without calling the AI.
+    """
+    mock_ranking(mock_ai_client)
+    get_overall(client, instructor_token)
+
+    response = get_overall(client, instructor_token, "?ranking=async")
+
+    assert response.status_code == 202
+    assert response.get_json()["ranking_job"]["status"] == "done"
+    assert mock_ai_client.call_count == 1
+
+
+def test_progress_changes_clear_the_cache(client):
+    """
+    Test that updating the progress of the teams removes the cached rankings.
+    """
+    ranking_cache.put("key", "ranking")
+
+    with client.application.app_context():
+        update_team_progress([Milestones.query.first().id])
+
+    assert ranking_cache.get("key") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = RankingCache(max_entries=2, ttl=600)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_cache_expires_rankings():
+    cache = RankingCache(max_entries=2, ttl=0)
+    cache.put("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_key_covers_model_and_prompt_version():
+    prompt = ["Team: Team Alpha\n"]
+
+    assert ranking_cache_key(prompt, "model", 1) == ranking_cache_key(
+        list(prompt), "model", 1
+    )
+    assert ranking_cache_key(prompt, "model", 1) != ranking_cache_key(
+        prompt, "model", 2
+    )
+    assert ranking_cache_key(prompt, "model", 1) != ranking_cache_key(
+        prompt, "other", 1
+    )
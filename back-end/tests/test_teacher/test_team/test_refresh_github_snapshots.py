@@ -0,0 +1,34 @@
+from unittest.mock import patch
+from apis.teacher.github_snapshots import refresh_github_snapshots, get_github_snapshot
+from application.models import Teams
+
+
+@patch("apis.teacher.github_snapshots.fetch_commit_details")
+def test_refresh_github_snapshots(mock_fetch_commit_details, client):
+    """
+    Test that the snapshots of all teams with a GitHub repository are refreshed, skipping failed fetches.
+    """
+
+    def fetch(repo_url):
+        if repo_url.endswith("team_beta"):
+            return {"status": "404", "message": "Not Found"}
+        return {
+            "total_commits": 3,
+            "lines_of_code_added": 30,
+            "lines_of_code_deleted": 3,
+            "milestones": [{"milestone_id": 1, "name": "Milestone 1", "commits": 1}],
+        }
+
+    mock_fetch_commit_details.side_effect = fetch
+
+    with client.application.app_context():
+        assert refresh_github_snapshots() == 3
+
+        for team in Teams.query.all():
+            snapshot = get_github_snapshot(team.id)
+            if team.name == "Team Beta":
+                assert snapshot is None
+            else:
+                assert snapshot.total_commits == 3
+                assert snapshot.milestones[0]["milestone_id"] == 1
+                assert snapshot.created_at is not None
@@ -0,0 +1,106 @@
+from unittest.mock import patch, MagicMock
+from flask import json
+
+GITHUB_STATS = {
+    "total_commits": 10,
+    "lines_of_code_added": 500,
+    "lines_of_code_deleted": 100,
+    "milestones": [],
+}
+
+
+def mock_ranking(mock_ai_client):
+    mock_choice = MagicMock()
+    mock_choice.message.content = json.dumps(
+        {
+            "teams": [
+                {
+                    "team_name": "Team Alpha",
+                    "rank": 1,
+                    "status": "on_track",
+                    "reason": "High progress with consistent GitHub activity.",
+                }
+            ]
+        }
+    )
+    mock_ai_client.return_value.choices = [mock_choice]
+
+
+def get_overall(client, token, accept):
+    with patch(
+        "apis.teacher.team_management.fetch_commit_details",
+        return_value=GITHUB_STATS,
+    ):
+        response = client.get(
+            "/teacher/team_management/overall",
+            headers={"Authentication-Token": token, "Accept": accept},
+        )
+        # Consume the streamed body while GitHub is mocked
+        response.get_data()
+        return response
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_stream_ndjson(mock_ai_client, client, instructor_token):
+    """
+    Test that the progress of every team is streamed before the GitHub statistics and the ranking.
+    """
+    mock_ranking(mock_ai_client)
+
+    response = get_overall(client, instructor_token, "application/x-ndjson")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    events = [
+        json.loads(line) for line in response.get_data(as_text=True).split("\n") if line
+    ]
+    names = [event["event"] for event in events]
+
+    team_count = names.count("progress")
+    assert team_count > 0
+    assert names[:team_count] == ["progress"] * team_count
+    assert set(names[team_count:-1]) == {"github"}
+    assert names[-1] == "ranking"
+
+    github = next(event["data"] for event in events if event["event"] == "github")
+    assert github["total_commits"] == 10
+    assert events[-1]["data"][0]["team_name"] == "Team Alpha"
+    assert events[-1]["data"][0]["rank"] == 1
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_stream_server_sent_events(mock_ai_client, client, instructor_token):
+    """
+    Test that the events are sent as server-sent events, ending with an error event if the AI fails.
+    """
+    mock_ai_client.side_effect = Exception("AI service failed")
+
+    response = get_overall(client, instructor_token, "text/event-stream")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    messages = [
+        message.split("\n")
+        for message in response.get_data(as_text=True).split("\n\n")
+        if message
+    ]
+    assert messages[0][0] == "event: progress"
+    assert json.loads(messages[0][1][len("data: ") :])["team_name"]
+    assert messages[-1] == ["event: error", 'data: "AI service failed"']
+
+
+@patch("apis.teacher.team_management.ai_client.chat.completions.create")
+def test_json_is_returned_by_default(mock_ai_client, client, instructor_token):
+    """
+    Test that clients accepting any media type still receive the JSON array.
+    """
+    mock_ranking(mock_ai_client)
+
+    response = get_overall(client, instructor_token, "*/*")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    data = response.get_json()
+    assert data[0]["rank"] == 1
+    assert data[0]["total_commits"] == 10
@@ -0,0 +1,95 @@
+from unittest.mock import patch
+import pytest
+from github import Github
+from apis.teacher.github_graphql import sync_commits_graphql
+from apis.teacher.setup import fetch_commit_details
+from application.models import CommitStats, GithubSyncState, db
+from tests.fake_github import FakeGithub
+
+
+@pytest.fixture
+def app_context(client):
+    client.application.config["GITHUB_STATS_BACKEND"] = "graphql"
+    with client.application.app_context():
+        yield
+        db.session.query(CommitStats).delete()
+        db.session.query(GithubSyncState).delete()
+        db.session.commit()
+
+
+@pytest.fixture
+def server():
+    with FakeGithub() as server:
+        yield server
+
+
+@pytest.fixture
+def github_client(server):
+    github_client = Github(
+        base_url=server.url, seconds_between_requests=None, seconds_between_writes=None
+    )
+    with patch("apis.teacher.setup.github_client", github_client):
+        yield github_client
+
+
+def test_sync_commits_graphql_pages_history(server, github_client, app_context):
+    """
+    Test that a cold sync fetches the statistics of 100 commits per GraphQL request.
+    """
+    server.add_commits("example/repo", 250)
+
+    details = fetch_commit_details("https://github.com/example/repo")
+
+    assert server.requests == {"graphql": 3}
+    assert details["total_commits"] == 250
+    assert details["lines_of_code_added"] == sum(10 + i % 7 for i in range(250))
+    assert details["lines_of_code_deleted"] == sum(i % 3 for i in range(250))
+    assert details["milestones"][0]["commits"] == 250
+
+    member_details = fetch_commit_details("https://github.com/example/repo", "bob")
+    assert member_details["total_commits"] == 125
+
+
+def test_sync_commits_graphql_incremental(server, github_client, app_context):
+    """
+    Test that a refresh only pages until the sync watermark.
+    """
+    server.add_commits("example/repo", 250)
+    sync_commits_graphql(github_client, "example/repo")
+
+    server.add_commits("example/repo", 5, milestone_id=2)
+    assert sync_commits_graphql(github_client, "example/repo") == 5
+    assert sync_commits_graphql(github_client, "example/repo") == 0
+
+    assert server.requests == {"graphql": 5}
+    state = GithubSyncState.query.filter_by(repo="example/repo").first()
+    assert state.last_sha == server.repos["example/repo"][0]["sha"]
+
+
+def test_sync_commits_graphql_rewritten_history(server, github_client, app_context):
+    """
+    Test that commits removed by a force push are pruned.
+    """
+    server.add_commits("example/repo", 10)
+    sync_commits_graphql(github_client, "example/repo")
+
+    server.repos["example/repo"] = server.repos["example/repo"][3:]
+    sync_commits_graphql(github_client, "example/repo")
+
+    assert CommitStats.query.filter_by(repo="example/repo").count() == 7
+
+
+def test_sync_commits_graphql_errors(server, github_client, app_context):
+    """
+    Test that GraphQL errors are returned in the format of the REST API errors.
+    """
+    server.repos["example/empty"] = []
+
+    assert fetch_commit_details("https://github.com/example/missing") == {
+        "status": "404",
+        "message": "Could not resolve to a Repository with the name 'example/missing'.",
+    }
+    assert fetch_commit_details("https://github.com/example/empty") == {
+        "status": "409",
+        "message": "Git Repository is empty.",
+    }
@@ -0,0 +1,232 @@
+import os
+import subprocess
+from unittest.mock import MagicMock, patch
+import pytest
+from github import Github
+from apis.teacher.github_mirror import (
+    GitMirrorError,
+    github_login_lookup,
+    run_git,
+    sync_commits_mirror,
+)
+from apis.teacher.github_stats import sync_commits
+from apis.teacher.setup import fetch_commit_details
+from application.models import CommitAuthors, CommitStats, GithubSyncState, db
+from tests.fake_github import FakeGithub
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def commit(repo, message, email, lines=1, deleted=0, filename="notes.txt", name=None):
+    path = repo / filename
+    content = path.read_text().splitlines() if path.exists() else []
+    content = content[: len(content) - deleted] + [message] * lines
+    path.write_text("\n".join(content) + "\n")
+    git(repo, "add", "-A")
+    git(
+        repo,
+        "-c",
+        f"user.name={name or email.split('@')[0]}",
+        "-c",
+        f"user.email={email}",
+        "commit",
+        "-q",
+        "-m",
+        message,
+    )
+    return git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "origin" / "team_repo"
+    repo.mkdir(parents=True)
+    git(repo, "init", "-q", "-b", "main")
+    commit(
+        repo, "Milestone-1 Add user stories", "123+alice@users.noreply.github.com", 10
+    )
+    commit(repo, "Milestone-1 Fix typos", "bob@example.com", 5, deleted=5)
+    commit(repo, "Initial scaffolding", "123+alice@users.noreply.github.com", 100)
+    commit(repo, "Milestone-999 Unknown milestone", "bob@example.com", 1, deleted=1)
+    return repo
+
+
+@pytest.fixture
+def app_context(client, tmp_path):
+    client.application.config["GITHUB_STATS_BACKEND"] = "mirror"
+    client.application.config["GIT_MIRROR_FOLDER"] = str(tmp_path / "mirrors")
+    with client.application.app_context():
+        yield
+        db.session.query(CommitStats).delete()
+        db.session.query(GithubSyncState).delete()
+        db.session.query(CommitAuthors).delete()
+        db.session.commit()
+
+
+def test_fetch_commit_details_from_mirror(repo, app_context, tmp_path):
+    """
+    Test that the statistics are read from a local mirror of the repository.
+    """
+    details = fetch_commit_details(f"file://{repo}")
+
+    assert os.path.isdir(tmp_path / "mirrors" / "origin" / "team_repo.git")
+    assert details == {
+        "total_commits": 4,
+        "lines_of_code_added": 116,
+        "lines_of_code_deleted": 6,
+        "milestones": [
+            {
+                "milestone_id": 1,
+                "name": "User Requirements and Stories Submission",
+                "commits": 2,
+                "lines_of_code_added": 15,
+                "lines_of_code_deleted": 5,
+            }
+        ],
+    }
+
+    assert fetch_commit_details(f"file://{repo}", "Alice")["total_commits"] == 2
+    assert fetch_commit_details(f"file://{repo}", "bob")["total_commits"] == 2
+
+
+def test_sync_commits_mirror_incremental(repo, app_context, tmp_path):
+    """
+    Test that a refresh only reads the commits pushed since the last sync, and prunes rewritten history.
+    """
+    url, mirrors = f"file://{repo}", str(tmp_path / "mirrors")
+    sync = lambda: sync_commits_mirror(
+        url, "origin/team_repo", mirrors, allow_local=True
+    )
+    assert sync() == 4
+    assert sync() == 0
+
+    head = commit(repo, "Milestone-2 Wireframes", "bob@example.com", 3)
+    assert sync() == 1
+    assert (
+        GithubSyncState.query.filter_by(repo="origin/team_repo").first().last_sha
+        == head
+    )
+
+    git(repo, "reset", "-q", "--hard", "HEAD~3")
+    commit(repo, "Milestone-2 Rewritten", "bob@example.com", 2)
+    assert sync() == 1
+    assert CommitStats.query.filter_by(repo="origin/team_repo").count() == 3
+
+
+def test_fetch_commit_details_mirror_errors(repo, app_context, tmp_path):
+    """
+    Test that git errors are returned in the format of the GitHub API errors.
+    """
+    empty = tmp_path / "origin" / "empty_repo"
+    empty.mkdir()
+    git(empty, "init", "-q")
+
+    assert fetch_commit_details(f"file://{empty}") == {
+        "status": "409",
+        "message": "Git Repository is empty.",
+    }
+    assert fetch_commit_details(f"file://{tmp_path}/missing/repo")["status"] == "502"
+
+
+def test_sync_commits_mirror_authors_match_rest(app_context, tmp_path):
+    """
+    Test that the mirror resolves the commit authors to the same GitHub logins as the REST API sync, looking
+    up every unknown email once.
+    """
+    repo = tmp_path / "origin" / "team_repo"
+    repo.mkdir(parents=True)
+    git(repo, "init", "-q", "-b", "main")
+    logins = {}
+    for message, email, name, login in [
+        ("Milestone-1 Stories", "carol@university.edu", "Carol Smith", "carol-gh"),
+        ("Milestone-1 Typos", "Dave@Example.com", "dave", "dave-gh"),
+        ("Milestone-1 More stories", "carol@university.edu", "Carol S", "carol-gh"),
+        ("Milestone-1 Draft", "guest@localhost", "Guest", None),
+        ("Milestone-1 Review", "7+erin@users.noreply.github.com", "Erin", "erin"),
+    ]:
+        sha = commit(repo, message, email, name=name)
+        logins[sha] = login
+
+    with FakeGithub() as server:
+        for sha, login in logins.items():
+            server.add_commit(
+                "origin/team_repo", sha, login, "Change", "2024-11-01T10:00:00Z", 1, 0
+            )
+        github_client = Github(base_url=server.url, retry=None)
+
+        sync_commits(github_client, "origin/team_repo")
+        rest_authors = dict(db.session.query(CommitStats.sha, CommitStats.author))
+        assert rest_authors == logins
+
+        db.session.query(CommitStats).delete()
+        db.session.query(GithubSyncState).delete()
+        db.session.commit()
+        lookups = server.requests["commit"]
+
+        for _ in range(2):
+            sync_commits_mirror(
+                f"file://{repo}",
+                "origin/team_repo",
+                str(tmp_path / "mirrors"),
+                lookup_login=github_login_lookup(github_client, "origin/team_repo"),
+                allow_local=True,
+            )
+            assert dict(db.session.query(CommitStats.sha, CommitStats.author)) == (
+                rest_authors
+            )
+            db.session.query(CommitStats).delete()
+            db.session.query(GithubSyncState).delete()
+            db.session.commit()
+
+        # One lookup per unknown email, cached for the later syncs
+        assert server.requests["commit"] - lookups == 3
+
+
+def test_sync_commits_mirror_local_authors(repo, app_context, tmp_path):
+    """
+    Test that the authors of a local repository are matched against the GitHub usernames of the users.
+    """
+    sha = commit(repo, "Milestone-1 Wireframes", "Student1@university.edu")
+    sync_commits_mirror(
+        f"file://{repo}",
+        "origin/team_repo",
+        str(tmp_path / "mirrors"),
+        allow_local=True,
+    )
+
+    assert CommitStats.query.filter_by(sha=sha).one().author == "shrasinh"
+
+
+def test_sync_commits_mirror_rejects_other_hosts(repo, app_context, tmp_path):
+    """
+    Test that only repositories hosted on GitHub are mirrored, and local repositories only when allowed.
+    """
+    for url in (
+        "https://gitlab.com/origin/team_repo.git",
+        "git@example.com:origin/team_repo.git",
+        f"file://{repo}",
+    ):
+        with pytest.raises(GitMirrorError) as error:
+            sync_commits_mirror(url, "origin/team_repo", str(tmp_path / "mirrors"))
+        assert error.value.data["status"] == "400"
+    assert not os.path.exists(tmp_path / "mirrors")
+
+
+def test_run_git_sends_token_to_github_only():
+    """
+    Test that the access token is only configured for requests to GitHub.
+    """
+    with patch(
+        "apis.teacher.github_mirror.subprocess.run",
+        return_value=MagicMock(returncode=0, stdout=""),
+    ) as run:
+        run_git(["fetch", "origin"], "secret")
+
+    command = run.call_args.args[0]
+    headers = [arg for arg in command if "extraHeader" in arg]
+    assert len(headers) == 1
+    assert headers[0].startswith("http.https://github.com/.extraHeader=")
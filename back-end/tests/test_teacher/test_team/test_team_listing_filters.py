@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from apis.teacher.team_progress import update_team_progress
+from application.models import Milestones, Submissions, Tasks, Teams, Users, db
+
+
+@pytest.fixture(scope="module")
+def listing_teams(client):
+    """
+    Adds five teams under the instructor and a milestone whose deadline has passed, fully submitted by the
+    first two teams only.
+    """
+    with client.application.app_context():
+        instructor = Users.query.filter_by(username="profsmith").first()
+        teams = [
+            Teams(name=f"Listing Team {i}", instructor_id=instructor.id)
+            for i in range(5)
+        ]
+        milestone = Milestones(
+            title="Past Milestone",
+            description="Milestone whose deadline has passed",
+            deadline=datetime.now(timezone.utc) - timedelta(days=1),
+        )
+        db.session.add_all([*teams, milestone])
+        db.session.flush()
+        task = Tasks(milestone_id=milestone.id, description="Past task")
+        db.session.add(task)
+        db.session.flush()
+        for team in teams[:2]:
+            db.session.add(
+                Submissions(
+                    task_id=task.id,
+                    team_id=team.id,
+                    submission_time=datetime.now(timezone.utc) - timedelta(days=2),
+                )
+            )
+        update_team_progress([milestone.id])
+        db.session.commit()
+        return [team.id for team in teams]
+
+
+def get(client, token, url):
+    return client.get(url, headers={"Authentication-Token": token})
+
+
+def test_teams_are_paginated(client, instructor_token, listing_teams):
+    """
+    Test that the pages of a search are followed through the Link header.
+    """
+    url = "/teacher/team_management/individual?search=listing&limit=2"
+    pages = []
+    while url:
+        response = get(client, instructor_token, url)
+        assert response.status_code == 200
+        pages.append([team["id"] for team in response.get_json()["teams"]])
+        link = response.headers.get("Link")
+        url = link[1 : link.index(">")] if link else None
+
+    assert pages == [listing_teams[:2], listing_teams[2:4], listing_teams[4:]]
+
+
+def test_teams_are_searched_by_name(client, instructor_token, listing_teams):
+    response = get(
+        client, instructor_token, "/teacher/team_management/individual?search=TEAM 3"
+    )
+
+    assert response.status_code == 200
+    assert [team["name"] for team in response.get_json()["teams"]] == ["Listing Team 3"]
+    assert "Link" not in response.headers
+
+
+def test_teams_are_filtered_by_status(client, instructor_token, listing_teams):
+    """
+    Test that the status filter is computed from the tasks whose deadline has passed.
+    """
+    response = get(
+        client,
+        instructor_token,
+        "/teacher/team_management/individual?search=listing&status=on_track",
+    )
+    assert [team["id"] for team in response.get_json()["teams"]] == listing_teams[:2]
+
+    response = get(
+        client,
+        instructor_token,
+        "/teacher/team_management/individual?search=listing&status=off_track",
+    )
+    assert [team["id"] for team in response.get_json()["teams"]] == listing_teams[2:]
+
+
+@pytest.mark.parametrize(
+    "query", ["limit=0", "limit=101", "limit=ten", "after=last", "status=late"]
+)
+def test_invalid_listing_parameters(client, instructor_token, query):
+    response = get(
+        client, instructor_token, f"/teacher/team_management/individual?{query}"
+    )
+
+    assert response.status_code == 400
+
+
+def test_overall_progress_is_paginated(client, instructor_token, listing_teams):
+    response = get(
+        client,
+        instructor_token,
+        "/teacher/team_management/overall?ranking=local&search=listing&limit=3",
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [team["team_name"] for team in data] == [
+        f"Listing Team {i}" for i in range(3)
+    ]
+    assert sorted(team["rank"] for team in data) == [1, 2, 3]
+    assert f"after={listing_teams[2]}" in response.headers["Link"]
+
+
+def test_milestone_overview_is_filtered(client, instructor_token, listing_teams):
+    response = get(
+        client, instructor_token, "/teacher/milestone_management?search=listing"
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["no_of_teams"] == 5
+    milestone = next(m for m in data["milestones"] if m["title"] == "Past Milestone")
+    assert milestone["completion_rate"] == 40.0